@@ -0,0 +1,111 @@
+# Batch Factory Benchmark for AURORA Trading System
+"""
+Compare the per-event trade factory with the columnar batch factory
+(events and row tuples), and optionally the insert throughput of
+EventStore.append_many against EventStore.append_rows.
+
+Usage (from the AURORA-Trading-System directory):
+    python -m benchmarks.bench_batch_factories --events 200000
+    python -m benchmarks.bench_batch_factories --events 20000 --insert
+"""
+
+from typing import Any, Callable, Dict
+import argparse
+import json
+import time
+
+import numpy as np
+
+from src.events.event_models import EventType, create_trade_event, create_trade_events
+
+
+def _columns(n: int) -> Dict[str, Any]:
+    """Backfill-style column arrays."""
+    rng = np.random.default_rng(42)
+    return {
+        'aggregate_ids': [f"trade:{i}" for i in range(n)],
+        'symbols': rng.choice(["BTC/USD", "ETH/USD", "SOL/USD"], n),
+        'prices': rng.uniform(100.0, 50000.0, n),
+        'quantities': rng.uniform(0.01, 5.0, n),
+        'sides': rng.choice(["BUY", "SELL"], n),
+    }
+
+
+def _per_event(columns: Dict[str, Any]):
+    """Build events one at a time with the existing factory."""
+    return [
+        create_trade_event(aggregate_id, EventType.TRADE_EXECUTED, symbol, price, quantity, side, "EXECUTED")
+        for aggregate_id, symbol, price, quantity, side in zip(
+            columns['aggregate_ids'],
+            columns['symbols'].tolist(),
+            columns['prices'].tolist(),
+            columns['quantities'].tolist(),
+            columns['sides'].tolist()
+        )
+    ]
+
+
+def _batch(columns: Dict[str, Any], as_rows: bool):
+    """Build events (or rows) with the columnar factory."""
+    return create_trade_events(
+        columns['aggregate_ids'], EventType.TRADE_EXECUTED, columns['symbols'],
+        columns['prices'], columns['quantities'], columns['sides'], "EXECUTED",
+        as_rows=as_rows
+    )
+
+
+def _rate(n: int, func: Callable[[], Any]) -> float:
+    """Run func once and return processed objects per second."""
+    start = time.perf_counter()
+    func()
+    return n / (time.perf_counter() - start)
+
+
+def run(n: int, insert: bool = False) -> Dict[str, float]:
+    """Run all measurements."""
+    columns = _columns(n)
+    results = {
+        'per_event_factory_per_sec': _rate(n, lambda: _per_event(columns)),
+        'batch_events_per_sec': _rate(n, lambda: _batch(columns, as_rows=False)),
+        'batch_rows_per_sec': _rate(n, lambda: _batch(columns, as_rows=True)),
+    }
+
+    if insert:
+        # Needs a reachable DATABASE_URL; both paths start from an empty table
+        from src.events.event_store import EventStore
+
+        store = EventStore()
+        store.clear()
+        events = _per_event(columns)
+        results['append_many_per_sec'] = _rate(n, lambda: store.append_many(events))
+        store.clear()
+        rows = _batch(columns, as_rows=True)
+        results['append_rows_per_sec'] = _rate(n, lambda: store.append_rows(rows, notify=False))
+        store.clear()
+
+    return results
+
+
+def main() -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark AURORA batch event factories.")
+    parser.add_argument("--events", type=int, default=100000, help="events per measurement")
+    parser.add_argument("--insert", action="store_true", help="also measure store inserts")
+    args = parser.parse_args()
+
+    results = run(args.events, insert=args.insert)
+    baseline = results['per_event_factory_per_sec']
+
+    print(f"AURORA batch factory benchmark ({args.events:,} events)")
+    print(f"{'metric':<28}{'per sec':>14}{'ratio':>9}")
+    for metric in ('per_event_factory_per_sec', 'batch_events_per_sec', 'batch_rows_per_sec'):
+        print(f"{metric:<28}{results[metric]:>14,.0f}{results[metric] / baseline:>8.2f}x")
+    if 'append_rows_per_sec' in results:
+        ratio = results['append_rows_per_sec'] / results['append_many_per_sec']
+        print(f"{'append_many_per_sec':<28}{results['append_many_per_sec']:>14,.0f}")
+        print(f"{'append_rows_per_sec':<28}{results['append_rows_per_sec']:>14,.0f}{ratio:>8.2f}x")
+    print(json.dumps(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+# Cache Admission Benchmark for AURORA Trading System
+"""
+Compare the hit ratio (and speed) of W-TinyLFU with plain LRU on key
+traces of the same byte capacity.
+
+Synthetic traces (seeded, reproducible):
+    zipf       skewed popularity (Zipf s=0.9) over --keys keys
+    zipf+scan  the same, interleaved with one-off sequential scans
+               (a client paging through /trades)
+    loop       cyclic access to 1.5x the capacity (LRU worst case)
+
+Recorded traces are text files with one access per line, ``key`` or
+``key size_in_bytes``; pass them with --trace (repeatable). Without
+sizes every key counts as --size bytes. Redis is not needed.
+
+Usage (from the AURORA-Trading-System directory):
+    python -m benchmarks.bench_cache_admission --capacity 1000 --accesses 200000
+    python -m benchmarks.bench_cache_admission --trace keys.log
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import argparse
+import itertools
+import json
+import random
+import time
+
+from src.cache.local_cache import MISSING
+from src.cache.tinylfu import TinyLFUCache
+
+
+# (key, size in bytes)
+Access = Tuple[str, int]
+
+
+class ByteLRU:
+    """Plain LRU bounded by bytes (the baseline)."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()
+
+    def get(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return MISSING
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def set(self, key: str, value: Any, size: int) -> None:
+        if key in self._entries:
+            self.bytes -= self._entries.pop(key)[1]
+        self._entries[key] = (value, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            self.bytes -= self._entries.popitem(last=False)[1][1]
+
+
+# ============================================================================
+# Traces
+# ============================================================================
+
+def _zipf(keys: int, accesses: int, rng: random.Random, skew: float = 0.9) -> List[str]:
+    weights = [1.0 / (rank + 1) ** skew for rank in range(keys)]
+    return [f"cache:get_trade:{rank}" for rank in rng.choices(range(keys), weights, k=accesses)]
+
+
+def zipf_trace(keys: int, accesses: int, size: int, seed: int) -> List[Access]:
+    return [(key, size) for key in _zipf(keys, accesses, random.Random(seed))]
+
+
+def zipf_scan_trace(keys: int, accesses: int, size: int, seed: int, capacity: int) -> List[Access]:
+    """Zipf accesses with a scan of 2x the capacity after every 10% of them."""
+    rng = random.Random(seed)
+    hot = _zipf(keys, accesses, rng)
+    trace: List[Access] = []
+    page = itertools.count()
+    block = max(1, accesses // 10)
+    for start in range(0, accesses, block):
+        trace.extend((key, size) for key in hot[start:start + block])
+        trace.extend((f"cache:get_trades:{next(page)}", size) for _ in range(2 * capacity))
+    return trace
+
+
+def loop_trace(accesses: int, size: int, capacity: int) -> List[Access]:
+    span = capacity * 3 // 2
+    return [(f"cache:loop:{i % span}", size) for i in range(accesses)]
+
+
+def read_trace(path: str, size: int) -> List[Access]:
+    """Load a recorded trace (``key`` or ``key size`` per line)."""
+    trace: List[Access] = []
+    with open(path) as f:
+        for line in f:
+            parts = line.split()
+            if parts:
+                trace.append((parts[0], int(parts[1]) if len(parts) > 1 else size))
+    return trace
+
+
+# ============================================================================
+# Simulation
+# ============================================================================
+
+def simulate(cache: Any, trace: Iterable[Access]) -> Dict[str, float]:
+    """Replay a trace as read-through lookups.
+
+    Returns:
+        Hit ratio and microseconds per access
+    """
+    hits = lookups = 0
+    start = time.perf_counter()
+    for key, size in trace:
+        lookups += 1
+        if cache.get(key) is MISSING:
+            cache.set(key, key, size=size)
+        else:
+            hits += 1
+    elapsed = time.perf_counter() - start
+    return {'hit_ratio': hits / lookups if lookups else 0.0, 'us_per_access': elapsed / max(1, lookups) * 1e6}
+
+
+def run(
+    capacity: int,
+    keys: int,
+    accesses: int,
+    size: int,
+    seed: int,
+    traces: Optional[List[str]] = None
+) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """Replay every trace against LRU and W-TinyLFU of capacity * size bytes."""
+    workloads: Dict[str, List[Access]] = {
+        'zipf': zipf_trace(keys, accesses, size, seed),
+        'zipf+scan': zipf_scan_trace(keys, accesses, size, seed, capacity),
+        'loop': loop_trace(accesses, size, capacity),
+    }
+    for path in traces or ():
+        workloads[path] = read_trace(path, size)
+
+    max_bytes = capacity * size
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for name, trace in workloads.items():
+        results[name] = {
+            'lru': simulate(ByteLRU(max_bytes), trace),
+            'tinylfu': simulate(
+                TinyLFUCache(max_bytes=max_bytes, default_ttl=None, expected_entries=capacity), trace
+            ),
+        }
+    return results
+
+
+def main() -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark W-TinyLFU against LRU hit ratios.")
+    parser.add_argument("--capacity", type=int, default=1000, help="cache capacity in entries of --size bytes")
+    parser.add_argument("--keys", type=int, default=20000, help="distinct keys of the synthetic traces")
+    parser.add_argument("--accesses", type=int, default=200000, help="accesses per synthetic trace")
+    parser.add_argument("--size", type=int, default=512, help="bytes per entry when the trace has no sizes")
+    parser.add_argument("--seed", type=int, default=42, help="random seed")
+    parser.add_argument("--trace", action="append", help="recorded trace file (repeatable)")
+    args = parser.parse_args()
+
+    results = run(args.capacity, args.keys, args.accesses, args.size, args.seed, args.trace)
+
+    print(f"{'trace':<14}{'policy':<10}{'hit ratio':>11}{'us/access':>11}")
+    for name, rows in results.items():
+        for policy, row in rows.items():
+            print(f"{name:<14}{policy:<10}{row['hit_ratio']:>11.3f}{row['us_per_access']:>11.2f}")
+    print(json.dumps(results))
+
+
+if __name__ == "__main__":
+    main()
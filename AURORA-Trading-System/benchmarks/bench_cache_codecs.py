@@ -0,0 +1,93 @@
+# Cache Codec Benchmark for AURORA Trading System
+"""
+Compare cache value codecs and compression: encode and decode time and
+bytes stored, for a page of trades and a single trade.
+
+Only installed backends are measured (orjson, msgpack, lz4 and zstd are
+optional). Redis is not needed.
+
+Usage (from the AURORA-Trading-System directory):
+    python -m benchmarks.bench_cache_codecs --trades 100 --rounds 2000
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+import argparse
+import json
+import time
+
+from src.cache.codecs import CODECS, COMPRESSIONS, ValueCodec
+
+
+def _trades(n: int) -> List[Dict[str, Any]]:
+    """A /trades page as cached by the API (JSON-mode TradeResponse dicts)."""
+    start = datetime(2026, 2, 2, 14, 30)
+    return [
+        {
+            'id': i,
+            'symbol': ("BTC/USD", "ETH/USD", "SOL/USD")[i % 3],
+            'price': 45000.0 + i * 0.25,
+            'quantity': 1.5,
+            'side': "BUY" if i % 2 else "SELL",
+            'created_at': (start + timedelta(seconds=i)).isoformat(),
+        }
+        for i in range(n)
+    ]
+
+
+def _measure(encoder: ValueCodec, value: Any, rounds: int) -> Dict[str, float]:
+    """Time encode/decode and record the stored size."""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        raw = encoder.encode(value)
+    encode_us = (time.perf_counter() - start) / rounds * 1e6
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        ValueCodec.decode(raw)
+    decode_us = (time.perf_counter() - start) / rounds * 1e6
+
+    return {'encode_us': encode_us, 'decode_us': decode_us, 'bytes': len(raw)}
+
+
+def run(trades: int, rounds: int, threshold: int) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """Measure every installed codec/compression pair on both payloads."""
+    payloads = {'page': _trades(trades), 'single': _trades(1)[0]}
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    compressions: List[Optional[str]] = [None] + sorted(COMPRESSIONS)
+
+    for payload_name, value in payloads.items():
+        results[payload_name] = {}
+        for codec in sorted(CODECS):
+            for compression in compressions:
+                encoder = ValueCodec(codec, compression, compress_threshold=threshold)
+                name = f"{codec}+{compression or 'none'}"
+                results[payload_name][name] = _measure(encoder, value, rounds)
+    return results
+
+
+def main() -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark AURORA cache codecs.")
+    parser.add_argument("--trades", type=int, default=100, help="trades per cached page")
+    parser.add_argument("--rounds", type=int, default=2000, help="encode/decode rounds")
+    parser.add_argument("--threshold", type=int, default=1024, help="compression threshold (bytes)")
+    args = parser.parse_args()
+
+    results = run(args.trades, args.rounds, args.threshold)
+
+    for payload_name, rows in results.items():
+        baseline = rows["json+none"]
+        print(f"\n{payload_name} ({args.trades if payload_name == 'page' else 1} trades)")
+        print(f"{'codec':<18}{'encode us':>11}{'decode us':>11}{'bytes':>9}{'vs json':>9}")
+        for name, row in rows.items():
+            ratio = row['bytes'] / baseline['bytes']
+            print(
+                f"{name:<18}{row['encode_us']:>11.1f}{row['decode_us']:>11.1f}"
+                f"{row['bytes']:>9,}{ratio:>8.2f}x"
+            )
+    print(json.dumps(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# Event Model Benchmark for AURORA Trading System
+"""
+Compare the slotted, frozen Event against the previous dict-based
+dataclass: construction, to_dict and to_json throughput (objects/sec)
+and memory per event (bytes, measured with tracemalloc).
+
+Usage (from the AURORA-Trading-System directory):
+    python -m benchmarks.bench_event_models --events 200000
+"""
+
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+import argparse
+import json
+import time
+import tracemalloc
+import uuid
+
+from src.events import event_models
+from src.events.event_models import Event, EventType
+
+
+@dataclass
+class LegacyEvent:
+    """Event as implemented before the slotted version (for comparison)."""
+
+    event_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    event_type: str = field(default="")
+    aggregate_id: str = field(default="")
+    timestamp: datetime = field(default_factory=datetime.utcnow)
+    data: Dict[str, Any] = field(default_factory=dict)
+    version: int = field(default=1)
+    user_id: Optional[str] = field(default=None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data['timestamp'] = self.timestamp.isoformat()
+        return data
+
+    def to_json(self) -> str:
+        import json
+        return json.dumps(self.to_dict())
+
+    def __hash__(self):
+        return hash(self.event_id)
+
+
+def _payload(i: int) -> Dict[str, Any]:
+    """Typical trade event payload."""
+    return {
+        'symbol': "BTC/USD",
+        'price': 45000.0 + i,
+        'quantity': 1.5,
+        'side': "BUY" if i % 2 else "SELL",
+        'status': "EXECUTED",
+    }
+
+
+def _build(cls: Callable, n: int) -> List[Any]:
+    """Construct n events of the given class."""
+    timestamp = datetime.utcnow()
+    return [
+        cls(
+            event_type=EventType.TRADE_EXECUTED,
+            aggregate_id=f"trade:{i}",
+            timestamp=timestamp,
+            data=_payload(i)
+        )
+        for i in range(n)
+    ]
+
+
+def _rate(n: int, func: Callable[[], Any]) -> float:
+    """Run func once and return processed objects per second."""
+    start = time.perf_counter()
+    func()
+    return n / (time.perf_counter() - start)
+
+
+def _bytes_per_event(cls: Callable, n: int) -> float:
+    """Measure traced memory allocated per constructed event."""
+    tracemalloc.start()
+    events = _build(cls, n)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del events
+    return current / n
+
+
+def run(n: int) -> Dict[str, Dict[str, float]]:
+    """Run all measurements for both implementations."""
+    results: Dict[str, Dict[str, float]] = {}
+
+    for name, cls in (("legacy", LegacyEvent), ("slotted", Event)):
+        events = _build(cls, n)
+        results[name] = {
+            'construct_per_sec': _rate(n, lambda: _build(cls, n)),
+            'to_dict_per_sec': _rate(n, lambda: [e.to_dict() for e in events]),
+            'to_json_per_sec': _rate(n, lambda: [e.to_json() for e in events]),
+            'bytes_per_event': _bytes_per_event(cls, n),
+        }
+
+    if event_models.orjson is not None:
+        # Same slotted events, forcing the json module fallback
+        events = _build(Event, n)
+        saved, event_models.orjson = event_models.orjson, None
+        try:
+            results["slotted"]['to_json_stdlib_per_sec'] = _rate(
+                n, lambda: [e.to_json() for e in events]
+            )
+        finally:
+            event_models.orjson = saved
+
+    return results
+
+
+def main() -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark AURORA event models.")
+    parser.add_argument("--events", type=int, default=100000, help="events per measurement")
+    args = parser.parse_args()
+
+    results = run(args.events)
+    legacy, slotted = results["legacy"], results["slotted"]
+
+    print(f"AURORA event model benchmark ({args.events:,} events, "
+          f"orjson={'yes' if event_models.orjson else 'no'})")
+    print(f"{'metric':<26}{'legacy':>14}{'slotted':>14}{'ratio':>9}")
+    for metric in ('construct_per_sec', 'to_dict_per_sec', 'to_json_per_sec', 'bytes_per_event'):
+        ratio = slotted[metric] / legacy[metric]
+        print(f"{metric:<26}{legacy[metric]:>14,.0f}{slotted[metric]:>14,.0f}{ratio:>8.2f}x")
+    if 'to_json_stdlib_per_sec' in slotted:
+        print(f"{'to_json_stdlib_per_sec':<26}{'':>14}{slotted['to_json_stdlib_per_sec']:>14,.0f}")
+    print(json.dumps(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -7,8 +7,14 @@ FastAPI dependency functions for request handlers.
 from sqlalchemy.orm import Session
 from src.database.config import SessionLocal
 from src.cache.redis_client import redis_client
-from src.events.event_store import event_store, EventStore
+from src.events.event_store import event_store, projection_materializer, EventStore
 from src.events.event_processor import EventProcessor
+from src.events.portfolio_projection import PortfolioProjection
+from src.events.event_stats import event_stats
+
+
+# Shared projection so each request only loads newly appended trade events
+portfolio_projection = PortfolioProjection(event_store)
 
 
 def get_db() -> Session:
@@ -72,4 +78,9 @@ def get_processor() -> EventProcessor:
         async def replay(processor = Depends(get_processor)):
             state = processor.replay_events(aggregate_id)
     """
-    return EventProcessor(event_store)
+    return EventProcessor(
+        event_store,
+        portfolio=portfolio_projection,
+        stats=event_stats,
+        materialized=projection_materializer.store
+    )
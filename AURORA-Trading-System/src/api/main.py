@@ -5,6 +5,7 @@
 
 from fastapi import FastAPI
 from fastapi.openapi.utils import get_openapi
+import os
 import uvicorn
 
 # Import integrated routes
@@ -23,6 +24,69 @@ app = FastAPI(
 # Include integrated routes
 app.include_router(router)
 
+@app.on_event("startup")
+def start_cache_invalidation_listener():
+    """Listen for L1 invalidations of other workers (if any route uses the L1 tier)."""
+    from src.cache.local_cache import invalidation_bus, local_cache
+    if local_cache.enabled:
+        invalidation_bus.start()
+
+
+@app.on_event("shutdown")
+def stop_cache_invalidation_listener():
+    """Stop the L1 invalidation listener."""
+    from src.cache.local_cache import invalidation_bus
+    invalidation_bus.stop()
+
+
+# Periodic aggregated cache metrics as CACHE_METRICS events (opt-in, 0 disables)
+CACHE_METRICS_INTERVAL = float(os.getenv("CACHE_METRICS_INTERVAL", "0"))
+
+
+@app.on_event("startup")
+def start_cache_metrics_reporter():
+    """Start appending periodic cache metrics summaries to the event store."""
+    if CACHE_METRICS_INTERVAL <= 0:
+        return
+    from src.cache.metrics import CacheMetricsReporter, cache_metrics
+    from src.events.event_store import event_store
+    app.state.cache_metrics_reporter = CacheMetricsReporter(
+        cache_metrics, event_store.append, CACHE_METRICS_INTERVAL
+    )
+    app.state.cache_metrics_reporter.start()
+
+
+# Preload hot cache entries before serving (see src/api/warmup.py)
+CACHE_WARMUP_ON_STARTUP = os.getenv("CACHE_WARMUP_ON_STARTUP", "0") == "1"
+
+
+@app.on_event("startup")
+async def warm_cache_on_startup():
+    """Warm the cache so a new worker does not start cold."""
+    if not CACHE_WARMUP_ON_STARTUP:
+        return
+    from .warmup import warm_cache
+    try:
+        await warm_cache()
+    except Exception as e:
+        print(f"❌ Cache warm-up failed: {e}")
+
+
+@app.on_event("shutdown")
+def stop_cache_metrics_reporter():
+    """Stop the cache metrics reporter."""
+    reporter = getattr(app.state, "cache_metrics_reporter", None)
+    if reporter is not None:
+        reporter.stop()
+
+
+@app.on_event("shutdown")
+async def close_async_redis_pools():
+    """Close the async Redis connection pools of the serving event loop."""
+    from src.cache.async_redis_client import async_redis_client
+    if async_redis_client is not None:
+        await async_redis_client.aclose()
+
 # Custom OpenAPI schema
 def custom_openapi():
     if app.openapi_schema:
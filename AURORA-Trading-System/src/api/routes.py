@@ -5,14 +5,17 @@ Provides unified interface for trade operations and event queries.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
 from typing import List, Optional
 from datetime import datetime
+import asyncio
 from sqlalchemy.orm import Session
 
 from src.database.config import SessionLocal
 from src.database.models import Trade
 from src.cache.decorators import cache
-from src.events.event_store import event_store
+from src.cache.async_cache_manager import AsyncCacheManager
+from src.events.event_store import event_store, event_cache_tag
 from src.events.event_processor import EventProcessor
 from src.events.event_models import create_trade_event, EventType
 
@@ -27,7 +30,7 @@ router = APIRouter(prefix="/api/v1", tags=["AURORA API"])
 # ============================================================================
 
 @router.get("/trades", response_model=List[TradeResponse])
-@cache(ttl=3600)
+@cache(ttl=3600, version="trades", stale_ttl=300, lock_timeout=5, early_refresh=1.0)
 async def get_trades(
     db: Session = Depends(get_db),
     skip: int = Query(0, ge=0),
@@ -38,7 +41,11 @@ async def get_trades(
     
     - **skip**: Skip first N records
     - **limit**: Limit results (max 100)
-    - Results cached for 1 hour
+    - Results cached for 1 hour; concurrent misses run one query,
+      popular pages are refreshed early (XFetch) and expired pages are
+      served stale for up to 5 minutes while refreshed
+    - Pages are versioned ("trades"): trade writes start a new
+      generation instead of deleting every cached page
     
     Returns:
         List of trades with full details
@@ -48,7 +55,13 @@ async def get_trades(
 
 
 @router.get("/trades/{trade_id}", response_model=TradeResponse)
-@cache(ttl=3600)
+@cache(
+    ttl=3600,
+    tags=lambda trade_id, *args, **kwargs: [f"trade:{trade_id}"],
+    early_refresh=1.0,
+    negative_ttl=30,
+    negative_on=HTTPException
+)
 async def get_trade(
     trade_id: int,
     db: Session = Depends(get_db)
@@ -57,6 +70,8 @@ async def get_trade(
     Get specific trade by ID with caching.
     
     - **trade_id**: Trade identifier
+    - 404s are cached for 30 seconds; trade writes overwrite the entry
+      with the new trade (write-through)
     
     Returns:
         Trade details or 404 if not found
@@ -81,7 +96,9 @@ async def create_trade(
     1. Validate trade data (decorator @validate_trade)
     2. Persist to PostgreSQL database
     3. Create TRADE_CREATED event in Event Store
-    4. Invalidate cache pattern for /trades
+    4. Write the trade through to its GET /trades/{id} cache entry
+       (replacing a cached 404), start a new /trades page generation
+       and drop the cached 404 of its event stream
     5. Return created trade
     
     Request body:
@@ -116,11 +133,9 @@ async def create_trade(
     # Append to event store
     event_store.append(event)
     
-    # Invalidate cache
-    from src.cache.cache_manager import CacheManager
-    CacheManager.invalidate_pattern("cache:get_trades:*")
-    
-    return TradeResponse.from_orm(db_trade)
+    response = TradeResponse.from_orm(db_trade)
+    await _write_through(response)
+    return response
 
 
 @router.put("/trades/{trade_id}", response_model=TradeResponse)
@@ -133,6 +148,9 @@ async def update_trade(
     """
     Update trade and log TRADE_UPDATED event.
     
+    The updated trade is written through to its cache entry, like on
+    create.
+    
     Returns:
         Updated trade or 404
     """
@@ -159,11 +177,23 @@ async def update_trade(
     )
     event_store.append(event)
     
-    # Invalidate cache
-    from src.cache.cache_manager import CacheManager
-    CacheManager.invalidate_pattern("cache:*trade*")
-    
-    return TradeResponse.from_orm(db_trade)
+    response = TradeResponse.from_orm(db_trade)
+    await _write_through(response)
+    return response
+
+
+async def _write_through(trade: TradeResponse) -> None:
+    """Refresh the cache after a committed trade write.
+
+    The trade is stored under its GET /trades/{id} key, so the next read
+    does not reach the database, and /trades pages move to a new
+    generation. (The trade's cached event stream and replay are dropped
+    by the event store on append.)
+    """
+    await asyncio.gather(
+        get_trade.cache_put(trade, trade_id=trade.id),
+        AsyncCacheManager.bump_version("trades")
+    )
 
 
 # ============================================================================
@@ -186,7 +216,7 @@ async def get_events(
         List of events in chronological order
     """
     if event_type:
-        events = event_store.get_events_by_type(event_type)
+        events = event_store.get_events_by_type(event_type, include_payload=True)
     else:
         events = event_store.get_all_events(limit=limit)
     
@@ -194,6 +224,12 @@ async def get_events(
 
 
 @router.get("/events/stream/{aggregate_id}", response_model=List[EventResponse])
+@cache(
+    ttl=60,
+    tags=lambda aggregate_id, *args, **kwargs: [event_cache_tag(aggregate_id)],
+    negative_ttl=30,
+    negative_on=HTTPException
+)
 async def get_event_stream(
     aggregate_id: str,
     event_store_dep = Depends(get_event_store)
@@ -202,6 +238,8 @@ async def get_event_stream(
     Get event stream for specific aggregate (trade, cache, etc).
     
     - **aggregate_id**: Aggregate identifier (e.g., "trade:123")
+    - Streams cached for 1 minute, unknown aggregates (404) for 30
+      seconds; every append to the aggregate clears its stream
     
     Returns:
         All events for this aggregate in order
@@ -213,19 +251,28 @@ async def get_event_stream(
 
 
 @router.get("/events/replay/{aggregate_id}")
+@cache(
+    ttl=60,
+    tags=lambda aggregate_id, *args, **kwargs: [event_cache_tag(aggregate_id)],
+    negative_ttl=30,
+    negative_on=HTTPException
+)
 async def replay_events(
     aggregate_id: str,
     processor: EventProcessor = Depends(get_processor)
 ):
     """
-    Replay all events for aggregate to get current state.
+    Get the current state of an aggregate.
     
     - **aggregate_id**: Aggregate to replay
+    - Read from the projection table kept current on append (aggregates
+      not materialized yet are replayed)
+    - Cached like the event stream (tag "events:<aggregate_id>")
     
     Returns:
-        State after replaying all events
+        State after applying all events
     """
-    state = processor.replay_events(aggregate_id)
+    state = processor.get_projection(aggregate_id)
     if not state.get('event_count'):
         raise HTTPException(status_code=404, detail="No events to replay")
     return state
@@ -238,16 +285,75 @@ async def get_event_stats(
     """
     Get aggregate statistics across all events.
     
+    Served from Redis counters maintained on append; falls back to
+    the event store when Redis is unavailable.
+    
     Returns:
-        Total count, breakdown by type and aggregate, time range
+        Total count, breakdown by type and top aggregates, time range
     """
     return processor.get_aggregate_stats()
 
 
+@router.get("/portfolio")
+async def get_portfolio(
+    processor: EventProcessor = Depends(get_processor)
+):
+    """
+    Get portfolio positions aggregated from all TRADE_* events.
+    
+    Updated incrementally: only events appended since the previous
+    request are loaded into the columnar projection.
+    
+    Returns:
+        Per-symbol net position, average cost, notional and realized P&L
+    """
+    return processor.get_portfolio_projection()
+
+
 # ============================================================================
 # HEALTH/STATUS ENDPOINTS
 # ============================================================================
 
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """
+    Get cache hit/miss counters per tier and per key prefix.
+    
+    Returns:
+        In-process (l1) and Redis (l2) hits, misses and hit rates, and
+        per-prefix counters and latency/size histograms
+    """
+    from src.cache.cache_manager import CacheManager
+    return CacheManager.stats()
+
+
+@router.post("/cache/warm")
+async def warm_cache_now():
+    """
+    Preload hot cache entries on demand.
+    
+    Warms recent trades, the first /trades pages and the streams and
+    replays of the most active aggregates (see CACHE_WARMUP_* settings).
+    
+    Returns:
+        Number of keys warmed (total and per source), skipped and failed
+    """
+    from .warmup import warm_cache
+    return await warm_cache()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics() -> str:
+    """
+    Export cache metrics in the Prometheus text format.
+    
+    Returns:
+        Per-prefix hit/miss/error counters and latency/size histograms
+    """
+    from src.cache.metrics import cache_metrics
+    return cache_metrics.render_prometheus()
+
+
 @router.get("/health", response_model=HealthResponse)
 async def health_check(
     db: Session = Depends(get_db),
@@ -0,0 +1,238 @@
+# Cache Warm-up for AURORA Trading System
+"""
+Preloads hot API cache entries so a freshly deployed worker does not
+send its first burst of traffic to PostgreSQL.
+
+Warms the most recent trades (GET /trades/{id}), the first pages of
+GET /trades, and the event streams and replayed projections of the
+most active aggregates in the EventStore. Each source is loaded with
+one query; entries are written in pipelined chunks with bounded
+concurrency. Source queries and writes share one time budget, and
+entries are written with SET NX so values cached by live traffic in
+the meantime are never overwritten with older ones.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import os
+import time
+
+from src.database.config import SessionLocal
+from src.database.models import Trade
+from src.cache.async_cache_manager import AsyncCacheManager
+from src.events.event_store import event_store
+from src.events.event_processor import EventProcessor
+
+from .schemas import TradeResponse, EventResponse
+
+
+# (key, stored payload, tags, ttl) as built by @cache's cache_entry
+Entry = Tuple[str, Any, list, int]
+
+
+@dataclass
+class WarmupConfig:
+    """What to warm and how hard to push.
+
+    Attributes:
+        trades: Most recent trades to warm (GET /trades/{id})
+        pages: First GET /trades pages to warm
+        page_size: Page size of the warmed pages (the endpoint default)
+        aggregates: Most active aggregates whose stream and replay to warm
+        concurrency: Pipelines written concurrently
+        chunk_size: Keys per pipeline
+        budget: Seconds after which no more chunks are written
+    """
+
+    trades: int = 100
+    pages: int = 3
+    page_size: int = 10
+    aggregates: int = 20
+    concurrency: int = 4
+    chunk_size: int = 200
+    budget: float = 10.0
+
+    @classmethod
+    def from_env(cls) -> "WarmupConfig":
+        """Build the configuration from CACHE_WARMUP_* environment variables."""
+        return cls(
+            trades=int(os.getenv("CACHE_WARMUP_TRADES", cls.trades)),
+            pages=int(os.getenv("CACHE_WARMUP_PAGES", cls.pages)),
+            page_size=int(os.getenv("CACHE_WARMUP_PAGE_SIZE", cls.page_size)),
+            aggregates=int(os.getenv("CACHE_WARMUP_AGGREGATES", cls.aggregates)),
+            concurrency=int(os.getenv("CACHE_WARMUP_CONCURRENCY", cls.concurrency)),
+            chunk_size=int(os.getenv("CACHE_WARMUP_CHUNK_SIZE", cls.chunk_size)),
+            budget=float(os.getenv("CACHE_WARMUP_BUDGET", cls.budget)),
+        )
+
+
+@dataclass
+class WarmupReport:
+    """Outcome of a warm-up run."""
+
+    keys: int = 0
+    by_source: Dict[str, int] = field(default_factory=dict)
+    existing: int = 0
+    skipped: int = 0
+    failed: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def complete(self) -> bool:
+        """Whether every prepared entry was written."""
+        return not self.skipped and not self.failed
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize for the API and logs."""
+        return {
+            'keys': self.keys,
+            'by_source': self.by_source,
+            'existing': self.existing,
+            'skipped': self.skipped,
+            'failed': self.failed,
+            'elapsed': round(self.elapsed, 3),
+            'complete': self.complete,
+        }
+
+
+# ============================================================================
+# Entry sources (one query each, run in worker threads)
+# ============================================================================
+
+def _trade_entries(config: WarmupConfig) -> List[Entry]:
+    """Entries for the most recent trades and the first /trades pages."""
+    from .routes import get_trade, get_trades
+
+    session = SessionLocal()
+    try:
+        started = time.perf_counter()
+        recent = session.query(Trade).order_by(Trade.id.desc()).limit(config.trades).all()
+        rows = session.query(Trade).limit(config.pages * config.page_size).all()
+        delta = time.perf_counter() - started
+    finally:
+        session.close()
+
+    entries = [
+        get_trade.cache_entry(TradeResponse.from_orm(trade), kwargs={'trade_id': trade.id}, delta=delta)
+        for trade in recent
+    ]
+    page_rows = [TradeResponse.from_orm(trade) for trade in rows]
+    for page in range(config.pages):
+        skip = page * config.page_size
+        results = page_rows[skip:skip + config.page_size]
+        if page and not results:
+            break
+        entries.append(get_trades.cache_entry(
+            results, kwargs={'skip': skip, 'limit': config.page_size}, delta=delta
+        ))
+    return entries
+
+
+def _aggregate_entries(config: WarmupConfig) -> List[Entry]:
+    """Entries for the streams and replays of the most active aggregates."""
+    from .routes import get_event_stream, replay_events
+
+    started = time.perf_counter()
+    aggregate_ids = [
+        aggregate_id
+        for aggregate_id, _ in event_store.get_most_active_aggregates(config.aggregates)
+    ]
+    streams = event_store.get_events_for_aggregates(aggregate_ids)
+    delta = time.perf_counter() - started
+
+    processor = EventProcessor(event_store)
+    entries = []
+    for aggregate_id, events in streams.items():
+        if not events:
+            continue
+        kwargs = {'aggregate_id': aggregate_id}
+        entries.append(get_event_stream.cache_entry(
+            [EventResponse.from_event(event) for event in events], kwargs=kwargs, delta=delta
+        ))
+        entries.append(replay_events.cache_entry(
+            processor.project_events(aggregate_id, events), kwargs=kwargs, delta=delta
+        ))
+    return entries
+
+
+# ============================================================================
+# Warm-up
+# ============================================================================
+
+async def _write_chunk(chunk: List[Entry]) -> Optional[List[str]]:
+    """Write one chunk of entries with their tags (keys already cached
+    are left alone) and return the keys actually stored."""
+    return await AsyncCacheManager.add_many(
+        {key: payload for key, payload, _, _ in chunk},
+        ttl={key: ttl for key, _, _, ttl in chunk},
+        tags={key: key_tags for key, _, key_tags, _ in chunk}
+    )
+
+
+async def warm_cache(config: Optional[WarmupConfig] = None) -> Dict[str, Any]:
+    """Preload the hot API cache entries.
+
+    Args:
+        config: What to warm (defaults to WarmupConfig.from_env())
+
+    Returns:
+        Report with the number of keys warmed (total and per source),
+        entries already cached, skipped past the time budget or failed,
+        and elapsed time
+    """
+    config = config or WarmupConfig.from_env()
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    deadline = started + config.budget
+    report = WarmupReport()
+
+    async def load(source: Any) -> List[Entry]:
+        # A query still running at the deadline finishes in its thread unused
+        return await asyncio.wait_for(
+            asyncio.to_thread(source, config), timeout=max(0.0, deadline - loop.time())
+        )
+
+    sources = {'trades': _trade_entries, 'aggregates': _aggregate_entries}
+    results = await asyncio.gather(
+        *(load(source) for source in sources.values()),
+        return_exceptions=True
+    )
+
+    entries: List[Entry] = []
+    keys_by_source: Dict[str, set] = {}
+    for name, result in zip(sources, results):
+        if isinstance(result, asyncio.TimeoutError):
+            print(f"⚠️ Cache warm-up source timed out ({name})")
+            continue
+        if isinstance(result, Exception):
+            print(f"❌ Cache warm-up source failed ({name}): {result}")
+            continue
+        result = [entry for entry in result if entry is not None]  # generation unknown
+        entries.extend(result)
+        keys_by_source[name] = {entry[0] for entry in result}
+
+    semaphore = asyncio.Semaphore(max(1, config.concurrency))
+    written: set = set()
+
+    async def write(chunk: List[Entry]) -> None:
+        async with semaphore:
+            if loop.time() >= deadline:
+                report.skipped += len(chunk)
+                return
+            stored = await _write_chunk(chunk)
+            if stored is None:
+                report.failed += len(chunk)
+            else:
+                written.update(stored)
+                report.existing += len(chunk) - len(stored)
+
+    size = max(1, config.chunk_size)
+    await asyncio.gather(*(write(entries[i:i + size]) for i in range(0, len(entries), size)))
+
+    report.keys = len(written)
+    report.by_source = {name: len(keys & written) for name, keys in keys_by_source.items()}
+    report.elapsed = loop.time() - started
+    print(f"✅ Cache warm-up: {report.keys} keys in {report.elapsed:.2f}s "
+          f"({report.existing} already cached, {report.skipped} skipped, {report.failed} failed)")
+    return report.to_dict()
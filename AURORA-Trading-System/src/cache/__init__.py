@@ -1,6 +1,19 @@
 # Cache package initialization
 from .redis_client import redis_client, RedisClient
+from .local_cache import local_cache, LocalCache
+from .async_redis_client import async_redis_client, AsyncRedisClient
 from .cache_manager import CacheManager
+from .async_cache_manager import AsyncCacheManager
 from .decorators import cache
 
-__all__ = ["redis_client", "RedisClient", "CacheManager", "cache"]
+__all__ = [
+    "redis_client",
+    "RedisClient",
+    "async_redis_client",
+    "AsyncRedisClient",
+    "local_cache",
+    "LocalCache",
+    "CacheManager",
+    "AsyncCacheManager",
+    "cache"
+]
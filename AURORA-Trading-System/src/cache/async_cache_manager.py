@@ -0,0 +1,427 @@
+# Async Cache Manager for AURORA Trading System
+"""
+High-level cache operations for async code paths.
+Mirrors CacheManager on top of AsyncRedisClient.
+"""
+
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Union
+from .async_redis_client import async_redis_client
+from .cache_manager import CacheManager
+from .local_cache import MISSING, local_cache, invalidation_bus
+from .metrics import cache_metrics
+from .sharding import NodeUnavailable
+
+
+class AsyncCacheManager:
+    """Async high-level cache manager.
+
+    Same semantics as CacheManager (default TTLs, tags, L1
+    invalidation broadcast, graceful degradation) with awaitable
+    operations. Settings and cache metrics are shared with
+    CacheManager.
+    """
+
+    @staticmethod
+    async def broadcast(op: str, **fields: Any) -> None:
+        """Apply an invalidation to the L1 tier and broadcast it.
+
+        Async counterpart of invalidation_bus.publish; nothing is
+        published unless the L1 tier is enabled.
+
+        Args:
+            op: "delete", "pattern" or "flush"
+            **fields: keys=[...] or pattern="..."
+        """
+        message = invalidation_bus.prepare(op, **fields)
+        if message is None or async_redis_client is None:
+            return
+        try:
+            await async_redis_client.client.publish(invalidation_bus.channel, message)
+        except NodeUnavailable:
+            pass
+        except Exception as e:
+            print(f"❌ Cache invalidation publish error ({op}): {e}")
+
+    @staticmethod
+    async def get(key: str) -> Optional[Any]:
+        """Get a cached value.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value or None if missing/unavailable
+        """
+        if async_redis_client is None:
+            return None
+        return await async_redis_client.get(key)
+
+    @staticmethod
+    async def get_many(keys: Iterable[str]) -> Dict[str, Any]:
+        """Get several cached values.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Dictionary of cached values for the keys found
+        """
+        keys = list(keys)
+        if async_redis_client is None:
+            return {}
+        return await async_redis_client.get_many(keys)
+
+    @staticmethod
+    async def set(
+        key: str,
+        value: Any,
+        ttl: Optional[int] = None,
+        tags: Optional[Iterable[str]] = None
+    ) -> bool:
+        """Store a value in cache.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Time to live in seconds (defaults to DEFAULT_TTL)
+            tags: Tags to register the key under
+
+        Returns:
+            bool: True if successful
+        """
+        if async_redis_client is None:
+            return False
+        ttl = ttl or CacheManager.DEFAULT_TTL
+        if not tags:
+            return await async_redis_client.set(key, value, ttl)
+
+        elapsed = cache_metrics.timer()
+        try:
+            raw = async_redis_client.serialize(value)
+            pipe = async_redis_client.binary.pipeline(transaction=False)
+            CacheManager._queue_set(pipe, key, raw, ttl, tags)
+            stored = bool((await pipe.execute())[0])
+            cache_metrics.record_set(key, len(raw), elapsed())
+            return stored
+        except NodeUnavailable:
+            return False
+        except Exception as e:
+            cache_metrics.record_error(key, 'set')
+            print(f"❌ Cache SET error ({key}): {e}")
+            return False
+
+    @staticmethod
+    async def set_many(
+        items: Mapping[str, Any],
+        ttl: Union[int, Mapping[str, int], None] = None,
+        tags: Optional[Mapping[str, Iterable[str]]] = None
+    ) -> bool:
+        """Store several values in cache.
+
+        Args:
+            items: Mapping of cache key to value
+            ttl: TTL for all keys, or per-key TTLs (default DEFAULT_TTL)
+            tags: Optional mapping of cache key to the tags to register it under
+
+        Returns:
+            bool: True if successful
+        """
+        if async_redis_client is None:
+            return False
+        ttl = CacheManager._key_ttls(items, ttl)
+        if not tags:
+            return await async_redis_client.set_many(items, ttl)
+
+        elapsed = cache_metrics.timer()
+        try:
+            encoded = {key: async_redis_client.serialize(value) for key, value in items.items()}
+            pipe = async_redis_client.binary.pipeline(transaction=False)
+            for key, raw in encoded.items():
+                key_ttl = ttl[key] if isinstance(ttl, dict) else ttl
+                CacheManager._queue_set(pipe, key, raw, key_ttl, tags.get(key, ()))
+            await pipe.execute()
+            seconds = elapsed()
+            for key, raw in encoded.items():
+                cache_metrics.record_set(key, len(raw), seconds)
+            return True
+        except NodeUnavailable:
+            return False
+        except Exception as e:
+            for key in items:
+                cache_metrics.record_error(key, 'set')
+            print(f"❌ Cache SET_MANY error ({len(items)} keys): {e}")
+            return False
+
+    @staticmethod
+    async def add_many(
+        items: Mapping[str, Any],
+        ttl: Union[int, Mapping[str, int], None] = None,
+        tags: Optional[Mapping[str, Iterable[str]]] = None
+    ) -> Optional[List[str]]:
+        """Store the values whose keys are not cached yet (SET NX).
+
+        Args:
+            items: Mapping of cache key to value
+            ttl: TTL for all keys, or per-key TTLs (default DEFAULT_TTL)
+            tags: Optional mapping of cache key to the tags to register
+                it under (only for the keys actually stored)
+
+        Returns:
+            Keys stored, or None if the write failed
+        """
+        if async_redis_client is None:
+            return None
+        ttl = CacheManager._key_ttls(items, ttl)
+        tags = tags or {}
+
+        elapsed = cache_metrics.timer()
+        try:
+            encoded = {key: async_redis_client.serialize(value) for key, value in items.items()}
+            pipe = async_redis_client.binary.pipeline(transaction=False)
+            for key, raw in encoded.items():
+                pipe.set(key, raw, ex=ttl[key] if isinstance(ttl, dict) else ttl, nx=True)
+            replies = await pipe.execute(raise_on_error=False)
+            stored = [key for key, reply in zip(encoded, replies) if reply is True]
+            if any(tags.get(key) for key in stored):
+                pipe = async_redis_client.binary.pipeline(transaction=False)
+                for key in stored:
+                    CacheManager._queue_tags(
+                        pipe, key, ttl[key] if isinstance(ttl, dict) else ttl, tags.get(key, ())
+                    )
+                await pipe.execute()
+            seconds = elapsed()
+            for key in stored:
+                cache_metrics.record_set(key, len(encoded[key]), seconds)
+            return stored
+        except NodeUnavailable:
+            return None
+        except Exception as e:
+            for key in items:
+                cache_metrics.record_error(key, 'set')
+            print(f"❌ Cache ADD_MANY error ({len(items)} keys): {e}")
+            return None
+
+    @staticmethod
+    async def delete(key: str) -> bool:
+        """Delete a cached value.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            bool: True if key was deleted
+        """
+        await AsyncCacheManager.broadcast('delete', keys=[key])
+        if async_redis_client is None:
+            return False
+        return await async_redis_client.delete(key)
+
+    @staticmethod
+    async def delete_many(keys: List[str]) -> int:
+        """Delete several keys in one command.
+
+        Args:
+            keys: Cache keys to delete
+
+        Returns:
+            int: Number of keys deleted
+        """
+        if not keys:
+            return 0
+        await AsyncCacheManager.broadcast('delete', keys=list(keys))
+        if async_redis_client is None:
+            return 0
+        try:
+            return await async_redis_client.client.delete(*keys)
+        except Exception as e:
+            print(f"❌ Cache delete_many error: {e}")
+            return 0
+
+    @staticmethod
+    async def exists(key: str) -> bool:
+        """Check if a key is cached.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            bool: True if key exists
+        """
+        if async_redis_client is None:
+            return False
+        return await async_redis_client.exists(key)
+
+    @staticmethod
+    async def exists_many(keys: Iterable[str]) -> Dict[str, bool]:
+        """Check which of several keys are cached.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Dictionary mapping each key to whether it exists
+        """
+        keys = list(keys)
+        if async_redis_client is None:
+            return dict.fromkeys(keys, False)
+        return await async_redis_client.exists_many(keys)
+
+    @staticmethod
+    async def invalidate_tags(*tags: str) -> int:
+        """Delete every key registered under any of the given tags.
+
+        Args:
+            *tags: Tags to invalidate
+
+        Returns:
+            int: Number of keys deleted
+        """
+        if async_redis_client is None or not tags:
+            return 0
+        try:
+            tag_keys = [CacheManager.TAG_PREFIX + tag for tag in tags]
+            pipe = async_redis_client.client.pipeline(transaction=True)
+            pipe.sunion(tag_keys)
+            pipe.delete(*tag_keys)
+            keys = list((await pipe.execute())[0])
+        except Exception as e:
+            print(f"❌ Cache tag invalidate error ({', '.join(tags)}): {e}")
+            return 0
+
+        if not keys:
+            return 0
+        await AsyncCacheManager.broadcast('delete', keys=keys)
+        try:
+            pipe = async_redis_client.client.pipeline(transaction=False)
+            for start in range(0, len(keys), CacheManager.SCAN_BATCH):
+                pipe.delete(*keys[start:start + CacheManager.SCAN_BATCH])
+            return sum(await pipe.execute())
+        except Exception as e:
+            print(f"❌ Cache tag invalidate error ({', '.join(tags)}): {e}")
+            return 0
+
+    @staticmethod
+    async def invalidate_pattern(pattern: str) -> int:
+        """Delete all keys matching a glob pattern (SCAN based).
+
+        Args:
+            pattern: Key pattern (e.g., "cache:get_trades:*")
+
+        Returns:
+            int: Number of keys deleted
+        """
+        await AsyncCacheManager.broadcast('pattern', pattern=pattern)
+        if async_redis_client is None:
+            return 0
+        client = async_redis_client.client
+        deleted = 0
+        batch: List[str] = []
+        try:
+            async for key in client.scan_iter(match=pattern, count=CacheManager.SCAN_BATCH):
+                batch.append(key)
+                if len(batch) >= CacheManager.SCAN_BATCH:
+                    deleted += await client.delete(*batch)
+                    batch = []
+            if batch:
+                deleted += await client.delete(*batch)
+            return deleted
+        except Exception as e:
+            print(f"❌ Cache invalidate error ({pattern}): {e}")
+            return deleted
+
+    @staticmethod
+    async def get_version(name: str) -> Optional[int]:
+        """Get the current generation of a versioned key namespace.
+
+        Failed bumps are applied like in CacheManager.get_version.
+
+        Args:
+            name: Namespace (e.g., "trades")
+
+        Returns:
+            Current generation, or None if it cannot be read
+        """
+        key = CacheManager.VERSION_PREFIX + name
+        if local_cache.enabled:
+            cached = local_cache.get(key)
+            if cached is not MISSING:
+                return cached
+        if async_redis_client is None:
+            return None
+        client = async_redis_client.client
+        pending = name in CacheManager._pending_bumps
+        bumps_key = CacheManager._bumps_key(client, name)
+        try:
+            pipe = client.pipeline(transaction=False)
+            CacheManager._queue_version(pipe, key, pending, bumps_key)
+            version, bumps = CacheManager._version_reply(await pipe.execute(raise_on_error=False), bumps_key)
+            if bumps:
+                if not pending:
+                    version = int(await client.incr(key))
+                await client.srem(bumps_key, *bumps)
+        except NodeUnavailable:
+            return None
+        except Exception as e:
+            print(f"❌ Cache version error ({name}): {e}")
+            return None
+        if pending:
+            CacheManager._pending_bumps.discard(name)
+        if local_cache.enabled:
+            local_cache.set(key, version)
+        return version
+
+    @staticmethod
+    async def bump_version(name: str) -> Optional[int]:
+        """Move a versioned namespace to a new generation.
+
+        A failed bump is kept pending and recorded for the other workers
+        like in CacheManager.bump_version.
+
+        Args:
+            name: Namespace (e.g., "trades")
+
+        Returns:
+            New generation, or None if the bump failed
+        """
+        key = CacheManager.VERSION_PREFIX + name
+        await AsyncCacheManager.broadcast('delete', keys=[key])
+        if async_redis_client is None:
+            return None
+        try:
+            pipe = async_redis_client.client.pipeline(transaction=False)
+            CacheManager._queue_version(pipe, key, True)
+            version = int((await pipe.execute())[-1])
+        except Exception as e:
+            CacheManager._pending_bumps.add(name)
+            if not isinstance(e, NodeUnavailable):
+                print(f"❌ Cache version bump error ({name}): {e}")
+            await AsyncCacheManager._record_failed_bump(name)
+            return None
+        CacheManager._pending_bumps.discard(name)
+        return version
+
+    @staticmethod
+    async def _record_failed_bump(name: str) -> None:
+        """Record a failed bump for the other workers (best effort)."""
+        client = async_redis_client.client
+        bumps_key = CacheManager._bumps_key(client, name)
+        if bumps_key is None:
+            return
+        try:
+            pipe = client.pipeline(transaction=False)
+            CacheManager._queue_failed_bump(pipe, bumps_key)
+            await pipe.execute()
+        except Exception:
+            pass  # left to this process' pending bump
+
+    @staticmethod
+    async def flush() -> bool:
+        """Flush the entire cache (DANGEROUS).
+
+        Returns:
+            bool: True if successful
+        """
+        await AsyncCacheManager.broadcast('flush')
+        if async_redis_client is None:
+            return False
+        return await async_redis_client.flush()
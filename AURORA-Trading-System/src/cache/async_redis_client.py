@@ -0,0 +1,317 @@
+# Async Redis Client for AURORA Trading System
+"""
+Asyncio Redis client wrapper for async route handlers.
+Built on redis.asyncio so cache I/O never blocks the event loop.
+"""
+
+import asyncio
+from typing import Any, Dict, Iterable, Mapping, Optional, Union
+import weakref
+
+import redis.asyncio as aioredis
+
+from .codecs import ValueCodec
+from .memory_backend import AsyncMemoryRedis, is_memory_url
+from .metrics import cache_metrics
+from .redis_client import REDIS_URL, RedisClient
+from .sharding import DEFAULT_VIRTUAL_NODES, AsyncShardedRedis, HashRing, NodeHealth, NodeUnavailable, node_urls
+
+
+class AsyncRedisClient:
+    """Async counterpart of RedisClient.
+
+    Same serialization and error handling as RedisClient, with every
+    operation awaitable. asyncio connections are bound to the event
+    loop that opened them, so pools (of up to ``max_connections``) are
+    kept per running loop; an application normally has exactly one.
+    Several comma-separated URLs shard keys like RedisClient does.
+
+    Attributes:
+        url: Redis connection URL(s)
+        nodes: Node URLs
+        codec: ValueCodec used to encode values
+    """
+
+    MULTI_KEY_CHUNK = RedisClient.MULTI_KEY_CHUNK
+
+    _chunks = staticmethod(RedisClient._chunks)
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        max_connections: int = 50,
+        codec: Optional[ValueCodec] = None,
+        virtual_nodes: int = DEFAULT_VIRTUAL_NODES
+    ):
+        """Initialize AsyncRedisClient (connections are opened lazily).
+
+        Args:
+            url: Redis URL, or comma-separated node URLs (defaults to
+                REDIS_URL environment variable)
+            max_connections: Maximum connections kept per pool
+            codec: Value codec (defaults to ValueCodec.from_env())
+            virtual_nodes: Ring points per node when sharded
+        """
+        self.url = url or REDIS_URL
+        self.max_connections = max_connections
+        self.codec = codec or ValueCodec.from_env()
+        self.nodes = node_urls(self.url)
+        self._ring = HashRing(self.nodes, virtual_nodes) if len(self.nodes) > 1 else None
+        self._health = NodeHealth(self.nodes)
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, tuple]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _loop_clients(self) -> tuple:
+        """Get (str client, bytes client) of the running event loop."""
+        loop = asyncio.get_running_loop()
+        clients = self._clients.get(loop)
+        if clients is None and self._ring is not None:
+            clients = self._clients[loop] = tuple(
+                AsyncShardedRedis(
+                    [self._connect(node, decode) for node in self.nodes], self._ring, self._health
+                )
+                for decode in (True, False)
+            )
+        elif clients is None:
+            clients = self._clients[loop] = tuple(
+                self._connect(self.url, decode) for decode in (True, False)
+            )
+        return clients
+
+    def _connect(self, url: str, decode_responses: bool) -> Any:
+        """Open a client on one node."""
+        if is_memory_url(url):
+            return AsyncMemoryRedis.from_url(url, decode_responses=decode_responses)
+        # from_url: the client owns its pool, so aclose() disconnects it
+        return aioredis.from_url(
+            url, max_connections=self.max_connections, decode_responses=decode_responses
+        )
+
+    @property
+    def client(self) -> aioredis.Redis:
+        """Underlying redis.asyncio client of the running event loop."""
+        return self._loop_clients()[0]
+
+    @property
+    def binary(self) -> aioredis.Redis:
+        """redis.asyncio client returning bytes (for cached values)."""
+        return self._loop_clients()[1]
+
+    async def aclose(self) -> None:
+        """Close the connection pools of the running event loop.
+
+        Call on application shutdown; pools are reopened if the client
+        is used again.
+        """
+        clients = self._clients.pop(asyncio.get_running_loop(), None)
+        for client in clients or ():
+            try:
+                await client.aclose()
+            except Exception as e:
+                print(f"❌ Redis close error: {e}")
+
+    def serialize(self, value: Any) -> bytes:
+        """Serialize a Python value for storage in Redis."""
+        return self.codec.encode(value)
+
+    def deserialize(self, raw: Optional[bytes]) -> Optional[Any]:
+        """Deserialize a value read from Redis (any codec)."""
+        return self.codec.decode(raw)
+
+    async def ping(self) -> bool:
+        """Check Redis connectivity.
+
+        Returns:
+            bool: True if server answered PING
+        """
+        return await self.client.ping()
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Get a value from cache.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Deserialized value or None if missing
+        """
+        elapsed = cache_metrics.timer()
+        try:
+            raw = await self.binary.get(key)
+            cache_metrics.record_get(key, raw is not None, elapsed(), None if raw is None else len(raw))
+            return self.deserialize(raw)
+        except NodeUnavailable:
+            cache_metrics.record_get(key, False, elapsed())
+            return None
+        except Exception as e:
+            cache_metrics.record_error(key, 'get')
+            print(f"❌ Redis GET error ({key}): {e}")
+            return None
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+        """Set a value in cache.
+
+        Args:
+            key: Cache key
+            value: Value to cache (serializable by the codec)
+            ttl: Time to live in seconds (None = no expiry)
+
+        Returns:
+            bool: True if successful
+        """
+        elapsed = cache_metrics.timer()
+        try:
+            raw = self.serialize(value)
+            stored = bool(await self.binary.set(key, raw, ex=ttl))
+            cache_metrics.record_set(key, len(raw), elapsed())
+            return stored
+        except NodeUnavailable:
+            return False
+        except Exception as e:
+            cache_metrics.record_error(key, 'set')
+            print(f"❌ Redis SET error ({key}): {e}")
+            return False
+
+    async def delete(self, key: str) -> bool:
+        """Delete a key from cache.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            bool: True if key existed and was deleted
+        """
+        try:
+            return await self.client.delete(key) > 0
+        except NodeUnavailable:
+            return False
+        except Exception as e:
+            print(f"❌ Redis DELETE error ({key}): {e}")
+            return False
+
+    async def exists(self, key: str) -> bool:
+        """Check if a key exists in cache.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            bool: True if key exists
+        """
+        try:
+            return await self.client.exists(key) > 0
+        except NodeUnavailable:
+            return False
+        except Exception as e:
+            print(f"❌ Redis EXISTS error ({key}): {e}")
+            return False
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Get several values with one MGET per chunk of keys.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Dictionary of deserialized values for the keys found
+        """
+        keys = list(dict.fromkeys(keys))
+        values: Dict[str, Any] = {}
+        try:
+            for chunk in self._chunks(keys, self.MULTI_KEY_CHUNK):
+                elapsed = cache_metrics.timer()
+                sizes = {}
+                for key, raw in zip(chunk, await self.binary.mget(chunk)):
+                    if raw is not None:
+                        sizes[key] = len(raw)
+                        values[key] = self.deserialize(raw)
+                cache_metrics.record_get_many(chunk, sizes, elapsed())
+        except Exception as e:
+            for key in keys:
+                if key not in values:
+                    cache_metrics.record_error(key, 'get')
+            print(f"❌ Redis MGET error ({len(keys)} keys): {e}")
+        return values
+
+    async def set_many(
+        self,
+        items: Mapping[str, Any],
+        ttl: Union[int, Mapping[str, int], None] = None
+    ) -> bool:
+        """Set several values, pipelined per chunk of keys.
+
+        Args:
+            items: Mapping of cache key to value
+            ttl: TTL in seconds for all keys, or a mapping of per-key TTLs
+
+        Returns:
+            bool: True if all values were stored
+        """
+        keys = list(items)
+        stored = True
+        try:
+            for chunk in self._chunks(keys, self.MULTI_KEY_CHUNK):
+                elapsed = cache_metrics.timer()
+                encoded = {key: self.serialize(items[key]) for key in chunk}
+                if ttl is None:
+                    stored = bool(await self.binary.mset(encoded)) and stored
+                else:
+                    pipe = self.binary.pipeline(transaction=False)
+                    for key, raw in encoded.items():
+                        key_ttl = ttl.get(key) if isinstance(ttl, Mapping) else ttl
+                        pipe.set(key, raw, ex=key_ttl)
+                    # Replies of an unreachable shard are NodeUnavailable errors
+                    replies = await pipe.execute(raise_on_error=False)
+                    stored = not any(isinstance(reply, Exception) for reply in replies) and stored
+                seconds = elapsed()
+                for key, raw in encoded.items():
+                    cache_metrics.record_set(key, len(raw), seconds)
+            return stored
+        except Exception as e:
+            for key in keys:
+                cache_metrics.record_error(key, 'set')
+            print(f"❌ Redis SET_MANY error ({len(keys)} keys): {e}")
+            return False
+
+    async def exists_many(self, keys: Iterable[str]) -> Dict[str, bool]:
+        """Check several keys, pipelined per chunk of keys.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Dictionary mapping each key to whether it exists
+        """
+        keys = list(dict.fromkeys(keys))
+        found = dict.fromkeys(keys, False)
+        try:
+            for chunk in self._chunks(keys, self.MULTI_KEY_CHUNK):
+                pipe = self.client.pipeline(transaction=False)
+                for key in chunk:
+                    pipe.exists(key)
+                for key, count in zip(chunk, await pipe.execute(raise_on_error=False)):
+                    found[key] = isinstance(count, int) and count > 0
+        except Exception as e:
+            print(f"❌ Redis EXISTS_MANY error ({len(keys)} keys): {e}")
+        return found
+
+    async def flush(self) -> bool:
+        """Remove all keys from the current database of every node (DANGEROUS).
+
+        Returns:
+            bool: True if successful
+        """
+        try:
+            return bool(await self.client.flushdb())
+        except Exception as e:
+            print(f"❌ Redis FLUSH error: {e}")
+            return False
+
+
+# Global instance
+try:
+    async_redis_client = AsyncRedisClient()
+except Exception as e:
+    print(f"❌ Async Redis client unavailable: {e}")
+    async_redis_client = None
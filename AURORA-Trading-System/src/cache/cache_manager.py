@@ -4,57 +4,537 @@ High-level cache operations manager.
 Provides consistent interface for cache operations across AURORA system.
 """
 
-from typing import Any, Optional, List
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+import time
+import uuid
 from .redis_client import redis_client
+from .local_cache import MISSING, local_cache, invalidation_bus
+from .metrics import cache_metrics
+from .sharding import HashRing, NodeUnavailable
 
 
 class CacheManager:
+    """High-level cache manager.
+
+    Thin static facade over the global RedisClient that applies
+    default TTLs and degrades gracefully when Redis is unavailable.
+    Invalidations also evict the in-process L1 tier of every worker.
+    """
 
-    
     DEFAULT_TTL = 3600  # 1 hour default
-    
+    TAG_PREFIX = "cache-tag:"  # Redis set of keys per tag
+    SCAN_BATCH = 500  # keys per SCAN step / DELETE when matching patterns
+    VERSION_PREFIX = "cache-version:"  # generation counter per versioned namespace
+    VERSION_BUMP_PREFIX = "cache-version-bumps:"  # failed bumps, kept on another node
+    VERSION_BUMP_TTL = 86400  # seconds a failed bump stays visible to other workers
+
+    # Namespaces whose last bump did not reach Redis (retried on next use)
+    _pending_bumps: set = set()
+
+    @staticmethod
+    def _queue_set(pipe: Any, key: str, raw: bytes, ttl: int, tags: Iterable[str]) -> None:
+        """Queue a SET and its tag registrations on a pipeline."""
+        pipe.set(key, raw, ex=ttl)
+        CacheManager._queue_tags(pipe, key, ttl, tags)
+
+    @staticmethod
+    def _queue_tags(pipe: Any, key: str, ttl: int, tags: Iterable[str]) -> None:
+        """Queue the tag registrations of a key on a pipeline.
+
+        Tag sets live as long as their longest-lived key (EXPIRE NX,
+        then GT).
+        """
+        for tag in tags:
+            tag_key = CacheManager.TAG_PREFIX + tag
+            pipe.sadd(tag_key, key)
+            pipe.expire(tag_key, ttl, nx=True)
+            pipe.expire(tag_key, ttl, gt=True)
+
     @staticmethod
     def get(key: str) -> Optional[Any]:
+        """Get a cached value.
 
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value or None if missing/unavailable
+        """
         if redis_client is None:
             return None
         return redis_client.get(key)
-    
+
     @staticmethod
+    def set(
+        key: str,
+        value: Any,
+        ttl: Optional[int] = None,
+        tags: Optional[Iterable[str]] = None
+    ) -> bool:
+        """Store a value in cache.
 
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Time to live in seconds (defaults to DEFAULT_TTL)
+            tags: Tags to register the key under (see invalidate_tags)
+
+        Returns:
+            bool: True if successful
+        """
+        if redis_client is None:
+            return False
         ttl = ttl or CacheManager.DEFAULT_TTL
-        return redis_client.set(key, value, ttl)
-    
+        if not tags:
+            return redis_client.set(key, value, ttl)
+
+        # Value and tag registrations in one round trip
+        elapsed = cache_metrics.timer()
+        try:
+            raw = redis_client.serialize(value)
+            pipe = redis_client.binary.pipeline(transaction=False)
+            CacheManager._queue_set(pipe, key, raw, ttl, tags)
+            stored = bool(pipe.execute()[0])
+            cache_metrics.record_set(key, len(raw), elapsed())
+            return stored
+        except NodeUnavailable:
+            return False
+        except Exception as e:
+            cache_metrics.record_error(key, 'set')
+            print(f"❌ Cache SET error ({key}): {e}")
+            return False
+
+    @staticmethod
+    def get_many(keys: Iterable[str]) -> Dict[str, Any]:
+        """Get several cached values in as few round trips as possible.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Dictionary of cached values for the keys found
+        """
+        keys = list(keys)
+        if redis_client is None:
+            return {}
+        return redis_client.get_many(keys)
+
+    @staticmethod
+    def _key_ttls(
+        items: Mapping[str, Any], ttl: Union[int, Mapping[str, int], None]
+    ) -> Union[int, Dict[str, int]]:
+        """Apply DEFAULT_TTL to a TTL or to each key of a per-key TTL mapping."""
+        if isinstance(ttl, Mapping):
+            return {key: ttl.get(key) or CacheManager.DEFAULT_TTL for key in items}
+        return ttl or CacheManager.DEFAULT_TTL
+
+    @staticmethod
+    def set_many(
+        items: Mapping[str, Any],
+        ttl: Union[int, Mapping[str, int], None] = None,
+        tags: Optional[Mapping[str, Iterable[str]]] = None
+    ) -> bool:
+        """Store several values in cache.
+
+        Args:
+            items: Mapping of cache key to value
+            ttl: TTL in seconds for all keys, or a mapping of per-key
+                TTLs (keys without one use DEFAULT_TTL)
+            tags: Optional mapping of cache key to the tags to register
+                it under (values and tags written in one pipeline)
+
+        Returns:
+            bool: True if successful
+        """
+        if redis_client is None:
+            return False
+        ttl = CacheManager._key_ttls(items, ttl)
+        if not tags:
+            return redis_client.set_many(items, ttl)
+
+        elapsed = cache_metrics.timer()
+        try:
+            encoded = {key: redis_client.serialize(value) for key, value in items.items()}
+            pipe = redis_client.binary.pipeline(transaction=False)
+            for key, raw in encoded.items():
+                key_ttl = ttl[key] if isinstance(ttl, dict) else ttl
+                CacheManager._queue_set(pipe, key, raw, key_ttl, tags.get(key, ()))
+            pipe.execute()
+            seconds = elapsed()
+            for key, raw in encoded.items():
+                cache_metrics.record_set(key, len(raw), seconds)
+            return True
+        except NodeUnavailable:
+            return False
+        except Exception as e:
+            for key in items:
+                cache_metrics.record_error(key, 'set')
+            print(f"❌ Cache SET_MANY error ({len(items)} keys): {e}")
+            return False
+
+    @staticmethod
+    def add_many(
+        items: Mapping[str, Any],
+        ttl: Union[int, Mapping[str, int], None] = None,
+        tags: Optional[Mapping[str, Iterable[str]]] = None
+    ) -> Optional[List[str]]:
+        """Store the values whose keys are not cached yet (SET NX).
+
+        Tags are registered only for the keys actually stored, in a
+        second pipeline once the SET NX replies are known.
+
+        Args:
+            items: Mapping of cache key to value
+            ttl: TTL in seconds for all keys, or a mapping of per-key
+                TTLs (keys without one use DEFAULT_TTL)
+            tags: Optional mapping of cache key to the tags to register
+                it under
+
+        Returns:
+            Keys stored (keys already cached or on a down node are
+            left out), or None if the write failed
+        """
+        if redis_client is None:
+            return None
+        ttl = CacheManager._key_ttls(items, ttl)
+        tags = tags or {}
+
+        elapsed = cache_metrics.timer()
+        try:
+            encoded = {key: redis_client.serialize(value) for key, value in items.items()}
+            pipe = redis_client.binary.pipeline(transaction=False)
+            for key, raw in encoded.items():
+                pipe.set(key, raw, ex=ttl[key] if isinstance(ttl, dict) else ttl, nx=True)
+            replies = pipe.execute(raise_on_error=False)
+            stored = [key for key, reply in zip(encoded, replies) if reply is True]
+            if any(tags.get(key) for key in stored):
+                pipe = redis_client.binary.pipeline(transaction=False)
+                for key in stored:
+                    CacheManager._queue_tags(
+                        pipe, key, ttl[key] if isinstance(ttl, dict) else ttl, tags.get(key, ())
+                    )
+                pipe.execute()
+            seconds = elapsed()
+            for key in stored:
+                cache_metrics.record_set(key, len(encoded[key]), seconds)
+            return stored
+        except NodeUnavailable:
+            return None
+        except Exception as e:
+            for key in items:
+                cache_metrics.record_error(key, 'set')
+            print(f"❌ Cache ADD_MANY error ({len(items)} keys): {e}")
+            return None
+
     @staticmethod
     def delete(key: str) -> bool:
+        """Delete a cached value.
+
+        Args:
+            key: Cache key
 
+        Returns:
+            bool: True if key was deleted
+        """
+        invalidation_bus.publish('delete', keys=[key])
         if redis_client is None:
             return False
         return redis_client.delete(key)
-    
+
     @staticmethod
     def delete_many(keys: List[str]) -> int:
+        """Delete several keys in one command.
+
+        Args:
+            keys: Cache keys to delete
 
+        Returns:
+            int: Number of keys deleted
+        """
+        if not keys:
+            return 0
+        invalidation_bus.publish('delete', keys=list(keys))
+        if redis_client is None:
+            return 0
+        try:
+            return redis_client.client.delete(*keys)
+        except Exception as e:
+            print(f"❌ Cache delete_many error: {e}")
             return 0
-    
+
     @staticmethod
     def exists(key: str) -> bool:
+        """Check if a key is cached.
+
+        Args:
+            key: Cache key
 
+        Returns:
+            bool: True if key exists
+        """
         if redis_client is None:
             return False
         return redis_client.exists(key)
-    
+
     @staticmethod
-    def invalidate_pattern(pattern: str) -> int:
+    def exists_many(keys: Iterable[str]) -> Dict[str, bool]:
+        """Check which of several keys are cached.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Dictionary mapping each key to whether it exists
+        """
+        keys = list(keys)
+        if redis_client is None:
+            return dict.fromkeys(keys, False)
+        return redis_client.exists_many(keys)
+
+    @staticmethod
+    def invalidate_tags(*tags: str) -> int:
+        """Delete every key registered under any of the given tags.
+
+        Members and tag sets are read and dropped atomically, then the
+        keys are deleted in one pipeline.
 
+        Args:
+            *tags: Tags to invalidate (e.g., "trades", "trade:42")
+
+        Returns:
+            int: Number of keys deleted
+        """
+        if redis_client is None or not tags:
+            return 0
         try:
-            keys = redis_client.client.keys(pattern)
-            if not keys:
-                return 0
-            return redis_client.client.delete(*keys)
+            tag_keys = [CacheManager.TAG_PREFIX + tag for tag in tags]
+            pipe = redis_client.client.pipeline(transaction=True)
+            pipe.sunion(tag_keys)
+            pipe.delete(*tag_keys)
+            keys = list(pipe.execute()[0])
+        except Exception as e:
+            print(f"❌ Cache tag invalidate error ({', '.join(tags)}): {e}")
+            return 0
+
+        if not keys:
+            return 0
+        invalidation_bus.publish('delete', keys=keys)
+        try:
+            pipe = redis_client.client.pipeline(transaction=False)
+            for start in range(0, len(keys), CacheManager.SCAN_BATCH):
+                pipe.delete(*keys[start:start + CacheManager.SCAN_BATCH])
+            return sum(pipe.execute())
         except Exception as e:
+            print(f"❌ Cache tag invalidate error ({', '.join(tags)}): {e}")
+            return 0
+
+    @staticmethod
+    def invalidate_pattern(pattern: str) -> int:
+        """Delete all keys matching a glob pattern.
 
+        Walks the keyspace incrementally with SCAN instead of KEYS, so
+        Redis is never blocked for a full keyspace scan. Prefer tags
+        for invalidation on hot write paths.
+
+        Args:
+            pattern: Key pattern (e.g., "cache:get_trades:*")
+
+        Returns:
+            int: Number of keys deleted
+        """
+        invalidation_bus.publish('pattern', pattern=pattern)
+        if redis_client is None:
             return 0
-    
+        deleted = 0
+        batch: List[str] = []
+        try:
+            for key in redis_client.client.scan_iter(match=pattern, count=CacheManager.SCAN_BATCH):
+                batch.append(key)
+                if len(batch) >= CacheManager.SCAN_BATCH:
+                    deleted += redis_client.client.delete(*batch)
+                    batch = []
+            if batch:
+                deleted += redis_client.client.delete(*batch)
+            return deleted
+        except Exception as e:
+            print(f"❌ Cache invalidate error ({pattern}): {e}")
+            return deleted
+
+    @staticmethod
+    def _version_seed() -> int:
+        """Initial generation of a namespace: the current time in ms.
+
+        Counters only move forward, so a counter lost to eviction is
+        re-seeded above every generation handed out before.
+        """
+        return int(time.time() * 1000)
+
+    @staticmethod
+    def _bumps_key(client: Any, name: str) -> Optional[str]:
+        """Key of the failed bumps of a namespace, on another node than
+        its generation counter (None unless the cache is sharded)."""
+        ring = getattr(client, 'ring', None)
+        if not isinstance(ring, HashRing) or len(ring.nodes) < 2:
+            return None
+        node = ring.node_for(CacheManager.VERSION_PREFIX + name)
+        for i in range(64):
+            key = f"{CacheManager.VERSION_BUMP_PREFIX}{name}:{i}"
+            if ring.node_for(key) != node:
+                return key
+        return None
+
+    @staticmethod
+    def _queue_version(pipe: Any, key: str, bump: bool, bumps_key: Optional[str] = None) -> None:
+        """Queue the reads of a generation counter (seeded if missing,
+        incremented first with bump) and of its failed bumps; see
+        _version_reply."""
+        pipe.set(key, CacheManager._version_seed(), nx=True)
+        if bump:
+            pipe.incr(key)
+        pipe.get(key)
+        if bumps_key is not None:
+            pipe.smembers(bumps_key)
+
+    @staticmethod
+    def _version_reply(replies: List[Any], bumps_key: Optional[str]) -> Tuple[int, set]:
+        """Get the generation and the failed bumps recorded by other
+        workers from the replies of _queue_version (raises the
+        counter's error; unreadable bumps count as none)."""
+        bumps = replies.pop() if bumps_key is not None else set()
+        if isinstance(replies[-1], Exception):
+            raise replies[-1]
+        return int(replies[-1]), (set() if isinstance(bumps, Exception) else bumps)
+
     @staticmethod
-    def flush() -> bool:
\ No newline at end of file
+    def _queue_failed_bump(pipe: Any, bumps_key: str) -> None:
+        """Queue the record of a bump that did not reach the counter."""
+        pipe.sadd(bumps_key, uuid.uuid4().hex)
+        pipe.expire(bumps_key, CacheManager.VERSION_BUMP_TTL)
+
+    @staticmethod
+    def get_version(name: str) -> Optional[int]:
+        """Get the current generation of a versioned key namespace.
+
+        Kept in the L1 tier when it is enabled; bump_version broadcasts
+        the change so every worker rereads it. A bump that could not
+        reach Redis is applied here first, once Redis answers again:
+        bumps failed in this process are retried, and bumps other
+        workers recorded on another node (sharded cache) are applied
+        with one more increment.
+
+        Args:
+            name: Namespace (e.g., "trades")
+
+        Returns:
+            Current generation, or None if it cannot be read (Redis or
+            the counter's node is unavailable); versioned entries must
+            then be neither read nor written
+        """
+        key = CacheManager.VERSION_PREFIX + name
+        if local_cache.enabled:
+            cached = local_cache.get(key)
+            if cached is not MISSING:
+                return cached
+        if redis_client is None:
+            return None
+        client = redis_client.client
+        pending = name in CacheManager._pending_bumps
+        bumps_key = CacheManager._bumps_key(client, name)
+        try:
+            pipe = client.pipeline(transaction=False)
+            CacheManager._queue_version(pipe, key, pending, bumps_key)
+            version, bumps = CacheManager._version_reply(pipe.execute(raise_on_error=False), bumps_key)
+            if bumps:
+                if not pending:
+                    version = int(client.incr(key))
+                client.srem(bumps_key, *bumps)
+        except NodeUnavailable:
+            return None
+        except Exception as e:
+            print(f"❌ Cache version error ({name}): {e}")
+            return None
+        if pending:
+            CacheManager._pending_bumps.discard(name)
+        if local_cache.enabled:
+            local_cache.set(key, version)
+        return version
+
+    @staticmethod
+    def bump_version(name: str) -> Optional[int]:
+        """Move a versioned namespace to a new generation.
+
+        Keys built for older generations are no longer read and expire
+        on their TTL, instead of being deleted one by one. A bump that
+        fails (e.g. the counter's node is down) is kept pending in this
+        process and, on a sharded cache, recorded on another node, so
+        the next get_version of any worker applies it and entries cached
+        before the write are not read again once the node is back.
+
+        Args:
+            name: Namespace (e.g., "trades")
+
+        Returns:
+            New generation, or None if the bump failed
+        """
+        key = CacheManager.VERSION_PREFIX + name
+        invalidation_bus.publish('delete', keys=[key])
+        if redis_client is None:
+            return None
+        try:
+            pipe = redis_client.client.pipeline(transaction=False)
+            CacheManager._queue_version(pipe, key, True)
+            version = int(pipe.execute()[-1])
+        except Exception as e:
+            CacheManager._pending_bumps.add(name)
+            if not isinstance(e, NodeUnavailable):
+                print(f"❌ Cache version bump error ({name}): {e}")
+            CacheManager._record_failed_bump(name)
+            return None
+        CacheManager._pending_bumps.discard(name)
+        return version
+
+    @staticmethod
+    def _record_failed_bump(name: str) -> None:
+        """Record a failed bump for the other workers (best effort)."""
+        client = redis_client.client
+        bumps_key = CacheManager._bumps_key(client, name)
+        if bumps_key is None:
+            return
+        try:
+            pipe = client.pipeline(transaction=False)
+            CacheManager._queue_failed_bump(pipe, bumps_key)
+            pipe.execute()
+        except Exception:
+            pass  # left to this process' pending bump
+
+    @staticmethod
+    def flush() -> bool:
+        """Flush the entire cache (DANGEROUS).
+
+        Returns:
+            bool: True if successful
+        """
+        invalidation_bus.publish('flush')
+        if redis_client is None:
+            return False
+        return redis_client.flush()
+
+    @staticmethod
+    def stats() -> Dict[str, Any]:
+        """Get per-tier hit/miss counters and per-prefix metrics.
+
+        Returns:
+            Dictionary with "l1" (in-process) and "l2" (Redis) counters,
+            and "prefixes" (see CacheMetrics.snapshot)
+        """
+        totals = cache_metrics.totals()
+        lookups = totals['hits'] + totals['misses']
+        return {
+            'l1': local_cache.stats(),
+            'l2': {
+                'hits': totals['hits'],
+                'misses': totals['misses'],
+                'hit_rate': totals['hits'] / lookups if lookups else 0.0,
+            },
+            'prefixes': cache_metrics.snapshot(),
+        }
@@ -0,0 +1,262 @@
+# Cache Value Codecs for AURORA Trading System
+"""
+Pluggable serialization and compression for cached values.
+
+Every stored value starts with a one-byte header naming its codec and
+compression, so the configured codec can change without flushing Redis:
+old values keep decoding with the codec they were written with.
+
+Header byte (always < 0x20, so it never collides with JSON text):
+    bits 0-2  codec id (1-7)
+    bits 3-4  compression id (0-3)
+
+Values without a header (first byte >= 0x20) are legacy JSON strings.
+
+Pickled values are only decoded by a ValueCodec that allows pickle
+(CACHE_CODEC=pickle or CACHE_ALLOW_PICKLE=1): anyone able to write to
+Redis could otherwise run code in every reader.
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Optional
+import json
+import os
+import pickle
+import zlib
+
+try:
+    import orjson
+except ImportError:  # optional fast JSON codec
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional binary codec
+    msgpack = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # optional fast compression
+    lz4_frame = None
+
+try:
+    import zstandard
+except ImportError:  # optional high-ratio compression
+    zstandard = None
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize values the JSON codecs do not handle natively.
+
+    Pydantic models (API responses) are dumped in JSON mode and
+    datetimes are stored as ISO strings.
+    """
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+# ============================================================================
+# Codecs
+# ============================================================================
+
+@dataclass(frozen=True)
+class Codec:
+    """Serializer registered under a header id."""
+
+    id: int
+    name: str
+    dumps: Callable[[Any], bytes]
+    loads: Callable[[bytes], Any]
+
+
+_MSGPACK_DATETIME = 1  # msgpack ext type code for datetimes
+
+
+def _msgpack_default(value: Any) -> Any:
+    """Keep datetimes as an ext type, dump pydantic models to dicts."""
+    if isinstance(value, datetime):
+        return msgpack.ExtType(_MSGPACK_DATETIME, value.isoformat().encode())
+    return _json_default(value)
+
+
+def _msgpack_ext_hook(code: int, data: bytes) -> Any:
+    """Restore datetimes stored by _msgpack_default."""
+    if code == _MSGPACK_DATETIME:
+        return datetime.fromisoformat(data.decode())
+    return msgpack.ExtType(code, data)
+
+
+def _orjson_dumps(value: Any) -> bytes:
+    """orjson encoder (natively handles datetimes and dataclasses)."""
+    return orjson.dumps(value, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+CODECS: Dict[str, Codec] = {
+    'json': Codec(
+        1, 'json',
+        lambda value: json.dumps(value, default=_json_default).encode(),
+        json.loads
+    ),
+    # Trusted internal data only: unpickling runs arbitrary code
+    'pickle': Codec(
+        4, 'pickle',
+        lambda value: pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL),
+        pickle.loads
+    ),
+}
+if orjson is not None:
+    CODECS['orjson'] = Codec(2, 'orjson', _orjson_dumps, orjson.loads)
+if msgpack is not None:
+    CODECS['msgpack'] = Codec(
+        3, 'msgpack',
+        lambda value: msgpack.packb(value, default=_msgpack_default, use_bin_type=True),
+        lambda raw: msgpack.unpackb(raw, ext_hook=_msgpack_ext_hook, raw=False)
+    )
+
+
+# ============================================================================
+# Compression
+# ============================================================================
+
+@dataclass(frozen=True)
+class Compression:
+    """Compressor registered under a header id."""
+
+    id: int
+    name: str
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes], bytes]
+
+
+COMPRESSIONS: Dict[str, Compression] = {
+    'zlib': Compression(3, 'zlib', lambda raw: zlib.compress(raw, 1), zlib.decompress),
+}
+if lz4_frame is not None:
+    COMPRESSIONS['lz4'] = Compression(1, 'lz4', lz4_frame.compress, lz4_frame.decompress)
+if zstandard is not None:
+    COMPRESSIONS['zstd'] = Compression(
+        2, 'zstd',
+        lambda raw: zstandard.ZstdCompressor(level=3).compress(raw),
+        lambda raw: zstandard.ZstdDecompressor().decompress(raw)
+    )
+
+_CODECS_BY_ID = {codec.id: codec for codec in CODECS.values()}
+_COMPRESSIONS_BY_ID = {compression.id: compression for compression in COMPRESSIONS.values()}
+
+# Ids of optional backends, so values written by them give a clear error
+_KNOWN_CODEC_IDS = {1: 'json', 2: 'orjson', 3: 'msgpack', 4: 'pickle'}
+_KNOWN_COMPRESSION_IDS = {1: 'lz4', 2: 'zstd', 3: 'zlib'}
+
+# Fallbacks when an optional backend is configured but not installed
+_CODEC_FALLBACK = {'orjson': 'json', 'msgpack': 'json'}
+_COMPRESSION_FALLBACK = {'lz4': 'zlib', 'zstd': 'zlib'}
+
+
+class ValueCodec:
+    """Encoder/decoder for cached values.
+
+    Values are serialized with the configured codec and compressed when
+    the serialized form reaches ``compress_threshold`` bytes (and the
+    compressed form is smaller). Decoding reads the codec and compression
+    from each value's header, independent of the current configuration,
+    except that pickled values are rejected unless ``allow_pickle`` is set.
+    """
+
+    def __init__(
+        self,
+        codec: str = "json",
+        compression: Optional[str] = None,
+        compress_threshold: int = 1024,
+        allow_pickle: Optional[bool] = None
+    ):
+        """Initialize ValueCodec.
+
+        Optional backends that are not installed fall back to json/zlib.
+
+        Args:
+            codec: "json", "orjson", "msgpack" or "pickle" (trusted data only)
+            compression: "lz4", "zstd", "zlib" or None to disable
+            compress_threshold: Minimum serialized size in bytes to compress
+            allow_pickle: Decode pickled values (defaults to codec == "pickle")
+
+        Raises:
+            ValueError: If a codec or compression name is unknown
+        """
+        if codec not in CODECS:
+            if codec not in _CODEC_FALLBACK:
+                raise ValueError(f"Unknown cache codec: {codec}")
+            print(f"⚠️ Cache codec '{codec}' not installed, using {_CODEC_FALLBACK[codec]}")
+            codec = _CODEC_FALLBACK[codec]
+        if compression is not None and compression not in COMPRESSIONS:
+            if compression not in _COMPRESSION_FALLBACK:
+                raise ValueError(f"Unknown cache compression: {compression}")
+            print(
+                f"⚠️ Cache compression '{compression}' not installed, "
+                f"using {_COMPRESSION_FALLBACK[compression]}"
+            )
+            compression = _COMPRESSION_FALLBACK[compression]
+
+        self.codec = CODECS[codec]
+        self.compression = COMPRESSIONS[compression] if compression else None
+        self.compress_threshold = compress_threshold
+        self.allow_pickle = codec == "pickle" if allow_pickle is None else allow_pickle
+
+    @classmethod
+    def from_env(cls) -> "ValueCodec":
+        """Build the codec configured by CACHE_CODEC, CACHE_COMPRESSION
+        and CACHE_COMPRESS_THRESHOLD (defaults: orjson if installed,
+        lz4 if installed else zlib, 1024 bytes; "none" disables
+        compression). CACHE_ALLOW_PICKLE=1 decodes pickled values
+        written by other processes without writing pickle."""
+        compression = os.getenv("CACHE_COMPRESSION", "lz4" if lz4_frame else "zlib")
+        return cls(
+            codec=os.getenv("CACHE_CODEC", "orjson" if orjson else "json"),
+            compression=None if compression == "none" else compression,
+            compress_threshold=int(os.getenv("CACHE_COMPRESS_THRESHOLD", "1024")),
+            allow_pickle=True if os.getenv("CACHE_ALLOW_PICKLE", "0") == "1" else None
+        )
+
+    def encode(self, value: Any) -> bytes:
+        """Serialize (and maybe compress) a value with its header byte."""
+        raw = self.codec.dumps(value)
+        compression_id = 0
+        if self.compression is not None and len(raw) >= self.compress_threshold:
+            compressed = self.compression.compress(raw)
+            if len(compressed) < len(raw):
+                raw = compressed
+                compression_id = self.compression.id
+        return bytes(((compression_id << 3) | self.codec.id,)) + raw
+
+    def decode(self, raw: Optional[bytes]) -> Optional[Any]:
+        """Decode a stored value written by any codec configuration.
+
+        Raises:
+            ValueError: If the value needs a backend that is not
+                installed, or is pickled and pickle is not allowed
+        """
+        if raw is None:
+            return None
+        if isinstance(raw, str):
+            raw = raw.encode()
+        if not raw or raw[0] >= 0x20:
+            return json.loads(raw)  # legacy value without header
+
+        header = raw[0]
+        codec_id, compression_id = header & 0x07, header >> 3
+        if codec_id == CODECS['pickle'].id and not self.allow_pickle:
+            raise ValueError("Pickled cache value rejected (pickle decoding not enabled)")
+        payload = raw[1:]
+        if compression_id:
+            compression = _COMPRESSIONS_BY_ID.get(compression_id)
+            if compression is None:
+                name = _KNOWN_COMPRESSION_IDS.get(compression_id, compression_id)
+                raise ValueError(f"Cache compression '{name}' not installed")
+            payload = compression.decompress(payload)
+        codec = _CODECS_BY_ID.get(codec_id)
+        if codec is None:
+            raise ValueError(f"Cache codec '{_KNOWN_CODEC_IDS.get(codec_id, codec_id)}' not installed")
+        return codec.loads(payload)
@@ -5,19 +5,519 @@ Provides @cache decorator for transparent memoization of function results.
 """
 
 from functools import wraps
-from typing import Callable, Any, Optional
+from typing import Callable, Any, Dict, Iterable, Optional, Set, Tuple, Type, Union
 from .cache_manager import CacheManager
-import hashlib
+from .async_cache_manager import AsyncCacheManager
+from .keys import KeyBuilder
+from .local_cache import MISSING, local_cache, invalidation_bus
+from .metrics import cache_metrics
+from .single_flight import (
+    SingleFlight, AsyncSingleFlight,
+    acquire_lock, release_lock, acquire_lock_async, release_lock_async
+)
+import asyncio
 import inspect
+import math
+import random
+import threading
+import time
 
 
-def cache(ttl: Optional[int] = None, key_prefix: str = ""):
+# Marker key of values stored with freshness metadata (stale_ttl, early_refresh, local)
+ENVELOPE_MARK = "__cache_envelope__"
+
+# Marker key of cached "not found" outcomes (negative_ttl)
+NEGATIVE_MARK = "__cache_negative__"
+
+LOCK_POLL_INTERVAL = 0.05  # seconds between checks while another process recomputes
+
+# Strong references to background refresh tasks (the loop only keeps weak ones)
+_background_tasks: Set[asyncio.Task] = set()
+
+
+Tags = Union[Iterable[str], Callable[..., Iterable[str]]]
+
+ExceptionTypes = Union[Type[BaseException], Tuple[Type[BaseException], ...]]
+
+
+def _class_path(error: type) -> str:
+    """Stored name of an exception class."""
+    return f"{error.__module__}:{error.__qualname__}"
+
+
+class _Negative:
+    """Cached "not found" outcome: a None result or an exception to re-raise.
+
+    Exceptions are stored as their class path, args and attributes and
+    rebuilt fresh on every hit, so cached errors never share tracebacks.
+    """
+
+    __slots__ = ('error', 'args', 'attrs')
+
+    def __init__(
+        self,
+        error: Optional[Type[BaseException]] = None,
+        args: Iterable[Any] = (),
+        attrs: Optional[Dict[str, Any]] = None
+    ):
+        self.error = error
+        self.args = tuple(args)
+        self.attrs = attrs or {}
+
+    @classmethod
+    def from_exception(cls, exc: BaseException) -> "_Negative":
+        """Capture an exception raised by the cached function."""
+        return cls(type(exc), exc.args, dict(getattr(exc, '__dict__', {})))
+
+    def payload(self) -> Dict[str, Any]:
+        """Build the value stored in Redis."""
+        if self.error is None:
+            return {NEGATIVE_MARK: None}
+        return {NEGATIVE_MARK: _class_path(self.error), 'args': list(self.args), 'attrs': self.attrs}
+
+    @staticmethod
+    def class_map(types: Tuple[Type[BaseException], ...]) -> Dict[str, Type[BaseException]]:
+        """Map the stored class paths of the given exception types to them."""
+        return {_class_path(error): error for error in types}
+
+    @classmethod
+    def from_payload(
+        cls, payload: Dict[str, Any], classes: Dict[str, Type[BaseException]]
+    ) -> Optional["_Negative"]:
+        """Restore a stored outcome (None if its exception class is not one
+        of ``classes``, see class_map; paths read from Redis are never
+        imported)."""
+        path = payload[NEGATIVE_MARK]
+        if path is None:
+            return cls()
+        error = classes.get(path)
+        if error is None:
+            return None
+        return cls(error, payload.get('args', ()), payload.get('attrs'))
+
+    def result(self) -> None:
+        """Return None or raise a rebuilt copy of the cached exception."""
+        if self.error is None:
+            return None
+        exc = self.error.__new__(self.error, *self.args)
+        BaseException.__init__(exc, *self.args)
+        if self.attrs:
+            exc.__dict__.update(self.attrs)
+        raise exc
+
+
+def _settle(cached: Any) -> Any:
+    """Turn a cached value into the caller's result."""
+    return cached.result() if isinstance(cached, _Negative) else cached
+
+
+def cache(
+    ttl: Optional[int] = None,
+    key_prefix: str = "",
+    local: bool = False,
+    local_ttl: Optional[float] = None,
+    tags: Optional[Tags] = None,
+    stale_ttl: Optional[int] = None,
+    lock_timeout: Optional[float] = None,
+    early_refresh: Optional[float] = None,
+    negative_ttl: Optional[int] = None,
+    negative_on: ExceptionTypes = (),
+    version: Optional[Union[str, Callable[..., str]]] = None,
+    key_fn: Optional[Callable[..., Any]] = None,
+    vary_on: Optional[Iterable[str]] = None
+):
     """Decorator to cache function results.
-    
+
     Automatically caches function results based on arguments.
-<<<<
-    
+    Works with both regular and async functions; coroutine functions
+    use AsyncCacheManager so cache I/O never blocks the event loop.
+    Keys have the form
+    ``cache:<key_prefix or function name>:<hash of arguments>``; the
+    signature is inspected once (see KeyBuilder) so dependency-injected
+    parameters such as ``db: Session = Depends(get_db)`` are not part
+    of keys and omitted arguments hash like their defaults. ``vary_on``
+    restricts keys to the named parameters and ``key_fn`` (receiving the
+    call arguments) replaces the hash.
+
+    With ``local=True`` results are also kept in the in-process L1
+    cache, checked before Redis. L1 holds the same envelope as Redis, so
+    its hits get the same stale/early-refresh checks and never outlive
+    the Redis entry. Invalidations through CacheManager are broadcast so
+    every worker evicts the same keys.
+
+    Keys can be registered under tags so writers invalidate exactly the
+    affected entries with CacheManager.invalidate_tags. ``tags`` is a
+    list of tag names or a callable receiving the call arguments.
+
+    Misses are coalesced: concurrent callers for the same key in one
+    process wait for a single recomputation. With ``lock_timeout`` a
+    Redis lock extends this across processes; callers that lose the
+    lock poll for the winner's value (up to lock_timeout) before
+    recomputing themselves. With ``stale_ttl`` values are kept that
+    much longer than ``ttl`` and, once expired, served stale while a
+    background refresh recomputes them.
+
+    With ``early_refresh`` (XFetch) each value is stored with the time
+    it took to compute, and a hit triggers a background refresh before
+    expiry with a probability that rises as expiry approaches and with
+    the compute time: a hit at ``now`` refreshes when
+    ``now - delta * early_refresh * ln(rand()) >= expiry``. Popular keys
+    are regenerated by one caller ahead of time instead of all expiring
+    at the same instant.
+
+    With ``negative_ttl`` "not found" outcomes are cached too, for that
+    (short) TTL: a None result, or an exception of a ``negative_on``
+    type, which is re-raised on hits. Repeated lookups of missing IDs
+    then stop reaching the database; register them under tags so the
+    writer creating the ID can clear them.
+
+    With ``version`` keys embed the current generation of that
+    namespace (a name, or a callable receiving the call arguments).
+    Writers call CacheManager.bump_version instead of deleting every
+    affected key (e.g. all list pages); old generations expire on their
+    TTL. ``cache_put`` writes a known result through to its key, so a
+    read right after a write is a hit. While the generation cannot be
+    read (its node is down) calls neither read nor write the cache.
+
+    Args:
+        ttl: Time to live in seconds (defaults to CacheManager.DEFAULT_TTL)
+        key_prefix: Optional key namespace (defaults to function name)
+        local: Also cache results in the in-process L1 tier (the process
+            must run invalidation_bus.start(); the API does on startup)
+        local_ttl: L1 time to live in seconds (defaults to the L1 default,
+            capped by the Redis expiry)
+        tags: Tags (or callable returning tags) to register keys under
+        stale_ttl: Seconds an expired value may still be served while it
+            is refreshed in the background (None = disabled)
+        lock_timeout: Enable the cross-process recompute lock with this
+            expiry in seconds (None = per-process coalescing only)
+        early_refresh: XFetch beta; > 1 favours earlier refreshes
+            (None = disabled, 1.0 = usual choice)
+        negative_ttl: Time to live in seconds of cached None results and
+            negative_on exceptions (None = not cached)
+        negative_on: Exception type(s) cached as negative outcomes
+        version: Versioned namespace (or callable returning it) whose
+            generation is part of every key
+        key_fn: Callable building the key suffix from the call arguments
+        vary_on: Names of the parameters keys depend on (default: all
+            but dependency-injected ones)
+
     Example:
-        @cache(ttl=3600)
+        @cache(ttl=3600, tags=lambda user_id: ["users", f"user:{user_id}"])
         def get_user_profile(user_id: int):
-<<<<<<
+            return db.query(User).get(user_id)
+
+        get_user_profile.clear_cache(123)  # Drop a single entry
+        CacheManager.invalidate_tags("user:123")  # Drop all entries tagged
+    """
+    def decorator(func: Callable) -> Callable:
+        prefix = key_prefix or func.__name__
+        fresh_ttl = ttl or CacheManager.DEFAULT_TTL
+        redis_ttl = fresh_ttl + (stale_ttl or 0)
+        negative_types = (
+            (negative_on if isinstance(negative_on, tuple) else (negative_on,))
+            if negative_ttl else ()
+        )
+        negative_classes = _Negative.class_map(negative_types)
+
+        l1_ttl = min(local_ttl or local_cache.default_ttl, redis_ttl)
+        keys = KeyBuilder(func, prefix, vary_on=vary_on, key_fn=key_fn)
+
+        if local:
+            local_cache.enabled = True
+
+        def versioned(key: str, generation: Optional[int]) -> Optional[str]:
+            """Key of a generation (None if it is unknown: bypass the cache)."""
+            return None if generation is None else f"{key}:v{generation}"
+
+        def make_key(*args, **kwargs) -> Optional[str]:
+            key = keys.build(args, kwargs)
+            if version is None:
+                return key
+            name = version(*args, **kwargs) if callable(version) else version
+            return versioned(key, CacheManager.get_version(name))
+
+        async def make_key_async(*args, **kwargs) -> Optional[str]:
+            key = keys.build(args, kwargs)
+            if version is None:
+                return key
+            name = version(*args, **kwargs) if callable(version) else version
+            return versioned(key, await AsyncCacheManager.get_version(name))
+
+        def freshness(cached: Any) -> Tuple[Any, bool]:
+            """Turn a stored payload into (value, fresh)."""
+            if isinstance(cached, dict) and ENVELOPE_MARK in cached:
+                now = time.time()
+                if early_refresh and cached.get('delta'):
+                    # XFetch: -ln(u) for u in (0, 1] is exponentially distributed
+                    now -= cached['delta'] * early_refresh * math.log(1.0 - random.random())
+                return cached['value'], cached[ENVELOPE_MARK] > now
+            return cached, True
+
+        def remember(key: str, payload: Any, key_ttl: float) -> None:
+            """Keep a stored payload in L1, never past its Redis expiry."""
+            l1_key_ttl = min(l1_ttl, key_ttl)
+            if isinstance(payload, dict) and ENVELOPE_MARK in payload:
+                l1_key_ttl = min(l1_key_ttl, payload[ENVELOPE_MARK] + (stale_ttl or 0) - time.time())
+            if l1_key_ttl > 0:
+                local_cache.set(key, payload, l1_key_ttl)
+
+        def unwrap(key: str, cached: Any) -> Tuple[Any, bool]:
+            """Turn a Redis value into (value or MISSING, fresh)."""
+            if cached is None:
+                return MISSING, False
+            key_ttl = redis_ttl
+            if negative_ttl and isinstance(cached, dict) and NEGATIVE_MARK in cached:
+                cached = _Negative.from_payload(cached, negative_classes)
+                if cached is None:
+                    return MISSING, False
+                key_ttl = negative_ttl
+            if local:
+                remember(key, cached, key_ttl)
+            return freshness(cached)
+
+        def wrap(
+            result: Any, args: tuple, kwargs: dict, delta: float
+        ) -> Tuple[Any, Optional[Iterable[str]], int]:
+            """Build the stored payload, tags and TTL of a computed result
+            (delta = seconds it took to compute)."""
+            key_tags = tags(*args, **kwargs) if callable(tags) else tags
+            if negative_ttl and (result is None or isinstance(result, _Negative)):
+                negative = result if isinstance(result, _Negative) else _Negative()
+                if negative.error is not None:
+                    # Subclasses of negative_on raised here resolve on later hits
+                    negative_classes.setdefault(_class_path(negative.error), negative.error)
+                return negative.payload(), key_tags, negative_ttl
+            if stale_ttl or early_refresh or local:
+                # L1 copies need the expiry too (to re-check freshness on hits)
+                envelope = {ENVELOPE_MARK: time.time() + fresh_ttl, 'value': result}
+                if early_refresh:
+                    envelope['delta'] = delta
+                return envelope, key_tags, redis_ttl
+            return result, key_tags, redis_ttl
+
+        def l1_payload(result: Any, payload: Any) -> Any:
+            """L1 form of a stored payload (negative outcomes stay objects)."""
+            if negative_ttl and (result is None or isinstance(result, _Negative)):
+                return result if isinstance(result, _Negative) else _Negative()
+            return payload
+
+        def lookup(key: str) -> Tuple[Any, bool]:
+            """Get (value or MISSING, fresh) for a key."""
+            if local:
+                cached = local_cache.get(key)
+                if cached is not MISSING:
+                    cache_metrics.record_local_hit(key)
+                    return freshness(cached)
+            return unwrap(key, CacheManager.get(key))
+
+        def store(key: str, result: Any, args: tuple, kwargs: dict, delta: float) -> None:
+            payload, key_tags, key_ttl = wrap(result, args, kwargs, delta)
+            CacheManager.set(key, payload, key_ttl, tags=key_tags)
+            if local:
+                remember(key, l1_payload(result, payload), key_ttl)
+
+        async def lookup_async(key: str) -> Tuple[Any, bool]:
+            if local:
+                cached = local_cache.get(key)
+                if cached is not MISSING:
+                    cache_metrics.record_local_hit(key)
+                    return freshness(cached)
+            return unwrap(key, await AsyncCacheManager.get(key))
+
+        async def store_async(key: str, result: Any, args: tuple, kwargs: dict, delta: float) -> None:
+            payload, key_tags, key_ttl = wrap(result, args, kwargs, delta)
+            await AsyncCacheManager.set(key, payload, key_ttl, tags=key_tags)
+            if local:
+                remember(key, l1_payload(result, payload), key_ttl)
+
+        if inspect.iscoroutinefunction(func):
+            flights = AsyncSingleFlight()
+
+            async def recompute(key: str, args: tuple, kwargs: dict) -> Any:
+                token = None
+                if lock_timeout:
+                    token = await acquire_lock_async(key, lock_timeout)
+                    deadline = time.monotonic() + lock_timeout
+                    while token is None and time.monotonic() < deadline:
+                        await asyncio.sleep(LOCK_POLL_INTERVAL)
+                        cached, fresh = await lookup_async(key)
+                        if cached is not MISSING and fresh:
+                            return _settle(cached)
+                        token = await acquire_lock_async(key, lock_timeout)
+                try:
+                    started = time.perf_counter()
+                    try:
+                        result = await func(*args, **kwargs)
+                    except negative_types as e:
+                        await store_async(key, _Negative.from_exception(e), args, kwargs, 0.0)
+                        raise
+                    await store_async(key, result, args, kwargs, time.perf_counter() - started)
+                    return result
+                finally:
+                    if token is not None:
+                        await release_lock_async(key, token)
+
+            async def refresh(key: str, args: tuple, kwargs: dict) -> None:
+                try:
+                    await flights.do(key, lambda: recompute(key, args, kwargs))
+                except Exception as e:
+                    print(f"❌ Cache refresh error ({key}): {e}")
+
+            async def cache_put(result: Any, /, *args, **kwargs) -> bool:
+                """Write result through to the key of the given arguments."""
+                key = await make_key_async(*args, **kwargs)
+                if key is None:
+                    return False
+                payload, key_tags, key_ttl = wrap(result, args, kwargs, 0.0)
+                stored = await AsyncCacheManager.set(key, payload, key_ttl, tags=key_tags)
+                await AsyncCacheManager.broadcast('delete', keys=[key])
+                if local:
+                    remember(key, l1_payload(result, payload), key_ttl)
+                return stored
+
+            @wraps(func)
+            async def wrapper(*args, **kwargs) -> Any:
+                key = await make_key_async(*args, **kwargs)
+                if key is None:
+                    return await func(*args, **kwargs)
+                cached, fresh = await lookup_async(key)
+                if cached is not MISSING:
+                    if not fresh and not flights.in_flight(key):
+                        task = asyncio.get_running_loop().create_task(refresh(key, args, kwargs))
+                        _background_tasks.add(task)
+                        task.add_done_callback(_background_tasks.discard)
+                    return _settle(cached)
+
+                return await flights.do(key, lambda: recompute(key, args, kwargs))
+        else:
+            flights = SingleFlight()
+
+            def recompute(key: str, args: tuple, kwargs: dict) -> Any:
+                token = None
+                if lock_timeout:
+                    token = acquire_lock(key, lock_timeout)
+                    deadline = time.monotonic() + lock_timeout
+                    while token is None and time.monotonic() < deadline:
+                        time.sleep(LOCK_POLL_INTERVAL)
+                        cached, fresh = lookup(key)
+                        if cached is not MISSING and fresh:
+                            return _settle(cached)
+                        token = acquire_lock(key, lock_timeout)
+                try:
+                    started = time.perf_counter()
+                    try:
+                        result = func(*args, **kwargs)
+                    except negative_types as e:
+                        store(key, _Negative.from_exception(e), args, kwargs, 0.0)
+                        raise
+                    store(key, result, args, kwargs, time.perf_counter() - started)
+                    return result
+                finally:
+                    if token is not None:
+                        release_lock(key, token)
+
+            def refresh(key: str, args: tuple, kwargs: dict) -> None:
+                try:
+                    flights.do(key, lambda: recompute(key, args, kwargs))
+                except Exception as e:
+                    print(f"❌ Cache refresh error ({key}): {e}")
+
+            def cache_put(result: Any, /, *args, **kwargs) -> bool:
+                """Write result through to the key of the given arguments."""
+                key = make_key(*args, **kwargs)
+                if key is None:
+                    return False
+                payload, key_tags, key_ttl = wrap(result, args, kwargs, 0.0)
+                stored = CacheManager.set(key, payload, key_ttl, tags=key_tags)
+                invalidation_bus.publish('delete', keys=[key])
+                if local:
+                    remember(key, l1_payload(result, payload), key_ttl)
+                return stored
+
+            @wraps(func)
+            def wrapper(*args, **kwargs) -> Any:
+                key = make_key(*args, **kwargs)
+                if key is None:
+                    return func(*args, **kwargs)
+                cached, fresh = lookup(key)
+                if cached is not MISSING:
+                    if not fresh and not flights.in_flight(key):
+                        threading.Thread(
+                            target=refresh, args=(key, args, kwargs), daemon=True
+                        ).start()
+                    return _settle(cached)
+
+                return flights.do(key, lambda: recompute(key, args, kwargs))
+
+        def clear_cache(*args, **kwargs) -> bool:
+            """Remove the cached entry for the given arguments."""
+            key = make_key(*args, **kwargs)
+            return key is not None and CacheManager.delete(key)
+
+        def cache_entry(
+            result: Any, args: tuple = (), kwargs: Optional[dict] = None, delta: float = 0.0
+        ) -> Optional[Tuple[str, Any, list, int]]:
+            """Build (key, stored payload, tags, ttl) caching result for the
+            given call arguments, e.g. to warm many keys in one pipeline
+            with CacheManager.set_many (delta = estimated compute seconds;
+            None if the key's generation is unknown)."""
+            key = make_key(*args, **(kwargs or {}))
+            if key is None:
+                return None
+            payload, key_tags, key_ttl = wrap(result, args, kwargs or {}, delta)
+            return key, payload, list(key_tags or ()), key_ttl
+
+        wrapper.cache_key = make_key
+        wrapper.cache_entry = cache_entry
+        wrapper.clear_cache = clear_cache
+        wrapper.cache_put = cache_put
+        return wrapper
+
+    return decorator
+
+
+def cache_invalidate(pattern: Optional[str] = None, tags: Optional[Tags] = None):
+    """Decorator to invalidate cache keys after function execution.
+
+    Args:
+        pattern: Key pattern to invalidate (e.g., "cache:get_trades:*")
+        tags: Tags (or callable receiving the call arguments) to invalidate
+
+    Example:
+        @cache_invalidate(tags=["trades"])
+        def save_trade(trade):
+            ...
+    """
+    def tag_list(args: tuple, kwargs: dict) -> list:
+        if not tags:
+            return []
+        return list(tags(*args, **kwargs) if callable(tags) else tags)
+
+    def invalidate(args: tuple, kwargs: dict) -> None:
+        CacheManager.invalidate_tags(*tag_list(args, kwargs))
+        if pattern:
+            CacheManager.invalidate_pattern(pattern)
+
+    async def invalidate_async(args: tuple, kwargs: dict) -> None:
+        await AsyncCacheManager.invalidate_tags(*tag_list(args, kwargs))
+        if pattern:
+            await AsyncCacheManager.invalidate_pattern(pattern)
+
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def wrapper(*args, **kwargs) -> Any:
+                result = await func(*args, **kwargs)
+                await invalidate_async(args, kwargs)
+                return result
+        else:
+            @wraps(func)
+            def wrapper(*args, **kwargs) -> Any:
+                result = func(*args, **kwargs)
+                invalidate(args, kwargs)
+                return result
+
+        return wrapper
+
+    return decorator
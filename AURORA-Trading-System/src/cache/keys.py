@@ -0,0 +1,184 @@
+# Cache Key Builder for AURORA Trading System
+"""
+Deterministic cache keys for @cache.
+
+The cached function's signature is inspected once, at decoration time.
+Dependency-injected parameters (FastAPI ``Depends``, SQLAlchemy sessions,
+cache clients) are left out of keys, and missing arguments are filled
+with their defaults (FastAPI ``Query``/``Path`` markers reduced to their
+default value). ``f(1)``, ``f(x=1)`` and a request FastAPI dispatches
+with ``x=1`` and a fresh Session therefore share one key. The remaining
+arguments are canonicalized and hashed with BLAKE2b, which is stable
+across processes and restarts.
+"""
+
+from enum import Enum
+from typing import Annotated, Any, Callable, Iterable, List, Optional, Tuple, get_args, get_origin
+import hashlib
+import inspect
+
+try:
+    from pydantic.fields import FieldInfo
+except ImportError:  # FastAPI parameter markers are pydantic FieldInfo
+    FieldInfo = None
+
+try:
+    from pydantic_core import PydanticUndefined
+except ImportError:
+    try:
+        from pydantic.fields import Undefined as PydanticUndefined
+    except ImportError:
+        PydanticUndefined = None
+
+try:
+    from sqlalchemy.orm import Session
+except ImportError:  # optional
+    Session = None
+
+from .redis_client import RedisClient
+from .async_redis_client import AsyncRedisClient
+
+
+# Parameter types that are never part of a key (request-scoped resources)
+UNKEYED_TYPES: Tuple[type, ...] = tuple(
+    t for t in (Session, RedisClient, AsyncRedisClient) if t is not None
+)
+
+DIGEST_SIZE = 16  # bytes of BLAKE2b digest (32 hex characters)
+
+_NO_DEFAULT = inspect.Parameter.empty
+
+
+def _is_depends(marker: Any) -> bool:
+    """Check for a FastAPI Depends/Security marker (without importing FastAPI)."""
+    return any(cls.__name__ == 'Depends' for cls in type(marker).__mro__)
+
+
+def _is_injected(param: inspect.Parameter) -> bool:
+    """Whether a parameter is supplied by dependency injection."""
+    if _is_depends(param.default):
+        return True
+    annotation = param.annotation
+    if get_origin(annotation) is Annotated:
+        annotation, *metadata = get_args(annotation)
+        if any(_is_depends(marker) for marker in metadata):
+            return True
+    return isinstance(annotation, type) and issubclass(annotation, UNKEYED_TYPES)
+
+
+def _normalize_default(default: Any) -> Any:
+    """Reduce FastAPI Query/Path/Body markers to their default value."""
+    if FieldInfo is not None and isinstance(default, FieldInfo):
+        default = default.default
+        if default is PydanticUndefined or default is Ellipsis:
+            return _NO_DEFAULT
+    return default
+
+
+def canonical(value: Any) -> Any:
+    """Convert a value to an equivalent, order-independent structure whose
+    repr is stable (dicts and sets sorted, models as their fields)."""
+    if value is None or isinstance(value, (str, int, float, bytes)):
+        return value
+    if isinstance(value, Enum):
+        return canonical(value.value)
+    if isinstance(value, (list, tuple)):
+        return tuple(canonical(item) for item in value)
+    if isinstance(value, dict):
+        return ('dict', tuple(sorted(
+            ((canonical(k), canonical(v)) for k, v in value.items()), key=repr
+        )))
+    if isinstance(value, (set, frozenset)):
+        return ('set', tuple(sorted((canonical(item) for item in value), key=repr)))
+    dump = getattr(value, 'model_dump', None) or getattr(value, 'dict', None)
+    if callable(dump):  # pydantic models
+        return (type(value).__qualname__, canonical(dump()))
+    return value
+
+
+def _signature(func: Callable) -> inspect.Signature:
+    try:
+        return inspect.signature(func, eval_str=True)
+    except (NameError, TypeError):  # unresolvable string annotations
+        return inspect.signature(func)
+
+
+class KeyBuilder:
+    """Builds ``cache:<prefix>:<digest>`` keys for one function.
+
+    Attributes:
+        prefix: Key namespace
+        keyed: Names of the parameters that are part of keys
+    """
+
+    def __init__(
+        self,
+        func: Callable,
+        prefix: str,
+        vary_on: Optional[Iterable[str]] = None,
+        key_fn: Optional[Callable[..., Any]] = None
+    ):
+        """Inspect the signature of func.
+
+        Args:
+            func: Cached function
+            prefix: Key namespace
+            vary_on: Only these parameters are part of keys (default: all
+                but the dependency-injected ones)
+            key_fn: Build the key suffix from the call arguments instead
+
+        Raises:
+            ValueError: If vary_on names a parameter func does not have
+        """
+        self.prefix = prefix
+        self.key_fn = key_fn
+        params = list(_signature(func).parameters.values())
+        named = [p for p in params if p.kind not in (p.VAR_POSITIONAL, p.VAR_KEYWORD)]
+
+        self._names = {p.name for p in named}
+        self._positional = [
+            p.name for p in named if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD)
+        ]
+        self._defaults = {p.name: _normalize_default(p.default) for p in named}
+
+        if vary_on is None:
+            self.keyed: Tuple[str, ...] = tuple(p.name for p in named if not _is_injected(p))
+            self._extras = True
+        else:
+            vary_on = list(vary_on)
+            unknown = [name for name in vary_on if name not in self._names]
+            if unknown:
+                raise ValueError(
+                    f"vary_on names unknown parameters of {func.__qualname__}: {', '.join(unknown)}"
+                )
+            self.keyed = tuple(p.name for p in named if p.name in vary_on)
+            self._extras = False
+
+    def values(self, args: tuple, kwargs: dict) -> List[Tuple[str, Any]]:
+        """Get the (name, value) pairs a call is keyed on.
+
+        Missing arguments take their default; with ``*args``/``**kwargs``
+        in the signature, extra arguments are included (unless vary_on
+        is set).
+        """
+        bound = dict(zip(self._positional, args))
+        bound.update(kwargs)
+        values = []
+        for name in self.keyed:
+            value = bound.get(name, self._defaults[name])
+            if value is not _NO_DEFAULT:
+                values.append((name, value))
+        if self._extras:
+            if len(args) > len(self._positional):
+                values.append(('*', args[len(self._positional):]))
+            extra = sorted(k for k in kwargs if k not in self._names)
+            values.extend((name, kwargs[name]) for name in extra)
+        return values
+
+    def build(self, args: tuple, kwargs: dict) -> str:
+        """Build the key of a call."""
+        if self.key_fn is not None:
+            return f"cache:{self.prefix}:{self.key_fn(*args, **kwargs)}"
+        raw = repr(canonical(self.values(args, kwargs))).encode()
+        digest = hashlib.blake2b(raw, digest_size=DIGEST_SIZE).hexdigest()
+        return f"cache:{self.prefix}:{digest}"
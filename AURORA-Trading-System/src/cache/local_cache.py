@@ -0,0 +1,286 @@
+# Local Cache for AURORA Trading System
+"""
+In-process L1 cache in front of Redis.
+Bounded LRU with per-entry TTL; invalidations are broadcast over Redis
+pub/sub so every worker process evicts the same keys.
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+import copy
+import fnmatch
+import json
+import os
+import threading
+import time
+import uuid
+
+from .redis_client import redis_client
+from .sharding import NodeUnavailable
+
+
+# Sentinel distinguishing "not cached" from a cached None
+MISSING = object()
+
+INVALIDATION_CHANNEL = os.getenv("CACHE_INVALIDATION_CHANNEL", "cache:invalidate")
+LISTENER_RETRY_SECONDS = 1.0  # pause of the listener after a connection error
+
+_IMMUTABLE = (str, bytes, int, float, complex, bool, type(None), frozenset)
+
+
+def detach(value: Any) -> Any:
+    """Copy a mutable value so callers never share it with the cache.
+
+    Immutable scalars are returned as is; values that cannot be deep
+    copied are shared.
+    """
+    if isinstance(value, _IMMUTABLE):
+        return value
+    try:
+        return copy.deepcopy(value)
+    except Exception:
+        return value
+
+
+class LocalCache:
+    """Thread-safe bounded LRU cache with per-entry TTL.
+
+    Entries are kept in an OrderedDict in recency order; the least
+    recently used entry is evicted when ``max_entries`` is exceeded.
+    Expired entries are dropped when they are read. Values are copied on
+    set and get, so mutating a result never changes the cached entry.
+
+    Attributes:
+        enabled: Set once any @cache decorator opts into the L1 tier;
+            invalidations are only broadcast when it is set
+    """
+
+    def __init__(self, max_entries: int = 10000, default_ttl: float = 30.0):
+        """Initialize LocalCache.
+
+        Args:
+            max_entries: Maximum number of entries kept
+            default_ttl: TTL in seconds used when set() gets none
+        """
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple[Any, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Any:
+        """Get a value, refreshing its recency.
+
+        Returns:
+            Cached value or MISSING
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return detach(entry[0])
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, evicting the least recently used entries."""
+        expires_at = time.monotonic() + (ttl or self.default_ttl)
+        value = detach(value)
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, keys: Iterable[str]) -> int:
+        """Evict keys.
+
+        Returns:
+            int: Number of entries evicted
+        """
+        with self._lock:
+            return sum(self._entries.pop(key, None) is not None for key in keys)
+
+    def delete_pattern(self, pattern: str) -> int:
+        """Evict keys matching a glob pattern.
+
+        Returns:
+            int: Number of entries evicted
+        """
+        with self._lock:
+            keys = [key for key in self._entries if fnmatch.fnmatchcase(key, pattern)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        """Evict all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and occupancy."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'evictions': self.evictions,
+        }
+
+
+class InvalidationBus:
+    """Redis pub/sub broadcast of L1 invalidations.
+
+    Messages are JSON objects ``{"origin", "op", "keys"|"pattern"}``
+    with op one of ``delete``, ``pattern`` or ``flush``. Each process
+    applies its own invalidations locally before publishing and ignores
+    its own messages. Messages missed while disconnected are lost, so
+    the L1 TTL bounds how long a worker can serve a stale entry; the
+    listener keeps retrying and resubscribes once Redis is back.
+    """
+
+    def __init__(self, local: LocalCache, client=None, channel: str = INVALIDATION_CHANNEL):
+        """Initialize InvalidationBus.
+
+        Args:
+            local: L1 cache to evict from
+            client: redis-py client (defaults to the global RedisClient's)
+            channel: Pub/sub channel name
+        """
+        if client is None and redis_client is not None:
+            client = redis_client.client
+        self.local = local
+        self.client = client
+        self.channel = channel
+        self.origin = uuid.uuid4().hex
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._disconnected = False
+
+    def start(self) -> bool:
+        """Start the listener thread (idempotent).
+
+        Returns:
+            bool: True if the listener is running
+        """
+        if self.client is None:
+            return False
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return True
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(**{self.channel: self._on_message})
+                self._thread = pubsub.run_in_thread(
+                    sleep_time=1.0, daemon=True, exception_handler=self._on_listener_error
+                )
+                return True
+            except Exception as e:
+                print(f"❌ Cache invalidation listener failed to start: {e}")
+                return False
+
+    def stop(self) -> None:
+        """Stop the listener thread."""
+        with self._start_lock:
+            if self._thread is not None:
+                self._thread.stop()
+                self._thread = None
+
+    def _on_listener_error(self, error: Exception, pubsub: Any, thread: Any) -> None:
+        """Keep the listener thread alive through connection errors (the
+        next read reconnects and resubscribes)."""
+        if not self._disconnected:
+            self._disconnected = True
+            print(f"⚠️ Cache invalidation listener disconnected (retrying): {error}")
+        time.sleep(LISTENER_RETRY_SECONDS)
+
+    def _on_message(self, message: Dict[str, Any]) -> None:
+        """Apply an invalidation published by another process."""
+        self._disconnected = False
+        try:
+            payload = json.loads(message['data'])
+        except (TypeError, ValueError):
+            return
+        if payload.get('origin') == self.origin:
+            return
+        self.apply(payload)
+
+    def apply(self, payload: Dict[str, Any]) -> None:
+        """Apply an invalidation to the local cache."""
+        op = payload.get('op')
+        if op == 'delete':
+            self.local.delete(payload.get('keys', []))
+        elif op == 'pattern':
+            self.local.delete_pattern(payload.get('pattern', ''))
+        elif op == 'flush':
+            self.local.clear()
+
+    def prepare(self, op: str, **fields: Any) -> Optional[str]:
+        """Apply an invalidation locally and build its broadcast message.
+
+        Args:
+            op: "delete", "pattern" or "flush"
+            **fields: keys=[...] or pattern="..."
+
+        Returns:
+            JSON message to publish, or None if the L1 tier is disabled
+        """
+        if not self.local.enabled:
+            return None
+        payload = {'origin': self.origin, 'op': op, **fields}
+        self.apply(payload)
+        return json.dumps(payload)
+
+    def publish(self, op: str, **fields: Any) -> None:
+        """Apply an invalidation locally and broadcast it.
+
+        Nothing is published unless the L1 tier is enabled.
+
+        Args:
+            op: "delete", "pattern" or "flush"
+            **fields: keys=[...] or pattern="..."
+        """
+        message = self.prepare(op, **fields)
+        if message is None or self.client is None:
+            return
+        try:
+            self.client.publish(self.channel, message)
+        except NodeUnavailable:
+            pass
+        except Exception as e:
+            print(f"❌ Cache invalidation publish error ({op}): {e}")
+
+
+def _create_local_cache():
+    """Build the L1 tier: LRU by entry count (default) or, with
+    CACHE_L1_POLICY=tinylfu, scan-resistant W-TinyLFU by bytes."""
+    default_ttl = float(os.getenv("CACHE_L1_TTL", "30"))
+    if os.getenv("CACHE_L1_POLICY", "lru") == "tinylfu":
+        from .tinylfu import TinyLFUCache
+        return TinyLFUCache(
+            max_bytes=int(os.getenv("CACHE_L1_MAX_BYTES", str(64 * 1024 * 1024))),
+            default_ttl=default_ttl
+        )
+    return LocalCache(
+        max_entries=int(os.getenv("CACHE_L1_MAX_ENTRIES", "10000")),
+        default_ttl=default_ttl
+    )
+
+
+# Global instances
+local_cache = _create_local_cache()
+invalidation_bus = InvalidationBus(local_cache)
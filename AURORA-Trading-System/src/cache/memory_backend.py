@@ -0,0 +1,1027 @@
+# In-Process Cache Backend for AURORA Trading System
+"""
+Redis-compatible in-process backend for offline runs, CI and benchmarks.
+
+Implements the subset of redis-py used by the cache layer and the event
+statistics (strings, counters, sets, hashes, sorted sets, key expiry,
+RENAME, SCAN, pipelines with WATCH/MULTI and pub/sub) on top of a
+thread-safe in-memory store, so RedisClient, CacheManager and @cache run
+unchanged without a Redis server.
+
+Selected with a ``memory://[name][?maxmemory=<bytes>]`` URL or
+``CACHE_BACKEND=memory``. Clients opened with the same URL share one
+store (one "server" per name and process).
+
+Not supported: Lua scripting, cluster commands, blocking commands and
+async pub/sub subscriptions (publishing works). Unsupported commands raise
+redis.ResponseError like an unknown command would.
+"""
+
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+import heapq
+import itertools
+import queue
+import threading
+import time
+
+import redis
+
+
+MEMORY_SCHEME = "memory"
+
+# Approximate per-key bookkeeping overhead in bytes (dict entry, expiry)
+KEY_OVERHEAD = 64
+MEMBER_OVERHEAD = 16
+
+# SCAN iterations in flight per store (the oldest snapshot is dropped)
+SCAN_SNAPSHOTS = 64
+SCAN_POSITION_BITS = 32  # low cursor bits: position in the snapshot
+
+WRONGTYPE = "WRONGTYPE Operation against a key holding the wrong kind of value"
+
+
+def is_memory_url(url: Optional[str]) -> bool:
+    """Check whether a cache URL selects the in-process backend."""
+    return bool(url) and url.startswith(f"{MEMORY_SCHEME}://")
+
+
+def _encode(value: Any) -> bytes:
+    """Encode a command argument the way redis-py does."""
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, str):
+        return value.encode()
+    if isinstance(value, bool):
+        raise redis.DataError("Invalid input of type: 'bool'. Convert to a bytes, string, int or float first.")
+    if isinstance(value, (int, float)):
+        return repr(value).encode()
+    raise redis.DataError(f"Invalid input of type: '{type(value).__name__}'.")
+
+
+class SortedSet:
+    """Sorted set value: member -> score, ranked on demand."""
+
+    __slots__ = ('scores',)
+
+    def __init__(self):
+        self.scores: Dict[bytes, float] = {}
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def ranked(self, desc: bool = False) -> List[Tuple[bytes, float]]:
+        """Members ordered by (score, member), like Redis."""
+        return sorted(self.scores.items(), key=lambda item: (item[1], item[0]), reverse=desc)
+
+
+def _rank_slice(size: int, start: int, end: int) -> slice:
+    """Convert inclusive Redis rank bounds (negative from the end) to a slice."""
+    start = max(0, start + size if start < 0 else start)
+    end = end + size if end < 0 else end
+    return slice(start, max(start, end + 1))
+
+
+def _decode(value: Any) -> Any:
+    """Decode a reply for clients created with decode_responses=True."""
+    if isinstance(value, bytes):
+        return value.decode()
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(_decode(item) for item in value)
+    if isinstance(value, set):
+        return {_decode(item) for item in value}
+    if isinstance(value, dict):
+        return {_decode(k): _decode(v) for k, v in value.items()}
+    return value
+
+
+# ============================================================================
+# Store ("server")
+# ============================================================================
+
+class MemoryStore:
+    """Thread-safe keyspace with TTL expiry, memory accounting and pub/sub.
+
+    Values are bytes (strings), sets of bytes or dicts of bytes (hashes).
+    Expired keys are removed lazily on access and actively from a
+    deadline heap on every command, so ``used_memory`` stays accurate.
+    With ``max_memory`` the least recently used keys are evicted once a
+    write goes over the limit (like Redis' allkeys-lru).
+
+    Attributes:
+        max_memory: Byte limit of the keyspace (0 = unlimited)
+        used_memory: Approximate bytes used by keys and values
+        evicted_keys: Keys evicted because of max_memory
+        expired_keys: Keys removed because their TTL elapsed
+    """
+
+    def __init__(self, max_memory: int = 0):
+        """Initialize an empty store.
+
+        Args:
+            max_memory: Byte limit of the keyspace (0 = unlimited)
+        """
+        self.max_memory = max_memory
+        self.used_memory = 0
+        self.evicted_keys = 0
+        self.expired_keys = 0
+        self.lock = threading.RLock()
+        self._data: "OrderedDict[bytes, Any]" = OrderedDict()
+        self._sizes: Dict[bytes, int] = {}
+        self._expires: Dict[bytes, float] = {}
+        self._deadlines: List[Tuple[float, bytes]] = []
+        self._watched: Dict[bytes, List[int]] = {}  # key -> [watchers, version]
+        self._epoch = 0
+        self._channels: Dict[bytes, set] = {}
+        self._scans: "OrderedDict[int, List[bytes]]" = OrderedDict()  # SCAN id -> sorted keys
+        self._scan_ids = itertools.count(1)
+
+    # ------------------------------------------------------------------------
+    # Keyspace internals (callers hold the lock)
+    # ------------------------------------------------------------------------
+
+    def _expire_due(self) -> None:
+        """Remove keys whose deadline has passed."""
+        now = time.monotonic()
+        while self._deadlines and self._deadlines[0][0] <= now:
+            deadline, key = heapq.heappop(self._deadlines)
+            if self._expires.get(key) == deadline:
+                self._remove(key)
+                self.expired_keys += 1
+
+    def _lookup(self, key: bytes, kind: Optional[type] = None) -> Any:
+        """Get a live value (None if missing), checking its type."""
+        deadline = self._expires.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self._remove(key)
+            self.expired_keys += 1
+            return None
+        value = self._data.get(key)
+        if value is None:
+            return None
+        if kind is not None and not isinstance(value, kind):
+            raise redis.ResponseError(WRONGTYPE)
+        self._data.move_to_end(key)
+        return value
+
+    def _alive(self, key: bytes) -> bool:
+        """Check a key exists without counting it as used (for KEYS/SCAN)."""
+        deadline = self._expires.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self._remove(key)
+            self.expired_keys += 1
+            return False
+        return key in self._data
+
+    def _changed(self, key: bytes) -> None:
+        """Bump the version of a watched key."""
+        watch = self._watched.get(key)
+        if watch is not None:
+            watch[1] += 1
+
+    def _touch(self, key: bytes, size_delta: int = 0) -> None:
+        """Record a modification of key (WATCH versions, memory)."""
+        self._changed(key)
+        self._sizes[key] = self._sizes.get(key, 0) + size_delta
+        self.used_memory += size_delta
+
+    def _store(self, key: bytes, value: Any, size: int) -> None:
+        """Insert or replace a key with a value of the given size."""
+        if key in self._data:
+            self.used_memory -= self._sizes[key]
+        self._data[key] = value
+        self._data.move_to_end(key)
+        self._sizes[key] = 0
+        self._touch(key, size)
+
+    def _remove(self, key: bytes) -> bool:
+        """Delete a key and its expiry."""
+        if key not in self._data:
+            return False
+        del self._data[key]
+        self._expires.pop(key, None)
+        self.used_memory -= self._sizes.pop(key)
+        self._changed(key)
+        return True
+
+    def _set_deadline(self, key: bytes, seconds: Optional[float]) -> None:
+        """Set (or clear with None) the expiry of an existing key."""
+        if seconds is None:
+            self._expires.pop(key, None)
+            return
+        deadline = time.monotonic() + seconds
+        self._expires[key] = deadline
+        heapq.heappush(self._deadlines, (deadline, key))
+
+    def _evict(self, keep: bytes) -> None:
+        """Evict least recently used keys while over max_memory."""
+        if not self.max_memory:
+            return
+        while self.used_memory > self.max_memory and len(self._data) > 1:
+            key = next(iter(self._data))
+            if key == keep:
+                self._data.move_to_end(key)
+                key = next(iter(self._data))
+            self._remove(key)
+            self.evicted_keys += 1
+
+    def _new_collection(self, key: bytes, kind: type) -> Any:
+        """Get a set/hash for writing, creating it if missing."""
+        value = self._lookup(key, kind)
+        if value is None:
+            value = kind()
+            self._store(key, value, len(key) + KEY_OVERHEAD)
+        return value
+
+    def _drop_if_empty(self, key: bytes) -> None:
+        """Redis deletes sets and hashes when they become empty."""
+        if not self._data.get(key):
+            self._remove(key)
+
+    def watch(self, keys: List[bytes]) -> None:
+        """Start tracking modifications of keys (WATCH)."""
+        with self.lock:
+            for key in keys:
+                self._watched.setdefault(key, [0, 0])[0] += 1
+
+    def unwatch(self, keys: List[bytes]) -> None:
+        """Stop tracking keys registered with watch()."""
+        with self.lock:
+            for key in keys:
+                watch = self._watched.get(key)
+                if watch is not None:
+                    watch[0] -= 1
+                    if not watch[0]:
+                        del self._watched[key]
+
+    def versions(self, keys: List[bytes]) -> Tuple[int, List[int]]:
+        """Current modification versions of watched keys."""
+        with self.lock:
+            self._expire_due()
+            return self._epoch, [self._watched[key][1] for key in keys]
+
+    # ------------------------------------------------------------------------
+    # Command dispatch
+    # ------------------------------------------------------------------------
+
+    def execute(self, command: str, *args: Any, **kwargs: Any) -> Any:
+        """Run one command atomically.
+
+        Raises:
+            redis.ResponseError: Unknown command or wrong value type
+        """
+        handler = getattr(self, f"cmd_{command}", None)
+        if handler is None:
+            raise redis.ResponseError(f"unknown command '{command}' (in-process backend)")
+        with self.lock:
+            self._expire_due()
+            return handler(*args, **kwargs)
+
+    # Connection / server --------------------------------------------------
+
+    def cmd_ping(self) -> bool:
+        return True
+
+    def cmd_dbsize(self) -> int:
+        return len(self._data)
+
+    def cmd_flushdb(self, asynchronous: bool = False) -> bool:
+        self._data.clear()
+        self._sizes.clear()
+        self._expires.clear()
+        self._deadlines.clear()
+        self.used_memory = 0
+        self._epoch += 1
+        return True
+
+    cmd_flushall = cmd_flushdb
+
+    def cmd_info(self, section: Optional[str] = None) -> Dict[str, Any]:
+        return {
+            'used_memory': self.used_memory,
+            'maxmemory': self.max_memory,
+            'maxmemory_policy': 'allkeys-lru' if self.max_memory else 'noeviction',
+            'evicted_keys': self.evicted_keys,
+            'expired_keys': self.expired_keys,
+            'keys': len(self._data),
+            'expires': len(self._expires),
+        }
+
+    def cmd_memory_usage(self, key: Any, samples: Optional[int] = None) -> Optional[int]:
+        key = _encode(key)
+        return self._sizes.get(key) if self._lookup(key) is not None else None
+
+    # Keys -------------------------------------------------------------------
+
+    def cmd_delete(self, *keys: Any) -> int:
+        return sum(self._remove(_encode(key)) for key in keys)
+
+    cmd_unlink = cmd_delete
+
+    def cmd_rename(self, src: Any, dst: Any) -> bool:
+        src, dst = _encode(src), _encode(dst)
+        value = self._lookup(src)
+        if value is None:
+            raise redis.ResponseError("no such key")
+        deadline = self._expires.get(src)
+        size = self._sizes[src] - len(src) + len(dst)
+        self._remove(src)
+        self._remove(dst)
+        self._store(dst, value, size)
+        if deadline is not None:
+            self._expires[dst] = deadline
+            heapq.heappush(self._deadlines, (deadline, dst))
+        return True
+
+    def cmd_exists(self, *keys: Any) -> int:
+        return sum(self._lookup(_encode(key)) is not None for key in keys)
+
+    def cmd_expire(
+        self, key: Any, seconds: Any, nx: bool = False, xx: bool = False,
+        gt: bool = False, lt: bool = False
+    ) -> bool:
+        key = _encode(key)
+        if self._lookup(key) is None:
+            return False
+        seconds = seconds.total_seconds() if hasattr(seconds, 'total_seconds') else float(seconds)
+        current = self._expires.get(key)
+        remaining = None if current is None else current - time.monotonic()
+        if (nx and current is not None) or (xx and current is None):
+            return False
+        if gt and (remaining is None or seconds <= remaining):
+            return False
+        if lt and remaining is not None and seconds >= remaining:
+            return False
+        if seconds <= 0:
+            return self._remove(key)
+        self._set_deadline(key, seconds)
+        self._changed(key)
+        return True
+
+    def cmd_pexpire(self, key: Any, milliseconds: Any, **flags: bool) -> bool:
+        return self.cmd_expire(key, float(milliseconds) / 1000, **flags)
+
+    def cmd_persist(self, key: Any) -> bool:
+        key = _encode(key)
+        return self._lookup(key) is not None and self._expires.pop(key, None) is not None
+
+    def cmd_pttl(self, key: Any) -> int:
+        key = _encode(key)
+        if self._lookup(key) is None:
+            return -2
+        deadline = self._expires.get(key)
+        if deadline is None:
+            return -1
+        return max(0, int((deadline - time.monotonic()) * 1000))
+
+    def cmd_ttl(self, key: Any) -> int:
+        remaining = self.cmd_pttl(key)
+        return remaining if remaining < 0 else (remaining + 500) // 1000
+
+    def cmd_type(self, key: Any) -> bytes:
+        value = self._lookup(_encode(key))
+        if value is None:
+            return b"none"
+        return {bytes: b"string", set: b"set", dict: b"hash", SortedSet: b"zset"}[type(value)]
+
+    def cmd_keys(self, pattern: Any = "*") -> List[bytes]:
+        pattern = _encode(pattern).decode()
+        return [
+            key for key in list(self._data)
+            if fnmatchcase(key.decode(), pattern) and self._alive(key)
+        ]
+
+    def cmd_scan(
+        self, cursor: int = 0, match: Any = None, count: Optional[int] = None, _type: Any = None
+    ) -> Tuple[int, List[bytes]]:
+        """SCAN over a sorted snapshot of the keyspace.
+
+        The snapshot is taken once per iteration (at cursor 0), so a full
+        iteration sorts the keyspace once. The cursor packs the snapshot
+        id (high bits) and the position in it (low bits). Keys deleted
+        since the snapshot are skipped; keys added since may be missed,
+        as Redis allows. A cursor whose snapshot was dropped restarts
+        the iteration (keys may repeat, none are missed).
+        """
+        scan_id = int(cursor) >> SCAN_POSITION_BITS
+        position = int(cursor) & ((1 << SCAN_POSITION_BITS) - 1)
+        keys = self._scans.get(scan_id)
+        if keys is None:
+            scan_id, position, keys = next(self._scan_ids), 0, sorted(self._data)
+            self._scans[scan_id] = keys
+            while len(self._scans) > SCAN_SNAPSHOTS:
+                self._scans.popitem(last=False)
+
+        end = min(len(keys), position + (count or 10))
+        pattern = None if match is None else _encode(match).decode()
+        found = [
+            key for key in keys[position:end]
+            if (pattern is None or fnmatchcase(key.decode(), pattern)) and self._alive(key)
+        ]
+        if end >= len(keys):
+            self._scans.pop(scan_id, None)
+            return 0, found
+        return (scan_id << SCAN_POSITION_BITS) | end, found
+
+    # Strings ----------------------------------------------------------------
+
+    def cmd_get(self, key: Any) -> Optional[bytes]:
+        return self._lookup(_encode(key), bytes)
+
+    def cmd_set(
+        self, key: Any, value: Any, ex: Any = None, px: Any = None, nx: bool = False,
+        xx: bool = False, keepttl: bool = False, get: bool = False
+    ) -> Any:
+        key, value = _encode(key), _encode(value)
+        previous = self._lookup(key)
+        if get and previous is not None and not isinstance(previous, bytes):
+            raise redis.ResponseError(WRONGTYPE)
+        if (nx and previous is not None) or (xx and previous is None):
+            return previous if get else None
+        if ex is not None:
+            ttl = ex.total_seconds() if hasattr(ex, 'total_seconds') else float(ex)
+        elif px is not None:
+            ttl = (px.total_seconds() if hasattr(px, 'total_seconds') else float(px) / 1000)
+        else:
+            ttl = None
+        deadline = self._expires.get(key) if keepttl else None
+        self._store(key, value, len(key) + len(value) + KEY_OVERHEAD)
+        if keepttl and deadline is not None:
+            self._expires[key] = deadline
+        else:
+            self._expires.pop(key, None)
+            if ttl is not None:
+                self._set_deadline(key, ttl)
+        self._evict(key)
+        return previous if get else True
+
+    def cmd_mget(self, keys: Any, *args: Any) -> List[Optional[bytes]]:
+        keys = [keys] if isinstance(keys, (str, bytes)) else list(keys)
+        return [self._lookup_string(key) for key in keys + list(args)]
+
+    def _lookup_string(self, key: Any) -> Optional[bytes]:
+        value = self._lookup(_encode(key))
+        return value if isinstance(value, bytes) else None  # MGET returns nil for other types
+
+    def cmd_mset(self, mapping: Dict[Any, Any]) -> bool:
+        for key, value in mapping.items():
+            self.cmd_set(key, value)
+        return True
+
+    def cmd_incrby(self, key: Any, amount: int = 1) -> int:
+        key = _encode(key)
+        current = self._lookup(key, bytes)
+        try:
+            value = int(current or 0) + int(amount)
+        except ValueError:
+            raise redis.ResponseError("value is not an integer or out of range")
+        raw = str(value).encode()
+        self._store(key, raw, len(key) + len(raw) + KEY_OVERHEAD)  # keeps the TTL
+        return value
+
+    cmd_incr = cmd_incrby
+
+    def cmd_decrby(self, key: Any, amount: int = 1) -> int:
+        return self.cmd_incrby(key, -int(amount))
+
+    cmd_decr = cmd_decrby
+
+    # Sets -------------------------------------------------------------------
+
+    def cmd_sadd(self, key: Any, *members: Any) -> int:
+        key = _encode(key)
+        value = self._new_collection(key, set)
+        added = 0
+        for member in map(_encode, members):
+            if member not in value:
+                value.add(member)
+                self._touch(key, len(member) + MEMBER_OVERHEAD)
+                added += 1
+        self._evict(key)
+        return added
+
+    def cmd_srem(self, key: Any, *members: Any) -> int:
+        key = _encode(key)
+        value = self._lookup(key, set)
+        if value is None:
+            return 0
+        removed = 0
+        for member in map(_encode, members):
+            if member in value:
+                value.discard(member)
+                self._touch(key, -(len(member) + MEMBER_OVERHEAD))
+                removed += 1
+        self._drop_if_empty(key)
+        return removed
+
+    def cmd_smembers(self, key: Any) -> set:
+        return set(self._lookup(_encode(key), set) or ())
+
+    def cmd_sismember(self, key: Any, member: Any) -> bool:
+        return _encode(member) in (self._lookup(_encode(key), set) or ())
+
+    def cmd_scard(self, key: Any) -> int:
+        return len(self._lookup(_encode(key), set) or ())
+
+    def cmd_sunion(self, keys: Any, *args: Any) -> set:
+        keys = [keys] if isinstance(keys, (str, bytes)) else list(keys)
+        members: set = set()
+        for key in keys + list(args):
+            members |= self._lookup(_encode(key), set) or set()
+        return members
+
+    # Hashes -----------------------------------------------------------------
+
+    def cmd_hset(
+        self, key: Any, field: Any = None, value: Any = None,
+        mapping: Optional[Dict[Any, Any]] = None, items: Optional[list] = None
+    ) -> int:
+        pairs = dict(mapping or {})
+        if field is not None:
+            pairs[field] = value
+        for i in range(0, len(items or ()), 2):
+            pairs[items[i]] = items[i + 1]
+        key = _encode(key)
+        value_map = self._new_collection(key, dict)
+        added = 0
+        for field_name, field_value in pairs.items():
+            field_name, field_value = _encode(field_name), _encode(field_value)
+            previous = value_map.get(field_name)
+            delta = len(field_value) - (len(previous) if previous is not None else -len(field_name) - MEMBER_OVERHEAD)
+            added += previous is None
+            value_map[field_name] = field_value
+            self._touch(key, delta)
+        self._evict(key)
+        return added
+
+    def cmd_hget(self, key: Any, field: Any) -> Optional[bytes]:
+        return (self._lookup(_encode(key), dict) or {}).get(_encode(field))
+
+    def cmd_hgetall(self, key: Any) -> Dict[bytes, bytes]:
+        return dict(self._lookup(_encode(key), dict) or {})
+
+    def cmd_hdel(self, key: Any, *fields: Any) -> int:
+        key = _encode(key)
+        value_map = self._lookup(key, dict)
+        if value_map is None:
+            return 0
+        removed = 0
+        for field_name in map(_encode, fields):
+            previous = value_map.pop(field_name, None)
+            if previous is not None:
+                self._touch(key, -(len(field_name) + len(previous) + MEMBER_OVERHEAD))
+                removed += 1
+        self._drop_if_empty(key)
+        return removed
+
+    def cmd_hincrby(self, key: Any, field: Any, amount: int = 1) -> int:
+        current = self.cmd_hget(key, field)
+        try:
+            value = int(current or 0) + int(amount)
+        except ValueError:
+            raise redis.ResponseError("hash value is not an integer")
+        self.cmd_hset(key, field, value)
+        return value
+
+    # Sorted sets ------------------------------------------------------------
+
+    def cmd_zadd(
+        self, key: Any, mapping: Dict[Any, Any], nx: bool = False, xx: bool = False,
+        ch: bool = False, incr: bool = False, gt: bool = False, lt: bool = False
+    ) -> Any:
+        key = _encode(key)
+        value = self._new_collection(key, SortedSet)
+        added = changed = 0
+        result = None
+        for member, score in mapping.items():
+            member, score = _encode(member), float(score)
+            current = value.scores.get(member)
+            if (nx and current is not None) or (xx and current is None):
+                continue
+            if incr:
+                score += current or 0.0
+            if current is not None and ((gt and score <= current) or (lt and score >= current)):
+                continue
+            if current is None:
+                added += 1
+                self._touch(key, len(member) + MEMBER_OVERHEAD)
+            elif score != current:
+                changed += 1
+                self._changed(key)
+            value.scores[member] = result = score
+        self._drop_if_empty(key)
+        self._evict(key)
+        if incr:
+            return result
+        return added + changed if ch else added
+
+    def cmd_zincrby(self, key: Any, amount: float, member: Any) -> float:
+        return self.cmd_zadd(key, {member: amount}, incr=True)
+
+    def cmd_zscore(self, key: Any, member: Any) -> Optional[float]:
+        value = self._lookup(_encode(key), SortedSet)
+        return None if value is None else value.scores.get(_encode(member))
+
+    def cmd_zcard(self, key: Any) -> int:
+        return len(self._lookup(_encode(key), SortedSet) or ())
+
+    def cmd_zrem(self, key: Any, *members: Any) -> int:
+        key = _encode(key)
+        value = self._lookup(key, SortedSet)
+        if value is None:
+            return 0
+        removed = 0
+        for member in map(_encode, members):
+            if value.scores.pop(member, None) is not None:
+                self._touch(key, -(len(member) + MEMBER_OVERHEAD))
+                removed += 1
+        self._drop_if_empty(key)
+        return removed
+
+    def cmd_zrange(
+        self, key: Any, start: int, end: int, desc: bool = False,
+        withscores: bool = False, score_cast_func: Callable = float
+    ) -> List[Any]:
+        value = self._lookup(_encode(key), SortedSet)
+        if value is None:
+            return []
+        ranked = value.ranked(desc)[_rank_slice(len(value), int(start), int(end))]
+        if withscores:
+            return [(member, score_cast_func(score)) for member, score in ranked]
+        return [member for member, _ in ranked]
+
+    def cmd_zrevrange(
+        self, key: Any, start: int, end: int, withscores: bool = False,
+        score_cast_func: Callable = float
+    ) -> List[Any]:
+        return self.cmd_zrange(key, start, end, True, withscores, score_cast_func)
+
+    def cmd_zremrangebyrank(self, key: Any, start: int, end: int) -> int:
+        key = _encode(key)
+        value = self._lookup(key, SortedSet)
+        if value is None:
+            return 0
+        doomed = [member for member, _ in value.ranked()[_rank_slice(len(value), int(start), int(end))]]
+        return self.cmd_zrem(key, *doomed) if doomed else 0
+
+    # Pub/sub ----------------------------------------------------------------
+
+    def cmd_publish(self, channel: Any, message: Any) -> int:
+        channel, message = _encode(channel), _encode(message)
+        subscribers = list(self._channels.get(channel, ()))
+        for subscriber in subscribers:
+            subscriber.deliver(channel, message)
+        return len(subscribers)
+
+    def subscribe(self, subscriber: "MemoryPubSub", channel: bytes) -> None:
+        """Register a subscriber on a channel."""
+        with self.lock:
+            self._channels.setdefault(channel, set()).add(subscriber)
+
+    def unsubscribe(self, subscriber: "MemoryPubSub", channel: bytes) -> None:
+        """Remove a subscriber from a channel."""
+        with self.lock:
+            subscribers = self._channels.get(channel)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._channels[channel]
+
+
+# Stores shared per memory:// URL (name), like one server per address
+_stores: Dict[str, MemoryStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(url: str) -> MemoryStore:
+    """Get (creating on first use) the shared store of a memory:// URL.
+
+    ``memory://<name>?maxmemory=<bytes>``: the name selects the store
+    (default ""); maxmemory applies when the store is created.
+    """
+    parsed = urlparse(url)
+    name = parsed.netloc + parsed.path
+    with _stores_lock:
+        store = _stores.get(name)
+        if store is None:
+            max_memory = int(parse_qs(parsed.query).get('maxmemory', ['0'])[0])
+            store = _stores[name] = MemoryStore(max_memory=max_memory)
+        return store
+
+
+# ============================================================================
+# Clients
+# ============================================================================
+
+class MemoryRedis:
+    """redis.Redis look-alike bound to a MemoryStore.
+
+    Any supported command is available as a method with redis-py's
+    signature; replies are decoded to str with decode_responses=True.
+    """
+
+    def __init__(self, store: MemoryStore, decode_responses: bool = False):
+        """Initialize MemoryRedis.
+
+        Args:
+            store: Shared keyspace
+            decode_responses: Return str instead of bytes
+        """
+        self.store = store
+        self.decode_responses = decode_responses
+
+    @classmethod
+    def from_url(cls, url: str, decode_responses: bool = False, **kwargs: Any) -> "MemoryRedis":
+        """Open a client on the shared store of a memory:// URL."""
+        return cls(get_store(url), decode_responses=decode_responses)
+
+    def _reply(self, value: Any) -> Any:
+        return _decode(value) if self.decode_responses else value
+
+    def execute_command(self, command: str, *args: Any, **kwargs: Any) -> Any:
+        """Run a command by name (lower case, redis-py method name)."""
+        return self._reply(self.store.execute(command, *args, **kwargs))
+
+    def __getattr__(self, command: str) -> Callable[..., Any]:
+        if command.startswith('_'):
+            raise AttributeError(command)
+        return lambda *args, **kwargs: self.execute_command(command, *args, **kwargs)
+
+    def scan_iter(self, match: Any = None, count: Optional[int] = None, _type: Any = None) -> Iterator[Any]:
+        """Iterate over matching keys page by page with SCAN."""
+        cursor = None
+        while cursor != 0:
+            cursor, keys = self.execute_command('scan', cursor or 0, match=match, count=count)
+            yield from keys
+
+    def pipeline(self, transaction: bool = True, shard_hint: Any = None) -> "MemoryPipeline":
+        """Create a pipeline (always executed atomically)."""
+        return MemoryPipeline(self)
+
+    def pubsub(self, ignore_subscribe_messages: bool = False, **kwargs: Any) -> "MemoryPubSub":
+        """Create a pub/sub subscriber."""
+        return MemoryPubSub(self, ignore_subscribe_messages)
+
+    def close(self) -> None:
+        """No connections to release."""
+
+
+class MemoryPipeline:
+    """Buffered commands executed atomically, with WATCH/MULTI support.
+
+    After watch() commands run immediately until multi(); execute()
+    raises redis.WatchError if a watched key changed in between.
+    """
+
+    def __init__(self, client: MemoryRedis):
+        self.client = client
+        self.commands: List[Tuple[str, tuple, dict]] = []
+        self.watching: Optional[Tuple[List[bytes], Tuple[int, List[int]]]] = None
+        self.explicit_transaction = False
+
+    def __enter__(self) -> "MemoryPipeline":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.reset()
+
+    def __len__(self) -> int:
+        return len(self.commands)
+
+    def watch(self, *keys: Any) -> bool:
+        self.unwatch()
+        encoded = [_encode(key) for key in keys]
+        self.client.store.watch(encoded)
+        self.watching = (encoded, self.client.store.versions(encoded))
+        return True
+
+    def unwatch(self) -> bool:
+        if self.watching is not None:
+            self.client.store.unwatch(self.watching[0])
+            self.watching = None
+        return True
+
+    def multi(self) -> None:
+        self.explicit_transaction = True
+
+    def reset(self) -> None:
+        self.commands = []
+        self.unwatch()
+        self.explicit_transaction = False
+
+    def __getattr__(self, command: str) -> Callable[..., Any]:
+        if command.startswith('_'):
+            raise AttributeError(command)
+
+        def queue_command(*args: Any, **kwargs: Any) -> Any:
+            if self.watching is not None and not self.explicit_transaction:
+                return self.client.execute_command(command, *args, **kwargs)
+            self.commands.append((command, args, kwargs))
+            return self
+        return queue_command
+
+    def execute(self, raise_on_error: bool = True) -> List[Any]:
+        """Run the queued commands atomically and return their replies."""
+        store = self.client.store
+        try:
+            with store.lock:
+                if self.watching is not None:
+                    keys, versions = self.watching
+                    if store.versions(keys) != versions:
+                        raise redis.WatchError("Watched variable changed.")
+                results = []
+                for command, args, kwargs in self.commands:
+                    try:
+                        results.append(self.client.execute_command(command, *args, **kwargs))
+                    except redis.ResponseError as e:
+                        results.append(e)
+        finally:
+            self.reset()
+        if raise_on_error:
+            for result in results:
+                if isinstance(result, Exception):
+                    raise result
+        return results
+
+
+class MemoryPubSub:
+    """Pub/sub subscriber with redis-py's get_message/run_in_thread API."""
+
+    def __init__(self, client: MemoryRedis, ignore_subscribe_messages: bool = False):
+        self.client = client
+        self.ignore_subscribe_messages = ignore_subscribe_messages
+        self.channels: Dict[bytes, Optional[Callable[[Dict[str, Any]], None]]] = {}
+        self._messages: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+
+    def _message(self, kind: str, channel: bytes, data: Any) -> Dict[str, Any]:
+        return self.client._reply({'type': kind, 'pattern': None, 'channel': channel, 'data': data})
+
+    def deliver(self, channel: bytes, data: bytes) -> None:
+        """Queue a published message (called by the store)."""
+        self._messages.put(self._message('message', channel, data))
+
+    def subscribe(self, *channels: Any, **handlers: Callable[[Dict[str, Any]], None]) -> None:
+        subscriptions = {_encode(channel): None for channel in channels}
+        subscriptions.update({_encode(channel): handler for channel, handler in handlers.items()})
+        for channel, handler in subscriptions.items():
+            self.channels[channel] = handler
+            self.client.store.subscribe(self, channel)
+            self._messages.put(self._message('subscribe', channel, len(self.channels)))
+
+    def unsubscribe(self, *channels: Any) -> None:
+        for channel in [_encode(c) for c in channels] or list(self.channels):
+            self.channels.pop(channel, None)
+            self.client.store.unsubscribe(self, channel)
+
+    @property
+    def subscribed(self) -> bool:
+        return bool(self.channels)
+
+    def get_message(self, ignore_subscribe_messages: bool = False, timeout: float = 0.0) -> Optional[Dict[str, Any]]:
+        """Get the next message (None if none arrived within timeout).
+
+        Messages of channels subscribed with a handler are passed to
+        the handler instead of being returned.
+        """
+        try:
+            message = self._messages.get(timeout=timeout) if timeout else self._messages.get_nowait()
+        except queue.Empty:
+            return None
+        if message['type'] != 'message':
+            if ignore_subscribe_messages or self.ignore_subscribe_messages:
+                return None
+            return message
+        handler = self.channels.get(_encode(message['channel']))
+        if handler is not None:
+            handler(message)
+            return None
+        return message
+
+    def listen(self) -> Iterator[Dict[str, Any]]:
+        while self.subscribed:
+            message = self.get_message(timeout=1.0)
+            if message is not None:
+                yield message
+
+    def run_in_thread(
+        self, sleep_time: float = 0.0, daemon: bool = False,
+        exception_handler: Optional[Callable] = None
+    ) -> "MemoryPubSubWorker":
+        """Dispatch messages to handlers from a background thread."""
+        worker = MemoryPubSubWorker(self, sleep_time or 0.1, daemon)
+        worker.start()
+        return worker
+
+    def close(self) -> None:
+        self.unsubscribe()
+
+    reset = close
+
+
+class MemoryPubSubWorker(threading.Thread):
+    """Background dispatcher of a MemoryPubSub (like PubSubWorkerThread)."""
+
+    def __init__(self, pubsub: MemoryPubSub, sleep_time: float, daemon: bool):
+        super().__init__(daemon=daemon)
+        self.pubsub = pubsub
+        self.sleep_time = sleep_time
+        self._running = threading.Event()
+
+    def run(self) -> None:
+        self._running.set()
+        while self._running.is_set():
+            self.pubsub.get_message(ignore_subscribe_messages=True, timeout=self.sleep_time)
+        self.pubsub.close()
+
+    def stop(self) -> None:
+        self._running.clear()
+
+
+# ============================================================================
+# Async clients
+# ============================================================================
+
+class AsyncMemoryRedis:
+    """redis.asyncio.Redis look-alike bound to a MemoryStore.
+
+    Commands are coroutines; the store is in-process so they never
+    block on I/O. Only publishing is supported for pub/sub.
+    """
+
+    def __init__(self, store: MemoryStore, decode_responses: bool = False):
+        self.sync = MemoryRedis(store, decode_responses)
+
+    @classmethod
+    def from_url(cls, url: str, decode_responses: bool = False, **kwargs: Any) -> "AsyncMemoryRedis":
+        """Open a client on the shared store of a memory:// URL."""
+        return cls(get_store(url), decode_responses=decode_responses)
+
+    async def execute_command(self, command: str, *args: Any, **kwargs: Any) -> Any:
+        return self.sync.execute_command(command, *args, **kwargs)
+
+    def __getattr__(self, command: str) -> Callable[..., Any]:
+        if command.startswith('_'):
+            raise AttributeError(command)
+        return lambda *args, **kwargs: self.execute_command(command, *args, **kwargs)
+
+    async def scan_iter(self, match: Any = None, count: Optional[int] = None, _type: Any = None):
+        for key in self.sync.scan_iter(match=match, count=count):
+            yield key
+
+    def pipeline(self, transaction: bool = True, shard_hint: Any = None) -> "AsyncMemoryPipeline":
+        return AsyncMemoryPipeline(self.sync.pipeline(transaction))
+
+    async def aclose(self) -> None:
+        """No connections to release."""
+
+    close = aclose
+
+
+class AsyncMemoryPipeline:
+    """Async MemoryPipeline: buffered commands return the pipeline,
+    immediate (WATCHed) commands, execute and watch are awaitable."""
+
+    def __init__(self, pipeline: MemoryPipeline):
+        self.pipeline = pipeline
+
+    async def __aenter__(self) -> "AsyncMemoryPipeline":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.pipeline.reset()
+
+    def __len__(self) -> int:
+        return len(self.pipeline)
+
+    async def watch(self, *keys: Any) -> bool:
+        return self.pipeline.watch(*keys)
+
+    async def unwatch(self) -> bool:
+        return self.pipeline.unwatch()
+
+    def multi(self) -> None:
+        self.pipeline.multi()
+
+    async def reset(self) -> None:
+        self.pipeline.reset()
+
+    async def execute(self, raise_on_error: bool = True) -> List[Any]:
+        return self.pipeline.execute(raise_on_error)
+
+    def __getattr__(self, command: str) -> Callable[..., Any]:
+        if command.startswith('_'):
+            raise AttributeError(command)
+        queue_command = getattr(self.pipeline, command)
+
+        def call(*args: Any, **kwargs: Any) -> Any:
+            if self.pipeline.watching is not None and not self.pipeline.explicit_transaction:
+                async def immediate() -> Any:
+                    return queue_command(*args, **kwargs)
+                return immediate()
+            queue_command(*args, **kwargs)
+            return self
+        return call
@@ -0,0 +1,325 @@
+# Cache Metrics for AURORA Trading System
+"""
+Lightweight in-process cache instrumentation.
+Per key-prefix hit/miss and error counters plus latency and value-size
+histograms, exported as JSON or Prometheus text. Domain events only
+carry periodic aggregated summaries.
+"""
+
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import threading
+import time
+
+
+# Latency buckets in seconds (upper bounds)
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+# Serialized value size buckets in bytes (upper bounds)
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+# Prefix reported for keys without a ":" (keeps the label set bounded)
+UNPREFIXED = "other"
+
+
+def key_prefix(key: str) -> str:
+    """Get the metrics prefix of a cache key.
+
+    ``cache:<prefix>:<hash>`` keys (from @cache) report their function
+    prefix; other keys report their first segment, and keys without a
+    segment separator are counted under UNPREFIXED.
+    """
+    parts = key.split(":", 2)
+    if len(parts) == 1:
+        return UNPREFIXED
+    if parts[0] == "cache" and len(parts) > 2:
+        return parts[1]
+    return parts[0]
+
+
+class Histogram:
+    """Fixed-bucket histogram (cumulative on export, like Prometheus)."""
+
+    __slots__ = ('buckets', 'counts', 'count', 'sum')
+
+    def __init__(self, buckets: Sequence[float]):
+        """Initialize an empty histogram with the given upper bounds."""
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last = +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record one observation."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Export cumulative bucket counts, count and sum."""
+        cumulative, running = {}, 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            running += count
+            cumulative['+Inf' if bound == float('inf') else repr(bound)] = running
+        return {'buckets': cumulative, 'count': self.count, 'sum': self.sum}
+
+
+class _PrefixMetrics:
+    """Counters and histograms of one key prefix."""
+
+    __slots__ = ('hits', 'misses', 'local_hits', 'sets', 'errors',
+                 'get_latency', 'set_latency', 'value_size')
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.local_hits = 0
+        self.sets = 0
+        self.errors: Dict[str, int] = {}
+        self.get_latency = Histogram(LATENCY_BUCKETS)
+        self.set_latency = Histogram(LATENCY_BUCKETS)
+        self.value_size = Histogram(SIZE_BUCKETS)
+
+
+class CacheMetrics:
+    """Thread-safe registry of cache metrics per key prefix.
+
+    Recording is a dict lookup plus a few integer updates under a lock,
+    cheap enough for every cache operation.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._lock = threading.Lock()
+        self._prefixes: Dict[str, _PrefixMetrics] = {}
+        self._last_summary: Dict[str, Dict[str, int]] = {}
+
+    def _get(self, key: str) -> _PrefixMetrics:
+        prefix = key_prefix(key)
+        metrics = self._prefixes.get(prefix)
+        if metrics is None:
+            metrics = self._prefixes.setdefault(prefix, _PrefixMetrics())
+        return metrics
+
+    # ========================================================================
+    # Recording
+    # ========================================================================
+
+    def record_get(self, key: str, hit: bool, seconds: float, size: Optional[int] = None) -> None:
+        """Record a Redis lookup (size = serialized bytes on hit)."""
+        with self._lock:
+            metrics = self._get(key)
+            if hit:
+                metrics.hits += 1
+            else:
+                metrics.misses += 1
+            metrics.get_latency.observe(seconds)
+            if size is not None:
+                metrics.value_size.observe(size)
+
+    def record_get_many(self, keys: Sequence[str], hits: Dict[str, int], seconds: float) -> None:
+        """Record a batched lookup (hits maps found keys to their size)."""
+        with self._lock:
+            seen = set()
+            for key in keys:
+                metrics = self._get(key)
+                if key in hits:
+                    metrics.hits += 1
+                    metrics.value_size.observe(hits[key])
+                else:
+                    metrics.misses += 1
+                prefix = key_prefix(key)
+                if prefix not in seen:
+                    seen.add(prefix)
+                    metrics.get_latency.observe(seconds)
+
+    def record_set(self, key: str, size: int, seconds: float) -> None:
+        """Record a store of size serialized bytes."""
+        with self._lock:
+            metrics = self._get(key)
+            metrics.sets += 1
+            metrics.set_latency.observe(seconds)
+            metrics.value_size.observe(size)
+
+    def record_local_hit(self, key: str) -> None:
+        """Record a hit served by the in-process L1 tier."""
+        with self._lock:
+            self._get(key).local_hits += 1
+
+    def record_error(self, key: str, operation: str) -> None:
+        """Record a failed Redis operation."""
+        with self._lock:
+            errors = self._get(key).errors
+            errors[operation] = errors.get(operation, 0) + 1
+
+    def timer(self) -> Callable[[], float]:
+        """Start a timer; calling the result returns elapsed seconds."""
+        start = time.perf_counter()
+        return lambda: time.perf_counter() - start
+
+    # ========================================================================
+    # Export
+    # ========================================================================
+
+    def totals(self) -> Dict[str, int]:
+        """Get hit/miss totals across all prefixes."""
+        with self._lock:
+            return {
+                'hits': sum(m.hits for m in self._prefixes.values()),
+                'misses': sum(m.misses for m in self._prefixes.values()),
+                'local_hits': sum(m.local_hits for m in self._prefixes.values()),
+            }
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Export all metrics per prefix."""
+        with self._lock:
+            result = {}
+            for prefix, m in sorted(self._prefixes.items()):
+                lookups = m.hits + m.misses
+                result[prefix] = {
+                    'hits': m.hits,
+                    'misses': m.misses,
+                    'hit_ratio': m.hits / lookups if lookups else 0.0,
+                    'local_hits': m.local_hits,
+                    'sets': m.sets,
+                    'errors': dict(m.errors),
+                    'get_latency_seconds': m.get_latency.snapshot(),
+                    'set_latency_seconds': m.set_latency.snapshot(),
+                    'value_size_bytes': m.value_size.snapshot(),
+                }
+            return result
+
+    def render_prometheus(self) -> str:
+        """Export all metrics in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines: List[str] = []
+
+        counters = (
+            ('aurora_cache_hits_total', 'hits', 'Redis cache hits'),
+            ('aurora_cache_misses_total', 'misses', 'Redis cache misses'),
+            ('aurora_cache_local_hits_total', 'local_hits', 'In-process L1 cache hits'),
+            ('aurora_cache_sets_total', 'sets', 'Values stored in Redis'),
+        )
+        for name, field, help_text in counters:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            lines += [f'{name}{{prefix="{p}"}} {m[field]}' for p, m in snapshot.items()]
+
+        lines += ["# HELP aurora_cache_errors_total Failed Redis operations",
+                  "# TYPE aurora_cache_errors_total counter"]
+        for prefix, m in snapshot.items():
+            for operation, count in sorted(m['errors'].items()):
+                lines.append(f'aurora_cache_errors_total{{prefix="{prefix}",operation="{operation}"}} {count}')
+
+        histograms = (
+            ('aurora_cache_get_latency_seconds', 'get_latency_seconds', 'Redis lookup latency'),
+            ('aurora_cache_set_latency_seconds', 'set_latency_seconds', 'Redis store latency'),
+            ('aurora_cache_value_size_bytes', 'value_size_bytes', 'Serialized value size'),
+        )
+        for name, field, help_text in histograms:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for prefix, m in snapshot.items():
+                histogram = m[field]
+                for bound, count in histogram['buckets'].items():
+                    lines.append(f'{name}_bucket{{prefix="{prefix}",le="{bound}"}} {count}')
+                lines.append(f'{name}_sum{{prefix="{prefix}"}} {histogram["sum"]}')
+                lines.append(f'{name}_count{{prefix="{prefix}"}} {histogram["count"]}')
+
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        """Get per-prefix counter deltas since the previous summary.
+
+        Returns:
+            Dictionary of prefixes with activity since the last call
+        """
+        with self._lock:
+            current = {
+                prefix: {
+                    'hits': m.hits,
+                    'misses': m.misses,
+                    'local_hits': m.local_hits,
+                    'sets': m.sets,
+                    'errors': sum(m.errors.values()),
+                }
+                for prefix, m in self._prefixes.items()
+            }
+            previous, self._last_summary = self._last_summary, current
+
+        deltas = {}
+        for prefix, counters in current.items():
+            before = previous.get(prefix, {})
+            delta = {name: value - before.get(name, 0) for name, value in counters.items()}
+            if any(delta.values()):
+                deltas[prefix] = delta
+        return deltas
+
+    def reset(self) -> None:
+        """Drop all metrics (tests and benchmarks)."""
+        with self._lock:
+            self._prefixes.clear()
+            self._last_summary = {}
+
+
+class CacheMetricsReporter:
+    """Periodically appends aggregated cache metrics as a domain event.
+
+    Per-request signals stay in process; the event store only receives
+    one CACHE_METRICS event per interval with per-prefix counter deltas.
+    """
+
+    def __init__(self, metrics: CacheMetrics, append: Callable[[Any], Any], interval: float = 300.0):
+        """Initialize CacheMetricsReporter.
+
+        Args:
+            metrics: Metrics registry to summarize
+            append: Callable persisting an event (e.g. event_store.append)
+            interval: Seconds between summaries
+        """
+        self.metrics = metrics
+        self.append = append
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def report(self) -> Optional[Any]:
+        """Append one summary event if there was any cache activity.
+
+        Returns:
+            The appended event, or None
+        """
+        from src.events.event_models import CacheEvent, EventType
+
+        deltas = self.metrics.summary()
+        if not deltas:
+            return None
+        event = CacheEvent(
+            event_type=EventType.CACHE_METRICS,
+            aggregate_id="cache:metrics",
+            data={'interval_seconds': self.interval, 'prefixes': deltas}
+        )
+        self.append(event)
+        return event
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.report()
+            except Exception as e:
+                print(f"❌ Cache metrics summary failed: {e}")
+
+    def start(self) -> None:
+        """Start the background reporting thread (idempotent)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background reporting thread."""
+        self._stop.set()
+        self._thread = None
+
+
+# Global registry
+cache_metrics = CacheMetrics()
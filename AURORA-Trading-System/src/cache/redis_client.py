@@ -1,17 +1,322 @@
 # Redis Client for AURORA Trading System
 """
 Redis client wrapper providing connection pooling and basic operations.
-Handles JSON serialization for cache values.
+Handles serialization of cache values through pluggable codecs.
 """
 
 import redis
-from typing import Any, Optional
-import json
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Union
 import os
 
+from .codecs import ValueCodec
+from .memory_backend import MemoryRedis, is_memory_url
+from .metrics import cache_metrics
+from .sharding import DEFAULT_VIRTUAL_NODES, HashRing, NodeHealth, NodeUnavailable, ShardedRedis, node_urls
+
+
+# Redis URL - local connection by default
+# Format: redis://host:port/db, or memory://[name] for the in-process
+# backend (also selected with CACHE_BACKEND=memory); a comma-separated
+# list of URLs shards the cache over several nodes
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+if os.getenv("CACHE_BACKEND", "redis") == "memory" and not is_memory_url(REDIS_URL):
+    REDIS_URL = os.getenv("CACHE_MEMORY_URL", "memory://")
+
 
 class RedisClient:
     """Redis client wrapper for AURORA cache layer.
-    
+
     Provides connection pooling, automatic serialization,
-    and high-level cache operations.
\ No newline at end of file
+    and high-level cache operations.
+
+    Cached values go through ``binary`` (raw bytes with a codec header,
+    see codecs.py); ``client`` decodes responses to str for raw commands
+    on keys, sets and counters.
+
+    With a ``memory://`` URL both are in-process MemoryRedis clients on
+    a shared store (see memory_backend.py) and no server is needed.
+
+    With several comma-separated URLs both are ShardedRedis clients
+    (see sharding.py): keys are spread over the nodes by consistent
+    hashing, multi-key operations are pipelined per node in parallel
+    and keys of an unreachable node read as misses.
+
+    Attributes:
+        url: Redis connection URL(s)
+        nodes: Node URLs
+        pool: Shared connection pool (str responses, None in memory or
+            when sharded)
+        client: Underlying redis-py client (for raw commands)
+        binary: redis-py client returning bytes (for cached values)
+        codec: ValueCodec used to encode values
+    """
+
+    MULTI_KEY_CHUNK = 1000  # keys per MGET/pipeline round trip
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        max_connections: int = 50,
+        codec: Optional[ValueCodec] = None,
+        virtual_nodes: int = DEFAULT_VIRTUAL_NODES
+    ):
+        """Initialize RedisClient with connection pools.
+
+        Args:
+            url: Redis URL, or comma-separated node URLs (defaults to
+                REDIS_URL environment variable)
+            max_connections: Maximum connections kept in each pool
+            codec: Value codec (defaults to ValueCodec.from_env())
+            virtual_nodes: Ring points per node when sharded
+        """
+        self.url = url or REDIS_URL
+        self.codec = codec or ValueCodec.from_env()
+        self.nodes = node_urls(self.url)
+        if len(self.nodes) > 1:
+            self.pool = self.binary_pool = None
+            ring = HashRing(self.nodes, virtual_nodes)
+            health = NodeHealth(self.nodes)
+            self.client, self.binary = (
+                ShardedRedis([self._connect(node, max_connections, decode) for node in self.nodes], ring, health)
+                for decode in (True, False)
+            )
+            return
+        if is_memory_url(self.url):
+            self.pool = self.binary_pool = None
+            self.client = MemoryRedis.from_url(self.url, decode_responses=True)
+            self.binary = MemoryRedis.from_url(self.url, decode_responses=False)
+            return
+        self.pool = redis.ConnectionPool.from_url(
+            self.url,
+            max_connections=max_connections,
+            decode_responses=True
+        )
+        self.client = redis.Redis(connection_pool=self.pool)
+        self.binary_pool = redis.ConnectionPool.from_url(
+            self.url,
+            max_connections=max_connections,
+            decode_responses=False
+        )
+        self.binary = redis.Redis(connection_pool=self.binary_pool)
+
+    @staticmethod
+    def _connect(url: str, max_connections: int, decode_responses: bool) -> Any:
+        """Open a client on one node."""
+        if is_memory_url(url):
+            return MemoryRedis.from_url(url, decode_responses=decode_responses)
+        return redis.Redis(connection_pool=redis.ConnectionPool.from_url(
+            url, max_connections=max_connections, decode_responses=decode_responses
+        ))
+
+    def serialize(self, value: Any) -> bytes:
+        """Serialize a Python value for storage in Redis."""
+        return self.codec.encode(value)
+
+    def deserialize(self, raw: Optional[bytes]) -> Optional[Any]:
+        """Deserialize a value read from Redis (any codec)."""
+        return self.codec.decode(raw)
+
+    def ping(self) -> bool:
+        """Check Redis connectivity.
+
+        Returns:
+            bool: True if server answered PING
+        """
+        return self.client.ping()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a value from cache.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Deserialized value or None if missing
+        """
+        elapsed = cache_metrics.timer()
+        try:
+            raw = self.binary.get(key)
+            cache_metrics.record_get(key, raw is not None, elapsed(), None if raw is None else len(raw))
+            return self.deserialize(raw)
+        except NodeUnavailable:
+            cache_metrics.record_get(key, False, elapsed())
+            return None
+        except Exception as e:
+            cache_metrics.record_error(key, 'get')
+            print(f"❌ Redis GET error ({key}): {e}")
+            return None
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+        """Set a value in cache.
+
+        Args:
+            key: Cache key
+            value: Value to cache (serializable by the codec)
+            ttl: Time to live in seconds (None = no expiry)
+
+        Returns:
+            bool: True if successful
+        """
+        elapsed = cache_metrics.timer()
+        try:
+            raw = self.serialize(value)
+            stored = bool(self.binary.set(key, raw, ex=ttl))
+            cache_metrics.record_set(key, len(raw), elapsed())
+            return stored
+        except NodeUnavailable:
+            return False
+        except Exception as e:
+            cache_metrics.record_error(key, 'set')
+            print(f"❌ Redis SET error ({key}): {e}")
+            return False
+
+    def delete(self, key: str) -> bool:
+        """Delete a key from cache.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            bool: True if key existed and was deleted
+        """
+        try:
+            return self.client.delete(key) > 0
+        except NodeUnavailable:
+            return False
+        except Exception as e:
+            print(f"❌ Redis DELETE error ({key}): {e}")
+            return False
+
+    def exists(self, key: str) -> bool:
+        """Check if a key exists in cache.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            bool: True if key exists
+        """
+        try:
+            return self.client.exists(key) > 0
+        except NodeUnavailable:
+            return False
+        except Exception as e:
+            print(f"❌ Redis EXISTS error ({key}): {e}")
+            return False
+
+    @staticmethod
+    def _chunks(items: List[Any], size: int) -> Iterable[List[Any]]:
+        """Split a list into consecutive chunks."""
+        for start in range(0, len(items), size):
+            yield items[start:start + size]
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Get several values with one MGET per chunk of keys.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Dictionary of deserialized values for the keys found
+            (missing keys are omitted)
+        """
+        keys = list(dict.fromkeys(keys))
+        values: Dict[str, Any] = {}
+        try:
+            for chunk in self._chunks(keys, self.MULTI_KEY_CHUNK):
+                elapsed = cache_metrics.timer()
+                sizes = {}
+                for key, raw in zip(chunk, self.binary.mget(chunk)):
+                    if raw is not None:
+                        sizes[key] = len(raw)
+                        values[key] = self.deserialize(raw)
+                cache_metrics.record_get_many(chunk, sizes, elapsed())
+        except Exception as e:
+            for key in keys:
+                if key not in values:
+                    cache_metrics.record_error(key, 'get')
+            print(f"❌ Redis MGET error ({len(keys)} keys): {e}")
+        return values
+
+    def set_many(
+        self,
+        items: Mapping[str, Any],
+        ttl: Union[int, Mapping[str, int], None] = None
+    ) -> bool:
+        """Set several values, pipelined per chunk of keys.
+
+        Args:
+            items: Mapping of cache key to value
+            ttl: Time to live in seconds for all keys, or a mapping of
+                per-key TTLs (None / missing key = no expiry)
+
+        Returns:
+            bool: True if all values were stored
+        """
+        keys = list(items)
+        stored = True
+        try:
+            for chunk in self._chunks(keys, self.MULTI_KEY_CHUNK):
+                elapsed = cache_metrics.timer()
+                encoded = {key: self.serialize(items[key]) for key in chunk}
+                if ttl is None:
+                    stored = bool(self.binary.mset(encoded)) and stored
+                else:
+                    pipe = self.binary.pipeline(transaction=False)
+                    for key, raw in encoded.items():
+                        key_ttl = ttl.get(key) if isinstance(ttl, Mapping) else ttl
+                        pipe.set(key, raw, ex=key_ttl)
+                    # Replies of an unreachable shard are NodeUnavailable errors
+                    replies = pipe.execute(raise_on_error=False)
+                    stored = not any(isinstance(reply, Exception) for reply in replies) and stored
+                seconds = elapsed()
+                for key, raw in encoded.items():
+                    cache_metrics.record_set(key, len(raw), seconds)
+            return stored
+        except Exception as e:
+            for key in keys:
+                cache_metrics.record_error(key, 'set')
+            print(f"❌ Redis SET_MANY error ({len(keys)} keys): {e}")
+            return False
+
+    def exists_many(self, keys: Iterable[str]) -> Dict[str, bool]:
+        """Check several keys, pipelined per chunk of keys.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Dictionary mapping each key to whether it exists
+        """
+        keys = list(dict.fromkeys(keys))
+        found = dict.fromkeys(keys, False)
+        try:
+            for chunk in self._chunks(keys, self.MULTI_KEY_CHUNK):
+                pipe = self.client.pipeline(transaction=False)
+                for key in chunk:
+                    pipe.exists(key)
+                for key, count in zip(chunk, pipe.execute(raise_on_error=False)):
+                    found[key] = isinstance(count, int) and count > 0
+        except Exception as e:
+            print(f"❌ Redis EXISTS_MANY error ({len(keys)} keys): {e}")
+        return found
+
+    def flush(self) -> bool:
+        """Remove all keys from the current database of every node (DANGEROUS).
+
+        Returns:
+            bool: True if successful
+        """
+        try:
+            return bool(self.client.flushdb())
+        except Exception as e:
+            print(f"❌ Redis FLUSH error: {e}")
+            return False
+
+
+# Global instance
+try:
+    redis_client = RedisClient()
+except Exception as e:
+    print(f"❌ Redis client unavailable: {e}")
+    redis_client = None
@@ -0,0 +1,599 @@
+# Sharded Redis for AURORA Trading System
+"""
+Client-side sharding of the cache over several Redis nodes.
+
+Keys are placed on a consistent-hash ring with virtual nodes, so adding
+or removing a node only moves about 1/N of the keys; ``{tag}`` hash tags
+are honoured like in Redis Cluster. ShardedRedis mimics the redis-py
+client surface used by the cache layer:
+
+- single-key commands go to the key's node
+- multi-key commands (MGET, DEL, EXISTS, SUNION, MSET) and pipelines
+  are split per node and sent in parallel, replies merged in call order
+- FLUSHDB, KEYS/SCAN, DBSIZE and PING fan out to every node
+- pub/sub (the L1 invalidation bus) is pinned to the first node
+
+A node failing with a connection error is marked down for a few
+seconds: commands on its keys fail fast with NodeUnavailable and
+multi-key reads treat its keys as missing, so losing a node degrades to
+cache misses. Pipelines run one transaction per node (MULTI/EXEC is
+atomic per node only) and WATCH needs all watched keys on one node.
+
+Pub/sub does not fail over: publishers and subscribers must agree on a
+node, and moving them independently would split the bus. While the
+first node is down invalidations are not broadcast, so other workers
+serve their L1 copies until the L1 TTL (CACHE_L1_TTL) expires them;
+listeners resubscribe when the node is back. Keep the L1 TTL short when
+running several nodes, or list the most reliable node first.
+"""
+
+from bisect import bisect
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import asyncio
+import hashlib
+import threading
+import time
+
+import redis
+
+
+DEFAULT_VIRTUAL_NODES = 160  # ring points per node
+NODE_RETRY_SECONDS = 5.0  # how long a failed node is skipped
+
+# Errors meaning "node unreachable" (as opposed to command errors)
+NODE_ERRORS = (redis.ConnectionError, redis.TimeoutError, OSError)
+
+# Reply placeholder of a node that could not be reached
+_FAILED = object()
+
+# (node index, command, args, kwargs)
+Call = Tuple[int, str, tuple, dict]
+
+
+class NodeUnavailable(redis.ConnectionError):
+    """A command targeted a node that is down."""
+
+
+def node_urls(url: str) -> List[str]:
+    """Split a comma-separated list of node URLs."""
+    return [part.strip() for part in url.split(",") if part.strip()]
+
+
+def _hash(data: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'big')
+
+
+def _hash_key(key: Any) -> bytes:
+    """Bytes of a key that decide its node (the ``{tag}`` if present)."""
+    data = key if isinstance(key, bytes) else str(key).encode()
+    start = data.find(b'{')
+    if start != -1:
+        end = data.find(b'}', start + 1)
+        if end > start + 1:
+            return data[start + 1:end]
+    return data
+
+
+class HashRing:
+    """Consistent-hash ring with virtual nodes."""
+
+    def __init__(self, nodes: Sequence[str], virtual_nodes: int = DEFAULT_VIRTUAL_NODES):
+        """Place virtual_nodes points per node on the ring.
+
+        Args:
+            nodes: Node names (their position depends only on the name)
+            virtual_nodes: Points per node; more points spread keys more evenly
+        """
+        if not nodes:
+            raise ValueError("HashRing needs at least one node")
+        self.nodes = list(nodes)
+        points = sorted(
+            (_hash(f"{node}#{i}".encode()), index)
+            for index, node in enumerate(self.nodes)
+            for i in range(virtual_nodes)
+        )
+        self._hashes = [point for point, _ in points]
+        self._owners = [index for _, index in points]
+
+    def node_for(self, key: Any) -> int:
+        """Get the index of the node owning a key."""
+        position = bisect(self._hashes, _hash(_hash_key(key)))
+        return self._owners[position % len(self._owners)]
+
+
+class NodeHealth:
+    """Tracks which nodes are down (shared by the clients of one ring)."""
+
+    def __init__(self, names: Sequence[str], retry_after: float = NODE_RETRY_SECONDS):
+        self.names = list(names)
+        self.retry_after = retry_after
+        self._down_until = [0.0] * len(self.names)
+        self._lock = threading.Lock()
+
+    def available(self, index: int) -> bool:
+        return self._down_until[index] <= time.monotonic()
+
+    def check(self, index: int) -> None:
+        """Raise NodeUnavailable if the node is marked down."""
+        if not self.available(index):
+            raise NodeUnavailable(f"Redis node {self.names[index]} is down")
+
+    def failed(self, index: int, error: Exception) -> None:
+        """Mark a node down after a connection error."""
+        with self._lock:
+            was_up = self.available(index)
+            self._down_until[index] = time.monotonic() + self.retry_after
+        if was_up:
+            print(f"⚠️ Redis node {self.names[index]} unavailable "
+                  f"(retrying in {self.retry_after:.0f}s): {error}")
+
+    def down(self) -> List[str]:
+        """Names of the nodes currently marked down."""
+        return [name for index, name in enumerate(self.names) if not self.available(index)]
+
+
+# ============================================================================
+# Command routing
+# ============================================================================
+
+def _ok(reply: Any) -> bool:
+    return reply is not _FAILED and not isinstance(reply, Exception)
+
+
+def _single(replies: List[Any]) -> Any:
+    return replies[0]
+
+
+def _sum(replies: List[Any]) -> int:
+    return sum(reply for reply in replies if _ok(reply))
+
+
+def _all(replies: List[Any]) -> bool:
+    return all(_ok(reply) and bool(reply) for reply in replies)
+
+
+def _union(replies: List[Any]) -> set:
+    return set().union(*(reply for reply in replies if _ok(reply)))
+
+
+def _concat(replies: List[Any]) -> list:
+    return [item for reply in replies if _ok(reply) for item in reply]
+
+
+MULTI_KEY_SUM = ('delete', 'unlink', 'exists', 'touch')
+FAN_OUT = {'flushdb': _all, 'flushall': _all, 'ping': _all, 'dbsize': _sum, 'keys': _concat}
+PRIMARY = ('publish',)
+
+
+class _Router:
+    """Splitting of commands into per-node calls (sync and async)."""
+
+    def __init__(self, nodes: Sequence[Any], ring: HashRing, health: NodeHealth):
+        """Initialize the router.
+
+        Args:
+            nodes: One redis-py client per ring node, in ring order
+            ring: Key placement
+            health: Node health shared with the other clients of the ring
+        """
+        self.nodes = list(nodes)
+        self.ring = ring
+        self.health = health
+
+    def _group(self, keys: Sequence[Any]) -> Dict[int, List[int]]:
+        """Positions of keys per owning node."""
+        groups: Dict[int, List[int]] = {}
+        for position, key in enumerate(keys):
+            groups.setdefault(self.ring.node_for(key), []).append(position)
+        return groups
+
+    @staticmethod
+    def _key_list(args: tuple) -> list:
+        """Keys of MGET/SUNION-style calls: (keys, *more_keys)."""
+        first, rest = args[0], args[1:]
+        keys = list(first) if isinstance(first, (list, tuple)) else [first]
+        return keys + list(rest)
+
+    def _plan(self, command: str, args: tuple, kwargs: dict) -> Tuple[List[Call], Callable[[List[Any]], Any]]:
+        """Split a command into per-node calls and the merge of their replies."""
+        if command == 'mget':
+            keys = self._key_list(args)
+            groups = self._group(keys)
+
+            def merge_values(replies: List[Any]) -> List[Any]:
+                values: List[Any] = [None] * len(keys)
+                for positions, reply in zip(groups.values(), replies):
+                    if _ok(reply):
+                        for position, value in zip(positions, reply):
+                            values[position] = value
+                return values
+            calls = [(index, 'mget', ([keys[p] for p in positions],), {}) for index, positions in groups.items()]
+            return calls, merge_values
+
+        if command in MULTI_KEY_SUM or command == 'sunion':
+            keys = list(args) if command in MULTI_KEY_SUM else self._key_list(args)
+            groups = self._group(keys)
+            if command == 'sunion':
+                return [(index, command, ([keys[p] for p in positions],), {})
+                        for index, positions in groups.items()], _union
+            return [(index, command, tuple(keys[p] for p in positions), {})
+                    for index, positions in groups.items()], _sum
+
+        if command == 'mset':
+            mapping = args[0]
+            keys = list(mapping)
+            return [(index, 'mset', ({keys[p]: mapping[keys[p]] for p in positions},), {})
+                    for index, positions in self._group(keys).items()], _all
+
+        if command in FAN_OUT:
+            return [(index, command, args, kwargs) for index in range(len(self.nodes))], FAN_OUT[command]
+
+        if command in PRIMARY or not (args or kwargs):
+            return [(0, command, args, kwargs)], _single
+
+        key = args[0] if args else kwargs.get('name', next(iter(kwargs.values())))
+        return [(self.ring.node_for(key), command, args, kwargs)], _single
+
+    def _batches(self, commands: List[Tuple[List[Call], Callable]]) -> Tuple[Dict[int, List[Tuple[str, tuple, dict]]], List[List[Tuple[int, int]]]]:
+        """Group the calls of queued pipeline commands per node.
+
+        Returns:
+            Commands per node, and per queued command the (node, position)
+            of each of its calls
+        """
+        batches: Dict[int, List[Tuple[str, tuple, dict]]] = {}
+        slots = []
+        for calls, _ in commands:
+            command_slots = []
+            for index, command, args, kwargs in calls:
+                batch = batches.setdefault(index, [])
+                command_slots.append((index, len(batch)))
+                batch.append((command, args, kwargs))
+            slots.append(command_slots)
+        return batches, slots
+
+    def _merge_batches(
+        self,
+        commands: List[Tuple[List[Call], Callable]],
+        slots: List[List[Tuple[int, int]]],
+        node_replies: Dict[int, Optional[List[Any]]],
+        raise_on_error: bool
+    ) -> List[Any]:
+        """Merge per-node pipeline replies back into per-command replies."""
+        results = []
+        for (calls, merge), command_slots in zip(commands, slots):
+            replies = [
+                _FAILED if node_replies[index] is None else node_replies[index][position]
+                for index, position in command_slots
+            ]
+            if merge is _single and replies[0] is _FAILED:
+                index = command_slots[0][0]
+                results.append(NodeUnavailable(f"Redis node {self.health.names[index]} is down"))
+            else:
+                results.append(merge(replies))
+        if raise_on_error:
+            for result in results:
+                if isinstance(result, Exception):
+                    raise result
+        return results
+
+    def _node_error(self, index: int, error: Exception) -> NodeUnavailable:
+        """Mark a node down after a connection error and build the
+        NodeUnavailable to raise in its place."""
+        self.health.failed(index, error)
+        return NodeUnavailable(f"Redis node {self.health.names[index]} is down: {error}")
+
+    def _watch_node(self, keys: Sequence[Any]) -> int:
+        """Node of a WATCH (all keys must live on it)."""
+        indexes = {self.ring.node_for(key) for key in keys}
+        if len(indexes) != 1:
+            raise redis.RedisError("WATCH keys must live on one node (use a {hash tag})")
+        index = indexes.pop()
+        self.health.check(index)
+        return index
+
+
+# ============================================================================
+# Sync client
+# ============================================================================
+
+class ShardedRedis(_Router):
+    """redis.Redis look-alike spreading keys over several nodes."""
+
+    def __init__(self, nodes: Sequence[Any], ring: HashRing, health: NodeHealth):
+        super().__init__(nodes, ring, health)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def _map(self, func: Callable[[Any], Any], items: List[Any]) -> List[Any]:
+        """Apply func to items, in parallel threads when there are several."""
+        if len(items) <= 1:
+            return [func(item) for item in items]
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=len(self.nodes), thread_name_prefix="redis-shard"
+                    )
+        return list(self._executor.map(func, items))
+
+    def _run(self, call: Call) -> Any:
+        """Run one call on its node (NodeUnavailable if it is down)."""
+        index, command, args, kwargs = call
+        self.health.check(index)
+        try:
+            return getattr(self.nodes[index], command)(*args, **kwargs)
+        except NODE_ERRORS as e:
+            raise self._node_error(index, e) from e
+
+    def _run_or_fail(self, call: Call) -> Any:
+        try:
+            return self._run(call)
+        except NodeUnavailable:
+            return _FAILED
+
+    def execute_command(self, command: str, *args: Any, **kwargs: Any) -> Any:
+        """Run a command by redis-py method name on the node(s) owning its keys."""
+        calls, merge = self._plan(command, args, kwargs)
+        if merge is _single:
+            return self._run(calls[0])
+        return merge(self._map(self._run_or_fail, calls))
+
+    def __getattr__(self, command: str) -> Callable[..., Any]:
+        if command.startswith('_'):
+            raise AttributeError(command)
+        return lambda *args, **kwargs: self.execute_command(command, *args, **kwargs)
+
+    def scan_iter(self, match: Any = None, count: Optional[int] = None, **kwargs: Any) -> Iterator[Any]:
+        """Iterate over matching keys of every reachable node."""
+        for index, node in enumerate(self.nodes):
+            if not self.health.available(index):
+                continue
+            try:
+                yield from node.scan_iter(match=match, count=count, **kwargs)
+            except NODE_ERRORS as e:
+                self.health.failed(index, e)
+
+    def pubsub(self, **kwargs: Any) -> Any:
+        """Pub/sub on the first node (no failover, see the module docs)."""
+        return self.nodes[0].pubsub(**kwargs)
+
+    def pipeline(self, transaction: bool = True, shard_hint: Any = None) -> "ShardedPipeline":
+        """Create a pipeline split per node on execute."""
+        return ShardedPipeline(self, transaction)
+
+    def close(self) -> None:
+        for node in self.nodes:
+            node.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+
+class ShardedPipeline:
+    """Pipeline executed as one pipeline per node, in parallel.
+
+    After watch() every command goes to the watched keys' node, with
+    redis-py's WATCH/MULTI semantics.
+    """
+
+    def __init__(self, client: ShardedRedis, transaction: bool = True):
+        self.client = client
+        self.transaction = transaction
+        self.commands: List[Tuple[List[Call], Callable]] = []
+        self._bound: Any = None
+        self._bound_index = 0
+
+    def __enter__(self) -> "ShardedPipeline":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.reset()
+
+    def __len__(self) -> int:
+        return len(self._bound) if self._bound is not None else len(self.commands)
+
+    def watch(self, *keys: Any) -> Any:
+        index = self.client._watch_node(keys)
+        self._bound = self.client.nodes[index].pipeline(self.transaction)
+        self._bound_index = index
+        try:
+            return self._bound.watch(*keys)
+        except NODE_ERRORS as e:
+            raise self.client._node_error(index, e) from e
+
+    def unwatch(self) -> Any:
+        return self._bound.unwatch() if self._bound is not None else True
+
+    def multi(self) -> None:
+        if self._bound is not None:
+            self._bound.multi()
+
+    def reset(self) -> None:
+        self.commands = []
+        if self._bound is not None:
+            self._bound.reset()
+            self._bound = None
+
+    def __getattr__(self, command: str) -> Callable[..., Any]:
+        if command.startswith('_'):
+            raise AttributeError(command)
+        if self._bound is not None:
+            return getattr(self._bound, command)
+
+        def queue_command(*args: Any, **kwargs: Any) -> "ShardedPipeline":
+            self.commands.append(self.client._plan(command, args, kwargs))
+            return self
+        return queue_command
+
+    def _run_batch(self, item: Tuple[int, List[Tuple[str, tuple, dict]]]) -> Optional[List[Any]]:
+        """Execute one node's commands (None if the node is unreachable)."""
+        index, batch = item
+        try:
+            self.client.health.check(index)
+            pipe = self.client.nodes[index].pipeline(self.transaction)
+            for command, args, kwargs in batch:
+                getattr(pipe, command)(*args, **kwargs)
+            return pipe.execute(raise_on_error=False)
+        except NodeUnavailable:
+            return None
+        except NODE_ERRORS as e:
+            self.client.health.failed(index, e)
+            return None
+
+    def execute(self, raise_on_error: bool = True) -> List[Any]:
+        """Run the queued commands; replies of unreachable nodes become
+        NodeUnavailable (single-key) or misses (multi-key)."""
+        if self._bound is not None:
+            try:
+                return self._bound.execute(raise_on_error)
+            except NODE_ERRORS as e:
+                raise self.client._node_error(self._bound_index, e) from e
+            finally:
+                self.reset()
+        commands = self.commands
+        self.commands = []
+        batches, slots = self.client._batches(commands)
+        items = list(batches.items())
+        node_replies = dict(zip(batches, self.client._map(self._run_batch, items)))
+        return self.client._merge_batches(commands, slots, node_replies, raise_on_error)
+
+
+# ============================================================================
+# Async client
+# ============================================================================
+
+class AsyncShardedRedis(_Router):
+    """redis.asyncio.Redis look-alike spreading keys over several nodes."""
+
+    async def _run(self, call: Call) -> Any:
+        index, command, args, kwargs = call
+        self.health.check(index)
+        try:
+            return await getattr(self.nodes[index], command)(*args, **kwargs)
+        except NODE_ERRORS as e:
+            raise self._node_error(index, e) from e
+
+    async def _run_or_fail(self, call: Call) -> Any:
+        try:
+            return await self._run(call)
+        except NodeUnavailable:
+            return _FAILED
+
+    async def execute_command(self, command: str, *args: Any, **kwargs: Any) -> Any:
+        """Run a command on the node(s) owning its keys, nodes concurrently."""
+        calls, merge = self._plan(command, args, kwargs)
+        if merge is _single:
+            return await self._run(calls[0])
+        return merge(await asyncio.gather(*(self._run_or_fail(call) for call in calls)))
+
+    def __getattr__(self, command: str) -> Callable[..., Any]:
+        if command.startswith('_'):
+            raise AttributeError(command)
+        return lambda *args, **kwargs: self.execute_command(command, *args, **kwargs)
+
+    async def scan_iter(self, match: Any = None, count: Optional[int] = None, **kwargs: Any):
+        """Iterate over matching keys of every reachable node."""
+        for index, node in enumerate(self.nodes):
+            if not self.health.available(index):
+                continue
+            try:
+                async for key in node.scan_iter(match=match, count=count, **kwargs):
+                    yield key
+            except NODE_ERRORS as e:
+                self.health.failed(index, e)
+
+    def pubsub(self, **kwargs: Any) -> Any:
+        """Pub/sub on the first node (no failover, see the module docs)."""
+        return self.nodes[0].pubsub(**kwargs)
+
+    def pipeline(self, transaction: bool = True, shard_hint: Any = None) -> "AsyncShardedPipeline":
+        return AsyncShardedPipeline(self, transaction)
+
+    async def aclose(self) -> None:
+        for node in self.nodes:
+            await node.aclose()
+
+    close = aclose
+
+
+class AsyncShardedPipeline:
+    """Async ShardedPipeline: queueing returns the pipeline; execute,
+    watch and WATCHed commands are awaitable."""
+
+    def __init__(self, client: AsyncShardedRedis, transaction: bool = True):
+        self.client = client
+        self.transaction = transaction
+        self.commands: List[Tuple[List[Call], Callable]] = []
+        self._bound: Any = None
+        self._bound_index = 0
+
+    async def __aenter__(self) -> "AsyncShardedPipeline":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.reset()
+
+    def __len__(self) -> int:
+        return len(self._bound) if self._bound is not None else len(self.commands)
+
+    async def watch(self, *keys: Any) -> Any:
+        index = self.client._watch_node(keys)
+        self._bound = self.client.nodes[index].pipeline(self.transaction)
+        self._bound_index = index
+        try:
+            return await self._bound.watch(*keys)
+        except NODE_ERRORS as e:
+            raise self.client._node_error(index, e) from e
+
+    async def unwatch(self) -> Any:
+        return await self._bound.unwatch() if self._bound is not None else True
+
+    def multi(self) -> None:
+        if self._bound is not None:
+            self._bound.multi()
+
+    async def reset(self) -> None:
+        self.commands = []
+        if self._bound is not None:
+            await self._bound.reset()
+            self._bound = None
+
+    def __getattr__(self, command: str) -> Callable[..., Any]:
+        if command.startswith('_'):
+            raise AttributeError(command)
+        if self._bound is not None:
+            return getattr(self._bound, command)
+
+        def queue_command(*args: Any, **kwargs: Any) -> "AsyncShardedPipeline":
+            self.commands.append(self.client._plan(command, args, kwargs))
+            return self
+        return queue_command
+
+    async def _run_batch(self, index: int, batch: List[Tuple[str, tuple, dict]]) -> Optional[List[Any]]:
+        try:
+            self.client.health.check(index)
+            pipe = self.client.nodes[index].pipeline(self.transaction)
+            for command, args, kwargs in batch:
+                getattr(pipe, command)(*args, **kwargs)
+            return await pipe.execute(raise_on_error=False)
+        except NodeUnavailable:
+            return None
+        except NODE_ERRORS as e:
+            self.client.health.failed(index, e)
+            return None
+
+    async def execute(self, raise_on_error: bool = True) -> List[Any]:
+        if self._bound is not None:
+            try:
+                return await self._bound.execute(raise_on_error)
+            except NODE_ERRORS as e:
+                raise self.client._node_error(self._bound_index, e) from e
+            finally:
+                await self.reset()
+        commands = self.commands
+        self.commands = []
+        batches, slots = self.client._batches(commands)
+        replies = await asyncio.gather(*(self._run_batch(index, batch) for index, batch in batches.items()))
+        node_replies = dict(zip(batches, replies))
+        return self.client._merge_batches(commands, slots, node_replies, raise_on_error)
@@ -0,0 +1,224 @@
+# Single-Flight for AURORA Trading System
+"""
+Request coalescing for cache recomputation.
+Only one caller per key recomputes a missing value; concurrent callers
+wait for its result instead of stampeding the database.
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Optional
+import asyncio
+import threading
+import uuid
+
+from .redis_client import redis_client
+from .async_redis_client import async_redis_client
+from .sharding import NodeUnavailable
+
+
+LOCK_PREFIX = "cache-lock:"
+
+
+class _Call:
+    """In-flight call shared by the leader and its waiters."""
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Per-process single-flight for synchronous functions.
+
+    The first caller for a key (the leader) runs the function; callers
+    arriving while it runs block until it finishes and receive the same
+    result or exception.
+    """
+
+    def __init__(self):
+        """Initialize an empty in-flight map."""
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+
+    def in_flight(self, key: str) -> bool:
+        """Whether a call for key is currently running."""
+        return key in self._calls
+
+    def do(self, key: str, func: Callable[[], Any]) -> Any:
+        """Run func once per key across concurrent callers.
+
+        Args:
+            key: Coalescing key
+            func: Zero-argument callable computing the value
+
+        Returns:
+            The leader's result (exceptions are re-raised in every caller)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class AsyncSingleFlight:
+    """Per-process single-flight for coroutine functions.
+
+    Waiters await the leader's future, so they do not block the event
+    loop. Futures are bound to the loop of the leader.
+    """
+
+    def __init__(self):
+        """Initialize an empty in-flight map."""
+        self._calls: Dict[str, asyncio.Future] = {}
+
+    def in_flight(self, key: str) -> bool:
+        """Whether a call for key is currently running."""
+        return key in self._calls
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Await func once per key across concurrent callers.
+
+        Args:
+            key: Coalescing key
+            func: Zero-argument callable returning an awaitable
+
+        Returns:
+            The leader's result (exceptions are re-raised in every caller)
+        """
+        future = self._calls.get(key)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await func()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so an unawaited failure does not log a warning
+            future.exception()
+            raise
+        finally:
+            del self._calls[key]
+
+
+# ============================================================================
+# Distributed lock (coalesces recomputation across processes)
+# ============================================================================
+
+def acquire_lock(key: str, timeout: float, client=None) -> Optional[str]:
+    """Try to take the recompute lock of a cache key.
+
+    Args:
+        key: Cache key
+        timeout: Lock expiry in seconds (protects against crashed holders)
+        client: redis-py client (defaults to the global RedisClient's)
+
+    Returns:
+        Lock token if acquired, None if held elsewhere. When Redis (or
+        the lock's node) is unavailable a token is returned so callers
+        simply recompute unlocked.
+    """
+    client = client or (redis_client.client if redis_client is not None else None)
+    token = uuid.uuid4().hex
+    if client is None:
+        return token
+    try:
+        acquired = client.set(LOCK_PREFIX + key, token, nx=True, px=int(timeout * 1000))
+        return token if acquired else None
+    except NodeUnavailable:
+        return token
+    except Exception as e:
+        print(f"❌ Cache lock error ({key}): {e}")
+        return token
+
+
+def release_lock(key: str, token: str, client=None) -> bool:
+    """Release a recompute lock if it is still held by token.
+
+    Uses WATCH/MULTI compare-and-delete so an expired lock taken over by
+    another process is never released by the previous holder.
+
+    Returns:
+        bool: True if the lock was released
+    """
+    client = client or (redis_client.client if redis_client is not None else None)
+    if client is None:
+        return False
+    lock_key = LOCK_PREFIX + key
+    try:
+        with client.pipeline() as pipe:
+            pipe.watch(lock_key)
+            if pipe.get(lock_key) != token:
+                pipe.unwatch()
+                return False
+            pipe.multi()
+            pipe.delete(lock_key)
+            pipe.execute()
+            return True
+    except NodeUnavailable:
+        return False
+    except Exception as e:
+        print(f"❌ Cache unlock error ({key}): {e}")
+        return False
+
+
+async def acquire_lock_async(key: str, timeout: float) -> Optional[str]:
+    """Async acquire_lock on the global AsyncRedisClient."""
+    token = uuid.uuid4().hex
+    if async_redis_client is None:
+        return token
+    try:
+        acquired = await async_redis_client.client.set(
+            LOCK_PREFIX + key, token, nx=True, px=int(timeout * 1000)
+        )
+        return token if acquired else None
+    except NodeUnavailable:
+        return token
+    except Exception as e:
+        print(f"❌ Cache lock error ({key}): {e}")
+        return token
+
+
+async def release_lock_async(key: str, token: str) -> bool:
+    """Async release_lock on the global AsyncRedisClient."""
+    if async_redis_client is None:
+        return False
+    lock_key = LOCK_PREFIX + key
+    try:
+        async with async_redis_client.client.pipeline() as pipe:
+            await pipe.watch(lock_key)
+            if await pipe.get(lock_key) != token:
+                await pipe.unwatch()
+                return False
+            pipe.multi()
+            pipe.delete(lock_key)
+            await pipe.execute()
+            return True
+    except NodeUnavailable:
+        return False
+    except Exception as e:
+        print(f"❌ Cache unlock error ({key}): {e}")
+        return False
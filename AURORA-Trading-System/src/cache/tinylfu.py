@@ -0,0 +1,462 @@
+# W-TinyLFU Cache for AURORA Trading System
+"""
+Size-bounded in-memory cache with W-TinyLFU admission.
+
+Plain LRU admits everything, so one scan (a client paging through
+/trades) flushes the hot set. W-TinyLFU puts new entries in a small LRU
+window (1% of the capacity); entries leaving the window only enter the
+main segmented LRU (probation + protected) if a count-min sketch says
+they are used more often than every entry they would evict. The sketch
+is halved periodically so old popularity fades.
+
+Capacity is in bytes (``weigher`` estimates value sizes). Per-entry
+TTLs are tracked on a hashed timer wheel, so expired entries are
+reclaimed without scanning the cache. Every operation is O(1)
+(amortized for sketch aging and the timer wheel).
+
+TinyLFUCache has the LocalCache interface (values are copied on set and
+get alike) and can serve as the L1 tier (CACHE_L1_POLICY=tinylfu).
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional
+import fnmatch
+import sys
+import threading
+import time
+
+from .local_cache import MISSING, detach
+
+
+_MASK64 = (1 << 64) - 1
+_HALVE = bytes(value >> 1 for value in range(256))  # bytes.translate table
+
+WINDOW_RATIO = 0.01  # share of capacity for the admission window
+PROTECTED_RATIO = 0.8  # share of the main segment for protected entries
+AVERAGE_ENTRY_BYTES = 512  # sizes the sketch when entries are not given
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """Approximate memory held by a value (containers walked 3 levels deep)."""
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value) + 48
+    size = sys.getsizeof(value, 64)
+    if _depth < 3:
+        if isinstance(value, dict):
+            size += sum(
+                estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1)
+                for k, v in value.items()
+            )
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            size += sum(estimate_size(item, _depth + 1) for item in value)
+    return size
+
+
+class CountMinSketch:
+    """Count-min sketch of 8-bit counters (saturating at 15) with aging.
+
+    After ``sample_size`` increments every counter is halved, so
+    frequencies describe recent popularity.
+    """
+
+    def __init__(self, width: int, depth: int = 4, max_count: int = 15):
+        """Initialize an empty sketch.
+
+        Args:
+            width: Counters per row (rounded up to a power of two)
+            depth: Rows (independent hash functions)
+            max_count: Counter ceiling
+        """
+        self.width = 1 << max(4, (width - 1).bit_length())
+        self.depth = depth
+        self.max_count = max_count
+        self.rows = [bytearray(self.width) for _ in range(depth)]
+        self.sample_size = 10 * self.width
+        self.additions = 0
+        self._mask = self.width - 1
+
+    def _indexes(self, key: Hashable) -> List[int]:
+        h1 = hash(key) & _MASK64
+        h2 = (((h1 * 0x9E3779B97F4A7C15) & _MASK64) >> 32) | 1
+        return [(h1 + i * h2) & self._mask for i in range(self.depth)]
+
+    def estimate(self, key: Hashable) -> int:
+        """Get the (over-)estimated recent frequency of a key."""
+        return min(row[index] for row, index in zip(self.rows, self._indexes(key)))
+
+    def increment(self, key: Hashable) -> None:
+        """Count one occurrence (conservative update)."""
+        indexes = self._indexes(key)
+        current = min(row[index] for row, index in zip(self.rows, indexes))
+        if current < self.max_count:
+            for row, index in zip(self.rows, indexes):
+                if row[index] == current:
+                    row[index] = current + 1
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            self.rows = [row.translate(_HALVE) for row in self.rows]
+            self.additions //= 2
+
+
+class TimerWheel:
+    """Hashed timer wheel of key deadlines.
+
+    Keys are bucketed by deadline tick; advancing the clock visits only
+    the buckets of the elapsed ticks. Deadlines beyond one revolution
+    stay in their bucket and are revisited on later revolutions.
+    """
+
+    def __init__(self, resolution: float = 1.0, slots: int = 512, now: float = 0.0):
+        """Initialize an empty wheel.
+
+        Args:
+            resolution: Seconds per tick
+            slots: Buckets (one revolution = slots * resolution seconds)
+            now: Current clock reading
+        """
+        self.resolution = resolution
+        self.slots: List[Dict[Hashable, None]] = [{} for _ in range(slots)]
+        self._slot_of: Dict[Hashable, int] = {}
+        self._tick = int(now // resolution)
+
+    def schedule(self, key: Hashable, deadline: float) -> None:
+        """(Re)schedule a key; it is reported once deadline has passed."""
+        self.cancel(key)
+        tick = max(int(deadline // self.resolution) + 1, self._tick + 1)
+        slot = tick % len(self.slots)
+        self.slots[slot][key] = None
+        self._slot_of[key] = slot
+
+    def cancel(self, key: Hashable) -> None:
+        slot = self._slot_of.pop(key, None)
+        if slot is not None:
+            del self.slots[slot][key]
+
+    def advance(self, now: float) -> List[Hashable]:
+        """Move the clock to now.
+
+        Returns:
+            Keys in the elapsed buckets (due, or due on a later revolution;
+            the caller checks the deadline and reschedules or drops them)
+        """
+        tick = int(now // self.resolution)
+        if tick <= self._tick:
+            return []
+        elapsed = min(tick - self._tick, len(self.slots))
+        keys: List[Hashable] = []
+        for step in range(1, elapsed + 1):
+            bucket = self.slots[(self._tick + step) % len(self.slots)]
+            if bucket:
+                keys.extend(bucket)
+        self._tick = tick
+        return keys
+
+    def clear(self) -> None:
+        for bucket in self.slots:
+            bucket.clear()
+        self._slot_of.clear()
+
+
+class _Segment(OrderedDict):
+    """LRU-ordered entries of one segment with their total size."""
+
+    def __init__(self, max_bytes: int):
+        super().__init__()
+        self.max_bytes = max_bytes
+        self.bytes = 0
+
+
+class _Entry:
+    __slots__ = ('key', 'value', 'size', 'expires', 'segment')
+
+    def __init__(self, key: Hashable, value: Any, size: int, expires: Optional[float]):
+        self.key = key
+        self.value = value
+        self.size = size
+        self.expires = expires
+        self.segment: Optional[_Segment] = None
+
+
+class TinyLFUCache:
+    """Thread-safe, byte-bounded W-TinyLFU cache with per-entry TTL.
+
+    Same interface as LocalCache (get returns MISSING on a miss).
+
+    Attributes:
+        max_bytes: Capacity in bytes
+        default_ttl: TTL in seconds used when set() gets none (None = no expiry)
+        enabled: See LocalCache.enabled
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        default_ttl: Optional[float] = 30.0,
+        expected_entries: Optional[int] = None,
+        weigher: Callable[[Any], int] = estimate_size,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """Initialize TinyLFUCache.
+
+        Args:
+            max_bytes: Capacity in bytes
+            default_ttl: TTL in seconds used when set() gets none
+            expected_entries: Typical number of entries (sizes the sketch;
+                defaults to max_bytes / 512)
+            weigher: Estimates the size of a value in bytes
+            clock: Monotonic time source (seconds)
+        """
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.enabled = False
+        self.weigher = weigher
+        self.clock = clock
+
+        window_max = max(1, int(max_bytes * WINDOW_RATIO))
+        self.main_max = max_bytes - window_max
+
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._window = _Segment(window_max)
+        self._probation = _Segment(self.main_max)
+        self._protected = _Segment(int(self.main_max * PROTECTED_RATIO))
+        self.sketch = CountMinSketch(expected_entries or max(64, max_bytes // AVERAGE_ENTRY_BYTES))
+        self.wheel = TimerWheel(now=clock())
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejections = 0
+        self.expirations = 0
+
+    # ========================================================================
+    # Segments
+    # ========================================================================
+
+    def _place(self, entry: _Entry, segment: _Segment) -> None:
+        """Append an entry at the MRU end of a segment."""
+        segment[entry.key] = entry
+        segment.bytes += entry.size
+        entry.segment = segment
+
+    def _unplace(self, entry: _Entry) -> None:
+        """Take an entry out of its segment."""
+        del entry.segment[entry.key]
+        entry.segment.bytes -= entry.size
+        entry.segment = None
+
+    def _drop(self, entry: _Entry) -> None:
+        """Remove an entry from the cache."""
+        self._unplace(entry)
+        del self._entries[entry.key]
+        self.wheel.cancel(entry.key)
+
+    def _on_hit(self, entry: _Entry) -> None:
+        """Refresh recency; a probation hit promotes to protected."""
+        if entry.segment is self._probation:
+            self._unplace(entry)
+            self._place(entry, self._protected)
+            self._demote_protected()
+        else:
+            entry.segment.move_to_end(entry.key)
+
+    def _demote_protected(self) -> None:
+        """Move protected LRU entries back to probation while it is over its bound."""
+        while self._protected.bytes > self._protected.max_bytes:
+            demoted = next(iter(self._protected.values()))
+            self._unplace(demoted)
+            self._place(demoted, self._probation)
+
+    def _update(self, entry: _Entry, value: Any, size: int, expires: Optional[float]) -> None:
+        """Replace the value of a cached entry in place.
+
+        The entry keeps its segment (an update does not send a hot key
+        back through the window) and becomes its most recently used
+        entry; a size change is accounted there and the segment bounds
+        are restored.
+        """
+        entry.segment.bytes += size - entry.size
+        entry.value, entry.size, entry.expires = value, size, expires
+        entry.segment.move_to_end(entry.key)
+        if expires is None:
+            self.wheel.cancel(entry.key)
+        else:
+            self.wheel.schedule(entry.key, expires)
+        self._demote_protected()
+        while self._probation.bytes + self._protected.bytes > self.main_max:
+            self._drop(next(iter(self._main_victims())))
+            self.evictions += 1
+        self._evict_window()
+
+    def _main_victims(self) -> Iterable[_Entry]:
+        """Main entries in eviction order (probation LRU first)."""
+        yield from self._probation.values()
+        yield from self._protected.values()
+
+    def _admit(self, candidate: _Entry) -> None:
+        """Move a window evictee into main if it beats every main victim
+        it would displace.
+
+        The victims making room are picked (summing their sizes) and
+        compared before any is evicted, so a rejected candidate never
+        costs main entries.
+        """
+        frequency = self.sketch.estimate(candidate.key)
+        excess = self._probation.bytes + self._protected.bytes + candidate.size - self.main_max
+        victims: List[_Entry] = []
+        for victim in self._main_victims():
+            if excess <= 0:
+                break
+            if frequency <= self.sketch.estimate(victim.key):
+                break
+            victims.append(victim)
+            excess -= victim.size
+        if excess > 0:
+            self._drop(candidate)
+            self.rejections += 1
+            return
+        for victim in victims:
+            self._drop(victim)
+            self.evictions += 1
+        self._unplace(candidate)
+        self._place(candidate, self._probation)
+
+    def _evict_window(self) -> None:
+        while self._window.bytes > self._window.max_bytes:
+            self._admit(next(iter(self._window.values())))
+
+    def _expire(self, now: float) -> None:
+        """Drop entries whose deadline passed (timer wheel buckets)."""
+        for key in self.wheel.advance(now):
+            entry = self._entries.get(key)
+            if entry is None or entry.expires is None:
+                continue
+            if entry.expires <= now:
+                self._drop(entry)
+                self.expirations += 1
+            else:
+                self.wheel.schedule(key, entry.expires)
+
+    # ========================================================================
+    # Cache interface
+    # ========================================================================
+
+    def get(self, key: Hashable) -> Any:
+        """Get a value, recording the access.
+
+        Returns:
+            Cached value or MISSING
+        """
+        with self._lock:
+            now = self.clock()
+            self._expire(now)
+            self.sketch.increment(key)
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires is not None and entry.expires <= now:
+                self._drop(entry)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            self.hits += 1
+            self._on_hit(entry)
+            value = entry.value
+        return detach(value)
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, size: Optional[int] = None) -> bool:
+        """Store a value (admission to the main segment is decided later,
+        when it leaves the window; a cached key is updated in place).
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Time to live in seconds (defaults to default_ttl)
+            size: Size in bytes (defaults to weigher(value))
+
+        Returns:
+            bool: False if the value is larger than the whole cache
+        """
+        value = detach(value)
+        size = self.weigher(value) if size is None else size
+        ttl = ttl or self.default_ttl
+        with self._lock:
+            now = self.clock()
+            self._expire(now)
+            expires = now + ttl if ttl else None
+            entry = self._entries.get(key)
+            if size > self.main_max:
+                if entry is not None:
+                    self._drop(entry)
+                self.rejections += 1
+                return False
+            self.sketch.increment(key)
+            if entry is not None:
+                self._update(entry, value, size, expires)
+                return True
+            entry = self._entries[key] = _Entry(key, value, size, expires)
+            if entry.expires is not None:
+                self.wheel.schedule(key, entry.expires)
+            self._place(entry, self._window)
+            self._evict_window()
+            return True
+
+    def delete(self, keys: Iterable[Hashable]) -> int:
+        """Evict keys.
+
+        Returns:
+            int: Number of entries evicted
+        """
+        with self._lock:
+            deleted = 0
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._drop(entry)
+                    deleted += 1
+            return deleted
+
+    def delete_pattern(self, pattern: str) -> int:
+        """Evict keys matching a glob pattern (scans all keys).
+
+        Returns:
+            int: Number of entries evicted
+        """
+        with self._lock:
+            keys = [key for key in self._entries if fnmatch.fnmatchcase(str(key), pattern)]
+        return self.delete(keys)
+
+    def clear(self) -> None:
+        """Evict all entries (frequencies are kept)."""
+        with self._lock:
+            for segment in (self._window, self._probation, self._protected):
+                segment.clear()
+                segment.bytes = 0
+            self._entries.clear()
+            self.wheel.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    @property
+    def used_bytes(self) -> int:
+        """Bytes held by all entries."""
+        return self._window.bytes + self._probation.bytes + self._protected.bytes
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and occupancy."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': len(self._entries),
+            'bytes': self.used_bytes,
+            'max_bytes': self.max_bytes,
+            'evictions': self.evictions,
+            'rejections': self.rejections,
+            'expirations': self.expirations,
+        }
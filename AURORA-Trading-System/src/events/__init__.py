@@ -1,14 +1,29 @@
 # Events package initialization
-from .event_models import Event, TradeEvent, CacheEvent, SystemEvent
+from .event_models import Event, LazyEvent, TradeEvent, CacheEvent, SystemEvent
+from .event_registry import EventTypeRegistry, event_registry
+from .event_type_codes import EventTypeCodes
 from .event_store import EventStore, EventRecord
 from .event_processor import EventProcessor
+from .portfolio_projection import PortfolioProjection
+from .projection_registry import ProjectionRegistry
+from .projection_store import ProjectionStore, ProjectionMaterializer
+from .event_stats import EventStatsRecorder
 
 __all__ = [
     "Event",
+    "LazyEvent",
     "TradeEvent",
     "CacheEvent",
     "SystemEvent",
+    "EventTypeRegistry",
+    "event_registry",
+    "EventTypeCodes",
     "EventStore",
     "EventRecord",
-    "EventProcessor"
+    "EventProcessor",
+    "PortfolioProjection",
+    "ProjectionRegistry",
+    "ProjectionStore",
+    "ProjectionMaterializer",
+    "EventStatsRecorder"
 ]
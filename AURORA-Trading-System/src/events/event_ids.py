@@ -0,0 +1,106 @@
+# Event Identifiers for AURORA Trading System
+"""
+Time-ordered event identifiers (UUIDv7, RFC 9562).
+IDs sort by creation time, so appends land at the right edge of the
+events primary-key index instead of scattering across it.
+"""
+
+from typing import Optional
+from datetime import datetime, timezone
+import os
+import threading
+import time
+import uuid
+
+
+_COUNTER_BITS = 42          # 12 bits of rand_a + 30 high bits of rand_b
+_COUNTER_MAX = (1 << _COUNTER_BITS) - 1
+_COUNTER_SEED_MASK = (1 << (_COUNTER_BITS - 1)) - 1  # leave headroom to increment
+
+
+class UUIDv7Generator:
+    """Monotonic UUIDv7 generator.
+
+    Layout (128 bits):
+        48 bits  unix timestamp in milliseconds
+         4 bits  version (7)
+        42 bits  counter (12 bits rand_a + 30 bits of rand_b)
+         2 bits  variant (0b10)
+        32 bits  random
+
+    The counter is seeded randomly on each new millisecond and
+    incremented for every ID within it (RFC 9562 method 1), so IDs from
+    one generator are strictly increasing. If the clock goes backwards
+    or the counter overflows, the last timestamp is reused/advanced
+    rather than going back in time. The random tail keeps IDs from
+    different processes (including forked workers) unique.
+    """
+
+    def __init__(self):
+        """Initialize the generator."""
+        self._lock = threading.Lock()
+        self._last_ms = 0
+        self._counter = 0
+
+    def new(self) -> str:
+        """Generate a new UUIDv7 string."""
+        random_bytes = os.urandom(10)
+        tail = int.from_bytes(random_bytes[:4], "big")
+
+        with self._lock:
+            now_ms = time.time_ns() // 1_000_000
+            if now_ms > self._last_ms:
+                self._last_ms = now_ms
+                self._counter = int.from_bytes(random_bytes[4:], "big") & _COUNTER_SEED_MASK
+            else:
+                self._counter += 1
+                if self._counter > _COUNTER_MAX:
+                    self._last_ms += 1
+                    self._counter = int.from_bytes(random_bytes[4:], "big") & _COUNTER_SEED_MASK
+            timestamp_ms = self._last_ms
+            counter = self._counter
+
+        value = (
+            (timestamp_ms << 80)
+            | (0x7 << 76)
+            | ((counter >> 30) << 64)
+            | (0b10 << 62)
+            | ((counter & 0x3FFFFFFF) << 32)
+            | tail
+        )
+        hex_value = f"{value:032x}"
+        return (
+            f"{hex_value[:8]}-{hex_value[8:12]}-{hex_value[12:16]}-"
+            f"{hex_value[16:20]}-{hex_value[20:]}"
+        )
+
+    __call__ = new
+
+
+# Global generator
+_generator = UUIDv7Generator()
+
+
+def new_event_id() -> str:
+    """Generate a new time-ordered event ID."""
+    return _generator.new()
+
+
+def event_id_timestamp(event_id: str) -> Optional[datetime]:
+    """Extract the creation time embedded in a UUIDv7 event ID.
+
+    Args:
+        event_id: Event ID (UUIDv7 or legacy UUIDv4)
+
+    Returns:
+        Naive UTC datetime (millisecond precision), or None for IDs that
+        are not UUIDv7 (e.g. legacy uuid4 IDs)
+    """
+    try:
+        value = uuid.UUID(event_id)
+    except (ValueError, AttributeError, TypeError):
+        return None
+    if value.version != 7:
+        return None
+    timestamp_ms = value.int >> 80
+    return datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc).replace(tzinfo=None)
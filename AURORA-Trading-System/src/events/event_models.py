@@ -4,11 +4,19 @@ Domain events using Event Sourcing pattern.
 All events are immutable and represent facts that have happened.
 """
 
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
 from enum import Enum
-import uuid
+from numbers import Number
+import json
+
+from .event_ids import new_event_id
+
+try:
+    import orjson
+except ImportError:  # optional fast JSON encoder
+    orjson = None
 
 
 class EventType(str, Enum):
@@ -28,16 +36,23 @@ class EventType(str, Enum):
     SYSTEM_SHUTDOWN = "SYSTEM_SHUTDOWN"
     SYSTEM_ERROR = "SYSTEM_ERROR"
 
+    # Periodic cache metrics summaries. New members are appended so the
+    # dictionary codes of earlier types (seeded in order) never change.
+    CACHE_METRICS = "CACHE_METRICS"
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class Event:
     """Base event class for all domain events.
     
     Represents a fact that has occurred in the system.
-    Events are immutable once created and stored.
+    Events are immutable once created and stored (frozen), and use
+    __slots__ instead of a per-instance __dict__ to keep replay of
+    large streams cheap in memory.
     
     Attributes:
-        event_id: Unique identifier for this event
+        event_id: Unique identifier for this event (time-ordered UUIDv7;
+            legacy uuid4 IDs remain valid)
         event_type: Type of event (EventType enum)
         aggregate_id: Identifier of the aggregate this event belongs to
         timestamp: When the event occurred
@@ -46,7 +61,7 @@ class Event:
         user_id: Optional user who triggered the event
     """
     
-    event_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    event_id: str = field(default_factory=new_event_id)
     event_type: str = field(default="")
     aggregate_id: str = field(default="")
     timestamp: datetime = field(default_factory=datetime.utcnow)
@@ -57,21 +72,45 @@ class Event:
     def to_dict(self) -> Dict[str, Any]:
         """Convert event to dictionary representation.
         
+        The payload is copied shallowly (events are immutable facts).
+        
         Returns:
             Dictionary with all event fields (ISO format timestamps)
         """
-        data = asdict(self)
-        data['timestamp'] = self.timestamp.isoformat()
-        return data
+        return {
+            'event_id': self.event_id,
+            'event_type': self.event_type,
+            'aggregate_id': self.aggregate_id,
+            'timestamp': self.timestamp.isoformat(),
+            'data': dict(self.data),
+            'version': self.version,
+            'user_id': self.user_id,
+        }
     
     def to_json(self) -> str:
         """Convert event to JSON string.
         
+        Uses orjson when installed, falling back to the json module
+        for payloads orjson cannot encode.
+        
         Returns:
             JSON representation of the event
         """
-        import json
-        return json.dumps(self.to_dict())
+        document = {
+            'event_id': self.event_id,
+            'event_type': self.event_type,
+            'aggregate_id': self.aggregate_id,
+            'timestamp': self.timestamp.isoformat(),
+            'data': self.data,
+            'version': self.version,
+            'user_id': self.user_id,
+        }
+        if orjson is not None:
+            try:
+                return orjson.dumps(document).decode()
+            except TypeError:
+                pass
+        return json.dumps(document)
     
     def __hash__(self):
         """Hash based on event_id for set operations."""
@@ -86,7 +125,80 @@ class Event:
         )
 
 
-@dataclass
+_UNLOADED = object()
+
+# Slot descriptor backing Event.data (LazyEvent stores the decoded payload there)
+_DATA_SLOT = Event.__dict__['data']
+
+
+class LazyEvent(Event):
+    """Event whose payload is decoded on first access.
+    
+    Read paths that only need metadata (timelines, statistics, type
+    filters) get LazyEvent instances so the JSON payload is neither
+    transferred nor decoded unless ``data`` is actually used.
+    
+    The payload comes either from the raw JSON text selected with the
+    row (``raw_data``) or, when the data column was not selected at
+    all, from ``loader`` (a callable returning the raw JSON text).
+    Stored payloads of an older schema version are passed through
+    ``upcast`` once decoded (see EventTypeRegistry.decode_lazy).
+    """
+    
+    __slots__ = ('_raw_data', '_loader', '_upcast')
+    
+    def __init__(
+        self,
+        raw_data: Union[str, bytes, None] = None,
+        loader: Optional[Callable[[], Union[str, bytes, None]]] = None,
+        upcast: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+        **fields: Any
+    ):
+        """Initialize LazyEvent.
+        
+        Args:
+            raw_data: Raw JSON payload as stored in the data column
+            loader: Callable fetching the raw payload on demand
+            upcast: Callable migrating the decoded payload to the
+                current schema version
+            **fields: Event metadata fields (event_id, event_type, ...)
+        """
+        fields.setdefault('data', _UNLOADED)
+        object.__setattr__(self, '_raw_data', raw_data)
+        object.__setattr__(self, '_loader', loader)
+        object.__setattr__(self, '_upcast', upcast)
+        Event.__init__(self, **fields)
+    
+    @property
+    def data(self) -> Dict[str, Any]:
+        """Event payload, decoded on first access."""
+        value = _DATA_SLOT.__get__(self, LazyEvent)
+        if value is _UNLOADED:
+            raw = self._raw_data
+            if raw is None and self._loader is not None:
+                raw = self._loader()
+            value = json.loads(raw) if raw is not None else {}
+            if self._upcast is not None:
+                value = self._upcast(value)
+            _DATA_SLOT.__set__(self, value)
+            object.__setattr__(self, '_raw_data', None)
+            object.__setattr__(self, '_loader', None)
+            object.__setattr__(self, '_upcast', None)
+        return value
+    
+    @data.setter
+    def data(self, value: Dict[str, Any]) -> None:
+        # Only reached from the frozen __init__ (object.__setattr__)
+        _DATA_SLOT.__set__(self, value)
+    
+    @property
+    def data_loaded(self) -> bool:
+        """Whether the payload has been decoded already."""
+        return _DATA_SLOT.__get__(self, LazyEvent) is not _UNLOADED
+
+
+# eq=False keeps Event's __eq__/__hash__ (a generated hash would hash data)
+@dataclass(frozen=True, slots=True, eq=False)
 class TradeEvent(Event):
     """Event representing a trade operation.
     
@@ -106,7 +218,7 @@ class TradeEvent(Event):
     # status: str ("PENDING", "EXECUTED", "CANCELLED")
 
 
-@dataclass
+@dataclass(frozen=True, slots=True, eq=False)
 class CacheEvent(Event):
     """Event representing a cache operation.
     
@@ -115,6 +227,7 @@ class CacheEvent(Event):
         - Cache miss
         - Cache invalidation
         - Cache eviction
+        - Periodic metrics summary (CACHE_METRICS)
     """
     
     event_type: str = field(default=EventType.CACHE_HIT)
@@ -126,7 +239,7 @@ class CacheEvent(Event):
     # ttl: int (for SET operations)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True, eq=False)
 class SystemEvent(Event):
     """Event representing a system-level event.
     
@@ -253,3 +366,192 @@ def create_system_event(
         },
         user_id=user_id
     )
+
+
+# ============================================================================
+# Batch Factories
+# ============================================================================
+
+# Column order of event row tuples (matches the events table)
+EVENT_ROW_FIELDS = ('event_id', 'event_type', 'aggregate_id', 'timestamp', 'data', 'version', 'user_id')
+
+EventRow = Tuple[str, str, str, datetime, Dict[str, Any], int, Optional[str]]
+
+
+def _column(values: Any, size: int, name: str) -> List[Any]:
+    """Normalize a column (list, NumPy array or scalar) to a Python list.
+
+    Scalars (including strings, None and NumPy scalars) are repeated
+    ``size`` times. NumPy values are converted with ``tolist()`` first so
+    payloads hold native Python types and stay JSON serializable.
+    """
+    if hasattr(values, 'tolist'):
+        # Arrays become lists; NumPy scalars and 0-d arrays Python scalars
+        values = values.tolist()
+    if values is None or isinstance(values, (str, bytes, Number, Enum)):
+        return [values] * size
+    values = list(values)
+    if len(values) != size:
+        raise ValueError(f"Column '{name}' has {len(values)} values, expected {size}")
+    return values
+
+
+def _build_batch(
+    cls: type,
+    event_types: List[Any],
+    aggregate_ids: List[str],
+    payloads: List[Dict[str, Any]],
+    user_ids: List[Optional[str]],
+    timestamps: Any,
+    as_rows: bool
+) -> Union[List[Event], List[EventRow]]:
+    """Assemble events or row tuples from normalized columns."""
+    size = len(payloads)
+    if timestamps is None:
+        timestamps = [datetime.utcnow()] * size
+    else:
+        timestamps = _column(timestamps, size, 'timestamps')
+    event_types = [getattr(t, 'value', t) for t in event_types]
+    event_ids = [new_event_id() for _ in range(size)]
+
+    rows = zip(event_ids, event_types, aggregate_ids, timestamps, payloads, [1] * size, user_ids)
+    if as_rows:
+        return list(rows)
+    # Positional construction skips the keyword/default-factory overhead
+    return [cls(*row) for row in rows]
+
+
+def create_trade_events(
+    aggregate_ids: Sequence[str],
+    event_type: Any,
+    symbols: Any,
+    prices: Any,
+    quantities: Any,
+    sides: Any,
+    statuses: Any,
+    user_ids: Any = None,
+    timestamps: Any = None,
+    as_rows: bool = False
+) -> Union[List[TradeEvent], List[EventRow]]:
+    """Create trade events from column arrays.
+    
+    Every argument except ``aggregate_ids`` may be a list, a NumPy array
+    or a scalar shared by all rows.
+    
+    Args:
+        aggregate_ids: Trade IDs
+        event_type: Type(s) of trade event
+        symbols: Trading pair symbols
+        prices: Trade prices
+        quantities: Trade quantities
+        sides: Buy or sell
+        statuses: Trade statuses
+        user_ids: Users who initiated the trades
+        timestamps: Event times (default: now, shared by the batch)
+        as_rows: Return row tuples (EVENT_ROW_FIELDS order) for
+            EventStore.append_rows instead of TradeEvent objects
+    
+    Returns:
+        List of TradeEvent instances or row tuples
+    """
+    aggregate_ids = _column(aggregate_ids, len(aggregate_ids), 'aggregate_ids')
+    size = len(aggregate_ids)
+    payloads = [
+        {'symbol': symbol, 'price': price, 'quantity': quantity, 'side': side, 'status': status}
+        for symbol, price, quantity, side, status in zip(
+            _column(symbols, size, 'symbols'),
+            _column(prices, size, 'prices'),
+            _column(quantities, size, 'quantities'),
+            _column(sides, size, 'sides'),
+            _column(statuses, size, 'statuses')
+        )
+    ]
+    return _build_batch(
+        TradeEvent, _column(event_type, size, 'event_type'), aggregate_ids, payloads,
+        _column(user_ids, size, 'user_ids'), timestamps, as_rows
+    )
+
+
+def create_cache_events(
+    aggregate_ids: Sequence[str],
+    event_type: Any,
+    cache_keys: Any,
+    operations: Any,
+    hits: Any = None,
+    user_ids: Any = None,
+    timestamps: Any = None,
+    as_rows: bool = False
+) -> Union[List[CacheEvent], List[EventRow]]:
+    """Create cache events from column arrays.
+    
+    Args:
+        aggregate_ids: Cache aggregate IDs
+        event_type: Type(s) of cache event
+        cache_keys: Cache keys
+        operations: Operation types (GET, SET, DELETE, etc)
+        hits: Whether each GET was a hit (None entries are omitted)
+        user_ids: Optional user identifiers
+        timestamps: Event times (default: now, shared by the batch)
+        as_rows: Return row tuples instead of CacheEvent objects
+    
+    Returns:
+        List of CacheEvent instances or row tuples
+    """
+    aggregate_ids = _column(aggregate_ids, len(aggregate_ids), 'aggregate_ids')
+    size = len(aggregate_ids)
+    payloads = []
+    for cache_key, operation, hit in zip(
+        _column(cache_keys, size, 'cache_keys'),
+        _column(operations, size, 'operations'),
+        _column(hits, size, 'hits')
+    ):
+        data = {'cache_key': cache_key, 'operation': operation}
+        if hit is not None:
+            data['hit'] = hit
+        payloads.append(data)
+    return _build_batch(
+        CacheEvent, _column(event_type, size, 'event_type'), aggregate_ids, payloads,
+        _column(user_ids, size, 'user_ids'), timestamps, as_rows
+    )
+
+
+def create_system_events(
+    event_type: Any,
+    levels: Any,
+    messages: Sequence[str],
+    components: Any,
+    error_codes: Any = None,
+    user_ids: Any = None,
+    timestamps: Any = None,
+    as_rows: bool = False
+) -> Union[List[SystemEvent], List[EventRow]]:
+    """Create system events from column arrays.
+    
+    Args:
+        event_type: Type(s) of system event
+        levels: Event levels (INFO, WARNING, ERROR, CRITICAL)
+        messages: Human-readable messages (sets the batch size)
+        components: Components that generated the events
+        error_codes: Optional error codes
+        user_ids: Optional user identifiers
+        timestamps: Event times (default: now, shared by the batch)
+        as_rows: Return row tuples instead of SystemEvent objects
+    
+    Returns:
+        List of SystemEvent instances or row tuples
+    """
+    messages = _column(messages, len(messages), 'messages')
+    size = len(messages)
+    components = _column(components, size, 'components')
+    payloads = [
+        {'level': level, 'message': message, 'component': component, 'error_code': error_code}
+        for level, message, component, error_code in zip(
+            _column(levels, size, 'levels'), messages, components,
+            _column(error_codes, size, 'error_codes')
+        )
+    ]
+    return _build_batch(
+        SystemEvent, _column(event_type, size, 'event_type'),
+        [f"sys:{component}" for component in components], payloads,
+        _column(user_ids, size, 'user_ids'), timestamps, as_rows
+    )
@@ -4,12 +4,16 @@ Event Processor for replaying events and building materialized views.
 Handles event sourcing replay logic and state reconstruction.
 """
 
-from typing import Dict, Any, List, Optional, Callable
-from datetime import datetime
+from typing import Dict, Any, List, Optional, Callable, Tuple
+from datetime import datetime, timedelta
 from collections import defaultdict
 
 from .event_models import Event, EventType, TradeEvent, CacheEvent, SystemEvent
 from .event_store import EventStore
+from .portfolio_projection import PortfolioProjection
+from .projection_registry import ProjectionRegistry
+from .projection_store import ProjectionStore
+from .event_stats import EventStatsRecorder
 
 
 class EventProcessor:
@@ -19,13 +23,32 @@ class EventProcessor:
     Can reconstruct state at any point in time by replaying events.
     """
     
-    def __init__(self, event_store: EventStore):
+    def __init__(
+        self,
+        event_store: EventStore,
+        portfolio: Optional[PortfolioProjection] = None,
+        stats: Optional[EventStatsRecorder] = None,
+        materialized: Optional[ProjectionStore] = None,
+        projection_overlap: float = 5.0
+    ):
         """Initialize EventProcessor with an event store.
         
         Args:
             event_store: EventStore instance for retrieving events
+            portfolio: Optional shared PortfolioProjection (kept across
+                requests so it only loads new events on refresh)
+            stats: Optional Redis-backed EventStatsRecorder subscribed to
+                the store (None = always compute statistics in SQL)
+            materialized: Optional ProjectionStore kept current on append
+                (None = always replay aggregate projections)
+            projection_overlap: Seconds re-read before the projection
+                cursors on every run_projections() call (how late an
+                event may commit and still be delivered)
         """
         self.event_store = event_store
+        self.portfolio = portfolio or PortfolioProjection(event_store)
+        self.stats = stats
+        self.materialized = materialized
         self.event_handlers: Dict[str, Callable] = {
             EventType.TRADE_CREATED: self._handle_trade_created,
             EventType.TRADE_EXECUTED: self._handle_trade_executed,
@@ -34,6 +57,8 @@ class EventProcessor:
             EventType.CACHE_MISS: self._handle_cache_miss,
             EventType.CACHE_INVALIDATED: self._handle_cache_invalidated,
         }
+        self.projections = ProjectionRegistry()
+        self.projection_overlap = timedelta(seconds=projection_overlap)
     
     def replay_events(self, aggregate_id: str) -> Dict[str, Any]:
         """Replay all events for an aggregate to reconstruct current state.
@@ -45,22 +70,70 @@ class EventProcessor:
             Current state after replaying all events
         """
         events = self.event_store.get_events_by_aggregate(aggregate_id)
+        state = self.project_events(aggregate_id, events)
         
-        state = {
-            'aggregate_id': aggregate_id,
-            'version': 0,
-            'status': 'initialized',
-            'created_at': datetime.utcnow().isoformat(),
-            'event_count': 0,
-            'events': []
-        }
+        print(f"✅ Replayed {len(events)} events for {aggregate_id}")
+        return state
+    
+    def project_events(
+        self,
+        aggregate_id: str,
+        events: List[Event],
+        state: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Build aggregate state from already loaded events.
+        
+        Args:
+            aggregate_id: Aggregate ID the events belong to
+            events: Events of the aggregate in chronological order
+            state: Projected state of the events before these ones
+                (None = project from the start of the stream)
+        
+        Returns:
+            State after applying all events
+        """
+        if state is None:
+            state = {
+                'aggregate_id': aggregate_id,
+                'version': 0,
+                'status': 'initialized',
+                'created_at': datetime.utcnow().isoformat(),
+                'event_count': 0,
+                'events': []
+            }
         
         for event in events:
             state = self._apply_event(state, event)
         
-        print(f"✅ Replayed {len(events)} events for {aggregate_id}")
         return state
     
+    def projection_row(
+        self,
+        aggregate_id: str,
+        events: List[Event],
+        state: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Build the projection table row of an aggregate from its stream.
+        
+        Args:
+            aggregate_id: Aggregate ID the events belong to
+            events: Events of the aggregate in chronological order
+            state: Stored state the events follow (None = events are the
+                whole stream)
+        
+        Returns:
+            Row for ProjectionStore (state, version, event_count, ...)
+        """
+        state = self.project_events(aggregate_id, events, state)
+        return {
+            'aggregate_id': aggregate_id,
+            'state': state,
+            'version': state['version'],
+            'event_count': state['event_count'],
+            'last_event_time': events[-1].timestamp if events else None,
+            'rebuilt_at': datetime.utcnow(),
+        }
+    
     def replay_events_until(
         self,
         aggregate_id: str,
@@ -198,6 +271,24 @@ class EventProcessor:
     # Materialized Views / Projections
     # ========================================================================
     
+    def get_projection(self, aggregate_id: str) -> Dict[str, Any]:
+        """Get the current state of an aggregate.
+        
+        Read from the materialized projection table when one is
+        configured; aggregates not materialized yet are replayed.
+        
+        Args:
+            aggregate_id: Aggregate ID
+        
+        Returns:
+            Current state of the aggregate
+        """
+        if self.materialized is not None:
+            state = self.materialized.get(aggregate_id)
+            if state is not None:
+                return state
+        return self.replay_events(aggregate_id)
+    
     def get_trade_projection(self, trade_id: str) -> Dict[str, Any]:
         """Get materialized view of a trade's current state.
         
@@ -207,7 +298,7 @@ class EventProcessor:
         Returns:
             Trade state
         """
-        return self.replay_events(f"trade:{trade_id}")
+        return self.get_projection(f"trade:{trade_id}")
     
     def get_cache_projection(self, cache_key: str) -> Dict[str, Any]:
         """Get materialized view of cache activity.
@@ -218,15 +309,104 @@ class EventProcessor:
         Returns:
             Cache state and statistics
         """
-        return self.replay_events(f"cache:{cache_key}")
+        return self.get_projection(f"cache:{cache_key}")
+    
+    def register_projection(
+        self,
+        name: str,
+        handlers: Dict[str, Callable[[Event], None]],
+        on_batch_end: Optional[Callable[[], None]] = None
+    ) -> None:
+        """Register a projection fed by run_projections().
+        
+        The projection gets its own cursor: the next run delivers it the
+        whole history of its event types, then only new events.
+        
+        Args:
+            name: Unique projection name
+            handlers: Mapping of event type to handler(event), in the same
+                shape as event_handlers
+            on_batch_end: Optional callback run after each batch
+        """
+        self.projections.register(name, handlers, on_batch_end)
+    
+    def run_projections(self, batch_size: int = 1000) -> int:
+        """Feed all registered projections from the event store in one pass.
+        
+        Loads only the event types some projection subscribes to, starting
+        at the oldest projection cursor (from the start if a projection is
+        new), and dispatches each batch once to every subscriber. Timestamps
+        are set by the writer, so an event can commit behind a cursor; the
+        last projection_overlap seconds are re-read every call and event
+        IDs a projection already received are skipped.
+        
+        Args:
+            batch_size: Number of events loaded per store round trip
+        
+        Returns:
+            int: Number of events dispatched
+        """
+        event_types = self.projections.event_types()
+        if not event_types:
+            return 0
+        
+        overlap = self.projection_overlap
+        after = self.projections.start(overlap)
+        dispatched = 0
+        while True:
+            batch = self.event_store.get_events_after(
+                after=after,
+                event_types=event_types,
+                limit=batch_size
+            )
+            if not batch:
+                break
+            
+            dispatched += self.projections.dispatch(batch, overlap=overlap)
+            last = batch[-1]
+            after = (last.timestamp, last.event_id)
+            self.projections.advance(after, overlap)
+            
+            if len(batch) < batch_size:
+                break
+        
+        return dispatched
+    
+    def get_portfolio_projection(self) -> Dict[str, Any]:
+        """Get per-symbol portfolio view across all trade events.
+        
+        Incrementally loads trade events appended since the last call
+        into the columnar PortfolioProjection before aggregating.
+        
+        Returns:
+            Per-symbol net position, average cost, notional and realized P&L
+        """
+        self.portfolio.refresh()
+        return self.portfolio.summary()
     
     def get_aggregate_stats(self) -> Dict[str, Any]:
         """Get statistics across all aggregates.
         
+        Served from Redis counters in one round trip when an
+        EventStatsRecorder is configured. Falls back to scanning the
+        event store when Redis is unavailable, seeding the counters on
+        the way if Redis is reachable but not initialized yet.
+        
         Returns:
             Dictionary with aggregate statistics
         """
-        all_events = self.event_store.get_all_events()
+        if self.stats is not None:
+            stats = self.stats.get_stats()
+            if stats is not None:
+                return stats
+        
+        # Begun before the scan: batches recorded meanwhile are journaled
+        # and replayed by the seed when the scan missed them
+        marker = self.stats.begin_rebuild() if self.stats is not None else None
+        all_events = self.event_store.get_events_lazy()
+        
+        if marker is not None:
+            self.stats.rebuild(all_events, marker)
         
         stats = {
             'total_events': len(all_events),
@@ -247,6 +427,7 @@ class EventProcessor:
         # Convert defaultdicts to regular dicts
         stats['events_by_type'] = dict(stats['events_by_type'])
         stats['events_by_aggregate'] = dict(stats['events_by_aggregate'])
+        stats['source'] = 'sql'
         
         return stats
     
@@ -259,7 +440,7 @@ class EventProcessor:
         Returns:
             List of event metadata in chronological order
         """
-        events = self.event_store.get_events_by_aggregate(aggregate_id)
+        events = self.event_store.get_events_lazy(aggregate_id=aggregate_id)
         
         timeline = []
         for event in events:
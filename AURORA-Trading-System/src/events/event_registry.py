@@ -0,0 +1,200 @@
+# Event Type Registry for AURORA Trading System
+"""
+Type-preserving event codec registry.
+Maps event_type to its Event subclass and a precompiled decoder, and
+upcasts payloads of older schema versions to the current one.
+"""
+
+from typing import Any, Callable, Dict, Optional, Tuple, Type, Union
+from datetime import datetime
+
+from .event_models import Event, EventType, LazyEvent, TradeEvent, CacheEvent, SystemEvent
+
+
+Upcaster = Callable[[Dict[str, Any]], Dict[str, Any]]
+Decoder = Callable[[str, str, str, datetime, Dict[str, Any], int, Optional[str]], Event]
+
+
+def _compile_decoder(cls: Type[Event]) -> Decoder:
+    """Build a decoder constructing cls positionally (fields share Event's order)."""
+    def decode(event_id, event_type, aggregate_id, timestamp, data, version, user_id):
+        return cls(event_id, event_type, aggregate_id, timestamp, data, version, user_id)
+    return decode
+
+
+def _lazy_class(cls: Type[Event]) -> Type[LazyEvent]:
+    """Build the LazyEvent variant of an event class (an instance of both)."""
+    if issubclass(cls, LazyEvent):
+        return cls
+    if cls is Event:
+        return LazyEvent
+    return type(f"Lazy{cls.__name__}", (LazyEvent, cls), {'__slots__': (), '__module__': cls.__module__})
+
+
+class EventTypeRegistry:
+    """Registry mapping event types to classes, decoders and upcasters.
+
+    Decoding looks up the precompiled decoder for the row's event type
+    in one dict access and constructs the right subclass directly.
+    Unregistered types decode to ``default_class``. Lazy reads get a
+    LazyEvent subclass of the registered class, upcast on first access.
+
+    Schema versioning uses the ``version`` field: a type registered with
+    ``version=N`` upcasts stored payloads of version v < N through the
+    upcasters registered for v, v+1, ..., N-1. The chain for a given
+    (type, version) is composed lazily on first use and cached, so events
+    already at the current version pay nothing.
+    """
+
+    def __init__(self, default_class: Type[Event] = Event):
+        """Initialize an empty registry.
+
+        Args:
+            default_class: Class used for unregistered event types
+        """
+        self._default_class = default_class
+        self._default_decoder = _compile_decoder(default_class)
+        self._default_lazy_class = _lazy_class(default_class)
+        self._classes: Dict[str, Type[Event]] = {}
+        self._decoders: Dict[str, Decoder] = {}
+        self._lazy_classes: Dict[str, Type[LazyEvent]] = {}
+        self._versions: Dict[str, int] = {}
+        self._upcasters: Dict[Tuple[str, int], Upcaster] = {}
+        self._chains: Dict[Tuple[str, int], Upcaster] = {}
+
+    def register(self, event_type: str, cls: Type[Event], version: int = 1) -> None:
+        """Register the class and current schema version of an event type.
+
+        Args:
+            event_type: Event type string
+            cls: Event subclass to decode into
+            version: Current schema version of the payload
+        """
+        self._classes[event_type] = cls
+        self._decoders[event_type] = _compile_decoder(cls)
+        self._lazy_classes[event_type] = _lazy_class(cls)
+        self._versions[event_type] = version
+        self._chains.clear()
+
+    def register_upcaster(self, event_type: str, from_version: int, upcaster: Upcaster) -> None:
+        """Register a payload migration from one version to the next.
+
+        Args:
+            event_type: Event type string
+            from_version: Version the upcaster reads (produces from_version + 1)
+            upcaster: Callable taking and returning the payload dict
+        """
+        self._upcasters[(event_type, from_version)] = upcaster
+        self._chains.clear()
+
+    def class_for(self, event_type: str) -> Type[Event]:
+        """Get the class registered for an event type (default_class if unknown)."""
+        return self._classes.get(event_type, self._default_class)
+
+    def current_version(self, event_type: str) -> int:
+        """Get the current schema version of an event type."""
+        return self._versions.get(event_type, 1)
+
+    def _chain(self, event_type: str, from_version: int) -> Upcaster:
+        """Get (composing on first use) the upcast chain to the current version.
+
+        Raises:
+            ValueError: If an intermediate upcaster is missing
+        """
+        key = (event_type, from_version)
+        chain = self._chains.get(key)
+        if chain is not None:
+            return chain
+
+        steps = []
+        for version in range(from_version, self.current_version(event_type)):
+            upcaster = self._upcasters.get((event_type, version))
+            if upcaster is None:
+                raise ValueError(
+                    f"No upcaster for {event_type} from version {version}"
+                )
+            steps.append(upcaster)
+
+        def chain(data: Dict[str, Any]) -> Dict[str, Any]:
+            for step in steps:
+                data = step(data)
+            return data
+
+        self._chains[key] = chain
+        return chain
+
+    def decode(
+        self,
+        event_id: str,
+        event_type: str,
+        aggregate_id: str,
+        timestamp: datetime,
+        data: Dict[str, Any],
+        version: int,
+        user_id: Optional[str]
+    ) -> Event:
+        """Build the typed event for a stored row.
+
+        Returns:
+            Instance of the registered class, upcast to the current version
+        """
+        current = self._versions.get(event_type)
+        if current is not None and version < current:
+            data = self._chain(event_type, version)(data)
+            version = current
+
+        decoder = self._decoders.get(event_type, self._default_decoder)
+        return decoder(event_id, event_type, aggregate_id, timestamp, data, version, user_id)
+
+    def decode_lazy(
+        self,
+        event_id: str,
+        event_type: str,
+        aggregate_id: str,
+        timestamp: datetime,
+        version: int,
+        user_id: Optional[str],
+        raw_data: Union[str, bytes, None] = None,
+        loader: Optional[Callable[[], Union[str, bytes, None]]] = None
+    ) -> LazyEvent:
+        """Build the typed lazy event for a stored row.
+
+        Args:
+            raw_data: Raw JSON payload selected with the row
+            loader: Callable fetching the raw payload on demand
+
+        Returns:
+            LazyEvent instance of the registered class whose payload is
+            upcast to the current version when first accessed
+        """
+        upcast = None
+        current = self._versions.get(event_type)
+        if current is not None and version < current:
+            upcast = self._chain(event_type, version)
+            version = current
+
+        cls = self._lazy_classes.get(event_type, self._default_lazy_class)
+        return cls(
+            raw_data=raw_data,
+            loader=loader,
+            upcast=upcast,
+            event_id=event_id,
+            event_type=event_type,
+            aggregate_id=aggregate_id,
+            timestamp=timestamp,
+            version=version,
+            user_id=user_id
+        )
+
+
+# Global registry with the built-in event types
+event_registry = EventTypeRegistry()
+
+for _event_type in (EventType.TRADE_CREATED, EventType.TRADE_EXECUTED, EventType.TRADE_CANCELLED):
+    event_registry.register(_event_type.value, TradeEvent)
+for _event_type in (
+    EventType.CACHE_HIT, EventType.CACHE_MISS, EventType.CACHE_INVALIDATED, EventType.CACHE_METRICS
+):
+    event_registry.register(_event_type.value, CacheEvent)
+for _event_type in (EventType.SYSTEM_STARTUP, EventType.SYSTEM_SHUTDOWN, EventType.SYSTEM_ERROR):
+    event_registry.register(_event_type.value, SystemEvent)
@@ -0,0 +1,344 @@
+# Event Statistics for AURORA Trading System
+"""
+Real-time event statistics maintained in Redis.
+Counters are updated on append so /events/stats never scans PostgreSQL.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from collections import Counter
+from datetime import datetime, timezone
+import json
+import time
+
+import redis
+
+from src.cache.redis_client import redis_client
+from src.cache.single_flight import acquire_lock, release_lock
+from .event_models import Event
+
+
+# Counter keys replaced as a whole when seeding (rate:* buckets aside)
+COUNTER_KEYS = ("total", "by_type", "by_aggregate", "bounds")
+SEED_LOCK_TIMEOUT = 300.0  # seconds
+SEED_SWITCH_ATTEMPTS = 20
+SEED_SWITCH_RETRY = 0.05  # seconds between switch attempts
+
+# (event_id, event_type, aggregate_id, epoch seconds) of a recorded event
+Row = Tuple[str, str, str, float]
+# (seed token, writes counter when the seed began)
+SeedMarker = Tuple[str, int]
+
+
+def _epoch(timestamp: datetime) -> float:
+    """Convert a naive UTC datetime to epoch seconds."""
+    return timestamp.replace(tzinfo=timezone.utc).timestamp()
+
+
+def _from_epoch(seconds: float) -> datetime:
+    """Convert epoch seconds to a naive UTC datetime."""
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).replace(tzinfo=None)
+
+
+class EventStatsRecorder:
+    """Event statistics kept in Redis and updated per appended batch.
+
+    Keys (under ``prefix``):
+        total: Total number of events (string counter)
+        by_type: Per event type totals (hash)
+        by_aggregate: Per aggregate counts (sorted set, bounded top-K)
+        bounds: First/last event epoch (sorted set, updated with LT/GT)
+        rate:<minute>: Events per minute bucket (string counter with TTL)
+        writes: Number of batches recorded (numbers journaled batches)
+        seeding: Token of the seed in progress (batches are journaled)
+        journal: Batches recorded during a seed (hash of write number
+            to event rows, replayed by the seed for events its scan missed)
+        ready: Set once counters were seeded from the event store
+
+    Each batch is written in a single MULTI/EXEC pipeline and all stats
+    are read back in one round trip. The per-aggregate ranking keeps at
+    most ``top_k * 4`` members, evicting the smallest counts, so counts
+    of rarely seen aggregates are approximate.
+
+    The default prefix carries a ``{hash tag}`` so all keys live on one
+    node of a sharded cache (seeding renames keys into place).
+    """
+    
+    REBUILD_BATCH_SIZE = 10000
+
+    def __init__(
+        self,
+        client=None,
+        prefix: str = "stats:{events}:",
+        top_k: int = 100,
+        rate_window_minutes: int = 60
+    ):
+        """Initialize EventStatsRecorder.
+
+        Args:
+            client: redis-py client (defaults to the global RedisClient's)
+            prefix: Key prefix for all statistics keys
+            top_k: Number of most active aggregates reported
+            rate_window_minutes: Number of per-minute buckets kept and read
+        """
+        if client is None and redis_client is not None:
+            client = redis_client.client
+        self.client = client
+        self.prefix = prefix
+        self.top_k = top_k
+        self.rate_window_minutes = rate_window_minutes
+
+    def _key(self, name: str) -> str:
+        """Build a statistics key."""
+        return f"{self.prefix}{name}"
+
+    # ========================================================================
+    # Write path
+    # ========================================================================
+
+    @staticmethod
+    def _rows(events: List[Event]) -> List[Row]:
+        """Reduce events to the fields the counters need."""
+        return [
+            (e.event_id, getattr(e.event_type, 'value', e.event_type), e.aggregate_id, _epoch(e.timestamp))
+            for e in events
+        ]
+
+    def _write_counters(self, pipe: Any, rows: List[Row], prefix: str) -> None:
+        """Queue the counter updates of a batch of event rows on a pipeline."""
+        by_type = Counter(event_type for _, event_type, _, _ in rows)
+        by_aggregate = Counter(aggregate_id for _, _, aggregate_id, _ in rows)
+        epochs = [epoch for _, _, _, epoch in rows]
+        by_minute = Counter(int(epoch // 60) for epoch in epochs)
+        rate_ttl = self.rate_window_minutes * 60 * 2
+
+        pipe.incrby(f"{prefix}total", len(rows))
+        for event_type, count in by_type.items():
+            pipe.hincrby(f"{prefix}by_type", event_type, count)
+        for aggregate_id, count in by_aggregate.items():
+            pipe.zincrby(f"{prefix}by_aggregate", count, aggregate_id)
+        pipe.zremrangebyrank(f"{prefix}by_aggregate", 0, -(self.top_k * 4) - 1)
+        pipe.zadd(f"{prefix}bounds", {"first": min(epochs)}, lt=True)
+        pipe.zadd(f"{prefix}bounds", {"last": max(epochs)}, gt=True)
+        for minute, count in by_minute.items():
+            pipe.incrby(f"{prefix}rate:{minute}", count)
+            pipe.expire(f"{prefix}rate:{minute}", rate_ttl)
+
+    def record(self, events: Iterable[Event]) -> bool:
+        """Record a batch of appended events.
+
+        While a seed is in progress the batch is also journaled, so the
+        seed can replay it if its scan missed the events.
+
+        Args:
+            events: Events that were committed to the store
+
+        Returns:
+            bool: True if counters were updated
+        """
+        rows = self._rows(list(events))
+        if self.client is None or not rows:
+            return False
+
+        try:
+            pipe = self.client.pipeline(transaction=True)
+            self._write_counters(pipe, rows, self.prefix)
+            pipe.incrby(self._key("writes"), 1)
+            pipe.get(self._key("seeding"))
+            write, seeding = pipe.execute()[-2:]
+            if seeding:
+                pipe = self.client.pipeline(transaction=False)
+                pipe.hset(self._key("journal"), str(write), json.dumps(rows))
+                pipe.expire(self._key("journal"), int(SEED_LOCK_TIMEOUT))
+                pipe.execute()
+            return True
+        except Exception as e:
+            print(f"❌ Error recording event stats: {e}")
+            return False
+
+    def begin_rebuild(self) -> Optional[SeedMarker]:
+        """Start seeding: take the seed lock and journal batches from now on.
+
+        Call it before scanning the store and pass the result to rebuild().
+
+        Returns:
+            Seed marker, or None if Redis is unavailable or another worker
+            is seeding
+        """
+        if self.client is None:
+            return None
+        token = acquire_lock(self._key("seed"), SEED_LOCK_TIMEOUT, self.client)
+        if token is None:
+            return None
+        try:
+            pipe = self.client.pipeline(transaction=True)
+            pipe.set(self._key("seeding"), token, ex=int(SEED_LOCK_TIMEOUT))
+            pipe.delete(self._key("journal"))
+            pipe.get(self._key("writes"))
+            return token, int(pipe.execute()[-1] or 0)
+        except Exception as e:
+            print(f"❌ Error starting event stats seed: {e}")
+            release_lock(self._key("seed"), token, self.client)
+            return None
+
+    def rebuild(self, events: Iterable[Event], marker: Optional[SeedMarker] = None) -> bool:
+        """Seed the counters from a full scan of the store.
+
+        Counters are built under temporary keys and renamed into place in
+        one MULTI/EXEC, so readers never see partial counters. Batches
+        recorded since begin_rebuild() were journaled; the ones whose
+        events the scan did not contain are applied in the same MULTI, so
+        steady write traffic never aborts the seed. A Redis lock keeps
+        workers from seeding at the same time.
+
+        Args:
+            events: All events currently in the store
+            marker: begin_rebuild() result, taken before the scan (None =
+                begin now; events must then be read after this call)
+
+        Returns:
+            bool: True if counters were seeded
+        """
+        if marker is None:
+            marker = self.begin_rebuild()
+            if marker is None:
+                return False
+        token, first_write = marker
+        staging = self._key(f"staging:{token}:")
+
+        try:
+            events = list(events)
+            scanned = {event.event_id for event in events}
+            for start in range(0, len(events), self.REBUILD_BATCH_SIZE):
+                pipe = self.client.pipeline(transaction=False)
+                self._write_counters(pipe, self._rows(events[start:start + self.REBUILD_BATCH_SIZE]), staging)
+                for name in COUNTER_KEYS:  # dropped if the process dies before the switch
+                    pipe.expire(f"{staging}{name}", int(SEED_LOCK_TIMEOUT))
+                pipe.execute()
+            staged = list(self.client.scan_iter(match=f"{staging}*", count=1000))
+
+            for _ in range(SEED_SWITCH_ATTEMPTS):
+                if self._switch(staging, staged, scanned, first_write):
+                    return True
+                time.sleep(SEED_SWITCH_RETRY)
+            print("⚠️ Event stats seed abandoned: batches recorded meanwhile were not journaled")
+            return False
+        except Exception as e:
+            print(f"❌ Error seeding event stats: {e}")
+            return False
+        finally:
+            try:
+                leftovers = list(self.client.scan_iter(match=f"{staging}*", count=1000))
+                self.client.delete(self._key("seeding"), self._key("journal"), *leftovers)
+            except Exception:
+                pass
+            release_lock(self._key("seed"), token, self.client)
+
+    def _switch(self, staging: str, staged: List[Any], scanned: set, first_write: int) -> bool:
+        """Move staged counters live plus the journaled batches the scan
+        missed (False to retry: a batch is still being journaled, or a
+        batch was recorded during the switch)."""
+        with self.client.pipeline() as pipe:
+            try:
+                pipe.watch(self._key("writes"))
+                writes = int(pipe.get(self._key("writes")) or 0)
+                journal = pipe.hgetall(self._key("journal"))
+                if len(journal) < writes - first_write:
+                    pipe.unwatch()
+                    return False
+                late = [
+                    tuple(row) for batch in journal.values() for row in json.loads(batch)
+                    if row[0] not in scanned
+                ]
+                live = [self._key(name) for name in COUNTER_KEYS]
+                live.extend(self.client.scan_iter(match=self._key("rate:*"), count=1000))
+                pipe.multi()
+                pipe.delete(*live)
+                for key in staged:
+                    name = key[len(staging):]
+                    pipe.rename(key, self._key(name))
+                    if name in COUNTER_KEYS:
+                        pipe.persist(self._key(name))
+                if late:
+                    self._write_counters(pipe, late, self.prefix)
+                pipe.delete(self._key("journal"), self._key("seeding"))
+                pipe.set(self._key("ready"), 1)
+                pipe.execute()
+                return True
+            except redis.WatchError:
+                return False
+
+    def reset(self) -> bool:
+        """Delete all statistics keys.
+
+        Returns:
+            bool: True if successful
+        """
+        if self.client is None:
+            return False
+        try:
+            keys = [self._key(name) for name in ("ready", "writes", "seeding", "journal") + COUNTER_KEYS]
+            keys.extend(self.client.scan_iter(match=self._key("rate:*"), count=1000))
+            self.client.delete(*keys)
+            return True
+        except Exception as e:
+            print(f"❌ Error resetting event stats: {e}")
+            return False
+
+    # ========================================================================
+    # Read path
+    # ========================================================================
+
+    @property
+    def available(self) -> bool:
+        """Whether a Redis client is configured."""
+        return self.client is not None
+
+    def get_stats(self) -> Optional[Dict[str, Any]]:
+        """Read all statistics in one round trip.
+
+        Returns:
+            Statistics dictionary, or None if Redis is unavailable or the
+            counters have not been seeded yet
+        """
+        if self.client is None:
+            return None
+
+        current_minute = int(_epoch(datetime.utcnow()) // 60)
+        minutes: List[int] = list(range(
+            current_minute - self.rate_window_minutes + 1, current_minute + 1
+        ))
+
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.exists(self._key("ready"))
+            pipe.get(self._key("total"))
+            pipe.hgetall(self._key("by_type"))
+            pipe.zrevrange(self._key("by_aggregate"), 0, self.top_k - 1, withscores=True)
+            pipe.zscore(self._key("bounds"), "first")
+            pipe.zscore(self._key("bounds"), "last")
+            pipe.mget([self._key(f"rate:{minute}") for minute in minutes])
+            ready, total, by_type, by_aggregate, first, last, rates = pipe.execute()
+        except Exception as e:
+            print(f"❌ Error reading event stats: {e}")
+            return None
+
+        if not ready:
+            return None
+
+        return {
+            'total_events': int(total or 0),
+            'events_by_type': {k: int(v) for k, v in by_type.items()},
+            'events_by_aggregate': {k: int(v) for k, v in by_aggregate},
+            'first_event_time': _from_epoch(first).isoformat() if first is not None else None,
+            'last_event_time': _from_epoch(last).isoformat() if last is not None else None,
+            'events_per_minute': {
+                _from_epoch(minute * 60).isoformat(): int(count)
+                for minute, count in zip(minutes, rates)
+                if count
+            },
+            'source': 'redis',
+        }
+
+
+# Global instance (subscribed to the global event store in event_store.py)
+event_stats = EventStatsRecorder()
@@ -4,13 +4,19 @@ Event Store implementation using PostgreSQL for persistence.
 Stores all domain events with immutability and append-only semantics.
 """
 
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Sequence, Tuple, Callable
 from datetime import datetime
-from sqlalchemy import Column, String, JSON, DateTime, Integer, Index
+from sqlalchemy import Column, String, JSON, DateTime, Integer, SmallInteger, Index, Text, and_, cast, func, insert, or_
 from sqlalchemy.exc import IntegrityError
 
+from src.cache.cache_manager import CacheManager
 from src.database.config import Base, SessionLocal
-from .event_models import Event, EventType
+from .event_models import Event, EventType, LazyEvent, EVENT_ROW_FIELDS
+from .event_registry import event_registry
+from .event_stats import event_stats
+from .event_type_codes import event_type_codes
+from .migrate_event_types import needs_migration
+from .projection_store import AggregateProjectionRecord, ProjectionMaterializer
 import json
 
 
@@ -25,8 +31,8 @@ class EventRecord(Base):
     # Primary key
     event_id = Column(String(36), primary_key=True, unique=True, nullable=False)
     
-    # Event metadata
-    event_type = Column(String(100), nullable=False, index=True)
+    # Event metadata (event type dictionary-encoded, see event_types)
+    event_type_code = Column(SmallInteger, nullable=False)
     aggregate_id = Column(String(100), nullable=False, index=True)
     
     # Temporal
@@ -44,23 +50,31 @@ class EventRecord(Base):
     # Indexes for common queries
     __table_args__ = (
         Index('idx_aggregate_timestamp', 'aggregate_id', 'timestamp'),
-        Index('idx_event_type_timestamp', 'event_type', 'timestamp'),
+        Index('idx_event_type_timestamp', 'event_type_code', 'timestamp'),
     )
     
+    @property
+    def event_type(self) -> str:
+        """Decoded event type name."""
+        return event_type_codes.name(self.event_type_code)
+    
     def to_event(self) -> Event:
-        """Convert database record to Event object.
+        """Convert database record to its typed Event object.
+        
+        The class (TradeEvent, CacheEvent, ...) is chosen by the event
+        type registry, which also upcasts older payload versions.
         
         Returns:
             Event instance with all data from record
         """
-        return Event(
-            event_id=self.event_id,
-            event_type=self.event_type,
-            aggregate_id=self.aggregate_id,
-            timestamp=self.timestamp,
-            data=self.data,
-            version=self.version,
-            user_id=self.user_id
+        return event_registry.decode(
+            self.event_id,
+            self.event_type,
+            self.aggregate_id,
+            self.timestamp,
+            self.data,
+            self.version,
+            self.user_id
         )
 
 
@@ -75,6 +89,30 @@ class EventStore:
         """Initialize EventStore."""
         # Create tables if they don't exist
         Base.metadata.create_all(bind=SessionLocal().get_bind())
+        if needs_migration():
+            print("⚠️  events table predates event type codes; run python -m src.events.migrate_event_types")
+        self.subscribers: List[Callable[[List[Event]], Any]] = []
+    
+    def subscribe(self, subscriber: Callable[[List[Event]], Any]) -> None:
+        """Register a callback notified after events are committed.
+        
+        Subscribers receive the list of appended events once per append
+        or append_many call. Subscriber errors never fail the append.
+        
+        Args:
+            subscriber: Callable taking a list of events
+        """
+        self.subscribers.append(subscriber)
+    
+    def _notify(self, events: List[Event]) -> None:
+        """Deliver committed events to all subscribers."""
+        if not events:
+            return
+        for subscriber in self.subscribers:
+            try:
+                subscriber(events)
+            except Exception as e:
+                print(f"❌ Event subscriber failed: {e}")
     
     def append(self, event: Event) -> bool:
         """Append a single event to the store.
@@ -88,12 +126,19 @@ class EventStore:
         Raises:
             IntegrityError: If event_id already exists
         """
+        if self._append(event):
+            self._notify([event])
+            return True
+        return False
+    
+    def _append(self, event: Event) -> bool:
+        """Persist a single event without notifying subscribers."""
         try:
             session = SessionLocal()
             
             record = EventRecord(
                 event_id=event.event_id,
-                event_type=event.event_type,
+                event_type_code=event_type_codes.code(event.event_type),
                 aggregate_id=event.aggregate_id,
                 timestamp=event.timestamp,
                 data=event.data,
@@ -128,11 +173,60 @@ class EventStore:
         Returns:
             int: Number of successfully appended events
         """
-        appended = 0
-        for event in events:
-            if self.append(event):
-                appended += 1
-        return appended
+        appended = [event for event in events if self._append(event)]
+        self._notify(appended)
+        return len(appended)
+    
+    def append_rows(
+        self,
+        rows: Sequence[Tuple],
+        chunk_size: int = 5000,
+        notify: bool = True
+    ) -> int:
+        """Bulk insert event row tuples in a single transaction.
+        
+        Rows are tuples in EVENT_ROW_FIELDS order, as produced by the
+        batch factories with ``as_rows=True``. They are inserted with one
+        executemany per chunk; a duplicate ID fails the whole call.
+        
+        Args:
+            rows: Event row tuples
+            chunk_size: Rows per INSERT statement
+            notify: Build events for subscribers. Without it nothing
+                derived from the log is updated: the live projection table
+                stays stale until ``python -m src.events.rebuild`` runs,
+                event statistics until EventStatsRecorder.rebuild and
+                cached event reads until they expire (for backfills that
+                rebuild afterwards)
+        
+        Returns:
+            int: Number of appended events (0 on failure)
+        """
+        if not rows:
+            return 0
+        
+        session = SessionLocal()
+        try:
+            statement = insert(EventRecord.__table__)
+            for start in range(0, len(rows), chunk_size):
+                params = []
+                for row in rows[start:start + chunk_size]:
+                    values = dict(zip(EVENT_ROW_FIELDS, row))
+                    values['event_type_code'] = event_type_codes.code(values.pop('event_type'))
+                    params.append(values)
+                session.execute(statement, params)
+            session.commit()
+        except Exception as e:
+            print(f"❌ Error appending event rows: {e}")
+            session.rollback()
+            return 0
+        finally:
+            session.close()
+        
+        print(f"✅ Appended {len(rows)} event rows")
+        if notify and self.subscribers:
+            self._notify([event_registry.decode(*row) for row in rows])
+        return len(rows)
     
     def get_event(self, event_id: str) -> Optional[Event]:
         """Retrieve a single event by ID.
@@ -181,7 +275,7 @@ class EventStore:
             if since:
                 query = query.filter(EventRecord.timestamp >= since)
             
-            records = query.order_by(EventRecord.timestamp).all()
+            records = query.order_by(EventRecord.timestamp, EventRecord.event_id).all()
             session.close()
             
             return [record.to_event() for record in records]
@@ -190,31 +284,164 @@ class EventStore:
             print(f"❌ Error retrieving events: {e}")
             return []
     
-    def get_events_by_type(self, event_type: str) -> List[Event]:
-        """Retrieve all events of a specific type.
+    def get_events_for_aggregates(
+        self,
+        aggregate_ids: Sequence[str],
+        strict: bool = False
+    ) -> Dict[str, List[Event]]:
+        """Retrieve the event streams of several aggregates in one query.
         
         Args:
-            event_type: Type of events to retrieve
+            aggregate_ids: Aggregate IDs to retrieve events for
+            strict: Raise store errors instead of returning empty streams
         
         Returns:
-            List of events of the specified type
+            Mapping of aggregate ID to its events in chronological order
         """
+        streams: Dict[str, List[Event]] = {aggregate_id: [] for aggregate_id in aggregate_ids}
+        if not streams:
+            return streams
+        
         try:
             session = SessionLocal()
             
             records = session.query(EventRecord)\
-                .filter(EventRecord.event_type == event_type)\
-                .order_by(EventRecord.timestamp)\
+                .filter(EventRecord.aggregate_id.in_(list(streams)))\
+                .order_by(EventRecord.aggregate_id, EventRecord.timestamp, EventRecord.event_id)\
+                .all()
+            session.close()
+            
+            for record in records:
+                streams[record.aggregate_id].append(record.to_event())
+            return streams
+            
+        except Exception as e:
+            if strict:
+                raise
+            print(f"❌ Error retrieving aggregate streams: {e}")
+            return streams
+    
+    def count_events_by_aggregate(
+        self,
+        aggregate_ids: Sequence[str],
+        strict: bool = False
+    ) -> Dict[str, int]:
+        """Count the events of several aggregates in one query.
+        
+        Args:
+            aggregate_ids: Aggregate IDs to count events for
+            strict: Raise store errors instead of returning no counts
+        
+        Returns:
+            Mapping of aggregate ID to its number of events (0 if none)
+        """
+        counts: Dict[str, int] = {aggregate_id: 0 for aggregate_id in aggregate_ids}
+        if not counts:
+            return counts
+        
+        try:
+            session = SessionLocal()
+            rows = session.query(EventRecord.aggregate_id, func.count(EventRecord.event_id))\
+                .filter(EventRecord.aggregate_id.in_(list(counts)))\
+                .group_by(EventRecord.aggregate_id)\
                 .all()
+            session.close()
+            counts.update(rows)
+            return counts
+            
+        except Exception as e:
+            if strict:
+                raise
+            print(f"❌ Error counting aggregate events: {e}")
+            return {}
+    
+    def get_aggregate_ids(
+        self,
+        after: Optional[str] = None,
+        since: Optional[datetime] = None,
+        strict: bool = False
+    ) -> List[str]:
+        """Retrieve distinct aggregate IDs in sorted order.
+        
+        Args:
+            after: Only return IDs sorting after this one
+            since: Only return aggregates with events at or after this time
+            strict: Raise store errors instead of returning an empty list
+        
+        Returns:
+            Sorted list of aggregate IDs
+        """
+        try:
+            session = SessionLocal()
+            
+            query = session.query(EventRecord.aggregate_id).distinct()
             
+            if after is not None:
+                query = query.filter(EventRecord.aggregate_id > after)
+            if since is not None:
+                query = query.filter(EventRecord.timestamp >= since)
+            
+            rows = query.order_by(EventRecord.aggregate_id).all()
             session.close()
             
-            return [record.to_event() for record in records]
+            return [row[0] for row in rows]
             
         except Exception as e:
-            print(f"❌ Error retrieving events by type: {e}")
+            if strict:
+                raise
+            print(f"❌ Error retrieving aggregate IDs: {e}")
             return []
     
+    def get_most_active_aggregates(
+        self,
+        limit: int = 20,
+        since: Optional[datetime] = None
+    ) -> List[Tuple[str, int]]:
+        """Retrieve the aggregates with the most events.
+        
+        Args:
+            limit: Maximum number of aggregates returned
+            since: Only count events at or after this time
+        
+        Returns:
+            List of (aggregate ID, event count), most active first
+        """
+        try:
+            session = SessionLocal()
+            
+            count = func.count(EventRecord.event_id)
+            query = session.query(EventRecord.aggregate_id, count)
+            if since is not None:
+                query = query.filter(EventRecord.timestamp >= since)
+            
+            rows = query.group_by(EventRecord.aggregate_id)\
+                .order_by(count.desc(), EventRecord.aggregate_id)\
+                .limit(limit)\
+                .all()
+            session.close()
+            
+            return [(aggregate_id, events) for aggregate_id, events in rows]
+            
+        except Exception as e:
+            print(f"❌ Error retrieving active aggregates: {e}")
+            return []
+    
+    def get_events_by_type(self, event_type: str, include_payload: bool = False) -> List[Event]:
+        """Retrieve all events of a specific type.
+        
+        Served by the lazy read path, so payloads are only decoded for
+        events whose ``data`` is accessed.
+        
+        Args:
+            event_type: Type of events to retrieve
+            include_payload: Select the raw payload text with the rows
+                (for callers that read ``data`` of every event)
+        
+        Returns:
+            List of events of the specified type
+        """
+        return self.get_events_lazy(event_type=event_type, include_payload=include_payload)
+    
     def get_all_events(self, limit: Optional[int] = None) -> List[Event]:
         """Retrieve all events in the store.
         
@@ -228,7 +455,7 @@ class EventStore:
             session = SessionLocal()
             
             query = session.query(EventRecord)\
-                .order_by(EventRecord.timestamp)
+                .order_by(EventRecord.timestamp, EventRecord.event_id)
             
             if limit:
                 query = query.limit(limit)
@@ -242,6 +469,161 @@ class EventStore:
             print(f"❌ Error retrieving all events: {e}")
             return []
     
+    def get_events_lazy(
+        self,
+        aggregate_id: Optional[str] = None,
+        event_type: Optional[str] = None,
+        since: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        include_payload: bool = False
+    ) -> List[LazyEvent]:
+        """Retrieve events with deferred payload decoding.
+        
+        Only metadata columns are selected by default; the payload of an
+        event is fetched from the store if its ``data`` is accessed. With
+        include_payload the raw JSON text is selected alongside and
+        decoded on first access instead.
+        
+        Args:
+            aggregate_id: Optional aggregate to filter by
+            event_type: Optional event type to filter by
+            since: Optional start datetime (events after this time)
+            limit: Optional limit on number of events to return
+            include_payload: Select the raw payload text with the rows
+        
+        Returns:
+            List of LazyEvent instances in chronological order, typed
+            and upcast through the event registry
+        """
+        columns = [
+            EventRecord.event_id,
+            EventRecord.event_type_code,
+            EventRecord.aggregate_id,
+            EventRecord.timestamp,
+            EventRecord.version,
+            EventRecord.user_id,
+        ]
+        if include_payload:
+            columns.append(cast(EventRecord.data, Text))
+        
+        try:
+            session = SessionLocal()
+            
+            query = session.query(*columns)
+            
+            if aggregate_id is not None:
+                query = query.filter(EventRecord.aggregate_id == aggregate_id)
+            if event_type is not None:
+                query = query.filter(
+                    EventRecord.event_type_code == event_type_codes.lookup(event_type)
+                )
+            if since is not None:
+                query = query.filter(EventRecord.timestamp >= since)
+            
+            query = query.order_by(EventRecord.timestamp, EventRecord.event_id)
+            if limit:
+                query = query.limit(limit)
+            
+            rows = query.all()
+            session.close()
+            
+        except Exception as e:
+            print(f"❌ Error retrieving lazy events: {e}")
+            return []
+        
+        events = []
+        for row in rows:
+            raw_data = row[6] if include_payload else None
+            loader = None if include_payload else self._payload_loader(row[0])
+            events.append(event_registry.decode_lazy(
+                row[0],
+                event_type_codes.name(row[1]),
+                row[2],
+                row[3],
+                row[4],
+                row[5],
+                raw_data=raw_data,
+                loader=loader
+            ))
+        return events
+    
+    def _payload_loader(self, event_id: str) -> Callable[[], Optional[str]]:
+        """Build a loader fetching one event's raw payload on demand."""
+        return lambda: self.get_event_payload(event_id)
+    
+    def get_event_payload(self, event_id: str) -> Optional[str]:
+        """Retrieve the raw JSON payload of a single event.
+        
+        Args:
+            event_id: ID of the event
+        
+        Returns:
+            Raw JSON text or None if not found
+        """
+        try:
+            session = SessionLocal()
+            
+            raw = session.query(cast(EventRecord.data, Text))\
+                .filter(EventRecord.event_id == event_id)\
+                .scalar()
+            
+            session.close()
+            return raw
+            
+        except Exception as e:
+            print(f"❌ Error retrieving event payload: {e}")
+            return None
+    
+    def get_events_after(
+        self,
+        after: Optional[Tuple[datetime, str]] = None,
+        event_types: Optional[Sequence[str]] = None,
+        limit: int = 1000
+    ) -> List[Event]:
+        """Retrieve the next page of events after a (timestamp, event_id) cursor.
+        
+        Keyset pagination over the (timestamp, event_id) order, so callers
+        can stream the log in batches and resume incrementally.
+        
+        Args:
+            after: Cursor of the last event already seen (None = from start)
+            event_types: Optional list of event types to include
+            limit: Maximum number of events to return
+        
+        Returns:
+            List of events in (timestamp, event_id) order
+        """
+        try:
+            session = SessionLocal()
+            
+            query = session.query(EventRecord)
+            
+            if event_types:
+                query = query.filter(
+                    EventRecord.event_type_code.in_(event_type_codes.lookup_many(event_types))
+                )
+            
+            if after is not None:
+                after_timestamp, after_event_id = after
+                query = query.filter(or_(
+                    EventRecord.timestamp > after_timestamp,
+                    and_(
+                        EventRecord.timestamp == after_timestamp,
+                        EventRecord.event_id > after_event_id
+                    )
+                ))
+            
+            records = query.order_by(EventRecord.timestamp, EventRecord.event_id)\
+                .limit(limit)\
+                .all()
+            session.close()
+            
+            return [record.to_event() for record in records]
+            
+        except Exception as e:
+            print(f"❌ Error retrieving events page: {e}")
+            return []
+    
     def get_event_count(self) -> int:
         """Get total number of events in store.
         
@@ -260,7 +642,8 @@ class EventStore:
     def clear(self) -> bool:
         """Clear all events from the store (DANGEROUS).
         
-        WARNING: This deletes all events. Use only for testing!
+        WARNING: This deletes all events and the projections derived
+        from them. Use only for testing!
         
         Returns:
             bool: True if successful
@@ -268,6 +651,7 @@ class EventStore:
         try:
             session = SessionLocal()
             session.query(EventRecord).delete()
+            session.query(AggregateProjectionRecord).delete()
             session.commit()
             session.close()
             print("⚠️  All events cleared!")
@@ -277,5 +661,21 @@ class EventStore:
             return False
 
 
-# Global instance
+def event_cache_tag(aggregate_id: str) -> str:
+    """Cache tag of everything derived from an aggregate's events."""
+    return f"events:{aggregate_id}"
+
+
+def invalidate_event_caches(events: List[Event]) -> None:
+    """Drop cached entries derived from the aggregates of appended events."""
+    CacheManager.invalidate_tags(*{event_cache_tag(event.aggregate_id) for event in events})
+
+
+# Global instance; read models subscribe here so they stay current
+# whichever module appends the events (cache invalidation runs after
+# the projection table is updated)
 event_store = EventStore()
+projection_materializer = ProjectionMaterializer(event_store)
+event_store.subscribe(projection_materializer)
+event_store.subscribe(event_stats.record)
+event_store.subscribe(invalidate_event_caches)
@@ -0,0 +1,159 @@
+# Event Type Codes for AURORA Trading System
+"""
+Dictionary encoding of event type names.
+The events table and its indexes store a small integer code per row;
+the code <-> name table is cached in process so the public API keeps
+working with strings.
+"""
+
+from typing import Dict, Iterable, List, Optional
+import threading
+import time
+
+from sqlalchemy import Column, SmallInteger, String
+from sqlalchemy.exc import IntegrityError
+
+from src.database.config import Base, SessionLocal
+from .event_models import EventType
+
+
+class EventTypeRecord(Base):
+    """SQLAlchemy model for the event type dictionary."""
+    __tablename__ = "event_types"
+
+    code = Column(SmallInteger, primary_key=True, autoincrement=False)
+    name = Column(String(100), nullable=False, unique=True)
+
+
+class EventTypeCodes:
+    """In-process cache of the event type dictionary.
+
+    Codes are assigned once (max + 1) and never change, so the cache
+    only grows: unknown names are inserted on write, unknown codes are
+    reloaded from the table. Built-in EventType members are seeded in
+    declaration order (before the first new name is registered) so they
+    get the same codes in every database. Concurrent writers registering
+    the same new name resolve through the unique constraints and a retry.
+    Names found missing on read are remembered for MISS_TTL seconds so
+    filters on never-stored types do not reload the table every call.
+    """
+
+    MAX_RETRIES = 5
+    MISS_TTL = 5.0  # seconds
+    MAX_MISSES = 1024  # names come from request filters, keep the map bounded
+
+    def __init__(self):
+        """Initialize an empty cache."""
+        self._lock = threading.Lock()
+        self._codes: Dict[str, int] = {}
+        self._names: Dict[int, str] = {}
+        self._misses: Dict[str, float] = {}
+        self._seeded = False
+
+    def _load(self) -> None:
+        """Reload the full dictionary from the database."""
+        session = SessionLocal()
+        try:
+            rows = session.query(EventTypeRecord.code, EventTypeRecord.name).all()
+        finally:
+            session.close()
+        self._codes = {name: code for code, name in rows}
+        self._names = {code: name for code, name in rows}
+
+    def seed(self) -> None:
+        """Register the built-in event types (idempotent)."""
+        self._seeded = True
+        try:
+            for event_type in EventType:
+                self.code(event_type.value)
+        except Exception:
+            self._seeded = False
+            raise
+
+    def code(self, name: str) -> int:
+        """Get the code of an event type, registering it if new.
+
+        Args:
+            name: Event type name (str or EventType)
+
+        Returns:
+            int: Event type code
+        """
+        name = getattr(name, 'value', name)
+        code = self._codes.get(name)
+        if code is not None:
+            return code
+        if not self._seeded:
+            self.seed()
+            if name in self._codes:
+                return self._codes[name]
+
+        with self._lock:
+            for _ in range(self.MAX_RETRIES):
+                self._load()
+                if name in self._codes:
+                    return self._codes[name]
+
+                session = SessionLocal()
+                try:
+                    code = max(self._names, default=0) + 1
+                    session.add(EventTypeRecord(code=code, name=name))
+                    session.commit()
+                    self._codes[name] = code
+                    self._names[code] = name
+                    self._misses.pop(name, None)
+                    return code
+                except IntegrityError:
+                    # Another process took this code or name; reload and retry
+                    session.rollback()
+                finally:
+                    session.close()
+
+        raise RuntimeError(f"Could not register event type: {name}")
+
+    def lookup(self, name: str) -> Optional[int]:
+        """Get the code of an event type without registering it.
+
+        Args:
+            name: Event type name (str or EventType)
+
+        Returns:
+            Code, or None if no event of this type was ever stored
+        """
+        name = getattr(name, 'value', name)
+        code = self._codes.get(name)
+        if code is not None:
+            return code
+        if self._misses.get(name, 0.0) > time.monotonic():
+            return None
+
+        with self._lock:
+            self._load()
+            code = self._codes.get(name)
+            if code is None:
+                if len(self._misses) >= self.MAX_MISSES:
+                    self._misses.clear()
+                self._misses[name] = time.monotonic() + self.MISS_TTL
+        return code
+
+    def lookup_many(self, names: Iterable[str]) -> List[int]:
+        """Get the codes of known event types (unknown names are dropped)."""
+        codes = (self.lookup(name) for name in names)
+        return [code for code in codes if code is not None]
+
+    def name(self, code: int) -> str:
+        """Get the event type name of a code.
+
+        Raises:
+            KeyError: If the code is not in the dictionary
+        """
+        name = self._names.get(code)
+        if name is None:
+            with self._lock:
+                self._load()
+            name = self._names[code]
+        return name
+
+
+# Global cache
+event_type_codes = EventTypeCodes()
@@ -0,0 +1,132 @@
+# Event Type Code Migration for AURORA Trading System
+"""
+Migrates an events table created before event types were dictionary
+encoded (``event_type`` string column) to the ``event_type_code`` schema.
+
+Adds the code column, backfills it in batches through the event_types
+dictionary, then drops the old column with its indexes and rebuilds
+idx_event_type_timestamp on the code. Safe to re-run: a new or migrated
+table is left untouched and an interrupted run continues with the rows
+not backfilled yet.
+
+Run it with writers of the previous version stopped, before starting
+the new version (which only writes event_type_code).
+
+Usage:
+    python -m src.events.migrate_event_types
+    python -m src.events.migrate_event_types --batch-size 50000
+"""
+
+from typing import List, Optional
+import argparse
+import sys
+
+from sqlalchemy import inspect, text
+
+from src.database.config import engine
+from .event_type_codes import EventTypeRecord, event_type_codes
+
+
+TABLE = "events"
+LEGACY_COLUMN = "event_type"
+TYPE_INDEX = "idx_event_type_timestamp"
+DEFAULT_BATCH_SIZE = 10000
+
+
+def needs_migration() -> bool:
+    """Check whether the events table still has the legacy type column."""
+    inspector = inspect(engine)
+    if not inspector.has_table(TABLE):
+        return False
+    return LEGACY_COLUMN in {column['name'] for column in inspector.get_columns(TABLE)}
+
+
+def migrate_event_type_codes(batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """Migrate the events table to dictionary-encoded event types.
+
+    Args:
+        batch_size: Rows backfilled per transaction
+
+    Returns:
+        int: Number of rows backfilled by this call
+
+    Raises:
+        RuntimeError: If rows are left without a code (the legacy
+            column is kept so the migration can be re-run)
+    """
+    if not needs_migration():
+        return 0
+
+    columns = {column['name'] for column in inspect(engine).get_columns(TABLE)}
+    EventTypeRecord.__table__.create(engine, checkfirst=True)
+
+    with engine.begin() as conn:
+        if 'event_type_code' not in columns:
+            conn.execute(text(f'ALTER TABLE {TABLE} ADD COLUMN event_type_code SMALLINT'))
+        names = conn.execute(text(f'SELECT DISTINCT {LEGACY_COLUMN} FROM {TABLE}')).scalars().all()
+
+    # Built-in types first so they keep their fixed codes
+    event_type_codes.seed()
+    for name in names:
+        event_type_codes.code(name)
+
+    backfill = text(
+        f'UPDATE {TABLE} SET event_type_code = '
+        f'(SELECT code FROM event_types WHERE event_types.name = {TABLE}.{LEGACY_COLUMN}) '
+        f'WHERE event_id IN ('
+        f'SELECT event_id FROM {TABLE} WHERE event_type_code IS NULL '
+        f'AND {LEGACY_COLUMN} IN (SELECT name FROM event_types) LIMIT :batch_size)'
+    )
+    backfilled = 0
+    while True:
+        with engine.begin() as conn:
+            updated = conn.execute(backfill, {'batch_size': batch_size}).rowcount
+        if updated <= 0:
+            break
+        backfilled += updated
+        print(f"🔄 Backfilled event type codes: {backfilled} rows")
+
+    with engine.begin() as conn:
+        missing = conn.execute(
+            text(f'SELECT COUNT(*) FROM {TABLE} WHERE event_type_code IS NULL')
+        ).scalar()
+        if missing:
+            raise RuntimeError(
+                f"{missing} events have no event type code; stop writers of the "
+                f"previous version and re-run the migration"
+            )
+
+        for index in inspect(conn).get_indexes(TABLE):
+            if index['name'] == TYPE_INDEX or LEGACY_COLUMN in index['column_names']:
+                conn.execute(text(f'DROP INDEX {index["name"]}'))
+        conn.execute(text(f'ALTER TABLE {TABLE} DROP COLUMN {LEGACY_COLUMN}'))
+        if engine.dialect.name == 'postgresql':
+            # SQLite cannot add NOT NULL to an existing column
+            conn.execute(text(f'ALTER TABLE {TABLE} ALTER COLUMN event_type_code SET NOT NULL'))
+        conn.execute(text(f'CREATE INDEX {TYPE_INDEX} ON {TABLE} (event_type_code, timestamp)'))
+
+    print(f"✅ Events table migrated to event type codes ({backfilled} rows backfilled)")
+    return backfilled
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(
+        description="Migrate the AURORA events table to dictionary-encoded event types."
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+        help=f"rows backfilled per transaction (default: {DEFAULT_BATCH_SIZE})"
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        migrate_event_type_codes(batch_size=args.batch_size)
+    except Exception as e:
+        print(f"❌ Event type migration failed: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
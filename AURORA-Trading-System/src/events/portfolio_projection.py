@@ -0,0 +1,308 @@
+# Portfolio Projection for AURORA Trading System
+"""
+Columnar portfolio projection over trade events.
+Keeps the latest state of every trade aggregate in NumPy arrays and
+computes per-symbol positions with grouped, vectorized reductions.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from datetime import datetime, timedelta
+import threading
+
+import numpy as np
+
+from .event_models import Event, EventType
+
+
+TRADE_EVENT_TYPES = (
+    EventType.TRADE_CREATED,
+    EventType.TRADE_EXECUTED,
+    EventType.TRADE_CANCELLED,
+)
+
+_SIDE_SIGNS = {"BUY": 1, "SELL": -1}
+
+
+def _as_float(value: Any) -> float:
+    """Convert a payload number to float (NaN when missing)."""
+    return np.nan if value is None else float(value)
+
+
+def _last_occurrence(keys: np.ndarray) -> np.ndarray:
+    """Return the positions of the last occurrence of each distinct key."""
+    _, first_in_reversed = np.unique(keys[::-1], return_index=True)
+    return keys.size - 1 - first_in_reversed
+
+
+def _scatter_last(
+    target: np.ndarray,
+    rows: np.ndarray,
+    values: np.ndarray,
+    mask: np.ndarray
+) -> None:
+    """Write values into target rows, keeping the last write per row."""
+    positions = np.flatnonzero(mask)
+    if positions.size == 0:
+        return
+    positions = positions[_last_occurrence(rows[positions])]
+    target[rows[positions]] = values[positions]
+
+
+class PortfolioProjection:
+    """Vectorized per-symbol portfolio built from TRADE_* events.
+
+    Each trade aggregate occupies one row of columnar arrays holding the
+    fields of its latest events (symbol code, price, quantity, side) and
+    whether it is still active (not cancelled). New events are applied in
+    batches and scattered into those rows, so re-applying an event is
+    idempotent and the projection can be updated incrementally.
+
+    Timestamps are set by the writer, so an event can commit after a
+    refresh with a timestamp before the cursor. Each refresh therefore
+    re-reads the last ``overlap`` seconds before the cursor, skips the
+    event IDs it already applied and re-applies that window in order.
+
+    Per-symbol figures are computed with ``np.bincount`` over the active
+    rows using the average cost method:
+        - net_position: bought quantity minus sold quantity
+        - average_cost: average price of the open side of the position
+        - notional: gross traded value (sum of price * quantity)
+        - realized_pnl: closed quantity * (avg sell price - avg buy price)
+    """
+
+    def __init__(
+        self,
+        event_store,
+        batch_size: int = 5000,
+        initial_capacity: int = 1024,
+        overlap: float = 5.0
+    ):
+        """Initialize PortfolioProjection.
+
+        Args:
+            event_store: EventStore used to load trade events
+            batch_size: Number of events loaded per store round trip
+            initial_capacity: Initial number of trade rows allocated
+            overlap: Seconds before the cursor re-read on every refresh
+                (how late an event may commit and still be picked up)
+        """
+        self.event_store = event_store
+        self.batch_size = batch_size
+        self.overlap = timedelta(seconds=overlap)
+        self.cursor: Optional[Tuple[datetime, str]] = None
+        self.events_applied = 0
+        self._recent: Dict[str, datetime] = {}  # applied IDs inside the overlap
+
+        self._lock = threading.Lock()
+        self._symbols: List[str] = []
+        self._symbol_codes: Dict[str, int] = {}
+        self._rows: Dict[str, int] = {}
+        self._size = 0
+
+        self._symbol = np.full(initial_capacity, -1, dtype=np.int32)
+        self._price = np.zeros(initial_capacity, dtype=np.float64)
+        self._quantity = np.zeros(initial_capacity, dtype=np.float64)
+        self._side = np.zeros(initial_capacity, dtype=np.int8)
+        self._active = np.zeros(initial_capacity, dtype=bool)
+
+    # ========================================================================
+    # Loading
+    # ========================================================================
+
+    def refresh(self) -> int:
+        """Load and apply all trade events appended since the last refresh.
+
+        Returns:
+            int: Number of trade events applied
+        """
+        applied = 0
+        with self._lock:
+            after = None if self.cursor is None else (self.cursor[0] - self.overlap, "")
+            while True:
+                batch = self.event_store.get_events_after(
+                    after=after,
+                    event_types=TRADE_EVENT_TYPES,
+                    limit=self.batch_size
+                )
+                if not batch:
+                    break
+
+                fresh = [e for e in batch if e.event_id not in self._recent]
+                if fresh:
+                    # Re-apply the whole page so a late event lands in order
+                    self._apply(batch)
+                    applied += len(fresh)
+                    self._recent.update((e.event_id, e.timestamp) for e in fresh)
+
+                last = batch[-1]
+                after = (last.timestamp, last.event_id)
+                if self.cursor is None or after > self.cursor:
+                    self.cursor = after
+
+                if len(batch) < self.batch_size:
+                    break
+
+            if self.cursor is not None:
+                horizon = self.cursor[0] - self.overlap
+                self._recent = {
+                    event_id: timestamp for event_id, timestamp in self._recent.items()
+                    if timestamp >= horizon
+                }
+            self.events_applied += applied
+
+        return applied
+
+    def apply(self, events: Iterable[Event]) -> int:
+        """Apply a batch of events (non-trade events are ignored).
+
+        Args:
+            events: Events in chronological order
+
+        Returns:
+            int: Number of trade events applied
+        """
+        with self._lock:
+            applied = self._apply(events)
+            self.events_applied += applied
+            return applied
+
+    def _apply(self, events: Iterable[Event]) -> int:
+        """Scatter a batch of trade events into the columnar arrays
+        (events_applied is counted by the caller)."""
+        trades = [e for e in events if e.event_type in TRADE_EVENT_TYPES]
+        if not trades:
+            return 0
+
+        n = len(trades)
+        payloads = [e.data for e in trades]
+
+        rows = np.fromiter(
+            (self._row_for(e.aggregate_id) for e in trades), dtype=np.int64, count=n
+        )
+        self._ensure_capacity(self._size)
+
+        symbol = np.fromiter(
+            (self._symbol_code(d.get('symbol')) for d in payloads), dtype=np.int32, count=n
+        )
+        price = np.fromiter((_as_float(d.get('price')) for d in payloads), dtype=np.float64, count=n)
+        quantity = np.fromiter((_as_float(d.get('quantity')) for d in payloads), dtype=np.float64, count=n)
+        side = np.fromiter((_SIDE_SIGNS.get(d.get('side'), 0) for d in payloads), dtype=np.int8, count=n)
+        cancelled = np.fromiter(
+            (
+                e.event_type == EventType.TRADE_CANCELLED
+                or str(d.get('status', '')).upper() == 'CANCELLED'
+                for e, d in zip(trades, payloads)
+            ),
+            dtype=bool,
+            count=n
+        )
+
+        # Each field keeps the last value present for the row in this batch
+        _scatter_last(self._symbol, rows, symbol, symbol >= 0)
+        _scatter_last(self._price, rows, price, ~np.isnan(price))
+        _scatter_last(self._quantity, rows, quantity, ~np.isnan(quantity))
+        _scatter_last(self._side, rows, side, side != 0)
+
+        # The last event of each trade decides whether it still counts
+        _scatter_last(self._active, rows, ~cancelled, np.ones(n, dtype=bool))
+
+        return n
+
+    def _row_for(self, aggregate_id: str) -> int:
+        """Get (or allocate) the row index of a trade aggregate."""
+        row = self._rows.get(aggregate_id)
+        if row is None:
+            row = self._size
+            self._rows[aggregate_id] = row
+            self._size += 1
+        return row
+
+    def _symbol_code(self, symbol: Optional[str]) -> int:
+        """Get (or allocate) the dictionary code of a symbol (-1 if missing)."""
+        if symbol is None:
+            return -1
+        code = self._symbol_codes.get(symbol)
+        if code is None:
+            code = len(self._symbols)
+            self._symbol_codes[symbol] = code
+            self._symbols.append(symbol)
+        return code
+
+    def _ensure_capacity(self, size: int) -> None:
+        """Grow the columnar arrays (doubling) to hold at least size rows."""
+        capacity = self._symbol.size
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        grow = capacity - self._symbol.size
+        self._symbol = np.concatenate([self._symbol, np.full(grow, -1, dtype=np.int32)])
+        self._price = np.concatenate([self._price, np.zeros(grow, dtype=np.float64)])
+        self._quantity = np.concatenate([self._quantity, np.zeros(grow, dtype=np.float64)])
+        self._side = np.concatenate([self._side, np.zeros(grow, dtype=np.int8)])
+        self._active = np.concatenate([self._active, np.zeros(grow, dtype=bool)])
+
+    # ========================================================================
+    # Aggregates
+    # ========================================================================
+
+    def summary(self) -> Dict[str, Any]:
+        """Compute per-symbol portfolio figures.
+
+        Returns:
+            Dictionary with per-symbol positions and portfolio totals
+        """
+        with self._lock:
+            n = self._size
+            symbol = self._symbol[:n]
+            side = self._side[:n]
+            active = self._active[:n] & (symbol >= 0) & (side != 0)
+
+            codes = symbol[active]
+            side = side[active]
+            quantity = self._quantity[:n][active]
+            notional = self._price[:n][active] * quantity
+            symbols = list(self._symbols)
+            cursor = self.cursor
+            events_applied = self.events_applied
+
+        k = len(symbols)
+        buys = side > 0
+
+        buy_qty = np.bincount(codes, weights=np.where(buys, quantity, 0.0), minlength=k)
+        buy_cost = np.bincount(codes, weights=np.where(buys, notional, 0.0), minlength=k)
+        sell_qty = np.bincount(codes, weights=np.where(buys, 0.0, quantity), minlength=k)
+        sell_value = np.bincount(codes, weights=np.where(buys, 0.0, notional), minlength=k)
+        trade_count = np.bincount(codes, minlength=k)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            avg_buy = np.where(buy_qty > 0, buy_cost / buy_qty, 0.0)
+            avg_sell = np.where(sell_qty > 0, sell_value / sell_qty, 0.0)
+
+        net_position = buy_qty - sell_qty
+        realized_pnl = np.minimum(buy_qty, sell_qty) * (avg_sell - avg_buy)
+        average_cost = np.where(
+            net_position > 0, avg_buy, np.where(net_position < 0, avg_sell, 0.0)
+        )
+        gross_notional = buy_cost + sell_value
+
+        positions = {}
+        for code in np.flatnonzero(trade_count):
+            positions[symbols[code]] = {
+                'net_position': float(net_position[code]),
+                'average_cost': float(average_cost[code]),
+                'notional': float(gross_notional[code]),
+                'realized_pnl': float(realized_pnl[code]),
+                'buy_quantity': float(buy_qty[code]),
+                'sell_quantity': float(sell_qty[code]),
+                'trade_count': int(trade_count[code]),
+            }
+
+        return {
+            'positions': positions,
+            'total_notional': float(gross_notional.sum()),
+            'total_realized_pnl': float(realized_pnl.sum()),
+            'trade_count': int(trade_count.sum()),
+            'events_applied': events_applied,
+            'as_of': cursor[0].isoformat() if cursor else None,
+        }
@@ -0,0 +1,248 @@
+# Projection Registry for AURORA Trading System
+"""
+Single-pass dispatcher for multiple projections.
+Projections register handlers per event type; one pass over a batch of
+events fans each event out only to the projections subscribed to it.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import time
+
+from .event_models import Event
+
+
+EventHandler = Callable[[Event], None]
+
+
+@dataclass
+class ProjectionStats:
+    """Runtime statistics for one registered projection.
+
+    Attributes:
+        events: Number of events delivered to the projection
+        errors: Number of handler calls that raised
+        total_seconds: Time spent inside the projection's handlers
+        last_error: Message of the most recent error
+    """
+
+    events: int = field(default=0)
+    errors: int = field(default=0)
+    total_seconds: float = field(default=0.0)
+    last_error: Optional[str] = field(default=None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert stats to dictionary representation."""
+        return {
+            'events': self.events,
+            'errors': self.errors,
+            'total_seconds': self.total_seconds,
+            'avg_us_per_event': (
+                self.total_seconds / self.events * 1e6 if self.events else 0.0
+            ),
+            'last_error': self.last_error,
+        }
+
+
+@dataclass
+class ProjectionCursor:
+    """Read position of one registered projection.
+
+    Attributes:
+        position: (timestamp, event_id) up to which the projection has
+            seen the log (None = nothing yet, backfill from the start)
+        recent: Delivered event IDs (with their timestamps) inside the
+            overlap window before the position
+    """
+
+    position: Optional[Tuple[datetime, str]] = field(default=None)
+    recent: Dict[str, datetime] = field(default_factory=dict)
+
+    def delivered(self, event: Event, overlap: timedelta) -> bool:
+        """Check whether an event already reached the projection."""
+        if self.position is None:
+            return False
+        return event.event_id in self.recent or event.timestamp < self.position[0] - overlap
+
+    def advance(self, position: Tuple[datetime, str], overlap: timedelta) -> None:
+        """Move past a fully read position and forget IDs behind the window."""
+        if self.position is None or position > self.position:
+            self.position = position
+        horizon = self.position[0] - overlap
+        self.recent = {
+            event_id: timestamp for event_id, timestamp in self.recent.items()
+            if timestamp >= horizon
+        }
+
+
+class ProjectionRegistry:
+    """Registry of projections sharing one pass over the event stream.
+
+    Each projection registers a mapping of event type to handler, in the
+    same shape as ``EventProcessor.event_handlers``. A dispatch table
+    (event type -> subscribed handlers) is precomputed at registration,
+    so dispatching an event is a single dict lookup.
+
+    A failing handler never stops the batch: the error is recorded in the
+    projection's stats and dispatch continues with the next handler.
+
+    Each projection also has its own ProjectionCursor, so one registered
+    later (or re-registered with more event types) is backfilled from the
+    start while the others skip what they already received.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._handlers: Dict[str, Dict[str, EventHandler]] = {}
+        self._batch_callbacks: Dict[str, Callable[[], None]] = {}
+        self._dispatch: Dict[str, Tuple[Tuple[str, EventHandler], ...]] = {}
+        self.stats: Dict[str, ProjectionStats] = {}
+        self.cursors: Dict[str, ProjectionCursor] = {}
+
+    def register(
+        self,
+        name: str,
+        handlers: Dict[str, EventHandler],
+        on_batch_end: Optional[Callable[[], None]] = None
+    ) -> None:
+        """Register a projection.
+
+        Args:
+            name: Unique projection name
+            handlers: Mapping of event type to handler(event)
+            on_batch_end: Optional callback run after each dispatched batch
+                in which the projection received events (e.g. to flush
+                buffered work)
+
+        Raises:
+            ValueError: If a projection with this name already exists
+        """
+        if name in self._handlers:
+            raise ValueError(f"Projection already registered: {name}")
+
+        self._handlers[name] = dict(handlers)
+        if on_batch_end is not None:
+            self._batch_callbacks[name] = on_batch_end
+        self.stats[name] = ProjectionStats()
+        self.cursors[name] = ProjectionCursor()
+        self._rebuild_dispatch()
+
+    def unregister(self, name: str) -> bool:
+        """Remove a projection.
+
+        Args:
+            name: Projection name
+
+        Returns:
+            bool: True if the projection was registered
+        """
+        if self._handlers.pop(name, None) is None:
+            return False
+        self._batch_callbacks.pop(name, None)
+        self.stats.pop(name, None)
+        self.cursors.pop(name, None)
+        self._rebuild_dispatch()
+        return True
+
+    def _rebuild_dispatch(self) -> None:
+        """Precompute the event type -> handlers dispatch table."""
+        table: Dict[str, List[Tuple[str, EventHandler]]] = {}
+        for name, handlers in self._handlers.items():
+            for event_type, handler in handlers.items():
+                table.setdefault(event_type, []).append((name, handler))
+        self._dispatch = {
+            event_type: tuple(targets) for event_type, targets in table.items()
+        }
+
+    def event_types(self) -> List[str]:
+        """Get all event types with at least one subscriber."""
+        return list(self._dispatch)
+
+    def subscribers(self, event_type: str) -> List[str]:
+        """Get names of projections subscribed to an event type."""
+        return [name for name, _ in self._dispatch.get(event_type, ())]
+
+    def start(self, overlap: timedelta) -> Optional[Tuple[datetime, str]]:
+        """Get the read position covering every projection's cursor.
+
+        Args:
+            overlap: Window re-read before each position for late events
+
+        Returns:
+            Cursor to read after, or None to read from the start
+        """
+        positions = [cursor.position for cursor in self.cursors.values()]
+        if not positions or None in positions:
+            return None
+        return (min(positions)[0] - overlap, "")
+
+    def advance(self, position: Tuple[datetime, str], overlap: timedelta) -> None:
+        """Record that every projection has seen the log up to position."""
+        for cursor in self.cursors.values():
+            cursor.advance(position, overlap)
+
+    def dispatch(self, events: Iterable[Event], overlap: Optional[timedelta] = None) -> int:
+        """Fan a batch of events out to subscribed projections in one pass.
+
+        Args:
+            events: Events in chronological order
+            overlap: Track delivery in the projection cursors with this
+                overlap window, skipping events a projection already
+                received (None = deliver every event)
+
+        Returns:
+            int: Number of events delivered to at least one projection
+        """
+        dispatch = self._dispatch
+        stats = self.stats
+        cursors = self.cursors
+        clock = time.perf_counter
+        touched = set()
+        delivered = 0
+
+        for event in events:
+            targets = dispatch.get(event.event_type)
+            if not targets:
+                continue
+
+            reached = False
+            for name, handler in targets:
+                if overlap is not None:
+                    cursor = cursors[name]
+                    if cursor.delivered(event, overlap):
+                        continue
+                    cursor.recent[event.event_id] = event.timestamp
+                reached = True
+                projection_stats = stats[name]
+                start = clock()
+                try:
+                    handler(event)
+                except Exception as e:
+                    projection_stats.errors += 1
+                    projection_stats.last_error = f"{event.event_id}: {e}"
+                    print(f"❌ Projection {name} failed on {event.event_type}: {e}")
+                projection_stats.total_seconds += clock() - start
+                projection_stats.events += 1
+                touched.add(name)
+            delivered += reached
+
+        for name in touched:
+            callback = self._batch_callbacks.get(name)
+            if callback is None:
+                continue
+            projection_stats = stats[name]
+            start = clock()
+            try:
+                callback()
+            except Exception as e:
+                projection_stats.errors += 1
+                projection_stats.last_error = f"batch end: {e}"
+                print(f"❌ Projection {name} failed at batch end: {e}")
+            projection_stats.total_seconds += clock() - start
+
+        return delivered
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get per-projection timing and error statistics."""
+        return {name: s.to_dict() for name, s in self.stats.items()}
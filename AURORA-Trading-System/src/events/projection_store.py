@@ -0,0 +1,405 @@
+# Projection Store for AURORA Trading System
+"""
+Materialized aggregate projections persisted in PostgreSQL.
+Holds the live projection table (kept current on every append by
+ProjectionMaterializer), rebuild shadow tables and the checkpoints used
+to resume an interrupted rebuild.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Set
+from datetime import datetime
+import threading
+import time
+from sqlalchemy import (
+    Boolean, Column, DateTime, Integer, JSON, MetaData, String, Table, select, text
+)
+from sqlalchemy.dialects import postgresql, sqlite
+
+from src.database.config import Base, SessionLocal, engine
+
+
+LIVE_TABLE = "aggregate_projections"
+SHADOW_PREFIX = "aggregate_projections_shadow_"
+MATERIALIZE_ATTEMPTS = 3  # tries per append before the aggregates are requeued
+MATERIALIZE_BACKOFF = 0.05  # seconds before the first retry, doubled per retry
+
+
+class AggregateProjectionRecord(Base):
+    """SQLAlchemy model for the live materialized projection of an aggregate.
+
+    One row per aggregate with the state produced by EventProcessor.
+    """
+    __tablename__ = LIVE_TABLE
+
+    aggregate_id = Column(String(100), primary_key=True)
+    state = Column(JSON, nullable=False)
+    version = Column(Integer, nullable=False, default=0)
+    event_count = Column(Integer, nullable=False, default=0)
+    last_event_time = Column(DateTime, nullable=True)
+    rebuilt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class ProjectionCheckpointRecord(Base):
+    """SQLAlchemy model for rebuild progress of one partition.
+
+    Aggregates are rebuilt in sorted order per partition, so the last
+    completed aggregate ID is enough to resume a crashed run.
+    """
+    __tablename__ = "projection_rebuild_checkpoints"
+
+    run_id = Column(String(32), primary_key=True)
+    partition = Column(Integer, primary_key=True)
+    partitions = Column(Integer, nullable=False)
+    last_aggregate_id = Column(String(100), nullable=True)
+    aggregates_done = Column(Integer, nullable=False, default=0)
+    events_done = Column(Integer, nullable=False, default=0)
+    completed = Column(Boolean, nullable=False, default=False)
+    started_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class ProjectionStore:
+    """Store for materialized projections and their rebuild bookkeeping."""
+
+    def __init__(self):
+        """Initialize ProjectionStore."""
+        Base.metadata.create_all(
+            bind=engine,
+            tables=[
+                AggregateProjectionRecord.__table__,
+                ProjectionCheckpointRecord.__table__,
+            ]
+        )
+
+    def get(self, aggregate_id: str) -> Optional[Dict[str, Any]]:
+        """Get the live materialized state of an aggregate.
+
+        Args:
+            aggregate_id: Aggregate ID
+
+        Returns:
+            Stored state or None if not materialized
+        """
+        try:
+            session = SessionLocal()
+            record = session.get(AggregateProjectionRecord, aggregate_id)
+            session.close()
+            return record.state if record else None
+        except Exception as e:
+            print(f"❌ Error retrieving projection: {e}")
+            return None
+
+    def get_rows(self, aggregate_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get the live rows of several aggregates in one query.
+
+        Store errors propagate (callers fall back or retry).
+
+        Args:
+            aggregate_ids: Aggregate IDs
+
+        Returns:
+            Mapping of aggregate ID to its row (state, event_count,
+            last_event_time) for the aggregates materialized
+        """
+        if not aggregate_ids:
+            return {}
+        table = AggregateProjectionRecord.__table__
+        with engine.connect() as conn:
+            rows = conn.execute(
+                select(table.c.aggregate_id, table.c.state, table.c.event_count, table.c.last_event_time)
+                .where(table.c.aggregate_id.in_(aggregate_ids))
+            ).mappings().all()
+        return {row['aggregate_id']: dict(row) for row in rows}
+
+    def upsert_rows(
+        self,
+        rows: List[Dict[str, Any]],
+        run_id: Optional[str] = None,
+        conn: Any = None
+    ) -> int:
+        """Write projection rows unless the stored row has as many events.
+
+        Event streams only grow, so a row built from more events is the
+        newer one: concurrent appenders and the rebuild catch-up can never
+        move a row back to an older state.
+
+        Args:
+            rows: Projection rows
+            run_id: Write to this run's shadow table (None = live table)
+            conn: Connection of an open transaction (None = own transaction)
+
+        Returns:
+            int: Number of rows written
+        """
+        if not rows:
+            return 0
+        if conn is None:
+            with engine.begin() as conn:
+                return self.upsert_rows(rows, run_id, conn)
+
+        table = self.shadow_table(run_id) if run_id else AggregateProjectionRecord.__table__
+        stored = dict(conn.execute(
+            select(table.c.aggregate_id, table.c.event_count)
+            .where(table.c.aggregate_id.in_([row['aggregate_id'] for row in rows]))
+        ).all())
+        newer = [row for row in rows if row['event_count'] > stored.get(row['aggregate_id'], -1)]
+        if not newer:
+            return 0
+
+        insert = postgresql.insert if engine.dialect.name == "postgresql" else sqlite.insert
+        statement = insert(table)
+        conn.execute(
+            statement.on_conflict_do_update(
+                index_elements=[table.c.aggregate_id],
+                set_={name: statement.excluded[name] for name in newer[0] if name != 'aggregate_id'},
+                where=table.c.event_count < statement.excluded.event_count
+            ),
+            newer
+        )
+        return len(newer)
+
+    # ========================================================================
+    # Shadow tables
+    # ========================================================================
+
+    @staticmethod
+    def shadow_table(run_id: str) -> Table:
+        """Get the shadow table definition for a rebuild run.
+
+        The name is run-specific so constraint names never collide with
+        the ones the live table inherited from a previous swap.
+        """
+        return AggregateProjectionRecord.__table__.to_metadata(
+            MetaData(), name=f"{SHADOW_PREFIX}{run_id}"
+        )
+
+    def create_shadow(self, run_id: str) -> Table:
+        """Create (if needed) the shadow table for a rebuild run."""
+        table = self.shadow_table(run_id)
+        table.create(bind=engine, checkfirst=True)
+        return table
+
+    def write_batch(
+        self,
+        run_id: str,
+        partition: int,
+        rows: List[Dict[str, Any]],
+        last_aggregate_id: str,
+        events_done: int
+    ) -> None:
+        """Write projection rows and advance the checkpoint atomically.
+
+        Args:
+            run_id: Rebuild run ID
+            partition: Partition the rows belong to
+            rows: Projection rows for the shadow table
+            last_aggregate_id: Last aggregate included in rows
+            events_done: Number of events replayed to build rows
+        """
+        table = self.shadow_table(run_id)
+        with engine.begin() as conn:
+            if rows:
+                conn.execute(table.insert(), rows)
+            conn.execute(
+                ProjectionCheckpointRecord.__table__.update()
+                .where(ProjectionCheckpointRecord.run_id == run_id)
+                .where(ProjectionCheckpointRecord.partition == partition)
+                .values(
+                    last_aggregate_id=last_aggregate_id,
+                    aggregates_done=ProjectionCheckpointRecord.aggregates_done + len(rows),
+                    events_done=ProjectionCheckpointRecord.events_done + events_done,
+                    updated_at=datetime.utcnow()
+                )
+            )
+
+    def swap(self, run_id: str, catch_up: Optional[Callable[[Any], int]] = None) -> int:
+        """Atomically switch the live projection to a run's shadow table.
+
+        Both renames and the drop of the previous table happen in one
+        transaction (PostgreSQL DDL is transactional), so readers see
+        either the old or the new projection, never a missing table.
+        The live table is locked ACCESS EXCLUSIVE up front (the lock the
+        renames need anyway), so reads and materializer writes wait for
+        the switch instead of deadlocking with a lock upgrade half-way;
+        appends committed while catch_up runs are applied to the new
+        table once it is live.
+
+        Args:
+            run_id: Rebuild run ID
+            catch_up: Final catch-up pass run inside the transaction,
+                given its connection (returns the number of rows written)
+
+        Returns:
+            int: Rows written by catch_up
+        """
+        shadow = f"{SHADOW_PREFIX}{run_id}"
+        retired = f"{LIVE_TABLE}_retired_{run_id}"
+        with engine.begin() as conn:
+            if engine.dialect.name == "postgresql":
+                conn.execute(text(f'LOCK TABLE {LIVE_TABLE} IN ACCESS EXCLUSIVE MODE'))
+            caught_up = catch_up(conn) if catch_up is not None else 0
+            conn.execute(text(f'ALTER TABLE {LIVE_TABLE} RENAME TO {retired}'))
+            conn.execute(text(f'ALTER TABLE {shadow} RENAME TO {LIVE_TABLE}'))
+            conn.execute(text(f'DROP TABLE {retired}'))
+        return caught_up
+
+    # ========================================================================
+    # Checkpoints
+    # ========================================================================
+
+    def get_checkpoints(self, run_id: str) -> List[ProjectionCheckpointRecord]:
+        """Get the checkpoints of a rebuild run ordered by partition."""
+        session = SessionLocal()
+        records = session.query(ProjectionCheckpointRecord)\
+            .filter(ProjectionCheckpointRecord.run_id == run_id)\
+            .order_by(ProjectionCheckpointRecord.partition)\
+            .all()
+        session.close()
+        return records
+
+    def init_checkpoints(self, run_id: str, partitions: int) -> None:
+        """Create one empty checkpoint per partition for a new run."""
+        session = SessionLocal()
+        now = datetime.utcnow()
+        for partition in range(partitions):
+            session.add(ProjectionCheckpointRecord(
+                run_id=run_id,
+                partition=partition,
+                partitions=partitions,
+                aggregates_done=0,
+                events_done=0,
+                completed=False,
+                started_at=now,
+                updated_at=now
+            ))
+        session.commit()
+        session.close()
+
+    def complete_partition(self, run_id: str, partition: int) -> None:
+        """Mark a partition of a run as fully rebuilt."""
+        with engine.begin() as conn:
+            conn.execute(
+                ProjectionCheckpointRecord.__table__.update()
+                .where(ProjectionCheckpointRecord.run_id == run_id)
+                .where(ProjectionCheckpointRecord.partition == partition)
+                .values(completed=True, updated_at=datetime.utcnow())
+            )
+
+
+class ProjectionMaterializer:
+    """EventStore subscriber keeping the live projection table current.
+
+    Each appended batch is applied on top of the stored rows of the
+    touched aggregates and written with upsert_rows, so the table
+    matches the log without a rebuild and append latency does not grow
+    with stream length. The shortcut is only taken when it is provably
+    exact: the stored row plus the new events must account for every
+    event of the aggregate (one grouped COUNT) and the new events must
+    come after the stored ones. Otherwise (a concurrent append, a late
+    timestamp, no row yet) the aggregate is re-projected from its full
+    stream.
+
+    A failed write (e.g. a deadlock with a concurrent rebuild swap) is
+    retried with backoff; if it keeps failing, the aggregates are kept
+    pending and re-projected with the next appended batch (or by
+    retry_pending) instead of being dropped.
+    """
+
+    def __init__(self, event_store):
+        """Initialize ProjectionMaterializer.
+
+        Args:
+            event_store: EventStore the materializer is subscribed to
+        """
+        self.event_store = event_store
+        self._store: Optional[ProjectionStore] = None
+        self._processor = None
+        self._pending: Set[str] = set()
+        self._pending_lock = threading.Lock()
+
+    @property
+    def pending(self) -> Set[str]:
+        """Aggregates whose materialization failed and awaits a retry."""
+        return set(self._pending)
+
+    @property
+    def store(self) -> ProjectionStore:
+        """Projection store (its tables are created on first use)."""
+        if self._store is None:
+            self._store = ProjectionStore()
+        return self._store
+
+    def __call__(self, events: List[Any]) -> int:
+        """Materialize the aggregates of a batch of appended events.
+
+        Returns:
+            int: Number of projection rows written
+        """
+        appended: Dict[str, List[Any]] = {}
+        for event in events:
+            appended.setdefault(event.aggregate_id, []).append(event)
+        return self._materialize(appended)
+
+    def retry_pending(self) -> int:
+        """Re-project the aggregates left pending by failed writes.
+
+        Returns:
+            int: Number of projection rows written
+        """
+        return self._materialize({})
+
+    def _materialize(self, appended: Dict[str, List[Any]]) -> int:
+        """Project aggregates (plus pending ones, replayed in full) with
+        retries; requeue them if every attempt fails."""
+        with self._pending_lock:
+            appended = {**appended, **{aggregate_id: [] for aggregate_id in self._pending}}
+            self._pending.clear()
+        if not appended:
+            return 0
+
+        for attempt in range(MATERIALIZE_ATTEMPTS):
+            try:
+                return self._project(appended)
+            except Exception as e:
+                error = e
+                if attempt + 1 < MATERIALIZE_ATTEMPTS:
+                    time.sleep(MATERIALIZE_BACKOFF * 2 ** attempt)
+
+        with self._pending_lock:
+            self._pending.update(appended)
+        print(f"❌ Projection materialization failed for {len(appended)} aggregates "
+              f"(kept pending): {error}")
+        return 0
+
+    def _project(self, appended: Dict[str, List[Any]]) -> int:
+        """Write the rows of aggregates given their new events (an empty
+        list re-projects the full stream)."""
+        if self._processor is None:
+            from .event_processor import EventProcessor  # imports the event store
+            self._processor = EventProcessor(self.event_store)
+
+        incremental = [aggregate_id for aggregate_id, events in appended.items() if events]
+        stored = self.store.get_rows(incremental)
+        counts = self.event_store.count_events_by_aggregate(list(stored), strict=True)
+
+        rows = []
+        replay = []
+        for aggregate_id, events in appended.items():
+            row = stored.get(aggregate_id)
+            events = sorted(events, key=lambda event: (event.timestamp, event.event_id))
+            if (
+                row is not None and events and row['last_event_time'] is not None
+                and events[0].timestamp > row['last_event_time']
+                and row['event_count'] + len(events) == counts.get(aggregate_id)
+            ):
+                rows.append(self._processor.projection_row(aggregate_id, events, row['state']))
+            else:
+                replay.append(aggregate_id)
+
+        streams = self.event_store.get_events_for_aggregates(replay, strict=True)
+        rows.extend(
+            self._processor.projection_row(aggregate_id, stream)
+            for aggregate_id, stream in streams.items()
+            if stream
+        )
+        return self.store.upsert_rows(rows)
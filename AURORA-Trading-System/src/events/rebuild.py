@@ -0,0 +1,300 @@
+# Projection Rebuild Tool for AURORA Trading System
+"""
+Resumable multi-process rebuild of materialized aggregate projections.
+
+Splits the event log by aggregate hash across worker processes, writes
+replayed state into a shadow table with periodic checkpoints and then
+switches the live projection over atomically.
+
+Usage:
+    python -m src.events.rebuild --workers 4
+    python -m src.events.rebuild --resume 20260202143000123456
+"""
+
+from typing import Any, Dict, List, Optional
+from datetime import datetime, timedelta
+import argparse
+import multiprocessing
+import queue
+import sys
+import time
+import zlib
+
+from src.database.config import engine
+from .event_store import event_store
+from .event_processor import EventProcessor
+from .projection_store import ProjectionStore
+
+
+DEFAULT_CHECKPOINT_EVERY = 500
+PROGRESS_INTERVAL = 5.0  # seconds between progress reports
+MAX_CATCH_UP_PASSES = 10
+# Event timestamps are set before commit; catch-up re-reads this far back
+CATCH_UP_OVERLAP = timedelta(seconds=5)
+
+
+def partition_of(aggregate_id: str, partitions: int) -> int:
+    """Get the partition of an aggregate (stable across processes)."""
+    return zlib.crc32(aggregate_id.encode()) % partitions
+
+
+def _init_worker() -> None:
+    """Drop connections inherited from the parent process."""
+    engine.dispose(close=False)
+
+
+def _rebuild_partition(
+    run_id: str,
+    partition: int,
+    partitions: int,
+    checkpoint_every: int,
+    progress: Any
+) -> int:
+    """Rebuild every aggregate of one partition into the shadow table.
+
+    Resumes after the partition's last checkpointed aggregate.
+
+    Returns:
+        int: Number of events replayed by this call
+    """
+    store = ProjectionStore()
+    processor = EventProcessor(event_store)
+
+    checkpoint = store.get_checkpoints(run_id)[partition]
+    if checkpoint.completed:
+        return 0
+
+    # Store errors propagate: a partition is only completed with real data
+    aggregate_ids = [
+        aggregate_id
+        for aggregate_id in event_store.get_aggregate_ids(
+            after=checkpoint.last_aggregate_id, strict=True
+        )
+        if partition_of(aggregate_id, partitions) == partition
+    ]
+
+    replayed = 0
+    for start in range(0, len(aggregate_ids), checkpoint_every):
+        chunk = aggregate_ids[start:start + checkpoint_every]
+        streams = event_store.get_events_for_aggregates(chunk, strict=True)
+
+        rows = [
+            processor.projection_row(aggregate_id, streams[aggregate_id])
+            for aggregate_id in chunk
+            if streams[aggregate_id]
+        ]
+        events_done = sum(row['event_count'] for row in rows)
+
+        store.write_batch(run_id, partition, rows, chunk[-1], events_done)
+        replayed += events_done
+        progress.put(events_done)
+
+    store.complete_partition(run_id, partition)
+    return replayed
+
+
+def _catch_up(
+    store: ProjectionStore,
+    processor: EventProcessor,
+    run_id: str,
+    since: datetime,
+    chunk_size: int,
+    conn: Any = None
+) -> int:
+    """Re-project aggregates with events at or after since into the shadow table.
+
+    Returns:
+        int: Number of shadow rows that changed
+    """
+    changed = event_store.get_aggregate_ids(since=since, strict=True)
+    written = 0
+    for start in range(0, len(changed), chunk_size):
+        streams = event_store.get_events_for_aggregates(changed[start:start + chunk_size], strict=True)
+        written += store.upsert_rows(
+            [
+                processor.projection_row(aggregate_id, stream)
+                for aggregate_id, stream in streams.items()
+                if stream
+            ],
+            run_id=run_id,
+            conn=conn
+        )
+    return written
+
+
+def _format_eta(seconds: Optional[float]) -> str:
+    """Format an ETA in seconds as H:MM:SS."""
+    if seconds is None:
+        return "?"
+    return str(timedelta(seconds=int(seconds)))
+
+
+def rebuild_projections(
+    workers: int = 4,
+    run_id: Optional[str] = None,
+    checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY,
+    progress_interval: float = PROGRESS_INTERVAL
+) -> Dict[str, Any]:
+    """Rebuild all aggregate projections and switch the live table over.
+
+    Args:
+        workers: Number of worker processes (= partitions of a new run)
+        run_id: ID of an interrupted run to resume (None = new run)
+        checkpoint_every: Aggregates written per checkpoint
+        progress_interval: Seconds between progress reports
+
+    Returns:
+        Dictionary with run ID, events replayed, duration and throughput
+
+    Raises:
+        ValueError: If run_id does not match an existing run
+        RuntimeError: If a partition did not complete (the live table is
+            left untouched; resume the run)
+    """
+    store = ProjectionStore()
+
+    if run_id is None:
+        run_id = datetime.utcnow().strftime("%Y%m%d%H%M%S%f")
+        store.init_checkpoints(run_id, workers)
+        checkpoints = store.get_checkpoints(run_id)
+        print(f"🔨 Starting projection rebuild {run_id} with {workers} partitions")
+    else:
+        checkpoints = store.get_checkpoints(run_id)
+        if not checkpoints:
+            raise ValueError(f"Unknown rebuild run: {run_id}")
+        print(f"🔁 Resuming projection rebuild {run_id}")
+
+    partitions = checkpoints[0].partitions
+    started_at = checkpoints[0].started_at
+    store.create_shadow(run_id)
+
+    total_events = event_store.get_event_count()
+    done = sum(checkpoint.events_done for checkpoint in checkpoints)
+    pending = [checkpoint.partition for checkpoint in checkpoints if not checkpoint.completed]
+
+    clock_start = time.time()
+    replayed = 0
+
+    if pending:
+        context = multiprocessing.get_context()
+        manager = context.Manager()
+        progress = manager.Queue()
+
+        try:
+            with context.Pool(min(workers, len(pending)), initializer=_init_worker) as pool:
+                results = [
+                    pool.apply_async(
+                        _rebuild_partition,
+                        (run_id, partition, partitions, checkpoint_every, progress)
+                    )
+                    for partition in pending
+                ]
+
+                last_report = clock_start
+                while not all(result.ready() for result in results):
+                    try:
+                        replayed += progress.get(timeout=0.2)
+                    except queue.Empty:
+                        pass
+
+                    now = time.time()
+                    if now - last_report >= progress_interval:
+                        last_report = now
+                        rate = replayed / (now - clock_start)
+                        remaining = max(total_events - done - replayed, 0)
+                        eta = remaining / rate if rate else None
+                        print(
+                            f"⏳ {done + replayed:,}/{total_events:,} events | "
+                            f"{rate:,.0f} events/s | ETA {_format_eta(eta)}"
+                        )
+
+                # Re-raise worker failures; checkpoints allow resuming the run
+                for result in results:
+                    result.get()
+
+                while not progress.empty():
+                    replayed += progress.get()
+        finally:
+            manager.shutdown()
+
+    unfinished = [
+        checkpoint.partition
+        for checkpoint in store.get_checkpoints(run_id)
+        if not checkpoint.completed
+    ]
+    if unfinished:
+        raise RuntimeError(
+            f"Partitions {unfinished} of run {run_id} did not complete; "
+            f"resume with --resume {run_id}"
+        )
+
+    # Catch up aggregates that received events while the run was going,
+    # repeating until a pass changes nothing (or MAX_CATCH_UP_PASSES)
+    processor = EventProcessor(event_store)
+    since = started_at - CATCH_UP_OVERLAP
+    caught_up = 0
+    for _ in range(MAX_CATCH_UP_PASSES):
+        pass_started = datetime.utcnow()
+        written = _catch_up(store, processor, run_id, since, checkpoint_every)
+        caught_up += written
+        since = pass_started - CATCH_UP_OVERLAP
+        if not written:
+            break
+
+    # The last pass runs in the swap transaction while appenders' writes to
+    # the live table wait, so no event falls between catch-up and switch
+    caught_up += store.swap(
+        run_id,
+        catch_up=lambda conn: _catch_up(store, processor, run_id, since, checkpoint_every, conn)
+    )
+
+    elapsed = time.time() - clock_start
+    throughput = replayed / elapsed if elapsed > 0 else 0.0
+    print(
+        f"✅ Projection rebuild {run_id} switched live: {replayed:,} events in "
+        f"{elapsed:.1f}s ({throughput:,.0f} events/s), "
+        f"{caught_up} aggregates caught up"
+    )
+
+    return {
+        'run_id': run_id,
+        'events_replayed': replayed,
+        'aggregates_caught_up': caught_up,
+        'elapsed_seconds': elapsed,
+        'events_per_second': throughput,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(
+        description="Rebuild AURORA aggregate projections without downtime."
+    )
+    parser.add_argument(
+        "--workers", type=int, default=4,
+        help="worker processes / hash partitions for a new run (default: 4)"
+    )
+    parser.add_argument(
+        "--resume", metavar="RUN_ID", default=None,
+        help="resume an interrupted run from its checkpoints"
+    )
+    parser.add_argument(
+        "--checkpoint-every", type=int, default=DEFAULT_CHECKPOINT_EVERY,
+        help=f"aggregates written per checkpoint (default: {DEFAULT_CHECKPOINT_EVERY})"
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        rebuild_projections(
+            workers=args.workers,
+            run_id=args.resume,
+            checkpoint_every=args.checkpoint_every
+        )
+    except Exception as e:
+        print(f"❌ Projection rebuild failed: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -328,6 +328,33 @@ class TestCacheIntegration:
         # Count should increase (cache was invalidated)
         assert count2 >= count1
 
+    def test_write_through_on_create(self):
+        """Test a created trade is readable right away (404 not served from cache)."""
+        missing = client.get("/api/v1/trades/4242424")
+        assert missing.status_code == 404
+
+        created = client.post(
+            "/api/v1/trades",
+            json={"symbol": "SOL/USD", "price": 150.0, "quantity": 3, "side": "BUY"}
+        ).json()
+
+        response = client.get(f"/api/v1/trades/{created['id']}")
+        assert response.status_code == 200
+        assert response.json() == created
+
+    def test_cache_warm_endpoint(self):
+        """Test on-demand warm-up reports the keys it preloaded."""
+        client.post(
+            "/api/v1/trades",
+            json={"symbol": "ETH/USD", "price": 2500.0, "quantity": 2, "side": "SELL"}
+        )
+        
+        response = client.post("/api/v1/cache/warm")
+        assert response.status_code == 200
+        report = response.json()
+        assert report["keys"] == sum(report["by_source"].values())
+        assert report["skipped"] == 0
+
 
 # ============================================================================
 # ERROR HANDLING TESTS
@@ -3,9 +3,21 @@ Unit tests for AURORA cache layer.
 Tests Redis connection, cache manager operations, and decorator functionality.
 """
 
+import itertools
+
 import pytest
+from src.cache import cache_manager
 from src.cache.cache_manager import CacheManager
 from src.cache.decorators import cache, cache_invalidate
+from src.cache.local_cache import MISSING, LocalCache, InvalidationBus, local_cache
+from src.cache.single_flight import acquire_lock, release_lock, acquire_lock_async, release_lock_async
+from src.cache.async_cache_manager import AsyncCacheManager
+from src.cache.codecs import CODECS, COMPRESSIONS, ValueCodec
+from src.cache.metrics import CacheMetrics, CacheMetricsReporter, cache_metrics, key_prefix
+from src.cache.memory_backend import MemoryRedis, MemoryStore
+from src.cache.redis_client import RedisClient
+from src.cache.sharding import HashRing
+from src.cache.tinylfu import CountMinSketch, TinyLFUCache
 
 
 # ============================================================================
@@ -73,6 +85,42 @@ def test_cache_delete_many():
     assert deleted == 3
 
 
+def test_cache_set_get_many():
+    """Test batch set and get across chunk boundaries."""
+    from src.cache.redis_client import redis_client
+    
+    items = {f"many:{i}": {"i": i} for i in range(5)}
+    chunk, redis_client.MULTI_KEY_CHUNK = redis_client.MULTI_KEY_CHUNK, 2
+    try:
+        assert CacheManager.set_many(items, ttl=60) is True
+        values = CacheManager.get_many(list(items) + ["many:missing"])
+    finally:
+        redis_client.MULTI_KEY_CHUNK = chunk
+    
+    assert values == items
+    assert 0 < redis_client.client.ttl("many:0") <= 60
+
+
+def test_cache_set_many_per_key_ttl():
+    """Test per-key TTLs fall back to the default TTL."""
+    from src.cache.redis_client import redis_client
+    
+    CacheManager.set_many({"ttl:a": 1, "ttl:b": 2}, ttl={"ttl:a": 30})
+    
+    assert 0 < redis_client.client.ttl("ttl:a") <= 30
+    assert 30 < redis_client.client.ttl("ttl:b") <= CacheManager.DEFAULT_TTL
+
+
+def test_cache_exists_many():
+    """Test batch existence check."""
+    CacheManager.set("exists_many:a", "value", ttl=60)
+    
+    assert CacheManager.exists_many(["exists_many:a", "exists_many:b"]) == {
+        "exists_many:a": True,
+        "exists_many:b": False,
+    }
+
+
 def test_cache_invalidate_pattern():
     """Test pattern-based cache invalidation."""
     # Set multiple keys with pattern
@@ -294,6 +342,1087 @@ def test_cache_decorator_integration_with_manager():
     assert call_count == 2
 
 
+# ============================================================================
+# Tag Invalidation Tests
+# ============================================================================
+
+def test_cache_invalidate_tags():
+    """Test tagged keys are deleted exactly, untagged keys survive."""
+    CacheManager.set("tagged:1", 1, ttl=60, tags=["orders", "order:1"])
+    CacheManager.set("tagged:2", 2, ttl=120, tags=["orders"])
+    CacheManager.set("tagged:3", 3, ttl=60)
+    
+    assert CacheManager.invalidate_tags("order:1") == 1
+    assert CacheManager.get("tagged:2") == 2
+    assert CacheManager.invalidate_tags("orders") == 1
+    assert CacheManager.get("tagged:3") == 3
+    assert CacheManager.invalidate_tags("orders") == 0
+
+
+def test_cache_decorator_tags():
+    """Test @cache registers keys under static and computed tags."""
+    call_count = 0
+    
+    @cache(ttl=60, tags=lambda account_id: ["accounts", f"account:{account_id}"])
+    def get_balance(account_id):
+        nonlocal call_count
+        call_count += 1
+        return account_id * 10
+    
+    @cache_invalidate(tags=lambda account_id: [f"account:{account_id}"])
+    def deposit(account_id):
+        return True
+    
+    get_balance(1)
+    get_balance(2)
+    deposit(1)
+    get_balance(1)
+    get_balance(2)
+    assert call_count == 3
+    
+    CacheManager.invalidate_tags("accounts")
+    get_balance(2)
+    assert call_count == 4
+
+
+def test_cache_invalidate_pattern_scans_in_batches():
+    """Test SCAN-based pattern invalidation across several batches."""
+    batch, CacheManager.SCAN_BATCH = CacheManager.SCAN_BATCH, 3
+    try:
+        CacheManager.set_many({f"scan:{i}": i for i in range(10)}, ttl=60)
+        assert CacheManager.invalidate_pattern("scan:*") == 10
+    finally:
+        CacheManager.SCAN_BATCH = batch
+    assert CacheManager.exists("scan:0") is False
+
+
+# ============================================================================
+# Stampede Protection Tests
+# ============================================================================
+
+def test_cache_decorator_single_flight_sync():
+    """Test concurrent misses run the function once."""
+    import threading
+    import time
+    
+    call_count = 0
+    
+    @cache(ttl=60, key_prefix="flight_sync")
+    def slow_query(x):
+        nonlocal call_count
+        call_count += 1
+        time.sleep(0.2)
+        return x * 2
+    
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(slow_query(21))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert results == [42] * 5
+    assert call_count == 1
+
+
+def test_cache_decorator_single_flight_async():
+    """Test concurrent async misses await one computation."""
+    import asyncio
+    
+    call_count = 0
+    
+    @cache(ttl=60, key_prefix="flight_async")
+    async def slow_query(x):
+        nonlocal call_count
+        call_count += 1
+        await asyncio.sleep(0.1)
+        return x * 2
+    
+    async def run():
+        return await asyncio.gather(*(slow_query(5) for _ in range(5)))
+    
+    assert asyncio.run(run()) == [10] * 5
+    assert call_count == 1
+
+
+def test_cache_decorator_stale_while_revalidate():
+    """Test expired values are served stale and refreshed in background."""
+    import time
+    
+    call_count = 0
+    
+    @cache(ttl=1, stale_ttl=60, key_prefix="swr")
+    def version():
+        nonlocal call_count
+        call_count += 1
+        return call_count
+    
+    assert version() == 1
+    time.sleep(1.1)
+    assert version() == 1          # stale value, refresh started
+    deadline = time.time() + 2
+    while call_count < 2 and time.time() < deadline:
+        time.sleep(0.02)
+    time.sleep(0.05)
+    assert version() == 2
+    assert call_count == 2
+
+
+def test_cache_decorator_local_tier_stale_while_revalidate():
+    """Test L1 hits run the same freshness check as Redis hits."""
+    import time
+    
+    call_count = 0
+    
+    @cache(ttl=1, stale_ttl=60, key_prefix="swr_l1", local=True, local_ttl=30)
+    def version():
+        nonlocal call_count
+        call_count += 1
+        return call_count
+    
+    assert version() == 1
+    assert local_cache.get(version.cache_key()) is not MISSING
+    time.sleep(1.1)
+    assert version() == 1          # stale L1 value, refresh started
+    deadline = time.time() + 2
+    while call_count < 2 and time.time() < deadline:
+        time.sleep(0.02)
+    time.sleep(0.05)
+    assert version() == 2
+    assert call_count == 2
+
+
+def test_cache_decorator_local_tier_early_refresh(monkeypatch):
+    """Test XFetch early refreshes also fire on L1 hits."""
+    import time
+    import src.cache.decorators as decorators
+    
+    call_count = 0
+    
+    @cache(ttl=1, key_prefix="xfetch_l1", early_refresh=1.0, local=True)
+    def version():
+        nonlocal call_count
+        call_count += 1
+        time.sleep(0.05)
+        return call_count
+    
+    assert version() == 1
+    redis_hits = CacheManager.stats()["l2"]["hits"]
+    monkeypatch.setattr(decorators.random, "random", lambda: 1.0 - 1e-12)  # far in the tail
+    assert version() == 1          # L1 hit, refresh started
+    assert CacheManager.stats()["l2"]["hits"] == redis_hits
+    deadline = time.time() + 2
+    while call_count < 2 and time.time() < deadline:
+        time.sleep(0.02)
+    assert call_count == 2
+
+
+def test_cache_decorator_early_refresh(monkeypatch):
+    """Test XFetch refreshes a value before expiry based on its compute time."""
+    import time
+    import src.cache.decorators as decorators
+    
+    call_count = 0
+    
+    @cache(ttl=1, key_prefix="xfetch", early_refresh=1.0)
+    def version():
+        nonlocal call_count
+        call_count += 1
+        time.sleep(0.05)
+        return call_count
+    
+    assert version() == 1
+    envelope = CacheManager.get(version.cache_key())
+    assert envelope["delta"] >= 0.05
+    
+    monkeypatch.setattr(decorators.random, "random", lambda: 0.0)  # -ln(1) = 0: no early refresh
+    assert version() == 1
+    time.sleep(0.1)
+    assert call_count == 1
+    
+    monkeypatch.setattr(decorators.random, "random", lambda: 1.0 - 1e-12)  # far in the tail
+    assert version() == 1          # still served, refresh started
+    deadline = time.time() + 2
+    while call_count < 2 and time.time() < deadline:
+        time.sleep(0.02)
+    assert call_count == 2
+
+def test_cache_lock_compare_and_delete():
+    """Test the recompute lock is exclusive and released by its holder only."""
+    token = acquire_lock("lock_test", timeout=5)
+    
+    assert token is not None
+    assert acquire_lock("lock_test", timeout=5) is None
+    assert release_lock("lock_test", "other-token") is False
+    assert release_lock("lock_test", token) is True
+    assert acquire_lock("lock_test", timeout=5) is not None
+
+
+def test_cache_decorator_waits_for_lock_holder():
+    """Test a caller losing the Redis lock uses the holder's value."""
+    import threading
+    
+    call_count = 0
+    
+    @cache(ttl=60, key_prefix="locked", lock_timeout=2)
+    def expensive():
+        nonlocal call_count
+        call_count += 1
+        return "mine"
+    
+    key = expensive.cache_key()
+    token = acquire_lock(key, timeout=5)
+    results = []
+    thread = threading.Thread(target=lambda: results.append(expensive()))
+    thread.start()
+    CacheManager.set(key, "holder", ttl=60)
+    thread.join()
+    release_lock(key, token)
+    
+    assert results == ["holder"]
+    assert call_count == 0
+
+
+# ============================================================================
+# Async Cache Tests
+# ============================================================================
+
+def test_async_cache_manager_operations():
+    """Test the async manager round-trips values, batches and tags."""
+    import asyncio
+    
+    async def run():
+        assert await AsyncCacheManager.set("async:1", {"a": 1}, ttl=60, tags=["async"]) is True
+        assert await AsyncCacheManager.set_many({"async:2": 2, "async:3": 3}, ttl=60) is True
+        assert await AsyncCacheManager.get("async:1") == {"a": 1}
+        assert await AsyncCacheManager.get_many(["async:2", "async:x"]) == {"async:2": 2}
+        assert await AsyncCacheManager.exists_many(["async:3", "async:x"]) == {
+            "async:3": True, "async:x": False
+        }
+        assert await AsyncCacheManager.invalidate_tags("async") == 1
+        assert await AsyncCacheManager.invalidate_pattern("async:*") == 2
+        assert await AsyncCacheManager.exists("async:2") is False
+    
+    asyncio.run(run())
+    # A second event loop gets its own connection pool
+    asyncio.run(run())
+    
+    async def close():
+        from src.cache.async_redis_client import async_redis_client
+        client = async_redis_client.client
+        await async_redis_client.aclose()
+        assert client is not async_redis_client.client  # reopened on use
+        await async_redis_client.aclose()
+    
+    asyncio.run(close())
+
+
+def test_async_decorator_uses_async_client(monkeypatch):
+    """Test coroutine functions never touch the blocking client."""
+    import asyncio
+    
+    def blocking(*args, **kwargs):
+        raise AssertionError("blocking cache call from async code")
+    
+    monkeypatch.setattr(CacheManager, "get", staticmethod(blocking))
+    monkeypatch.setattr(CacheManager, "set", staticmethod(blocking))
+    call_count = 0
+    
+    @cache(ttl=60, key_prefix="async_native", lock_timeout=1, stale_ttl=60)
+    async def fetch(x):
+        nonlocal call_count
+        call_count += 1
+        return x + 1
+    
+    async def run():
+        return [await fetch(1), await fetch(1)]
+    
+    assert asyncio.run(run()) == [2, 2]
+    assert call_count == 1
+
+
+def test_async_lock_compare_and_delete():
+    """Test the async recompute lock mirrors the sync one."""
+    import asyncio
+    
+    async def run():
+        token = await acquire_lock_async("async_lock", timeout=5)
+        assert token is not None
+        assert await acquire_lock_async("async_lock", timeout=5) is None
+        assert await release_lock_async("async_lock", "other-token") is False
+        assert await release_lock_async("async_lock", token) is True
+    
+    asyncio.run(run())
+
+
+# ============================================================================
+# Codec Tests
+# ============================================================================
+
+def test_value_codecs_round_trip():
+    """Test every installed codec/compression pair round-trips values."""
+    value = {"trades": [{"id": i, "symbol": "BTC/USD", "price": 45000.5} for i in range(100)]}
+    
+    for codec in CODECS:
+        for compression in list(COMPRESSIONS) + [None]:
+            encoder = ValueCodec(codec, compression, compress_threshold=64)
+            raw = encoder.encode(value)
+            assert raw[0] < 0x20
+            assert encoder.decode(raw) == value
+            if compression:
+                assert len(raw) < len(ValueCodec(codec, None).encode(value))
+
+
+def test_value_codec_header_allows_codec_change():
+    """Test values written by other codecs and legacy JSON still decode."""
+    from datetime import datetime
+    
+    pickled = ValueCodec("pickle").encode({"at": datetime(2026, 1, 2, 3, 4)})
+    zipped = ValueCodec("json", "zlib", compress_threshold=1).encode({"zipped": True})
+    
+    assert ValueCodec("pickle").decode(zipped) == {"zipped": True}
+    assert ValueCodec("json", allow_pickle=True).decode(pickled) == {"at": datetime(2026, 1, 2, 3, 4)}
+    with pytest.raises(ValueError):
+        ValueCodec("json").decode(pickled)  # pickle only when explicitly enabled
+    assert ValueCodec().decode(b'{"legacy": true}') == {"legacy": True}
+    assert ValueCodec().decode(b'"text"') == "text"
+    assert ValueCodec("json", "zlib", compress_threshold=10_000).encode("x")[0] == 1
+    with pytest.raises(ValueError):
+        ValueCodec("yaml")
+
+
+def test_redis_client_stores_codec_header():
+    """Test cached values are stored with the codec header byte."""
+    from src.cache.redis_client import RedisClient, redis_client
+    
+    client = RedisClient(url=redis_client.url, codec=ValueCodec("pickle", "zlib", compress_threshold=16))
+    value = {"ids": list(range(50))}
+    assert client.set("codec:pickle", value, ttl=60) is True
+    
+    raw = client.binary.get("codec:pickle")
+    assert raw[0] == (COMPRESSIONS["zlib"].id << 3) | CODECS["pickle"].id
+    assert client.get("codec:pickle") == value
+    # Readers without pickle enabled treat it as a miss
+    assert CacheManager.get("codec:pickle") is None
+
+
+# ============================================================================
+# Local (L1) Cache Tests
+# ============================================================================
+
+def test_local_cache_lru_and_ttl():
+    """Test L1 evicts least recently used and expired entries."""
+    import time
+    
+    l1 = LocalCache(max_entries=2)
+    l1.set("a", 1)
+    l1.set("b", 2)
+    assert l1.get("a") == 1          # a is now most recent
+    l1.set("c", 3)                   # evicts b
+    
+    assert l1.get("b") is MISSING
+    assert l1.get("c") == 3
+    l1.set("short", None, ttl=0.01)
+    assert l1.get("short") is None
+    time.sleep(0.02)
+    assert l1.get("short") is MISSING
+    assert l1.stats()["evictions"] == 2
+    assert l1.delete_pattern("c*") == 1
+
+
+def test_cache_decorator_local_tier():
+    """Test L1 hits skip Redis and invalidation evicts both tiers."""
+    call_count = 0
+    
+    @cache(ttl=60, key_prefix="l1", local=True)
+    def lookup(x):
+        nonlocal call_count
+        call_count += 1
+        return {"x": x}
+    
+    lookup(1)
+    redis_hits = CacheManager.stats()["l2"]["hits"]
+    assert lookup(1) == {"x": 1}
+    assert CacheManager.stats()["l2"]["hits"] == redis_hits
+    assert local_cache.get(lookup.cache_key(1))["value"] == {"x": 1}
+    
+    lookup(1)["x"] = 99  # callers get copies
+    assert lookup(1) == {"x": 1}
+    
+    CacheManager.invalidate_pattern("cache:l1:*")
+    assert local_cache.get(lookup.cache_key(1)) is MISSING
+    lookup(1)
+    assert call_count == 2
+
+
+def test_invalidation_bus_broadcast():
+    """Test invalidations published by one worker evict another's L1."""
+    import time
+    from src.cache.redis_client import redis_client
+    
+    worker_a, worker_b = LocalCache(), LocalCache()
+    worker_a.enabled = worker_b.enabled = True
+    bus_a = InvalidationBus(worker_a, redis_client.client, channel="test:invalidate")
+    bus_b = InvalidationBus(worker_b, redis_client.client, channel="test:invalidate")
+    assert bus_b.start() is True
+    time.sleep(0.2)
+    
+    try:
+        worker_b.set("k1", 1)
+        worker_b.set("k2", 2)
+        bus_a.publish("delete", keys=["k1"])
+        deadline = time.time() + 2
+        while worker_b.get("k1") is not MISSING and time.time() < deadline:
+            time.sleep(0.02)
+        
+        assert worker_b.get("k1") is MISSING
+        assert worker_b.get("k2") == 2
+    finally:
+        bus_b.stop()
+
+
+# ============================================================================
+# Negative Caching Tests
+# ============================================================================
+
+class TradeNotFound(Exception):
+    """Lookup error cached by the negative caching tests."""
+    
+    def __init__(self, trade_id):
+        super().__init__(trade_id)
+        self.trade_id = trade_id
+
+
+def test_cache_decorator_negative_exception():
+    """Test chosen exceptions are cached, re-raised and cleared by tag."""
+    call_count = 0
+    existing = set()
+    
+    @cache(ttl=60, key_prefix="neg_exc", tags=lambda trade_id: [f"neg:{trade_id}"],
+           negative_ttl=5, negative_on=TradeNotFound)
+    def find(trade_id):
+        nonlocal call_count
+        call_count += 1
+        if trade_id not in existing:
+            raise TradeNotFound(trade_id)
+        return {"id": trade_id}
+    
+    for _ in range(3):
+        with pytest.raises(TradeNotFound) as error:
+            find(7)
+        assert error.value.trade_id == 7
+    assert call_count == 1
+    from src.cache.redis_client import redis_client
+    assert 0 < redis_client.client.ttl(find.cache_key(7)) <= 5
+    
+    existing.add(7)
+    CacheManager.invalidate_tags("neg:7")
+    assert find(7) == {"id": 7}
+    assert call_count == 2
+
+
+class TradeArchived(TradeNotFound):
+    """Subclass of the negative caching test error."""
+
+
+def test_cache_decorator_negative_classes_never_imported():
+    """Test stored class paths only resolve to negative_on classes the
+    process knows, never by importing what Redis names."""
+    from src.cache.decorators import NEGATIVE_MARK
+    
+    calls = {"find": 0, "archived": 0}
+    
+    @cache(ttl=60, key_prefix="neg_forged", negative_ttl=5, negative_on=TradeNotFound)
+    def find(trade_id):
+        calls["find"] += 1
+        return {"id": trade_id}
+    
+    @cache(ttl=60, key_prefix="neg_archived", negative_ttl=5, negative_on=TradeNotFound)
+    def archived(trade_id):
+        calls["archived"] += 1
+        raise TradeArchived(trade_id)
+    
+    forged = {NEGATIVE_MARK: f"{TradeArchived.__module__}:TradeArchived", "args": [1], "attrs": {}}
+    CacheManager.set(find.cache_key(1), forged, ttl=60)
+    assert find(1) == {"id": 1}    # unknown class: a miss
+    assert calls["find"] == 1
+    
+    for _ in range(2):
+        with pytest.raises(TradeArchived):
+            archived(2)
+    assert calls["archived"] == 1  # subclasses raised by the function resolve
+
+
+def test_cache_decorator_negative_none_and_unlisted_errors():
+    """Test None results are cached and other exceptions are not."""
+    import asyncio
+    
+    calls = {"none": 0, "boom": 0}
+    
+    @cache(ttl=60, key_prefix="neg_none", negative_ttl=5)
+    async def missing():
+        calls["none"] += 1
+        return None
+    
+    @cache(ttl=60, key_prefix="neg_boom", negative_ttl=5, negative_on=TradeNotFound)
+    def boom():
+        calls["boom"] += 1
+        raise ValueError("not cached")
+    
+    async def run():
+        return [await missing() for _ in range(3)]
+    
+    assert asyncio.run(run()) == [None] * 3
+    assert calls["none"] == 1
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            boom()
+    assert calls["boom"] == 2
+
+
+# ============================================================================
+# Cache Warm-up Tests
+# ============================================================================
+
+def test_cache_entry_and_tagged_set_many():
+    """Test precomputed entries land where @cache reads them, with tags."""
+    call_count = 0
+    
+    @cache(ttl=60, key_prefix="warm", tags=lambda x: [f"warm:{x}"], stale_ttl=30)
+    def square(x):
+        nonlocal call_count
+        call_count += 1
+        return x * x
+    
+    entries = [square.cache_entry(x * x, args=(x,)) for x in range(3)]
+    key, _, key_tags, key_ttl = entries[0]
+    assert (key, key_tags, key_ttl) == (square.cache_key(0), ["warm:0"], 90)
+    assert CacheManager.set_many(
+        {key: payload for key, payload, _, _ in entries},
+        ttl={key: ttl for key, _, _, ttl in entries},
+        tags={key: key_tags for key, _, key_tags, _ in entries}
+    ) is True
+    
+    assert [square(x) for x in range(3)] == [0, 1, 4]
+    assert call_count == 0
+    assert CacheManager.invalidate_tags("warm:1") == 1
+    assert square(1) == 1
+    assert call_count == 1
+
+
+def test_add_many_keeps_existing_values():
+    """Test warm-up writes (SET NX) never overwrite values already cached."""
+    CacheManager.set("nx:fresh", "live", ttl=60)
+    
+    stored = CacheManager.add_many(
+        {"nx:fresh": "warm", "nx:new": "warm"}, ttl=60, tags={"nx:fresh": ["nx"], "nx:new": ["nx"]}
+    )
+    
+    assert stored == ["nx:new"]
+    assert CacheManager.get("nx:fresh") == "live"
+    assert CacheManager.get("nx:new") == "warm"
+    assert CacheManager.invalidate_tags("nx") == 1  # only the key it stored was tagged
+    assert CacheManager.get("nx:new") is None
+    assert CacheManager.get("nx:fresh") == "live"
+
+
+def test_async_add_many_reports_stored_keys():
+    """Test the async SET NX write returns only the keys it stored."""
+    import asyncio
+    
+    async def run():
+        await AsyncCacheManager.set("nx:async:a", "live", ttl=60)
+        stored = await AsyncCacheManager.add_many(
+            {"nx:async:a": "warm", "nx:async:b": "warm"}, ttl=60,
+            tags={"nx:async:a": ["nx:async"], "nx:async:b": ["nx:async"]}
+        )
+        assert stored == ["nx:async:b"]
+        assert await AsyncCacheManager.get("nx:async:a") == "live"
+        assert await AsyncCacheManager.invalidate_tags("nx:async") == 1
+        assert await AsyncCacheManager.get("nx:async:a") == "live"
+    
+    asyncio.run(run())
+
+
+# ============================================================================
+# Cache Metrics Tests
+# ============================================================================
+
+def test_cache_metrics_per_prefix():
+    """Test hits, misses, sizes and latencies are recorded per key prefix."""
+    @cache(ttl=60, key_prefix="metrics_fn")
+    def lookup(x):
+        return {"x": x}
+    
+    assert key_prefix(lookup.cache_key(1)) == "metrics_fn"
+    assert key_prefix("user:123") == "user"
+    assert key_prefix("session-8f3a") == key_prefix("session-91bc") == "other"
+    
+    lookup(1)
+    lookup(1)
+    CacheManager.get_many(["mp:a", "mp:b"])
+    
+    snapshot = cache_metrics.snapshot()
+    fn = snapshot["metrics_fn"]
+    assert fn["hits"] >= 1 and fn["misses"] >= 1 and fn["sets"] >= 1
+    assert fn["value_size_bytes"]["count"] >= 2
+    assert fn["get_latency_seconds"]["buckets"]["+Inf"] == fn["get_latency_seconds"]["count"]
+    assert snapshot["mp"]["misses"] >= 2
+    
+    text = cache_metrics.render_prometheus()
+    assert 'aurora_cache_hits_total{prefix="metrics_fn"}' in text
+    assert 'aurora_cache_get_latency_seconds_bucket{prefix="metrics_fn",le="+Inf"}' in text
+
+
+def test_cache_metrics_summary_event():
+    """Test periodic summaries carry counter deltas as one CACHE_METRICS event."""
+    from src.events.event_models import EventType
+    
+    metrics = CacheMetrics()
+    metrics.record_get("cache:fn:1", True, 0.001, 10)
+    metrics.record_get("cache:fn:2", False, 0.001)
+    metrics.record_error("cache:fn:3", "get")
+    appended = []
+    reporter = CacheMetricsReporter(metrics, appended.append, interval=60)
+    
+    event = reporter.report()
+    assert event.event_type == EventType.CACHE_METRICS
+    assert event.data["prefixes"]["fn"] == {
+        "hits": 1, "misses": 1, "local_hits": 0, "sets": 0, "errors": 1
+    }
+    assert reporter.report() is None  # no activity since the last summary
+    assert appended == [event]
+
+
+# ============================================================================
+# Write-through Tests
+# ============================================================================
+
+def test_cache_put_writes_through():
+    """Test a value written with cache_put is served without recomputing."""
+    call_count = 0
+    
+    @cache(ttl=60, tags=lambda item_id: [f"wt:{item_id}"], negative_ttl=30)
+    def load_item(item_id):
+        nonlocal call_count
+        call_count += 1
+        return None  # not found until written
+    
+    assert load_item(1) is None
+    assert call_count == 1
+    assert load_item.cache_put({"id": 1}, 1)  # replaces the cached "not found"
+    assert load_item(1) == {"id": 1}
+    assert call_count == 1
+    assert CacheManager.invalidate_tags("wt:1") == 1
+
+
+def test_cache_versioned_keys():
+    """Test bumping a namespace version moves keys to a new generation."""
+    import asyncio
+    
+    call_count = 0
+    
+    @cache(ttl=60, version="wt-pages")
+    async def load_page(skip):
+        nonlocal call_count
+        call_count += 1
+        return [skip, call_count]
+    
+    async def run():
+        first = await load_page(0)
+        assert await load_page(0) == first
+        version = await AsyncCacheManager.get_version("wt-pages")
+        assert await AsyncCacheManager.bump_version("wt-pages") == version + 1
+        assert CacheManager.get_version("wt-pages") == version + 1
+        assert await load_page(0) == [0, 2]  # new generation: recomputed
+        assert await load_page.cache_put([0, 99], 0)
+        assert await load_page(0) == [0, 99]
+        return load_page.cache_key(0)
+    
+    key = asyncio.run(run())
+    assert key.endswith(f":v{CacheManager.get_version('wt-pages')}")
+    assert call_count == 2
+
+
+# ============================================================================
+# Key Builder Tests
+# ============================================================================
+
+def test_cache_key_skips_injected_parameters():
+    """Test keys ignore Depends/Session parameters and normalize defaults."""
+    from fastapi import Depends, Query
+    from sqlalchemy.orm import Session
+    
+    def get_db():
+        pass
+    
+    @cache(ttl=60)
+    async def list_items(db: Session = Depends(get_db), skip: int = Query(0), limit: int = Query(10)):
+        pass
+    
+    @cache(ttl=60)
+    def get_item(item_id, db: Session = None, options=None):
+        pass
+    
+    assert list_items.cache_key(db=object(), skip=0, limit=10) == list_items.cache_key()
+    assert list_items.cache_key(skip=10) != list_items.cache_key()
+    assert get_item.cache_key(7, db=Session()) == get_item.cache_key(item_id=7)
+    assert get_item.cache_key(7, options={"a": 1, "b": {2, 1}}) == \
+        get_item.cache_key(7, options={"b": {1, 2}, "a": 1})
+
+
+def test_cache_key_vary_on_and_key_fn():
+    """Test vary_on restricts keys to named parameters and key_fn replaces the hash."""
+    @cache(ttl=60, vary_on=["symbol"])
+    def quote(symbol, request_id=None):
+        pass
+    
+    @cache(ttl=60, key_fn=lambda symbol, *args, **kwargs: symbol.lower())
+    def book(symbol, depth=10):
+        pass
+    
+    assert quote.cache_key("BTC", request_id=1) == quote.cache_key("BTC", request_id=2)
+    assert quote.cache_key("BTC") != quote.cache_key("ETH")
+    assert book.cache_key("BTC", depth=5) == "cache:book:btc"
+    with pytest.raises(ValueError):
+        cache(ttl=60, vary_on=["missing"])(quote.__wrapped__)
+
+
+# ============================================================================
+# Memory Backend Tests
+# ============================================================================
+
+def test_memory_backend_ttl_and_accounting(monkeypatch):
+    """Test keys expire on their TTL and used_memory follows writes and deletes."""
+    import src.cache.memory_backend as memory_backend
+    
+    now = [1000.0]
+    monkeypatch.setattr(memory_backend.time, "monotonic", lambda: now[0])
+    client = MemoryRedis(MemoryStore(), decode_responses=True)
+    
+    assert client.set("a", "x" * 100, ex=10) is True
+    client.sadd("s", "m1", "m2")
+    used = client.info()["used_memory"]
+    assert used >= 100
+    assert client.ttl("a") == 10 and client.ttl("s") == -1 and client.ttl("nope") == -2
+    assert sorted(client.keys("*")) == ["a", "s"]
+    
+    now[0] += 11
+    assert client.get("a") is None
+    assert client.exists("a") == 0
+    assert client.info()["used_memory"] < used
+    client.delete("s")
+    assert client.info()["used_memory"] == 0
+
+
+def test_memory_backend_maxmemory_evicts_lru():
+    """Test the least recently used keys are evicted above maxmemory."""
+    client = MemoryRedis(MemoryStore(max_memory=2000))
+    for i in range(5):
+        client.set(f"k{i}", b"v" * 300)
+    client.get("k0")  # k0 becomes most recently used
+    for i in range(5, 7):  # ~366 bytes per key: evicts k1 and k2
+        client.set(f"k{i}", b"v" * 300)
+    
+    assert client.info()["used_memory"] <= 2000
+    assert client.get("k0") is not None
+    assert client.get("k1") is None and client.get("k2") is None
+    assert client.get("k6") is not None
+
+
+def test_memory_backend_watch_and_pubsub():
+    """Test WATCH aborts on concurrent writes and pub/sub delivers messages."""
+    import redis
+    
+    store = MemoryStore()
+    client, other = MemoryRedis(store, True), MemoryRedis(store, True)
+    client.set("lock", "token")
+    
+    pipe = client.pipeline()
+    pipe.watch("lock")
+    other.set("lock", "stolen")
+    pipe.multi()
+    pipe.delete("lock")
+    with pytest.raises(redis.WatchError):
+        pipe.execute()
+    assert client.get("lock") == "stolen"
+    
+    received = []
+    pubsub = other.pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(**{"events": lambda message: received.append(message["data"])})
+    assert client.publish("events", "hello") == 1
+    for _ in range(2):  # subscribe confirmation, then the message
+        pubsub.get_message()
+    assert received == ["hello"]
+    
+    client.zincrby("rank", 2, "a")
+    client.zadd("rank", {"b": 5, "c": 1})
+    assert client.zrevrange("rank", 0, 1, withscores=True) == [("b", 5.0), ("a", 2.0)]
+
+
+def test_memory_backend_scan_pages_through_one_snapshot():
+    """Test SCAN pages cover every stable key while the keyspace changes."""
+    store = MemoryStore()
+    client = MemoryRedis(store, decode_responses=True)
+    for i in range(100):
+        client.set(f"scan:{i:03d}", "v")
+    
+    seen, cursor, steps = [], 0, 0
+    while True:
+        cursor, keys = client.scan(cursor, match="scan:*", count=10)
+        seen.extend(keys)
+        steps += 1
+        if steps == 3:
+            client.delete("scan:000", "scan:099")
+            client.set("scan:new", "v")
+        if cursor == 0:
+            break
+    
+    assert steps == 10
+    assert len(seen) == len(set(seen))
+    assert set(seen) >= {f"scan:{i:03d}" for i in range(1, 99)}
+    assert "scan:099" not in seen
+    assert store._scans == {}  # finished iterations drop their snapshot
+    
+    client.delete("scan:new")
+    assert sorted(client.scan_iter(match="scan:00*", count=7)) == [f"scan:{i:03d}" for i in range(1, 10)]
+
+
+def test_memory_backend_runs_cache_manager(monkeypatch):
+    """Test CacheManager and @cache run unchanged on a memory:// client."""
+    import src.cache.cache_manager as cache_manager
+    
+    client = RedisClient(url="memory://test-cache-manager")
+    assert client.pool is None and client.ping()
+    monkeypatch.setattr(cache_manager, "redis_client", client)
+    
+    assert CacheManager.set("mem:1", {"a": 1}, ttl=60, tags=["mem"])
+    assert CacheManager.get("mem:1") == {"a": 1}
+    assert CacheManager.get_many(["mem:1", "mem:2"]) == {"mem:1": {"a": 1}}
+    assert CacheManager.invalidate_tags("mem") == 1
+    assert CacheManager.get("mem:1") is None
+    assert client.binary.ttl("mem:1") == -2
+
+
+# ============================================================================
+# W-TinyLFU Tests
+# ============================================================================
+
+def test_tinylfu_resists_scans():
+    """Test frequently used keys survive a one-off scan that flushes an LRU."""
+    lfu = TinyLFUCache(max_bytes=100, default_ttl=None, expected_entries=100, weigher=lambda value: 1)
+    lru = LocalCache(max_entries=100, default_ttl=60)
+    hot = [f"hot:{i}" for i in range(50)]
+    for cache_ in (lfu, lru):
+        for _ in range(5):
+            for key in hot:
+                if cache_.get(key) is MISSING:
+                    cache_.set(key, key)
+        for i in range(1000):
+            cache_.set(f"scan:{i}", i)
+    
+    assert sum(lfu.get(key) is not MISSING for key in hot) >= 45
+    assert sum(lru.get(key) is not MISSING for key in hot) == 0
+    assert lfu.stats()['rejections'] > 800
+
+
+def test_tinylfu_byte_accounting():
+    """Test the byte bound holds and oversized values are rejected."""
+    cache_ = TinyLFUCache(max_bytes=10_000, default_ttl=None)
+    for i in range(200):
+        assert cache_.set(f"k:{i}", "x" * 100)
+        assert cache_.used_bytes <= cache_.max_bytes
+    
+    assert cache_.set("big", "x" * 20_000) is False
+    assert "big" not in cache_
+    assert cache_.set("k:1", "y", size=5_000) is True
+    assert cache_.used_bytes <= cache_.max_bytes
+    
+    entries = len(cache_)
+    assert cache_.delete_pattern("k:*") == entries
+    assert cache_.used_bytes == 0
+
+
+def test_tinylfu_rejection_keeps_main_victims():
+    """Test a candidate losing to any victim it needs evicts none of them."""
+    cache_ = TinyLFUCache(max_bytes=100, default_ttl=None, expected_entries=100)
+    cache_.set("cold", "a", size=50)
+    cache_.set("hot", "b", size=49)
+    for _ in range(10):
+        cache_.get("hot")
+    for _ in range(3):
+        cache_.get("new")
+    
+    assert cache_.set("new", "c", size=60)  # beats "cold" but not "hot"
+    assert "new" not in cache_
+    assert "cold" in cache_ and "hot" in cache_
+    assert cache_.stats()['evictions'] == 0
+    assert cache_.stats()['rejections'] == 1
+
+
+def test_tinylfu_update_keeps_segment():
+    """Test rewriting a hot key updates it in place instead of demoting it."""
+    now = [1000.0]
+    cache_ = TinyLFUCache(max_bytes=1000, default_ttl=None, expected_entries=100, clock=lambda: now[0])
+    cache_.set("hot", "a", size=10)
+    cache_.set("filler", "b", size=10)  # pushes "hot" out of the 10-byte window
+    cache_.get("hot")                   # probation hit: protected
+    assert cache_._entries["hot"].segment is cache_._protected
+    
+    assert cache_.set("hot", "c", ttl=5, size=30)
+    assert cache_._entries["hot"].segment is cache_._protected
+    assert cache_.get("hot") == "c"
+    assert cache_.used_bytes == 40
+    
+    now[0] += 10
+    cache_.get("filler")  # advances the wheel past the new TTL
+    assert "hot" not in cache_
+    assert cache_.used_bytes == 10
+
+
+def test_tinylfu_ttl_expires_on_timer_wheel():
+    """Test entries expire at their own TTL, swept without being read."""
+    now = [1000.0]
+    cache_ = TinyLFUCache(max_bytes=10_000, default_ttl=30.0, clock=lambda: now[0])
+    cache_.set("short", 1, ttl=2)
+    cache_.set("default", 2)
+    cache_.set("long", 3, ttl=600)
+    
+    now[0] += 5
+    cache_.set("other", 4)  # any access advances the wheel
+    assert "short" not in cache_
+    assert cache_.get("default") == 2
+    
+    now[0] += 60
+    assert cache_.get("other") is MISSING
+    assert cache_.get("long") == 3
+    assert "default" not in cache_
+    assert cache_.stats()['expirations'] == 3
+
+
+def test_count_min_sketch_estimates_and_ages():
+    """Test counts are never underestimated, saturate and halve on reset."""
+    sketch = CountMinSketch(width=64)
+    for _ in range(6):
+        sketch.increment("a")
+    sketch.increment("b")
+    
+    assert sketch.estimate("a") >= 6
+    assert sketch.estimate("b") >= 1
+    for _ in range(100):
+        sketch.increment("a")
+    assert sketch.estimate("a") == 15
+    
+    for i in range(sketch.sample_size - sketch.additions):  # reach one aging reset
+        sketch.increment(f"noise:{i}")
+    assert sketch.additions == sketch.sample_size // 2
+    assert sketch.estimate("a") <= 7
+
+
+# ============================================================================
+# Sharding Tests
+# ============================================================================
+
+def test_hash_ring_balance_and_stability():
+    """Test keys spread evenly and adding a node moves about 1/N of them."""
+    keys = [f"cache:fn:{i}" for i in range(6000)]
+    ring = HashRing(["a", "b", "c"])
+    placement = [ring.node_for(key) for key in keys]
+    
+    for index in range(3):
+        assert 1500 < placement.count(index) < 2500
+    
+    grown = HashRing(["a", "b", "c", "d"])
+    moved = sum(ring.nodes[old] != grown.nodes[grown.node_for(key)] for key, old in zip(keys, placement))
+    assert moved < len(keys) * 0.35
+    assert ring.node_for("lock:{trade:1}") == ring.node_for("cache:{trade:1}:x")
+
+
+def test_sharded_client_routes_and_fans_out():
+    """Test multi-key operations are split per node and flush reaches every node."""
+    client = RedisClient(url="memory://shard-a,memory://shard-b,memory://shard-c")
+    items = {f"sh:{i}": {"i": i} for i in range(30)}
+    
+    assert client.set_many(items, ttl=60)
+    assert client.get_many(list(items) + ["sh:missing"]) == items
+    sizes = [node.dbsize() for node in client.client.nodes]
+    assert sum(sizes) == 30 and all(sizes)
+    assert sorted(client.client.scan_iter(match="sh:*")) == sorted(items)
+    assert client.client.delete("sh:0", "sh:1", "sh:2") == 3
+    
+    assert client.flush()
+    assert client.client.dbsize() == 0
+
+
+def test_sharded_client_node_loss_degrades_to_misses(capsys):
+    """Test keys of an unreachable node read as misses without errors."""
+    client = RedisClient(url="memory://shard-live,redis://127.0.0.1:1/0")
+    keys = [f"loss:{i}" for i in range(20)]
+    live = [key for key in keys if client.client.ring.node_for(key) == 0]
+    dead = [key for key in keys if client.client.ring.node_for(key) == 1]
+    assert live and dead
+    
+    assert client.set_many({key: 1 for key in keys}, ttl=60) is False  # dead node's share lost
+    assert client.get_many(keys) == {key: 1 for key in live}
+    assert client.get(dead[0]) is None
+    assert client.exists_many(keys) == {key: key in live for key in keys}
+    assert client.client.health.down() == ["redis://127.0.0.1:1/0"]
+    assert "❌" not in capsys.readouterr().out
+
+
+def test_sharded_node_loss_skips_locks_and_keeps_version_bumps(monkeypatch, capsys):
+    """Test a down node runs locks unlocked and a lost bump is applied once it is back."""
+    client = RedisClient(url="memory://shard-ver-a,memory://shard-ver-b")
+    monkeypatch.setattr(cache_manager, "redis_client", client)
+    ring = client.client.ring
+    name = next(f"ns{i}" for i in itertools.count() if ring.node_for(CacheManager.VERSION_PREFIX + f"ns{i}") == 1)
+    key = next(f"down:{i}" for i in itertools.count() if ring.node_for(f"down:{i}") == 1)
+    version = CacheManager.get_version(name)
+    client.client.health.failed(1, OSError("node down"))
+    
+    assert CacheManager.set(key, 1, ttl=60, tags=["down"]) is False
+    assert acquire_lock(key, 5, client.client) is not None
+    assert release_lock(key, "token", client.client) is False
+    assert CacheManager.bump_version(name) is None
+    assert CacheManager.get_version(name) is None
+    
+    client.client.health._down_until[1] = 0.0  # node is back
+    assert CacheManager.get_version(name) == version + 1
+    assert name not in CacheManager._pending_bumps
+    assert "❌" not in capsys.readouterr().out
+
+
+def test_failed_version_bump_reaches_other_workers(monkeypatch):
+    """Test versioned calls bypass the cache while the counter's node is
+    down and every worker applies a bump that failed meanwhile."""
+    client = RedisClient(url="memory://shard-bump-a,memory://shard-bump-b")
+    monkeypatch.setattr(cache_manager, "redis_client", client)
+    monkeypatch.setattr(local_cache, "enabled", False)  # versions read from Redis every call
+    ring = client.client.ring
+    name = next(f"pages{i}" for i in itertools.count() if ring.node_for(CacheManager.VERSION_PREFIX + f"pages{i}") == 1)
+    calls = []
+    
+    @cache(ttl=60, key_prefix="bump", version=name)
+    def page(n):
+        calls.append(n)
+        return len(calls)
+    
+    assert page(1) == 1 and page(1) == 1
+    version = CacheManager.get_version(name)
+    client.client.health.failed(1, OSError("node down"))
+    
+    assert page(1) == 2 and page(1) == 3  # computed, never served from the old generation
+    assert page.cache_put(9, 1) is False
+    assert page.cache_entry(9, args=(1,)) is None
+    assert CacheManager.bump_version(name) is None
+    
+    CacheManager._pending_bumps.discard(name)  # as seen by another worker
+    client.client.health._down_until[1] = 0.0  # node is back
+    assert CacheManager.get_version(name) == version + 1
+    assert page(1) == 4 and page(1) == 4
+    assert CacheManager.get_version(name) == version + 1  # applied once
+
+
 if __name__ == "__main__":
     # Run: pytest tests/test_cache.py -v
     pytest.main([__file__, "-v"])
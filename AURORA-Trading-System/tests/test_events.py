@@ -4,13 +4,24 @@ Tests event models, event store, and event processor functionality.
 """
 
 import pytest
+import redis
+import uuid
 from datetime import datetime, timedelta
 from src.events.event_models import (
-    Event, EventType, TradeEvent, CacheEvent, SystemEvent,
-    create_trade_event, create_cache_event, create_system_event
+    Event, LazyEvent, EventType, TradeEvent, CacheEvent, SystemEvent,
+    create_trade_event, create_cache_event, create_system_event,
+    create_trade_events, create_cache_events, create_system_events
 )
 from src.events.event_store import EventStore, EventRecord
+from src.events.event_type_codes import EventTypeCodes, event_type_codes
+from src.events.event_registry import EventTypeRegistry, event_registry
+from src.events.event_ids import UUIDv7Generator, new_event_id, event_id_timestamp
 from src.events.event_processor import EventProcessor
+from src.events.portfolio_projection import PortfolioProjection
+from src.events.projection_registry import ProjectionRegistry
+from src.events.projection_store import ProjectionStore, ProjectionMaterializer
+from src.events.rebuild import rebuild_projections, partition_of
+from src.events.event_stats import EventStatsRecorder
 
 
 # ============================================================================
@@ -62,6 +73,37 @@ def test_event_to_json():
     assert "sys:core" in json_str
 
 
+def test_event_is_immutable():
+    """Test events are frozen and carry no per-instance __dict__."""
+    event = create_trade_event(
+        aggregate_id="trade:f1",
+        event_type=EventType.TRADE_CREATED,
+        symbol="BTC/USD",
+        price=45000,
+        quantity=1,
+        side="BUY",
+        status="CREATED"
+    )
+    
+    with pytest.raises(AttributeError):
+        event.aggregate_id = "trade:f2"
+    assert not hasattr(event, "__dict__")
+    assert hash(event) == hash(event.event_id)
+
+
+def test_event_to_json_matches_to_dict():
+    """Test JSON fast path encodes the same document as to_dict."""
+    import json
+    
+    event = Event(
+        event_type=EventType.TRADE_EXECUTED,
+        aggregate_id="trade:f3",
+        data={"symbol": "ETH/USD", "price": 2500.5, "nested": {"a": [1, 2]}}
+    )
+    
+    assert json.loads(event.to_json()) == event.to_dict()
+
+
 def test_trade_event_factory():
     """Test trade event factory function."""
     event = create_trade_event(
@@ -242,6 +284,8 @@ def test_event_store_get_by_type():
     
     assert len(trade_events) == 1
     assert len(cache_events) == 1
+    assert trade_events[0].data_loaded is False
+    assert trade_events[0].data["symbol"] == "BTC/USD"
 
 
 def test_event_store_append_many():
@@ -485,5 +529,858 @@ def test_event_processor_projection():
     assert projection["aggregate_id"] == "trade:777"
 
 
+# ============================================================================
+# Portfolio Projection Tests
+# ============================================================================
+
+def test_portfolio_projection_positions():
+    """Test per-symbol position, average cost and realized P&L."""
+    projection = PortfolioProjection(EventStore())
+    
+    projection.apply([
+        create_trade_event("trade:p1", EventType.TRADE_CREATED, "BTC/USD", 100, 2, "BUY", "CREATED"),
+        create_trade_event("trade:p2", EventType.TRADE_CREATED, "BTC/USD", 200, 2, "BUY", "CREATED"),
+        create_trade_event("trade:p3", EventType.TRADE_CREATED, "BTC/USD", 250, 1, "SELL", "CREATED"),
+        create_trade_event("trade:p4", EventType.TRADE_CREATED, "ETH/USD", 10, 5, "SELL", "CREATED"),
+    ])
+    
+    summary = projection.summary()
+    btc = summary["positions"]["BTC/USD"]
+    eth = summary["positions"]["ETH/USD"]
+    
+    assert btc["net_position"] == 3
+    assert btc["average_cost"] == 150
+    assert btc["notional"] == 850
+    assert btc["realized_pnl"] == 100
+    assert eth["net_position"] == -5
+    assert eth["average_cost"] == 10
+    assert summary["trade_count"] == 4
+
+
+def test_portfolio_projection_latest_event_wins():
+    """Test executions replace and cancellations remove a trade."""
+    projection = PortfolioProjection(EventStore())
+    
+    projection.apply([
+        create_trade_event("trade:p5", EventType.TRADE_CREATED, "BTC/USD", 100, 1, "BUY", "CREATED"),
+        create_trade_event("trade:p5", EventType.TRADE_EXECUTED, "BTC/USD", 110, 1, "BUY", "EXECUTED"),
+        create_trade_event("trade:p6", EventType.TRADE_CREATED, "BTC/USD", 120, 1, "BUY", "CREATED"),
+    ])
+    projection.apply([
+        Event(event_type=EventType.TRADE_CANCELLED, aggregate_id="trade:p6", data={"reason": "user"})
+    ])
+    
+    btc = projection.summary()["positions"]["BTC/USD"]
+    assert btc["net_position"] == 1
+    assert btc["average_cost"] == 110
+    assert btc["trade_count"] == 1
+
+
+def test_portfolio_projection_incremental_refresh():
+    """Test refresh only loads events appended since the last call."""
+    store = EventStore()
+    store.clear()
+    
+    processor = EventProcessor(store)
+    store.append(create_trade_event("trade:p7", EventType.TRADE_CREATED, "ETH/USD", 2000, 1, "BUY", "CREATED"))
+    store.append(create_cache_event("cache:p7", EventType.CACHE_HIT, "key", "GET"))
+    
+    portfolio = processor.get_portfolio_projection()
+    assert portfolio["positions"]["ETH/USD"]["net_position"] == 1
+    assert portfolio["events_applied"] == 1
+    
+    store.append(create_trade_event("trade:p8", EventType.TRADE_CREATED, "ETH/USD", 2100, 1, "SELL", "CREATED"))
+    
+    portfolio = processor.get_portfolio_projection()
+    assert portfolio["positions"]["ETH/USD"]["net_position"] == 0
+    assert portfolio["positions"]["ETH/USD"]["realized_pnl"] == 100
+    assert portfolio["events_applied"] == 2
+
+
+def test_portfolio_projection_picks_up_late_commits():
+    """Test an event committed after a refresh with an earlier timestamp is applied once."""
+    store = EventStore()
+    store.clear()
+    
+    projection = PortfolioProjection(store)
+    store.append(create_trade_event("trade:p9", EventType.TRADE_CREATED, "SOL/USD", 100, 4, "BUY", "CREATED"))
+    assert projection.refresh() == 1
+    
+    store.append(Event(
+        event_type=EventType.TRADE_CREATED,
+        aggregate_id="trade:p10",
+        timestamp=datetime.utcnow() - timedelta(seconds=2),
+        data={"symbol": "SOL/USD", "price": 120, "quantity": 1, "side": "SELL", "status": "CREATED"}
+    ))
+    
+    assert projection.refresh() == 1
+    assert projection.refresh() == 0
+    summary = projection.summary()
+    assert summary["positions"]["SOL/USD"]["net_position"] == 3
+    assert summary["events_applied"] == 2
+
+
+# ============================================================================
+# Projection Registry Tests
+# ============================================================================
+
+def test_projection_registry_fan_out():
+    """Test events reach only the projections subscribed to their type."""
+    registry = ProjectionRegistry()
+    trades, caches = [], []
+    
+    registry.register("trades", {EventType.TRADE_CREATED: trades.append})
+    registry.register("caches", {
+        EventType.CACHE_HIT: caches.append,
+        EventType.CACHE_MISS: caches.append
+    })
+    
+    delivered = registry.dispatch([
+        Event(event_type=EventType.TRADE_CREATED, aggregate_id="trade:r1"),
+        Event(event_type=EventType.CACHE_HIT, aggregate_id="cache:r1"),
+        Event(event_type=EventType.SYSTEM_STARTUP, aggregate_id="sys:CORE"),
+    ])
+    
+    assert delivered == 2
+    assert [e.aggregate_id for e in trades] == ["trade:r1"]
+    assert [e.aggregate_id for e in caches] == ["cache:r1"]
+    assert registry.subscribers(EventType.CACHE_MISS) == ["caches"]
+    assert registry.get_stats()["trades"]["events"] == 1
+
+
+def test_projection_registry_error_isolation():
+    """Test a failing projection does not affect the others."""
+    registry = ProjectionRegistry()
+    received = []
+    
+    def broken(event):
+        raise RuntimeError("boom")
+    
+    registry.register("broken", {EventType.TRADE_CREATED: broken})
+    registry.register("healthy", {EventType.TRADE_CREATED: received.append})
+    
+    registry.dispatch([
+        Event(event_type=EventType.TRADE_CREATED, aggregate_id="trade:r2"),
+        Event(event_type=EventType.TRADE_CREATED, aggregate_id="trade:r3"),
+    ])
+    
+    stats = registry.get_stats()
+    assert len(received) == 2
+    assert stats["broken"]["errors"] == 2
+    assert "boom" in stats["broken"]["last_error"]
+    assert stats["healthy"]["errors"] == 0
+
+
+def test_projection_registry_duplicate_name():
+    """Test registering the same projection name twice fails."""
+    registry = ProjectionRegistry()
+    registry.register("trades", {EventType.TRADE_CREATED: lambda e: None})
+    
+    with pytest.raises(ValueError):
+        registry.register("trades", {EventType.TRADE_EXECUTED: lambda e: None})
+
+
+def test_event_processor_run_projections():
+    """Test processor feeds registered projections incrementally."""
+    store = EventStore()
+    store.clear()
+    
+    processor = EventProcessor(store)
+    counts = {"events": 0, "batches": 0}
+    
+    def on_trade(event):
+        counts["events"] += 1
+    
+    def on_batch_end():
+        counts["batches"] += 1
+    
+    processor.register_projection(
+        "counter",
+        {EventType.TRADE_CREATED: on_trade},
+        on_batch_end=on_batch_end
+    )
+    
+    store.append(create_trade_event("trade:r4", EventType.TRADE_CREATED, "BTC/USD", 1, 1, "BUY", "CREATED"))
+    store.append(create_cache_event("cache:r4", EventType.CACHE_HIT, "key", "GET"))
+    
+    assert processor.run_projections() == 1
+    assert processor.run_projections() == 0
+    
+    store.append(create_trade_event("trade:r5", EventType.TRADE_CREATED, "BTC/USD", 1, 1, "BUY", "CREATED"))
+    
+    assert processor.run_projections() == 1
+    assert counts == {"events": 2, "batches": 2}
+
+
+def test_run_projections_late_commits_and_late_registration():
+    """Test late-committed events reach projections once and new projections are backfilled."""
+    store = EventStore()
+    store.clear()
+    
+    processor = EventProcessor(store)
+    seen = {"created": [], "executed": []}
+    processor.register_projection("created", {EventType.TRADE_CREATED: lambda e: seen["created"].append(e.aggregate_id)})
+    
+    store.append(create_trade_event("trade:r6", EventType.TRADE_CREATED, "BTC/USD", 1, 1, "BUY", "CREATED"))
+    store.append(create_trade_event("trade:r6", EventType.TRADE_EXECUTED, "BTC/USD", 1, 1, "BUY", "EXECUTED"))
+    assert processor.run_projections() == 1
+    
+    store.append(Event(
+        event_type=EventType.TRADE_CREATED,
+        aggregate_id="trade:r7",
+        timestamp=datetime.utcnow() - timedelta(seconds=2),
+        data={"symbol": "BTC/USD", "price": 1, "quantity": 1, "side": "BUY", "status": "CREATED"}
+    ))
+    assert processor.run_projections() == 1
+    assert processor.run_projections() == 0
+    assert seen["created"] == ["trade:r6", "trade:r7"]
+    
+    processor.register_projection("executed", {EventType.TRADE_EXECUTED: lambda e: seen["executed"].append(e.aggregate_id)})
+    assert processor.run_projections() == 1
+    assert seen == {"created": ["trade:r6", "trade:r7"], "executed": ["trade:r6"]}
+
+
+# ============================================================================
+# Projection Rebuild Tests
+# ============================================================================
+
+def test_rebuild_projections_switches_live_table():
+    """Test a multi-process rebuild materializes every aggregate."""
+    store = EventStore()
+    store.clear()
+    
+    for i in range(6):
+        store.append(create_trade_event(f"trade:b{i}", EventType.TRADE_CREATED, "BTC/USD", 100 + i, 1, "BUY", "CREATED"))
+    store.append(create_trade_event("trade:b0", EventType.TRADE_EXECUTED, "BTC/USD", 101, 1, "BUY", "EXECUTED"))
+    
+    result = rebuild_projections(workers=2, checkpoint_every=2)
+    
+    projections = ProjectionStore()
+    state = projections.get("trade:b0")
+    assert result["events_replayed"] == 7
+    assert state["status"] == "executed"
+    assert state["event_count"] == 2
+    assert projections.get("trade:b5")["price"] == 105
+
+
+def test_rebuild_projections_resume_skips_completed_partitions():
+    """Test resuming a run only rebuilds unfinished partitions."""
+    store = EventStore()
+    store.clear()
+    
+    aggregate_ids = [f"trade:c{i}" for i in range(8)]
+    for aggregate_id in aggregate_ids:
+        store.append(create_trade_event(aggregate_id, EventType.TRADE_CREATED, "ETH/USD", 10, 1, "SELL", "CREATED"))
+    
+    run_id = uuid.uuid4().hex  # checkpoints persist across runs on one database
+    projections = ProjectionStore()
+    projections.init_checkpoints(run_id, 2)
+    projections.complete_partition(run_id, 0)
+    
+    result = rebuild_projections(workers=2, run_id=run_id)
+    
+    # Only partition 1 is replayed by workers (catch-up may re-read the rest)
+    pending = [aggregate_id for aggregate_id in aggregate_ids if partition_of(aggregate_id, 2) == 1]
+    assert result["events_replayed"] == len(pending)
+    assert all(projections.get(aggregate_id) is not None for aggregate_id in pending)
+
+
+def test_rebuild_projections_store_error_keeps_live_table(monkeypatch):
+    """Test a failed event read aborts the run before the live table is swapped."""
+    store = EventStore()
+    store.clear()
+    
+    store.append(create_trade_event("trade:d0", EventType.TRADE_CREATED, "BTC/USD", 100, 1, "BUY", "CREATED"))
+    rebuild_projections(workers=1)
+    
+    def unavailable():
+        raise RuntimeError("database unavailable")
+    
+    monkeypatch.setattr("src.events.event_store.SessionLocal", unavailable)
+    with pytest.raises(RuntimeError):
+        rebuild_projections(workers=2)
+    
+    assert ProjectionStore().get("trade:d0")["event_count"] == 1
+
+
+def test_rebuild_projections_catches_up_appends_before_swap(monkeypatch):
+    """Test an event appended after the catch-up passes reaches the new live table."""
+    store = EventStore()
+    store.clear()
+    store.append(create_trade_event("trade:e0", EventType.TRADE_CREATED, "BTC/USD", 100, 1, "BUY", "CREATED"))
+    
+    swap = ProjectionStore.swap
+    
+    def append_then_swap(self, run_id, catch_up=None):
+        store.append(create_trade_event("trade:e0", EventType.TRADE_EXECUTED, "BTC/USD", 101, 1, "BUY", "EXECUTED"))
+        return swap(self, run_id, catch_up)
+    
+    monkeypatch.setattr(ProjectionStore, "swap", append_then_swap)
+    result = rebuild_projections(workers=1)
+    
+    assert ProjectionStore().get("trade:e0")["status"] == "executed"
+    assert result["aggregates_caught_up"] == 1
+
+
+def test_projection_table_materialized_on_append():
+    """Test appends keep the live projection table current for readers."""
+    store = EventStore()
+    store.clear()
+    materializer = ProjectionMaterializer(store)
+    store.subscribe(materializer)
+    processor = EventProcessor(store, materialized=materializer.store)
+    
+    store.append(create_trade_event("trade:m1", EventType.TRADE_CREATED, "BTC/USD", 100, 1, "BUY", "CREATED"))
+    store.append(create_trade_event("trade:m1", EventType.TRADE_EXECUTED, "BTC/USD", 101, 1, "BUY", "EXECUTED"))
+    
+    state = materializer.store.get("trade:m1")
+    assert state["status"] == "executed"
+    assert state["event_count"] == 2
+    assert processor.get_trade_projection("m1") == state
+    
+    # A row built from fewer events never replaces a newer one
+    stale = processor.projection_row("trade:m1", store.get_events_by_aggregate("trade:m1")[:1])
+    assert materializer.store.upsert_rows([stale]) == 0
+    assert materializer.store.get("trade:m1")["event_count"] == 2
+
+
+def test_projection_materializer_applies_appends_incrementally(monkeypatch):
+    """Test appends extend the stored row without reloading the stream, unless events are missing."""
+    store = EventStore()
+    store.clear()
+    materializer = ProjectionMaterializer(store)
+    store.subscribe(materializer)
+    store.append(create_trade_event("trade:m4", EventType.TRADE_CREATED, "BTC/USD", 100, 1, "BUY", "CREATED"))
+    
+    reloaded = []
+    get_events_for_aggregates = store.get_events_for_aggregates
+    
+    def tracked(aggregate_ids, strict=False):
+        reloaded.extend(aggregate_ids)
+        return get_events_for_aggregates(aggregate_ids, strict)
+    
+    monkeypatch.setattr(store, "get_events_for_aggregates", tracked)
+    store.append(create_trade_event("trade:m4", EventType.TRADE_EXECUTED, "BTC/USD", 101, 1, "BUY", "EXECUTED"))
+    assert reloaded == []
+    state = materializer.store.get("trade:m4")
+    assert state["status"] == "executed"
+    replayed = EventProcessor(store).project_events("trade:m4", get_events_for_aggregates(["trade:m4"])["trade:m4"])
+    assert state == replayed | {"created_at": state["created_at"]}
+    
+    # An event the row never saw (appended without notifying) forces a replay
+    store._append(create_trade_event("trade:m4", EventType.TRADE_CANCELLED, "BTC/USD", 101, 1, "BUY", "CANCELLED"))
+    store.append(create_cache_event("trade:m4", EventType.CACHE_HIT, "key", "GET"))
+    assert reloaded == ["trade:m4"]
+    assert materializer.store.get("trade:m4")["event_count"] == 4
+
+
+def test_projection_materializer_requeues_failed_writes(monkeypatch):
+    """Test a materialization failing every retry is kept and applied later."""
+    from src.events import projection_store
+    store = EventStore()
+    store.clear()
+    materializer = ProjectionMaterializer(store)
+    store.subscribe(materializer)
+    monkeypatch.setattr(projection_store, "MATERIALIZE_BACKOFF", 0.0)
+    
+    upsert_rows = ProjectionStore.upsert_rows
+    failures = [projection_store.MATERIALIZE_ATTEMPTS]
+    
+    def deadlocked(self, rows, run_id=None, conn=None):
+        if failures[0]:
+            failures[0] -= 1
+            raise RuntimeError("deadlock detected")
+        return upsert_rows(self, rows, run_id, conn)
+    
+    monkeypatch.setattr(ProjectionStore, "upsert_rows", deadlocked)
+    store.append(create_trade_event("trade:m2", EventType.TRADE_CREATED, "BTC/USD", 100, 1, "BUY", "CREATED"))
+    assert materializer.pending == {"trade:m2"}
+    assert materializer.store.get("trade:m2") is None
+    
+    store.append(create_trade_event("trade:m3", EventType.TRADE_CREATED, "ETH/USD", 10, 1, "BUY", "CREATED"))
+    assert materializer.pending == set()
+    assert materializer.store.get("trade:m2")["event_count"] == 1
+    assert materializer.store.get("trade:m3")["event_count"] == 1
+
+
+def test_append_invalidates_cached_event_reads():
+    """Test appends drop cache entries tagged with their aggregate."""
+    from src.cache.cache_manager import CacheManager
+    from src.events.event_store import event_cache_tag, event_store
+    
+    CacheManager.set("test:events:stream", ["cached"], ttl=60, tags=[event_cache_tag("cache:inv1")])
+    CacheManager.set("test:events:other", ["cached"], ttl=60, tags=[event_cache_tag("cache:inv2")])
+    
+    event_store.append(create_cache_event("cache:inv1", EventType.CACHE_MISS, "inv1", "GET"))
+    
+    assert CacheManager.get("test:events:stream") is None
+    assert CacheManager.get("test:events:other") == ["cached"]
+
+
+def test_rebuild_projections_unknown_run():
+    """Test resuming an unknown run fails."""
+    with pytest.raises(ValueError):
+        rebuild_projections(run_id="does-not-exist")
+
+
+# ============================================================================
+# Redis Event Statistics Tests
+# ============================================================================
+
+def test_event_stats_recorded_on_append():
+    """Test subscribed Redis counters track appended events."""
+    store = EventStore()
+    store.clear()
+    
+    recorder = EventStatsRecorder(prefix="test:stats:append:")
+    recorder.rebuild([])
+    store.subscribe(recorder.record)
+    
+    store.append(create_trade_event("trade:s1", EventType.TRADE_CREATED, "BTC/USD", 1, 1, "BUY", "CREATED"))
+    store.append_many([
+        create_trade_event("trade:s1", EventType.TRADE_EXECUTED, "BTC/USD", 1, 1, "BUY", "EXECUTED"),
+        create_cache_event("cache:s1", EventType.CACHE_HIT, "key", "GET"),
+    ])
+    
+    stats = recorder.get_stats()
+    assert stats["source"] == "redis"
+    assert stats["total_events"] == 3
+    assert stats["events_by_type"] == {"TRADE_CREATED": 1, "TRADE_EXECUTED": 1, "CACHE_HIT": 1}
+    assert stats["events_by_aggregate"]["trade:s1"] == 2
+    assert stats["first_event_time"] <= stats["last_event_time"]
+    assert sum(stats["events_per_minute"].values()) == 3
+
+
+def test_event_stats_top_aggregates_bounded():
+    """Test the per-aggregate ranking reports only the top-K aggregates."""
+    recorder = EventStatsRecorder(prefix="test:stats:topk:", top_k=2)
+    recorder.rebuild([
+        Event(event_type=EventType.CACHE_HIT, aggregate_id=f"cache:{i % 5}")
+        for i in range(5)
+    ] + [
+        Event(event_type=EventType.CACHE_HIT, aggregate_id="cache:hot")
+        for _ in range(3)
+    ])
+    
+    stats = recorder.get_stats()
+    assert len(stats["events_by_aggregate"]) == 2
+    assert stats["events_by_aggregate"]["cache:hot"] == 3
+    assert stats["total_events"] == 8
+
+
+def test_event_processor_stats_seed_and_fallback():
+    """Test processor seeds Redis stats and falls back to SQL without Redis."""
+    store = EventStore()
+    store.clear()
+    store.append(create_trade_event("trade:s2", EventType.TRADE_CREATED, "BTC/USD", 1, 1, "BUY", "CREATED"))
+    
+    recorder = EventStatsRecorder(prefix="test:stats:seed:")
+    recorder.reset()
+    processor = EventProcessor(store, stats=recorder)
+    
+    assert processor.get_aggregate_stats()["source"] == "sql"
+    assert processor.get_aggregate_stats()["source"] == "redis"
+    assert processor.get_aggregate_stats()["total_events"] == 1
+    
+    class UnreachableRedis:
+        def __getattr__(self, name):
+            raise redis.ConnectionError("Redis is down")
+    
+    unreachable = UnreachableRedis()
+    offline = EventProcessor(store, stats=EventStatsRecorder(client=unreachable))
+    stats = offline.get_aggregate_stats()
+    assert stats["source"] == "sql"
+    assert stats["total_events"] == 1
+
+
+def test_event_stats_seed_replays_concurrent_writes():
+    """Test batches recorded during the scan are counted exactly once."""
+    recorder = EventStatsRecorder(prefix="test:stats:{race}:")
+    recorder.reset()
+    recorder.rebuild([Event(event_type=EventType.CACHE_HIT, aggregate_id="cache:r0")])
+    
+    marker = recorder.begin_rebuild()
+    assert marker is not None
+    # Committed before the scan but recorded after the seed began
+    scanned = [Event(event_type=EventType.CACHE_HIT, aggregate_id="cache:r1")]
+    recorder.record(scanned)
+    # Committed after the scan
+    recorder.record([Event(event_type=EventType.CACHE_MISS, aggregate_id="cache:r2")])
+    
+    assert recorder.rebuild(scanned, marker) is True
+    stats = recorder.get_stats()
+    assert stats["total_events"] == 2
+    assert stats["events_by_type"] == {"CACHE_HIT": 1, "CACHE_MISS": 1}
+    assert list(recorder.client.scan_iter(match="test:stats:{race}:staging:*")) == []
+    assert not recorder.client.exists("test:stats:{race}:journal", "test:stats:{race}:seeding")
+    
+    # Recorded after the switch: counted live, not journaled
+    recorder.record([Event(event_type=EventType.CACHE_MISS, aggregate_id="cache:r3")])
+    assert recorder.get_stats()["total_events"] == 3
+    assert not recorder.client.exists("test:stats:{race}:journal")
+
+
+def test_event_stats_seed_guarded_by_lock():
+    """Test only one worker seeds the counters at a time."""
+    from src.cache.single_flight import acquire_lock, release_lock
+    
+    recorder = EventStatsRecorder(prefix="test:stats:{lock}:")
+    recorder.reset()
+    token = acquire_lock("test:stats:{lock}:seed", 30, recorder.client)
+    
+    try:
+        assert recorder.begin_rebuild() is None
+        assert recorder.rebuild([Event(event_type=EventType.CACHE_HIT, aggregate_id="cache:l1")]) is False
+        assert recorder.get_stats() is None
+    finally:
+        release_lock("test:stats:{lock}:seed", token, recorder.client)
+    
+    assert recorder.rebuild([Event(event_type=EventType.CACHE_HIT, aggregate_id="cache:l1")]) is True
+    assert recorder.get_stats()["total_events"] == 1
+
+
+# ============================================================================
+# Lazy Payload Tests
+# ============================================================================
+
+def test_lazy_event_decodes_on_first_access():
+    """Test LazyEvent decodes its raw payload only when data is used."""
+    event = LazyEvent(
+        raw_data='{"symbol": "BTC/USD", "price": 45000}',
+        event_type=EventType.TRADE_CREATED,
+        aggregate_id="trade:l1"
+    )
+    
+    assert event.data_loaded is False
+    assert event.aggregate_id == "trade:l1"
+    assert event.data["symbol"] == "BTC/USD"
+    assert event.data_loaded is True
+    assert event.to_dict()["data"]["price"] == 45000
+
+
+def test_event_store_lazy_metadata_only():
+    """Test metadata-only reads defer loading the payload."""
+    store = EventStore()
+    store.clear()
+    
+    event = create_trade_event("trade:l2", EventType.TRADE_CREATED, "ETH/USD", 2500, 2, "SELL", "CREATED")
+    store.append(event)
+    store.append(create_cache_event("cache:l2", EventType.CACHE_MISS, "key", "GET"))
+    
+    events = store.get_events_lazy(aggregate_id="trade:l2")
+    assert len(events) == 1
+    assert events[0].event_id == event.event_id
+    assert events[0].data_loaded is False
+    assert events[0].data["symbol"] == "ETH/USD"
+    
+    typed = store.get_events_lazy(event_type=EventType.CACHE_MISS, include_payload=True)
+    assert [e.aggregate_id for e in typed] == ["cache:l2"]
+    assert typed[0].data["operation"] == "GET"
+
+
+# ============================================================================
+# Event ID Tests
+# ============================================================================
+
+def test_event_ids_time_ordered():
+    """Test generated IDs are valid UUIDv7 and strictly increasing."""
+    import uuid
+    
+    generator = UUIDv7Generator()
+    ids = [generator.new() for _ in range(10000)]
+    
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+    parsed = uuid.UUID(ids[0])
+    assert parsed.version == 7
+    assert parsed.variant == uuid.RFC_4122
+
+
+def test_event_id_timestamp():
+    """Test the creation time is recoverable from UUIDv7 IDs only."""
+    import uuid
+    
+    before = datetime.utcnow() - timedelta(milliseconds=1)
+    embedded = event_id_timestamp(new_event_id())
+    
+    assert before <= embedded <= datetime.utcnow()
+    first, second = Event(), Event()
+    assert first.event_id < second.event_id
+    assert event_id_timestamp(str(uuid.uuid4())) is None
+    assert event_id_timestamp("not-a-uuid") is None
+
+
+def test_event_store_accepts_legacy_uuid4_ids():
+    """Test legacy uuid4 event IDs remain valid alongside UUIDv7."""
+    import uuid
+    
+    store = EventStore()
+    store.clear()
+    
+    legacy = Event(event_id=str(uuid.uuid4()), event_type=EventType.CACHE_HIT, aggregate_id="cache:u1")
+    current = Event(event_type=EventType.CACHE_HIT, aggregate_id="cache:u1")
+    
+    assert store.append(legacy) is True
+    assert store.append(current) is True
+    assert store.get_event(legacy.event_id).event_id == legacy.event_id
+    assert len(store.get_events_by_aggregate("cache:u1")) == 2
+
+
+def test_event_store_orders_by_id_on_timestamp_collision():
+    """Test events sharing a timestamp are returned in ID order."""
+    store = EventStore()
+    store.clear()
+    
+    timestamp = datetime.utcnow()
+    events = [
+        Event(event_type=EventType.CACHE_HIT, aggregate_id="cache:u2", timestamp=timestamp)
+        for _ in range(5)
+    ]
+    store.append_many(list(reversed(events)))
+    
+    stored = store.get_events_by_aggregate("cache:u2")
+    assert [e.event_id for e in stored] == [e.event_id for e in events]
+    
+    page = store.get_events_after(after=(timestamp, events[1].event_id), limit=2)
+    assert [e.event_id for e in page] == [e.event_id for e in events[2:4]]
+
+
+# ============================================================================
+# Event Type Registry Tests
+# ============================================================================
+
+def test_event_store_returns_typed_events():
+    """Test events read back from the store keep their subclass."""
+    store = EventStore()
+    store.clear()
+    
+    trade = create_trade_event(
+        "trade:t9", EventType.TRADE_EXECUTED, "BTC/USD", 45000.0, 1.0, "BUY", "EXECUTED"
+    )
+    cache_event = create_cache_event("cache:k", EventType.CACHE_HIT, "k", "GET", hit=True)
+    system = create_system_event(EventType.SYSTEM_STARTUP, "INFO", "started", "api")
+    store.append_many([trade, cache_event, system])
+    
+    assert type(store.get_event(trade.event_id)) is TradeEvent
+    assert type(store.get_event(cache_event.event_id)) is CacheEvent
+    assert type(store.get_event(system.event_id)) is SystemEvent
+    assert store.get_event(trade.event_id).data["symbol"] == "BTC/USD"
+
+
+def test_event_registry_unknown_type_decodes_to_event():
+    """Test unregistered event types fall back to the base class."""
+    event = event_registry.decode("id-1", "custom.type", "agg:1", datetime.utcnow(), {}, 1, None)
+    
+    assert type(event) is Event
+    assert event_registry.class_for("custom.type") is Event
+    
+    fallback = EventTypeRegistry(default_class=SystemEvent)
+    assert fallback.class_for("custom.type") is SystemEvent
+
+
+def test_event_store_lazy_reads_are_typed_and_upcast(monkeypatch):
+    """Test lazy reads keep the subclass and upcast old payload versions."""
+    store = EventStore()
+    store.clear()
+    
+    trade = create_trade_event("trade:lz", EventType.TRADE_EXECUTED, "BTC/USD", 1, 1, "BUY", "EXECUTED")
+    legacy = Event(event_type="legacy.fill", aggregate_id="trade:lz", data={"q": 2}, version=1)
+    store.append_many([trade, legacy])
+    
+    registry = EventTypeRegistry()
+    registry.register(EventType.TRADE_EXECUTED.value, TradeEvent)
+    registry.register("legacy.fill", TradeEvent, version=2)
+    registry.register_upcaster("legacy.fill", 1, lambda d: {"qty": d["q"]})
+    monkeypatch.setattr("src.events.event_store.event_registry", registry)
+    
+    lazy_trade, lazy_legacy = store.get_events_lazy(aggregate_id="trade:lz")
+    assert isinstance(lazy_trade, TradeEvent) and isinstance(lazy_trade, LazyEvent)
+    assert lazy_legacy.version == 2
+    assert lazy_legacy.data_loaded is False
+    assert lazy_legacy.data == {"qty": 2}
+
+
+def test_event_registry_upcasts_old_versions():
+    """Test older payload versions are upcast through the chain."""
+    registry = EventTypeRegistry()
+    registry.register("trade.executed", TradeEvent, version=3)
+    registry.register_upcaster("trade.executed", 1, lambda d: {"qty": d["q"]})
+    registry.register_upcaster("trade.executed", 2, lambda d: {**d, "venue": "default"})
+    
+    now = datetime.utcnow()
+    old = registry.decode("id-1", "trade.executed", "trade:1", now, {"q": 2}, 1, None)
+    mid = registry.decode("id-2", "trade.executed", "trade:1", now, {"qty": 3}, 2, None)
+    current = registry.decode("id-3", "trade.executed", "trade:1", now, {"qty": 4}, 3, None)
+    
+    assert type(old) is TradeEvent
+    assert old.data == {"qty": 2, "venue": "default"} and old.version == 3
+    assert mid.data == {"qty": 3, "venue": "default"}
+    assert current.data == {"qty": 4}
+    
+    registry.register("cache.hit", CacheEvent, version=2)
+    with pytest.raises(ValueError):
+        registry.decode("id-4", "cache.hit", "cache:1", now, {}, 1, None)
+
+
+# ============================================================================
+# Batch Factory Tests
+# ============================================================================
+
+def test_create_trade_events_from_arrays():
+    """Test batch trade events match the per-event factory payloads."""
+    import numpy as np
+    
+    events = create_trade_events(
+        ["trade:b1", "trade:b2"],
+        EventType.TRADE_EXECUTED,
+        np.array(["BTC/USD", "ETH/USD"]),
+        np.array([45000.0, 2500.0]),
+        np.array([1.5, 2.0]),
+        ["BUY", "SELL"],
+        "EXECUTED"
+    )
+    single = create_trade_event(
+        "trade:b1", EventType.TRADE_EXECUTED, "BTC/USD", 45000.0, 1.5, "BUY", "EXECUTED"
+    )
+    
+    assert all(type(e) is TradeEvent for e in events)
+    assert events[0].data == single.data
+    assert type(events[1].data["price"]) is float
+    assert events[0].event_type == EventType.TRADE_EXECUTED.value
+    assert events[0].event_id < events[1].event_id
+    
+    with pytest.raises(ValueError):
+        create_trade_events(["trade:b1"], EventType.TRADE_EXECUTED, ["A", "B"], 1.0, 1.0, "BUY", "NEW")
+    
+    shared = create_trade_events(
+        ["trade:b3", "trade:b4"], EventType.TRADE_EXECUTED, "BTC/USD",
+        np.float64(45000.0), np.int64(5), np.str_("BUY"), "EXECUTED"
+    )
+    assert [e.data["quantity"] for e in shared] == [5, 5]
+    assert type(shared[0].data["quantity"]) is int
+    assert type(shared[0].data["price"]) is float
+
+
+def test_batch_rows_bulk_append():
+    """Test row tuples from the batch factories go through append_rows."""
+    store = EventStore()
+    store.clear()
+    received = []
+    store.subscribe(received.extend)
+    
+    rows = create_cache_events(
+        [f"cache:r{i}" for i in range(3)], EventType.CACHE_HIT,
+        [f"r{i}" for i in range(3)], "GET", hits=[True, None, False], as_rows=True
+    )
+    rows += create_system_events(
+        EventType.SYSTEM_ERROR, "ERROR", ["boom"], "api", error_codes="E1", as_rows=True
+    )
+    
+    assert isinstance(rows[0], tuple)
+    assert store.append_rows(rows) == 4
+    assert store.get_event_count() == 4
+    assert "hit" not in store.get_event(rows[1][0]).data
+    stored = store.get_event(rows[3][0])
+    assert type(stored) is SystemEvent and stored.aggregate_id == "sys:api"
+    assert [e.event_id for e in received] == [row[0] for row in rows]
+    
+    # Duplicate IDs fail the whole batch
+    assert store.append_rows(rows[:1], notify=False) == 0
+    assert store.get_event_count() == 4
+
+
+# ============================================================================
+# Event Type Code Tests
+# ============================================================================
+
+def test_event_type_codes_stable_and_cached():
+    """Test built-in types get fixed codes and new names are registered once."""
+    store = EventStore()
+    codes = EventTypeCodes()
+    
+    builtin = [codes.code(event_type) for event_type in EventType]
+    assert builtin == list(range(1, len(EventType) + 1))
+    assert codes.code("custom.codes") == event_type_codes.code("custom.codes")
+    assert codes.name(codes.code("custom.codes")) == "custom.codes"
+    assert codes.lookup("never.stored") is None
+    assert codes.lookup_many([EventType.CACHE_HIT, "never.stored"]) == [codes.code(EventType.CACHE_HIT)]
+    
+    reloads = []
+    load = codes._load
+    codes._load = lambda: (reloads.append(1), load())
+    assert codes.lookup("never.stored") is None
+    assert reloads == []
+
+
+def test_event_store_stores_type_codes():
+    """Test the events table holds codes while the API returns names."""
+    from src.database.config import SessionLocal
+    
+    store = EventStore()
+    store.clear()
+    
+    event = Event(event_type="custom.stored", aggregate_id="agg:c1")
+    store.append(event)
+    store.append(Event(event_type=EventType.CACHE_HIT, aggregate_id="agg:c1"))
+    
+    session = SessionLocal()
+    record = session.query(EventRecord).filter(EventRecord.event_id == event.event_id).one()
+    session.close()
+    
+    assert record.event_type_code == event_type_codes.lookup("custom.stored")
+    assert record.event_type == "custom.stored"
+    assert [e.event_id for e in store.get_events_by_type("custom.stored")] == [event.event_id]
+    assert store.get_events_by_type("never.stored") == []
+    assert store.get_events_lazy(event_type="custom.stored")[0].event_type == "custom.stored"
+    assert len(store.get_events_after(event_types=["custom.stored", "never.stored"])) == 1
+
+
+def test_migrate_event_types_backfills_legacy_table():
+    """Test the migration moves a legacy event_type column to codes."""
+    from sqlalchemy import Column, DateTime, Index, Integer, JSON, MetaData, String, Table
+    from src.database.config import engine
+    from src.events.migrate_event_types import migrate_event_type_codes, needs_migration
+    
+    legacy = Table(
+        "events", MetaData(),
+        Column("event_id", String(36), primary_key=True),
+        Column("event_type", String(100), nullable=False, index=True),
+        Column("aggregate_id", String(100), nullable=False, index=True),
+        Column("timestamp", DateTime, nullable=False, index=True),
+        Column("data", JSON, nullable=False),
+        Column("version", Integer, nullable=False),
+        Column("user_id", String(100)),
+        Index("idx_event_type_timestamp", "event_type", "timestamp"),
+    )
+    EventRecord.__table__.drop(engine)
+    
+    try:
+        legacy.create(engine)
+        now = datetime.utcnow()
+        with engine.begin() as conn:
+            conn.execute(legacy.insert(), [
+                {"event_id": "legacy-1", "event_type": "TRADE_CREATED", "aggregate_id": "trade:m1",
+                 "timestamp": now, "data": {"symbol": "BTC/USD"}, "version": 1, "user_id": None},
+                {"event_id": "legacy-2", "event_type": "legacy.custom", "aggregate_id": "trade:m1",
+                 "timestamp": now + timedelta(seconds=1), "data": {}, "version": 1, "user_id": None},
+            ])
+        
+        assert needs_migration()
+        assert migrate_event_type_codes(batch_size=1) == 2
+        assert not needs_migration()
+        assert migrate_event_type_codes() == 0
+        
+        store = EventStore()
+        events = store.get_events_by_aggregate("trade:m1")
+        assert type(events[0]) is TradeEvent
+        assert [e.event_type for e in events] == ["TRADE_CREATED", "legacy.custom"]
+        assert [e.event_id for e in store.get_events_by_type("legacy.custom")] == ["legacy-2"]
+        assert store.append(Event(event_type="legacy.custom", aggregate_id="trade:m1"))
+    finally:
+        if needs_migration():
+            legacy.drop(engine)
+            EventRecord.__table__.create(engine)
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])